@@ -0,0 +1,320 @@
+# benchmark.py
+"""
+Replay-based performance benchmark.
+
+Replays recorded runs (start state + action log, see replay.py) headless
+through RedGymEnv.step and reports, per run:
+
+    steps_per_sec, step latency (mean/p50/p99/max ms), time per subsystem,
+    trigger evaluation time, peak RSS and the replay's RAM hash result
+
+Subsystem times come from wrapping the environment's own methods for the
+duration of the benchmark (see SUBSYSTEMS).  Times are inclusive: a
+subsystem called from inside another is counted in both.  Trigger
+evaluation is not part of env.step(); with --triggers every quest trigger
+is checked once per step through TriggerEvaluator and timed separately, as
+the play loop would do.
+
+Results are written as sorted, rounded JSON so a baseline checked into the
+repo diffs cleanly, and --compare flags metrics that got worse than a
+baseline by more than --tolerance.
+
+Usage:
+    python environment/benchmark.py --runs environment/replays/recordings --max_actions 2000 \\
+        --output benchmarks/latest.json --compare benchmarks/baseline.json
+"""
+import sys
+from pathlib import Path
+
+# Ensure the project root is in the Python path
+project_root_path = Path(__file__).resolve().parent.parent
+if str(project_root_path) not in sys.path:
+    sys.path.insert(0, str(project_root_path))
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import platform
+import resource
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from environment.replay import ReplayEngine, build_replay_env, find_start_state
+
+# Subsystem -> (attribute path on the env, method names)
+SUBSYSTEMS = {
+    'emulator': ('', ['run_action_on_emulator']),
+    'dialog': ('', ['read_dialog', 'get_active_dialog', 'handle_oak_dialog', 'handle_pokecenter_dialog']),
+    'collision': ('', ['get_collision_map_markdown', 'get_collision_map', 'get_collision_grid', 'get_collision_map_array']),
+    'map_tracking': ('', ['update_map_history', 'update_path_trace', 'update_safari_zone', 'update_seen_coords']),
+    'observation': ('', ['_get_obs']),
+    'navigator': ('navigator', ['snap_to_nearest_coordinate', '_execute_movement', 'convert_path_follow_to_movement_action']),
+    'quest': ('quest_manager', ['get_current_quest', 'filter_action']),
+    'stage': ('stage_manager', ['update_stage_manager', 'scripted_stage_movement']),
+}
+
+# Metrics where a larger value is a regression (everything else: smaller is worse)
+_HIGHER_IS_WORSE = ('latency_ms', 'subsystem_ms', 'trigger_ms', 'peak_rss_mb', 'mismatches')
+
+
+class SubsystemTimer:
+    """Wraps env methods with timers; restore() puts the originals back"""
+
+    def __init__(self, env, subsystems: Dict[str, tuple] = SUBSYSTEMS):
+        self.totals: Dict[str, float] = {name: 0.0 for name in subsystems}
+        self.calls: Dict[str, int] = {name: 0 for name in subsystems}
+        self._depth: Dict[str, int] = {name: 0 for name in subsystems}
+        self._patched: List[tuple] = []
+        for name, (owner_path, methods) in subsystems.items():
+            owner = self._resolve(env, owner_path)
+            if owner is None:
+                continue
+            for method in methods:
+                original = getattr(owner, method, None)
+                if callable(original):
+                    setattr(owner, method, self._wrap(name, original))
+                    self._patched.append((owner, method))
+
+    @staticmethod
+    def _resolve(env, path: str):
+        owner = env
+        for part in filter(None, path.split('.')):
+            owner = getattr(owner, part, None)
+            if owner is None:
+                return None
+        return owner
+
+    def _wrap(self, name: str, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            # Recursive/nested calls within one subsystem are counted once
+            if self._depth[name]:
+                return fn(*args, **kwargs)
+            self._depth[name] += 1
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.totals[name] += time.perf_counter() - start
+                self.calls[name] += 1
+                self._depth[name] -= 1
+        return timed
+
+    def restore(self):
+        for owner, method in self._patched:
+            # The wrapper is an instance attribute shadowing the class method
+            if method in vars(owner):
+                delattr(owner, method)
+        self._patched.clear()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+
+
+def _trigger_checker(env) -> Callable[[], None]:
+    from environment.environment_helpers.quest_catalog import get_quest_catalog
+    from environment.environment_helpers.trigger_evaluator import TriggerEvaluator
+
+    evaluator = TriggerEvaluator(env)
+    definitions = [t.definition for t in get_quest_catalog().triggers.values()]
+
+    def check_all():
+        for definition in definitions:
+            try:
+                evaluator.check_trigger(definition)
+            except Exception:
+                pass  # A trigger that cannot be evaluated in this state still costs its time
+    return check_all
+
+
+def benchmark_engine(engine: ReplayEngine, max_actions: Optional[int] = None,
+                     check_triggers: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """
+    Replay from the start and measure.
+
+    Args:
+        engine: ReplayEngine for one run
+        max_actions: Stop after this many actions (None: whole log)
+        check_triggers: Called after every step and timed as trigger evaluation
+
+    Returns:
+        dict: Metrics for the run (see module docstring)
+    """
+    engine.reset()
+    timer = SubsystemTimer(engine.env)
+    total = len(engine) if max_actions is None else min(max_actions, len(engine))
+    latencies = np.zeros(total, dtype=np.float64)
+    trigger_time = 0.0
+    executed = 0
+    start = time.perf_counter()
+    try:
+        while executed < total:
+            step_start = time.perf_counter()
+            running = engine.step()
+            latencies[executed] = time.perf_counter() - step_start
+            executed += 1
+            if check_triggers is not None:
+                trigger_start = time.perf_counter()
+                check_triggers()
+                trigger_time += time.perf_counter() - trigger_start
+            if not running:
+                break
+    finally:
+        timer.restore()
+    elapsed = time.perf_counter() - start
+    latencies_ms = latencies[:executed] * 1000.0
+    step_time = float(latencies[:executed].sum())
+
+    return {
+        'actions': executed,
+        'wall_seconds': elapsed,
+        'steps_per_sec': executed / step_time if step_time > 0 else 0.0,
+        'latency_ms': {
+            'mean': float(latencies_ms.mean()) if executed else 0.0,
+            'p50': float(np.percentile(latencies_ms, 50)) if executed else 0.0,
+            'p99': float(np.percentile(latencies_ms, 99)) if executed else 0.0,
+            'max': float(latencies_ms.max()) if executed else 0.0,
+        },
+        'subsystem_ms': {name: total_s * 1000.0 / max(executed, 1) for name, total_s in timer.totals.items()},
+        'subsystem_calls': dict(timer.calls),
+        'trigger_ms': trigger_time * 1000.0 / max(executed, 1) if check_triggers is not None else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'verified': engine.verified,
+        'mismatches': len(engine.mismatches),
+    }
+
+
+def discover_runs(roots: Iterable[Path]) -> List[Path]:
+    """Run directories (with a start state) under roots, or roots that are runs themselves"""
+    runs = []
+    for root in map(Path, roots):
+        candidates = [root] if find_start_state(root) else sorted(p for p in root.rglob("*") if p.is_dir())
+        runs.extend(p for p in candidates if find_start_state(p) and p.name != "replay_keyframes")
+    return runs
+
+
+def _round(value, digits: int = 3):
+    if isinstance(value, float):
+        return round(value, digits)
+    if isinstance(value, dict):
+        return {k: _round(v, digits) for k, v in value.items()}
+    return value
+
+
+def write_results(results: Dict[str, Any], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(_round(results), f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _flatten(prefix: str, value, out: Dict[str, float]):
+    if isinstance(value, dict):
+        for key, sub in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, sub, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out[prefix] = float(value)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.10) -> List[str]:
+    """
+    Per-run metrics that are worse than the baseline by more than tolerance.
+
+    Returns:
+        list: Human-readable regression lines (empty if none)
+    """
+    regressions = []
+    for run_name, run_results in results.get('runs', {}).items():
+        base_run = baseline.get('runs', {}).get(run_name)
+        if base_run is None:
+            continue
+        current, base = {}, {}
+        _flatten('', run_results, current)
+        _flatten('', base_run, base)
+        for metric in ('steps_per_sec', 'latency_ms.p50', 'latency_ms.p99', 'peak_rss_mb', 'mismatches') + tuple(
+                k for k in current if k.startswith(('subsystem_ms.', 'trigger_ms'))):
+            if metric not in current or metric not in base:
+                continue
+            old, new = base[metric], current[metric]
+            higher_is_worse = metric.startswith(_HIGHER_IS_WORSE)
+            worse = new - old if higher_is_worse else old - new
+            # Sub-0.01ms subsystem noise is not a regression
+            if worse > max(abs(old) * tolerance, 0.01 if 'ms' in metric else 0.0):
+                change = (new - old) / old * 100 if old else float('inf')
+                regressions.append(f"{run_name}: {metric} {old:.3f} -> {new:.3f} ({change:+.1f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark RedGymEnv.step by replaying recorded runs")
+    parser.add_argument("--runs", type=Path, nargs='+', default=[project_root_path / "environment" / "replays" / "recordings"],
+                        help="Run directories, or directories to search for runs")
+    parser.add_argument("--config_path", type=str, default=str(project_root_path / "config.yaml"))
+    parser.add_argument("--rom_path", type=str, default=None)
+    parser.add_argument("--max_actions", type=int, default=None, help="Actions replayed per run (default: all)")
+    parser.add_argument("--triggers", action="store_true", help="Also time evaluating every quest trigger after each step")
+    parser.add_argument("--output", type=Path, default=None, help="Write results JSON here")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression (default 10%%)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the environment's per-step prints")
+    args = parser.parse_args(argv)
+
+    runs = discover_runs(args.runs)
+    if not runs:
+        print(f"No recorded runs (start state + action log) found under {', '.join(map(str, args.runs))}")
+        return 1
+
+    env = build_replay_env(args.config_path, args.rom_path)
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'max_actions': args.max_actions,
+        'runs': {},
+    }
+    try:
+        for run_dir in runs:
+            try:
+                # No keyframes while timing: their save_state would land in the step latencies
+                engine = ReplayEngine.from_run(env, run_dir, keyframe_every=10 ** 9, persist_keyframes=False)
+            except FileNotFoundError as e:
+                print(f"Skipping {run_dir.name}: {e}")
+                continue
+            checker = _trigger_checker(env) if args.triggers else None
+            with contextlib.ExitStack() as stack:
+                if not args.verbose:
+                    stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+                run_results = benchmark_engine(engine, args.max_actions, checker)
+            results['runs'][run_dir.name] = run_results
+            print(f"{run_dir.name}: {run_results['actions']} actions, {run_results['steps_per_sec']:.1f} steps/sec, "
+                  f"p50 {run_results['latency_ms']['p50']:.2f} ms, p99 {run_results['latency_ms']['p99']:.2f} ms, "
+                  f"peak RSS {run_results['peak_rss_mb']:.0f} MB, {run_results['mismatches']} RAM hash mismatches")
+    finally:
+        env.pyboy.stop(save=False)
+
+    if args.output:
+        write_results(results, args.output)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -67,9 +67,11 @@ from environment.environment_helpers.navigator import InteractiveNavigator
 import itertools
 import tempfile
 
-from environment.environment_helpers.tile_visualizer import overlay_on_screenshot
 from environment.environment_helpers.quest_path_visualizer import QuestPathVisualizer
+from environment.environment_helpers.path_trace import PathTraceRecorder
+from environment.environment_helpers.event_log import emit_event, set_event_context
 from environment.environment_helpers.stage_helper import StageManager
+from environment.environment_helpers.scripted_overrides import ScriptedOverrideTable
 from environment.data.environment_data.menus import (
     TEXT_MENU_CURSOR_LOCATION,
     TEXT_MENU_CURSOR_LOCATIONS,
@@ -109,7 +111,7 @@ VALID_RELEASE_ACTIONS = [
 ]
 
 from environment.data.environment_data.item_handler import ItemHandler
-from environment.environment_helpers.tile_visualizer import overlay_on_screenshot
+from environment.environment_helpers.tile_visualizer import CollisionOverlayRenderer
 from environment.data.environment_data.ram_addresses import RamAddress as RAM
 from environment.data.environment_data.battle import (
     PokemonData,
@@ -351,6 +353,8 @@ class RedGymEnv(Env):
         self.item_handler = ItemHandler(self)
         self.navigator = InteractiveNavigator(self)
         self.stage_manager = StageManager(self)
+        # Quest-specific scripted tile overrides, indexed once at startup
+        self.scripted_overrides = ScriptedOverrideTable()
         
         # Initialize logging state tracking to reduce spam
         self.prev_logged_location = None
@@ -387,6 +391,7 @@ class RedGymEnv(Env):
         # Initialize warp-related cache variables
         self._is_warping = None
         self._minimap_warp_obs = None
+        self._collision_overlay_renderer = None
 
         # Quest path visualizer
         self.quest_visualizer = QuestPathVisualizer()
@@ -478,7 +483,7 @@ class RedGymEnv(Env):
         current_call_infos = {}
 
         # Reset recording attributes for the new run - but preserve run info if loading from last state
-        self.path_trace_data = {}
+        self.path_trace_data = PathTraceRecorder()
         # Only clear run info if we're not going to load from last ending state
         if not (self.init_from_last_ending_state and not options.get("state", None)):
             self.current_run_info = None
@@ -647,6 +652,7 @@ class RedGymEnv(Env):
         self.total_heal_health = 0
         self.died_count = 0
         self.step_count = 0
+        self.last_emulator_action = None
         self.blackout_check = 0
         self.blackout_count = 0
         self.use_surf = 0
@@ -1263,6 +1269,7 @@ class RedGymEnv(Env):
    
     def step(self, action):
         self.step_count += 1
+        self.last_emulator_action = None  # set by run_action_on_emulator() if input is sent
         
         self.handle_oak_dialog()
         self.handle_pokecenter_dialog()
@@ -1326,6 +1333,7 @@ class RedGymEnv(Env):
         except Exception as e:
             print(f"environment.py: step(): Error getting current quest: {e}")
             current_quest = None
+        set_event_context(self.step_count, current_quest)
         
         if current_quest not in [9, 10, 11, 12]:
             self.item_handler.scripted_buy_items()
@@ -1378,6 +1386,7 @@ class RedGymEnv(Env):
                 if converted_action is not None and converted_action != PATH_FOLLOW_ACTION:
                     final_action = converted_action
                     print(f"🎯 PATH_FOLLOW_ACTION converted to movement action {final_action}")
+                    emit_event("stage_action", action=final_action, original_action=action, source="path_follow")
                 else:
                     # If conversion fails we want to keep the player moving so they can
                     # still interact with nearby warp tiles (e.g. doorways).  Falling
@@ -1410,6 +1419,7 @@ class RedGymEnv(Env):
             if overridden != final_action:
                 final_action = overridden
                 print(f"environment.py: step(): StageManager.scripted_stage_movement override to {final_action}")
+                emit_event("stage_action", action=final_action, original_action=action, source="stage_manager")
         elif action == PATH_FOLLOW_ACTION:
             print(f"environment.py: step(): Skipping stage manager override for PATH_FOLLOW_ACTION - navigation has control")
 
@@ -1631,6 +1641,7 @@ class RedGymEnv(Env):
             print(f"=== STEP {self.step_count}: ACTION {action} (final: {final_action}) COMPLETE ===\n")
         
         self.update_map_history()
+        self.update_path_trace()
         print(f"environment.py: step(): END OF STEP {self.step_count}; location: {self.get_game_coords()}\n\n\n\n")
 
         # Print collision map to terminal for debugging formatting
@@ -1675,7 +1686,8 @@ class RedGymEnv(Env):
         # press button then release after some steps
         # TODO: Add video saving logic
 
-        # Send input to emulator
+        # Send input to emulator; recorded so replays do not need the navigator
+        self.last_emulator_action = action
         self.pyboy.send_input(VALID_ACTIONS[action])
         self.pyboy.send_input(VALID_RELEASE_ACTIONS[action], delay=self.emulator_delay)
         self.pyboy.tick(self.action_freq - 1, render=False)
@@ -2869,13 +2881,8 @@ class RedGymEnv(Env):
 
         player_x, player_y, map_n = self.get_game_coords()
         gy, gx = local_to_global(player_y, player_x, map_n)
-        map_key_str = str(map_n)
-
-        if map_key_str not in self.path_trace_data:
-            self.path_trace_data[map_key_str] = []
-
-        if not self.path_trace_data[map_key_str] or self.path_trace_data[map_key_str][-1] != [gy, gx]:
-            self.path_trace_data[map_key_str].append([gy, gx])
+        if self.path_trace_data.append(self.step_count, map_n, gy, gx):
+            emit_event("position", map_id=map_n, x=player_x, y=player_y, gy=gy, gx=gx)
 
     def _convert_text(self, bytes_data: list[int]) -> str:
         """Convert Pokemon text format to ASCII"""
@@ -3237,7 +3244,7 @@ class RedGymEnv(Env):
                 # Clear for next potential full re-initialization if object is reused
                 self.current_run_info = None
                 self.current_run_dir = None
-                self.path_trace_data = {}
+                self.path_trace_data = PathTraceRecorder()
         else:
             # Fallback: save ending game state in state_dir for resume (e.g., if env is used outside play.py)
             try:
@@ -3381,12 +3388,13 @@ class RedGymEnv(Env):
         # Reshape to group 2x2 blocks and take mean
         return arr.reshape(9, 2, 10, 2).mean(axis=(1, 3))
 
-    def get_collision_map(self):
+    def get_collision_grid(self):
         """
-        Creates a simple ASCII map showing player position, direction, terrain and sprites.
+        Builds the 9x10 numeric collision grid centred on the player.
         Takes into account tile pair collisions for more accurate walkability.
         Returns:
-            str: A string representation of the ASCII map with legend
+            np.ndarray: uint8 grid (0=walkable, 1=wall, 2=sprite, 3-6=player facing
+            up/down/left/right), or None if the player direction is unknown
         """
         # Get the terrain and movement data
         full_map = self.pyboy.game_area()
@@ -3410,31 +3418,36 @@ class RedGymEnv(Env):
         player_code = dir_codes.get(direction, 3)
 
         # Build numeric grid
-        grid = []
+        grid = np.ones((9, 10), dtype=np.uint8)
         for i in range(9):
-            row = []
             for j in range(10):
                 # Player at center
                 if i == 4 and j == 4:
-                    row.append(player_code)
+                    grid[i, j] = player_code
                 # Sprite positions
                 elif (j, i) in sprite_locations:
-                    row.append(2)
-                else:
-                    # Base terrain check
-                    walkable = False
-                    if downsampled_terrain[i][j] != 0:
-                        current_tile = full_tilemap[i * 2 + 1][j * 2]
-                        player_tile = full_tilemap[9][8]
-                        if self._can_move_between_tiles(player_tile, current_tile, tileset):
-                            walkable = True
-                    # Append code
-                    row.append(0 if walkable else 1)
-            grid.append(row)
+                    grid[i, j] = 2
+                # Base terrain check
+                elif downsampled_terrain[i][j] != 0:
+                    current_tile = full_tilemap[i * 2 + 1][j * 2]
+                    player_tile = full_tilemap[9][8]
+                    if self._can_move_between_tiles(player_tile, current_tile, tileset):
+                        grid[i, j] = 0
+        return grid
+
+    def get_collision_map(self):
+        """
+        Creates a simple ASCII map showing player position, direction, terrain and sprites.
+        Returns:
+            str: A string representation of the ASCII map with legend
+        """
+        grid = self.get_collision_grid()
+        if grid is None:
+            return None
 
         # Prepare output lines
         lines = []
-        for row in grid:
+        for row in grid.tolist():
             lines.append(" ".join(str(x) for x in row))
 
         # Legend for numeric codes
@@ -4123,34 +4136,6 @@ class RedGymEnv(Env):
             [],
         )    
     
-    def get_screenshot_with_overlay(self, alpha=128):
-        """
-        Get the current screenshot with a tile overlay showing walkable/unwalkable areas.
-        
-        Args:
-            alpha (int): Transparency value for the overlay (0-255)
-            
-        Returns:
-            PIL.Image: Screenshot with tile overlay
-        """
-        try:
-            # FIXED: Clear cached warp data to ensure fresh collision detection
-            self.clear_warp_cache()
-            
-            screenshot = self.get_screenshot()
-            collision_map_str = self.get_collision_map()
-            
-            # Ensure we have valid data
-            if not collision_map_str or not isinstance(collision_map_str, str):
-                print(f"Environment: Warning - Invalid collision map data: {type(collision_map_str)}")
-                return screenshot
-            
-            return overlay_on_screenshot(screenshot, collision_map_str, alpha)
-        except Exception as e:
-            print(f"Environment: Error creating collision overlay: {e}")
-            # Return regular screenshot if overlay fails
-            return self.get_screenshot()
-    
     def read_player_name(self) -> str:
         """Read the player's name"""
         name_bytes = self.memory[0xD158:0xD163]
@@ -4249,6 +4234,18 @@ class RedGymEnv(Env):
             self.well_i_dont_give_refunds = True
             print(f"Environment: Well, I don't\ngive refunds! dialog detected, setting well_i_dont_give_refunds to True")
 
+    def resolve_scripted_override(self, quest_id: Optional[int]) -> Optional[int]:
+        """
+        Resolve the scripted tile override for the current step.
+
+        Args:
+            quest_id: Currently active quest ID
+
+        Returns:
+            int: Overriding action index, or None if no override applies
+        """
+        return self.scripted_overrides.resolve(self, quest_id)
+
     def process_action(self, action: int, source: str = "unknown") -> tuple:
         """
         Single entry point for ALL actions - no exceptions!
@@ -4301,6 +4298,25 @@ class RedGymEnv(Env):
             print(f"Environment: No navigator available to load quest {quest_id}")
             return False
 
+    def render_collision_overlay(self, alpha=128):
+        """
+        Blend the collision grid onto the current screen with numpy.
+
+        Args:
+            alpha (int): Transparency value for the overlay (0-255)
+
+        Returns:
+            np.ndarray: (144, 160, 3) uint8 frame. This is a reused buffer that the
+            next call overwrites, so copy it if it must outlive the step.
+        """
+        screen = self.pyboy.screen.ndarray
+        grid = self.get_collision_grid()
+        if grid is None:
+            return screen[:, :, :3]
+        if self._collision_overlay_renderer is None:
+            self._collision_overlay_renderer = CollisionOverlayRenderer()
+        return self._collision_overlay_renderer.blend(screen, grid, alpha)
+
     def get_screenshot_with_overlay(self, alpha=128):
         """
         Get the current screenshot with a tile overlay showing walkable/unwalkable areas.
@@ -4314,16 +4330,7 @@ class RedGymEnv(Env):
         try:
             # FIXED: Clear cached warp data to ensure fresh collision detection
             self.clear_warp_cache()
-            
-            screenshot = self.get_screenshot()
-            collision_map_str = self.get_collision_map()
-            
-            # Ensure we have valid data
-            if not collision_map_str or not isinstance(collision_map_str, str):
-                print(f"Environment: Warning - Invalid collision map data: {type(collision_map_str)}")
-                return screenshot
-            
-            return overlay_on_screenshot(screenshot, collision_map_str, alpha)
+            return Image.fromarray(self.render_collision_overlay(alpha).copy())
         except Exception as e:
             print(f"Environment: Error creating collision overlay: {e}")
             # Return regular screenshot if overlay fails
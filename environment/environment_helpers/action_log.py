@@ -0,0 +1,158 @@
+# action_log.py
+"""
+Append-only action log for recorded playthroughs.
+
+Every recorded action is one JSON line in <run_id>_actions.ndjson.  Lines are
+buffered and written in batches; the file is fsynced at most every
+fsync_interval seconds and whenever flush(fsync=True) is called (the loop
+and final saves do that).  A save therefore only writes the actions recorded
+since the previous one, and no action list is kept in memory.
+
+A crash can at worst leave a partial last line, which read_action_log()
+skips.  Tools that want the old JSON list (<run_id>_actions.json) can get it
+with convert_to_json() or:
+
+    python -m environment.environment_helpers.action_log run_actions.ndjson [out.json]
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterator, List, Optional
+
+ACTION_LOG_SUFFIX = '.ndjson'
+
+
+class ActionLog:
+    """Append-only NDJSON action recorder (list-like: append/len/iter)"""
+
+    def __init__(self, path: Optional[Path], fsync_interval: float = 5.0, flush_every: int = 256):
+        """
+        Args:
+            path: Log file, appended to if it exists. None records nothing
+                (recordings disabled) but still counts actions
+            fsync_interval: Seconds between fsyncs on flush()
+            flush_every: Buffered actions that trigger a write
+        """
+        self.path = Path(path) if path is not None else None
+        self.fsync_interval = fsync_interval
+        self.flush_every = flush_every
+        self._pending: List[bytes] = []
+        self._count = 0
+        self._last_fsync = time.monotonic()
+        self._file = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'ab')
+
+    def append(self, entry: Any):
+        """Record one action (any JSON-serializable value)."""
+        self._count += 1
+        if self._file is None:
+            return
+        self._pending.append(json.dumps(entry, separators=(',', ':'), default=str).encode() + b'\n')
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self, fsync: Optional[bool] = None):
+        """
+        Write buffered actions.
+
+        Args:
+            fsync: True to force an fsync, False to skip it, None to fsync
+                if fsync_interval has passed since the last one
+        """
+        if self._file is None:
+            return
+        if self._pending:
+            self._file.write(b''.join(self._pending))
+            self._pending.clear()
+        self._file.flush()
+        now = time.monotonic()
+        if fsync or (fsync is None and now - self._last_fsync >= self.fsync_interval):
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush(fsync=True)
+        self._file.close()
+        self._file = None
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    def __len__(self) -> int:
+        """Actions recorded through this log (this session)"""
+        return self._count
+
+    def __iter__(self) -> Iterator[Any]:
+        """All actions in the file, including those from earlier sessions."""
+        if self.path is None:
+            return iter(())
+        if self._file is not None:
+            self.flush(fsync=False)
+        return read_action_log(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_action_log(path: Path) -> Iterator[Any]:
+    """Yield the actions of a log, skipping a partially written last line."""
+    with open(path, 'rb') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith(b'\n'):
+                    raise
+                print(f"Action log {path}: ignoring truncated last line {line_no}")
+
+
+def convert_to_json(log_path: Path, json_path: Path, indent: Optional[int] = 4) -> int:
+    """
+    Write a log as the JSON list RunManager used to save (json.dump(actions, indent=indent)).
+
+    Streams the log, so memory use does not grow with its length.
+
+    Returns:
+        int: Number of actions written
+    """
+    count = 0
+    prefix = ' ' * indent if indent is not None else ''
+    newline = '\n' if indent is not None else ''
+    separator = ',' + newline if indent is not None else ', '
+    with open(json_path, 'w') as out:
+        out.write('[')
+        for entry in read_action_log(log_path):
+            out.write(separator if count else newline)
+            text = json.dumps(entry, indent=indent)
+            out.write(prefix + text.replace('\n', '\n' + prefix) if prefix else text)
+            count += 1
+        out.write((newline + ']') if count else ']')
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert an NDJSON action log to the JSON actions list")
+    parser.add_argument('log', type=Path, help='<run_id>_actions.ndjson')
+    parser.add_argument('output', type=Path, nargs='?', help='Output JSON (default: log path with .json)')
+    parser.add_argument('--indent', type=int, default=4)
+    args = parser.parse_args(argv)
+    output = args.output or args.log.with_suffix('.json')
+    count = convert_to_json(args.log, output, args.indent)
+    print(f"Wrote {count} actions to {output}")
+
+
+if __name__ == '__main__':
+    main()
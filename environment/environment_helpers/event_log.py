@@ -0,0 +1,294 @@
+# event_log.py
+"""
+Typed binary event log.
+
+The engine used to leave quest transitions, trigger results, navigator snaps
+and StageManager actions only in free-text log lines that
+scripts/parse_logs.py recovers with regexes.  Those events are now also
+written as length-prefixed binary records to <run_id>_events.bin:
+
+    file   := MAGIC record*
+    record := u16 payload_len | u8 type | u32 step | i16 quest | f64 time | payload
+
+Each event type has a fixed field schema (EVENT_SCHEMAS); strings are u16
+length + UTF-8.  A torn record at the end of the file (crash mid-write) is
+ignored by the reader and cut off when the log is reopened for appending,
+so events of a resumed run follow the last complete record.  Step and quest come from the context the environment
+sets at the start of every step (set_event_context), so emitters only pass
+their own fields.
+
+load_events() returns one column table (dict of numpy arrays) per event
+type; scripts/query_events.py filters and aggregates those tables.
+"""
+
+import mmap
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+EVENTS_SUFFIX = "_events.bin"
+MAGIC = b"PKEVT\x01\n\x00"
+NO_QUEST = -1
+MAX_TEXT_BYTES = 16 * 1024  # per string field, keeps payloads within the u16 length
+
+_HEADER = struct.Struct("<HBIhd")
+_STR_LEN = struct.Struct("<H")
+
+# name -> (type code, [(field, struct code or 's' for string)])
+EVENT_SCHEMAS = {
+    "quest_transition": (1, [("from_quest", "h"), ("to_quest", "h")]),
+    "trigger_evaluated": (2, [("trigger_id", "s"), ("result", "?"), ("values", "s")]),
+    "nav_snap": (3, [("map_id", "H"), ("from_index", "i"), ("to_index", "i"), ("distance", "i"),
+                     ("recovery", "s")]),
+    "stage_action": (4, [("action", "B"), ("original_action", "B"), ("source", "s")]),
+    "position": (5, [("map_id", "H"), ("x", "h"), ("y", "h"), ("gy", "h"), ("gx", "h")]),
+}
+EVENT_NAMES = {code: name for name, (code, _) in EVENT_SCHEMAS.items()}
+
+# numpy dtypes of the numeric struct codes (strings become object columns)
+_DTYPES = {"h": np.int16, "H": np.uint16, "i": np.int32, "I": np.uint32, "B": np.uint8,
+           "?": np.bool_, "d": np.float64}
+
+
+def _compile(fields):
+    """Split a schema into runs of fixed-size fields (one Struct each) and strings"""
+    parts, run = [], []
+    for name, code in fields:
+        if code == "s":
+            if run:
+                parts.append((tuple(n for n, _ in run), struct.Struct("<" + "".join(c for _, c in run))))
+                run = []
+            parts.append((name, None))
+        else:
+            run.append((name, code))
+    if run:
+        parts.append((tuple(n for n, _ in run), struct.Struct("<" + "".join(c for _, c in run))))
+    return parts
+
+
+_LAYOUTS = {code: _compile(fields) for code, fields in EVENT_SCHEMAS.values()}
+
+
+def _complete_size(path: Path) -> int:
+    """Length of the file up to the end of its last complete record"""
+    with open(path, "rb") as f:
+        end = f.seek(0, 2)
+        if end < len(MAGIC):
+            return 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                return end  # not ours; leave it alone
+            pos = len(MAGIC)
+            while pos + _HEADER.size <= end:
+                length = _HEADER.unpack_from(data, pos)[0]
+                if pos + _HEADER.size + length > end:
+                    break
+                pos += _HEADER.size + length
+            return pos
+
+
+class EventLog:
+    """Append-only writer of typed events (buffered; thread-safe)"""
+
+    def __init__(self, path: Path, buffer_size: int = 256 * 1024):
+        """
+        Args:
+            path: Event file (appended to if it exists)
+            buffer_size: Write buffer; flushed when full and on flush()/close()
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.step = 0
+        self.quest = NO_QUEST
+        self.count = 0
+        self._lock = threading.Lock()
+        size = self.path.stat().st_size if self.path.exists() else 0
+        new_file = size < len(MAGIC)
+        complete = 0 if new_file else _complete_size(self.path)
+        if complete < size:
+            print(f"event_log.py: dropping {size - complete} bytes of a torn record at the end of {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(complete)
+        self._file = open(self.path, "ab", buffering=buffer_size)
+        if new_file:
+            self._file.write(MAGIC)
+
+    def set_context(self, step: int, quest: Optional[int]):
+        self.step = step
+        self.quest = NO_QUEST if quest is None else int(quest)
+
+    def emit(self, kind: str, **fields):
+        """
+        Append one event of a type in EVENT_SCHEMAS
+
+        Args:
+            kind: Event type name
+            fields: Values for every field of the type's schema
+        """
+        code, schema = EVENT_SCHEMAS[kind]
+        payload = bytearray()
+        for names, packer in _LAYOUTS[code]:
+            if packer is None:
+                text = str(fields.get(names) or "").encode("utf-8")[:MAX_TEXT_BYTES]
+                payload += _STR_LEN.pack(len(text))
+                payload += text
+            else:
+                payload += packer.pack(*(fields[n] for n in names))
+        header = _HEADER.pack(len(payload), code, self.step & 0xFFFFFFFF, self.quest, time.time())
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(header)
+            self._file.write(payload)
+            self.count += 1
+
+    def flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Process-wide event log of the current run (None: emitting is a no-op)
+_event_log: Optional[EventLog] = None
+
+
+def open_event_log(path: Path) -> EventLog:
+    """Make path the current run's event log (closing the previous one)"""
+    global _event_log
+    close_event_log()
+    _event_log = EventLog(path)
+    return _event_log
+
+
+def get_event_log() -> Optional[EventLog]:
+    return _event_log
+
+
+def close_event_log():
+    global _event_log
+    if _event_log is not None:
+        _event_log.close()
+        _event_log = None
+
+
+def set_event_context(step: int, quest: Optional[int]):
+    """Step and quest stamped on every following event"""
+    if _event_log is not None:
+        _event_log.set_context(step, quest)
+
+
+def emit_event(kind: str, **fields):
+    """Append an event to the current run's event log, if one is open"""
+    if _event_log is not None:
+        try:
+            _event_log.emit(kind, **fields)
+        except Exception as e:
+            print(f"event_log.py: emit_event(): could not record {kind}: {e}")
+
+
+def iter_events(path: Path, kinds: Optional[Iterable[str]] = None,
+                steps: Optional[Tuple[Optional[int], Optional[int]]] = None,
+                quest: Optional[int] = None) -> Iterator[Tuple[str, int, int, float, Dict[str, Any]]]:
+    """
+    Decode events, skipping payloads that fail the header filters
+
+    Args:
+        path: Event file
+        kinds: Event type names to keep (None: all)
+        steps: Inclusive (first, last) step range; either end may be None
+        quest: Quest id to keep
+
+    Yields:
+        (kind, step, quest, time, fields)
+    """
+    with open(path, "rb") as f:
+        if f.seek(0, 2) < len(MAGIC):
+            raise ValueError(f"{path} is not an event log")
+        # Memory-mapped so multi-gigabyte logs are paged in lazily
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not an event log")
+            yield from _scan(data, kinds, steps, quest)
+
+
+def _scan(data, kinds, steps, quest):
+    codes = None if kinds is None else {EVENT_SCHEMAS[k][0] for k in kinds}
+    first, last = steps if steps is not None else (None, None)
+    pos, end = len(MAGIC), len(data)
+    header_size = _HEADER.size
+    while pos + header_size <= end:
+        length, code, step, q, t = _HEADER.unpack_from(data, pos)
+        start = pos + header_size
+        pos = start + length
+        if pos > end:
+            break  # torn record at the end
+        if codes is not None and code not in codes:
+            continue
+        if (first is not None and step < first) or (last is not None and step > last):
+            continue
+        if quest is not None and q != quest:
+            continue
+        layout = _LAYOUTS.get(code)
+        if layout is None:
+            continue  # written by a newer schema
+        yield EVENT_NAMES[code], step, q, t, _decode(data, start, layout)
+
+
+def _decode(data, pos, layout) -> Dict[str, Any]:
+    fields = {}
+    for names, packer in layout:
+        if packer is None:
+            (n,) = _STR_LEN.unpack_from(data, pos)
+            pos += _STR_LEN.size
+            fields[names] = data[pos:pos + n].decode("utf-8", errors="replace")
+            pos += n
+        else:
+            fields.update(zip(names, packer.unpack_from(data, pos)))
+            pos += packer.size
+    return fields
+
+
+def load_events(path: Path, **filters) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Column tables of the (filtered) events, one per event type present
+
+    Args:
+        path: Event file
+        filters: As for iter_events (kinds, steps, quest)
+
+    Returns:
+        {kind: {"step", "quest", "time", <schema fields>: ndarray}}
+    """
+    rows: Dict[str, Dict[str, list]] = {}
+    for kind, step, q, t, fields in iter_events(path, **filters):
+        columns = rows.get(kind)
+        if columns is None:
+            columns = rows[kind] = {"step": [], "quest": [], "time": [],
+                                    **{name: [] for name, _ in EVENT_SCHEMAS[kind][1]}}
+        columns["step"].append(step)
+        columns["quest"].append(q)
+        columns["time"].append(t)
+        for name, value in fields.items():
+            columns[name].append(value)
+
+    tables = {}
+    for kind, columns in rows.items():
+        types = dict(EVENT_SCHEMAS[kind][1], step="I", quest="h", time="d")
+        tables[kind] = {name: np.array(values, dtype=_DTYPES.get(types[name], object))
+                        for name, values in columns.items()}
+    return tables
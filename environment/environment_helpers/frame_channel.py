@@ -0,0 +1,177 @@
+# Shared-memory framebuffer channel
+"""
+Frame Channel: a double-buffered RGB framebuffer in shared memory.
+
+The writer (the play loop) copies each new frame into the back buffer and
+flips it to the front, bumping a frame sequence number.  Readers (web
+server, Tk poller, other processes) attach by name, look at the sequence
+number, and only touch the pixels when it has moved past the last frame
+they encoded -- so a PNG is produced once per new frame that a client
+actually asks for, not once per UI tick.
+
+Shared memory layout (little-endian int64 header, then two pixel buffers):
+
+    [0] seq          last published frame sequence number (0 = no frame yet)
+    [1] front        index (0/1) of the buffer holding frame `seq`
+    [2] height
+    [3] width
+    [4] buf0_seq     sequence stored in buffer 0, -1 while being written
+    [5] buf1_seq     sequence stored in buffer 1, -1 while being written
+    buffer 0         height * width * 3 uint8
+    buffer 1         height * width * 3 uint8
+
+buf*_seq lets a reader that used the front buffer without copying confirm
+afterwards that the writer did not start overwriting it meanwhile.
+"""
+
+import threading
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+_HEADER_FIELDS = 6
+_HEADER_BYTES = _HEADER_FIELDS * 8
+_SEQ, _FRONT, _HEIGHT, _WIDTH, _BUF0_SEQ = range(5)
+
+
+class FrameChannel:
+    """Double-buffered (H, W, 3) uint8 framebuffer in one shared-memory block"""
+
+    def __init__(self, width: int, height: int, name: Optional[str] = None):
+        """
+        Args:
+            width: Frame width in pixels
+            height: Frame height in pixels
+            name: Attach to an existing channel instead of creating one
+        """
+        frame_bytes = width * height * 3
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + 2 * frame_bytes)
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self.name = self._shm.name
+        self.width = width
+        self.height = height
+
+        buf = self._shm.buf
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype='<i8', buffer=buf)
+        self._buffers = [
+            np.ndarray((height, width, 3), dtype=np.uint8, buffer=buf,
+                       offset=_HEADER_BYTES + i * frame_bytes)
+            for i in range(2)
+        ]
+        if self._owner:
+            self._header[:] = (0, 0, height, width, 0, 0)
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameChannel":
+        """Attach to a channel created elsewhere, reading its size from the header."""
+        probe = shared_memory.SharedMemory(name=name)
+        try:
+            header = np.ndarray((_HEADER_FIELDS,), dtype='<i8', buffer=probe.buf)
+            height, width = int(header[_HEIGHT]), int(header[_WIDTH])
+            del header
+        finally:
+            probe.close()
+        return cls(width, height, name=name)
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the newest published frame (0 before the first)."""
+        return int(self._header[_SEQ])
+
+    def back_buffer(self) -> np.ndarray:
+        """Writable view of the buffer the next publish() will flip to the front.
+
+        Renderers that can draw in place write here and call publish();
+        nothing is copied.  Marks the buffer as being written.
+        """
+        back = 1 - int(self._header[_FRONT])
+        self._header[_BUF0_SEQ + back] = -1
+        return self._buffers[back]
+
+    def publish(self) -> int:
+        """Flip the back buffer to the front and return the new sequence number."""
+        back = 1 - int(self._header[_FRONT])
+        seq = self.seq + 1
+        self._header[_BUF0_SEQ + back] = seq
+        self._header[_FRONT] = back
+        self._header[_SEQ] = seq
+        return seq
+
+    def write(self, frame: np.ndarray) -> int:
+        """Copy an (H, W, 3+) frame into the back buffer and publish it."""
+        np.copyto(self.back_buffer(), frame[:, :, :3], casting='unsafe')
+        return self.publish()
+
+    def front(self) -> Tuple[int, np.ndarray]:
+        """Return (seq, zero-copy view) of the newest frame.
+
+        The view holds frame `seq` until the writer starts on the frame after
+        next; check still_valid(seq) after using it if that matters.
+        """
+        front = int(self._header[_FRONT])
+        return int(self._header[_BUF0_SEQ + front]), self._buffers[front]
+
+    def still_valid(self, seq: int) -> bool:
+        """True if frame `seq` is still intact in one of the two buffers."""
+        return seq > 0 and seq in (int(self._header[_BUF0_SEQ]), int(self._header[_BUF0_SEQ + 1]))
+
+    def read(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Return (seq, copy) of the newest frame, or (seq, None) if none/torn."""
+        seq, view = self.front()
+        if seq <= 0:
+            return seq, None
+        frame = view.copy()
+        if not self.still_valid(seq):
+            return seq, None
+        return seq, frame
+
+    def close(self):
+        """Detach; the creating side also unlinks the shared memory."""
+        self._header = None
+        self._buffers = []
+        try:
+            self._shm.close()
+        except BufferError:
+            # A reader still holds a view of the front buffer; the mapping
+            # goes away with it
+            pass
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# Channels created in this process (writer side) or attached by name (reader side)
+_CHANNELS: Dict[str, FrameChannel] = {}
+_CHANNELS_LOCK = threading.Lock()
+
+
+def register_channel(channel: FrameChannel):
+    """Make a locally created channel resolvable by name without re-attaching."""
+    with _CHANNELS_LOCK:
+        _CHANNELS[channel.name] = channel
+
+
+def unregister_channel(channel: FrameChannel):
+    with _CHANNELS_LOCK:
+        if _CHANNELS.get(channel.name) is channel:
+            del _CHANNELS[channel.name]
+
+
+def get_channel(name: str) -> Optional[FrameChannel]:
+    """Return the channel called name, attaching to it on first use."""
+    with _CHANNELS_LOCK:
+        channel = _CHANNELS.get(name)
+        if channel is None:
+            try:
+                channel = FrameChannel.attach(name)
+            except FileNotFoundError:
+                return None
+            _CHANNELS[name] = channel
+        return channel
@@ -0,0 +1,172 @@
+# Tile pyramid for the Kanto global map
+"""
+Map Tile Pyramid: XYZ tiles of full_kanto_map.png for the web and Tk map views.
+
+Both global map views used to hold the whole 6976x7104 image: the browser
+downloaded it as one PNG and the Tk canvas kept it as a single PhotoImage.
+TilePyramid decodes the image once, slices it into TILE_PX square tiles at
+every zoom level and keeps only the encoded tile PNGs, so a viewport touches
+just the handful of tiles it shows.
+
+Zoom levels follow the XYZ convention: at max_zoom one map pixel is one tile
+pixel, each lower level halves the resolution, and zoom 0 fits the whole map
+in a single tile.  Tiles on the right/bottom edge are cropped, not padded.
+"""
+
+import io
+import math
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from PIL import Image
+
+TILE_PX = 256
+KANTO_MAP_PATH = Path(__file__).resolve().parent.parent / 'data' / 'environment_data' / 'full_kanto_map.png'
+
+
+class TilePyramid:
+    """Encoded XYZ tiles of one base image, built once and held in memory"""
+
+    def __init__(self, image_path: Path = KANTO_MAP_PATH, tile_size: int = TILE_PX):
+        """
+        Args:
+            image_path: Base map image
+            tile_size: Tile edge length in pixels
+        """
+        self.image_path = Path(image_path)
+        self.tile_size = tile_size
+        # Reads the PNG header only
+        with Image.open(self.image_path) as img:
+            self.width, self.height = img.size
+        self.max_zoom = max(0, math.ceil(math.log2(max(self.width, self.height) / tile_size)))
+        self._tiles: Dict[Tuple[int, int, int], bytes] = {}
+        self._build_lock = threading.Lock()
+        self._build_thread = None
+        self.ready = threading.Event()
+
+    def scale(self, z: int) -> int:
+        """Map pixels per tile pixel at zoom z."""
+        return 2 ** (self.max_zoom - z)
+
+    def level_size(self, z: int) -> Tuple[int, int]:
+        """(width, height) in pixels of the whole map at zoom z."""
+        s = self.scale(z)
+        return -(-self.width // s), -(-self.height // s)
+
+    def grid_size(self, z: int) -> Tuple[int, int]:
+        """(columns, rows) of tiles at zoom z."""
+        w, h = self.level_size(z)
+        return -(-w // self.tile_size), -(-h // self.tile_size)
+
+    def tiles_in_view(self, z: int, left: float, top: float, width: float, height: float) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (x, y) of every tile at zoom z that intersects a rectangle.
+
+        Args:
+            z: Zoom level
+            left, top, width, height: Rectangle in zoom-z pixel coordinates
+        """
+        if not 0 <= z <= self.max_zoom or width <= 0 or height <= 0:
+            return
+        cols, rows = self.grid_size(z)
+        ts = self.tile_size
+        x0, y0 = max(0, int(left // ts)), max(0, int(top // ts))
+        x1 = min(cols - 1, int(math.ceil((left + width) / ts)) - 1)
+        y1 = min(rows - 1, int(math.ceil((top + height) / ts)) - 1)
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                yield x, y
+
+    def build(self):
+        """Decode the base image once and encode every tile of every level."""
+        with self._build_lock:
+            if self.ready.is_set():
+                return
+            level = Image.open(self.image_path).convert('RGB')
+            tiles = {}
+            for z in range(self.max_zoom, -1, -1):
+                if z < self.max_zoom:
+                    level = level.reduce(2)
+                cols, rows = self.grid_size(z)
+                ts = self.tile_size
+                for y in range(rows):
+                    for x in range(cols):
+                        tile = level.crop((x * ts, y * ts, min((x + 1) * ts, level.width), min((y + 1) * ts, level.height)))
+                        buf = io.BytesIO()
+                        tile.save(buf, format='PNG')
+                        tiles[(z, x, y)] = buf.getvalue()
+            del level
+            self._tiles = tiles
+            self.ready.set()
+            print(f"TilePyramid: built {len(tiles)} tiles (zoom 0-{self.max_zoom}) from {self.image_path.name}")
+
+    def build_in_background(self) -> threading.Thread:
+        """Start build() on a daemon thread (once; later calls return the same thread)."""
+        with self._build_lock:
+            if self._build_thread is None:
+                self._build_thread = threading.Thread(target=self._build_safely, name="tile-pyramid", daemon=True)
+                self._build_thread.start()
+            return self._build_thread
+
+    def tile_png(self, z: int, x: int, y: int, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Return the encoded PNG of tile (z, x, y).
+
+        Args:
+            timeout: Seconds to wait for a build in progress (None waits forever)
+
+        Returns:
+            bytes or None if the tile is out of range or the pyramid is not built yet
+        """
+        if not self.ready.wait(timeout):
+            return None
+        return self._tiles.get((z, x, y))
+
+    def tile_image(self, z: int, x: int, y: int, timeout: Optional[float] = None) -> Optional[Image.Image]:
+        """Decoded PIL image of tile (z, x, y); see tile_png()."""
+        png = self.tile_png(z, x, y, timeout)
+        if png is None:
+            return None
+        img = Image.open(io.BytesIO(png))
+        img.load()
+        return img
+
+    def write(self, out_dir: Path):
+        """Write every tile to out_dir/{z}/{x}/{y}.png."""
+        self.build()
+        out_dir = Path(out_dir)
+        for (z, x, y), png in self._tiles.items():
+            path = out_dir / str(z) / str(x) / f"{y}.png"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(png)
+
+    def _build_safely(self):
+        try:
+            self.build()
+        except Exception as e:
+            print(f"TilePyramid: Error building tiles from {self.image_path}: {e}")
+
+
+_default_pyramid = None
+_default_pyramid_lock = threading.Lock()
+
+
+def get_kanto_pyramid() -> TilePyramid:
+    """Process-wide pyramid of full_kanto_map.png shared by the web and Tk map views."""
+    global _default_pyramid
+    with _default_pyramid_lock:
+        if _default_pyramid is None:
+            _default_pyramid = TilePyramid(KANTO_MAP_PATH)
+        return _default_pyramid
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write the Kanto map tile pyramid to disk")
+    parser.add_argument('out_dir', type=Path)
+    parser.add_argument('--image', type=Path, default=KANTO_MAP_PATH)
+    parser.add_argument('--tile_size', type=int, default=TILE_PX)
+    args = parser.parse_args()
+    TilePyramid(args.image, args.tile_size).write(args.out_dir)
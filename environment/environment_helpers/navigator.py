@@ -20,6 +20,8 @@ from environment.data.environment_data.items import Items
 from environment.data.environment_data.events import EventFlags
 from environment.data.environment_data.flags import Flags
 from environment.data.recorder_data.global_map import local_to_global, global_to_local
+from environment.environment_helpers.quest_catalog import get_quest_catalog
+from environment.environment_helpers.event_log import emit_event
 
 if TYPE_CHECKING:
     from environment import RedGymEnv
@@ -362,46 +364,11 @@ class ConsolidatedNavigator:
     
     def _load_quest_system(self):
         """Load quest definitions and initialize quest tracking"""
-        try:
-            required_completions_path = Path(__file__).parent / "required_completions.json"
-            if not required_completions_path.exists():
-                print(f"ConsolidatedNavigator: Quest definitions file not found: {required_completions_path}")
-                return
-                
-            with required_completions_path.open('r') as f:
-                loaded_data = json.load(f)
-            
-            if not isinstance(loaded_data, list):
-                print(f"ConsolidatedNavigator: Invalid quest definitions format")
-                return
-                
-            self.quest_definitions = loaded_data
-            
-            # Build location mapping
-            quests_by_location: Dict[int, List[int]] = defaultdict(list)
-            for q_def in self.quest_definitions:
-                try:
-                    loc = int(q_def["location_id"])
-                    quest_id_raw = q_def["quest_id"]
-                    if isinstance(quest_id_raw, str):
-                        quest_id_int = int(quest_id_raw.lstrip('0') or '0')
-                    else:
-                        quest_id_int = int(quest_id_raw)
-                    quests_by_location[loc].append(quest_id_int)
-                except (ValueError, TypeError, KeyError) as e:
-                    continue
-                    
-            for loc, qlist in quests_by_location.items():
-                qlist.sort()
-            self.quests_by_location = dict(quests_by_location)
-            
-            print(f"ConsolidatedNavigator: Loaded {len(self.quest_definitions)} quest definitions")
-            
-        except Exception as e:
-            print(f"ConsolidatedNavigator: Failed to load quest system: {e}")
-            self.quest_definitions = []
-            self.quests_by_location = {}
-        
+        catalog = get_quest_catalog()
+        self.quest_definitions = catalog.quests
+        self.quests_by_location = catalog.by_location
+        print(f"ConsolidatedNavigator: Loaded {len(self.quest_definitions)} quest definitions")
+
     def get_current_local_coords(self) -> Tuple[int, int, int]:
         """Get current local coordinates"""
         return self.env.get_game_coords()
@@ -1412,6 +1379,9 @@ class ConsolidatedNavigator:
                 self.movement_failure_count = 0
                 if self.current_coordinate_index >= len(self.sequential_coordinates):
                     self.current_coordinate_index = max(0, len(self.sequential_coordinates) - 1)
+                if self.current_coordinate_index != old_index:
+                    emit_event("nav_snap", map_id=self.env.get_game_coords()[2], from_index=old_index,
+                               to_index=self.current_coordinate_index, distance=dist, recovery=recovery_type)
 
                 # For recovery scenarios, also try to generate A* recovery path
                 if recovery_type in ["blackout_recovery", "emergency_recovery"]:
@@ -0,0 +1,222 @@
+# path_trace.py
+"""
+Columnar player path trace.
+
+The environment records the player's padded global position once per step.
+Instead of a dict of [gy, gx] lists per map, PathTraceRecorder keeps an
+(N, 4) int16 buffer with one row per position *change*:
+
+    (dstep, map_id, gy, gx)
+
+dstep is the number of steps since the previous row, so standing still costs
+nothing (run-length compression) and absolute steps are recovered with a
+cumulative sum.  Gaps longer than int16 allows are split into filler rows
+that repeat the previous position.
+
+Saves write only the rows recorded since the last save to a new compressed
+chunk, <run_id>_trace_0000.npz, <run_id>_trace_0001.npz, ...  Each chunk
+holds the rows plus base_step, the absolute step its first dstep is counted
+from, so chunks load independently.
+
+Tools should use load_trace() for the columns or load_map_coords() for the
+legacy {"<map_id>": [[gy, gx], ...]} coords dict; the latter also reads the
+old <run_id>_coords.json files.
+"""
+
+import glob
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+TRACE_SUFFIX = '_trace'
+TRACE_DTYPE = np.int16
+_MAX_DSTEP = int(np.iinfo(TRACE_DTYPE).max)
+_CHUNK_RE = re.compile(r'_(\d{4})\.npz$')
+
+
+@dataclass
+class PathTrace:
+    """Decoded trace columns, one entry per recorded position change"""
+    steps: np.ndarray   # int64 absolute step the position was entered
+    map_ids: np.ndarray  # int16
+    gy: np.ndarray      # int16 padded global row
+    gx: np.ndarray      # int16 padded global column
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def coords(self) -> np.ndarray:
+        """(N, 2) array of (gy, gx)"""
+        return np.stack([self.gy, self.gx], axis=1)
+
+    def map_coords(self) -> Dict[str, List[List[int]]]:
+        """The legacy path_trace_data dict: consecutive positions per map, deduplicated."""
+        result: Dict[str, List[List[int]]] = {}
+        for map_id, gy, gx in zip(self.map_ids.tolist(), self.gy.tolist(), self.gx.tolist()):
+            positions = result.setdefault(str(map_id), [])
+            if not positions or positions[-1] != [gy, gx]:
+                positions.append([gy, gx])
+        return result
+
+
+def _decode(rows: np.ndarray, base_step: int) -> PathTrace:
+    steps = base_step + np.cumsum(rows[:, 0], dtype=np.int64)
+    return PathTrace(steps=steps, map_ids=rows[:, 1], gy=rows[:, 2], gx=rows[:, 3])
+
+
+class PathTraceRecorder:
+    """Growable int16 trace buffer, saved incrementally as .npz chunks"""
+
+    def __init__(self, capacity: int = 4096):
+        """
+        Args:
+            capacity: Rows preallocated; the buffer doubles when full
+        """
+        self._rows = np.zeros((max(1, capacity), 4), dtype=TRACE_DTYPE)
+        self._size = 0
+        self._base_step = 0
+        self._last_step = 0
+        # chunk prefix -> (rows already saved there, next chunk index)
+        self._saved: Dict[Path, tuple] = {}
+
+    def append(self, step: int, map_id: int, gy: int, gx: int) -> bool:
+        """
+        Record the position at a step.
+
+        Returns:
+            bool: True if a row was added, False if the position is unchanged
+        """
+        if self._size:
+            last = self._rows[self._size - 1]
+            if last[1] == map_id and last[2] == gy and last[3] == gx:
+                return False
+            dstep = max(0, step - self._last_step)
+            while dstep > _MAX_DSTEP:
+                self._push(_MAX_DSTEP, *self._rows[self._size - 1, 1:].tolist())
+                dstep -= _MAX_DSTEP
+        else:
+            self._base_step = step
+            dstep = 0
+        self._push(dstep, map_id, gy, gx)
+        self._last_step = step
+        return True
+
+    def _push(self, dstep: int, map_id: int, gy: int, gx: int):
+        if self._size == len(self._rows):
+            grown = np.zeros((len(self._rows) * 2, 4), dtype=TRACE_DTYPE)
+            grown[:self._size] = self._rows[:self._size]
+            self._rows = grown
+        self._rows[self._size] = (dstep, map_id, gy, gx)
+        self._size += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Recorded (dstep, map_id, gy, gx) rows (a view, do not modify)"""
+        return self._rows[:self._size]
+
+    def trace(self) -> PathTrace:
+        return _decode(self.rows, self._base_step)
+
+    def to_map_coords(self) -> Dict[str, List[List[int]]]:
+        return self.trace().map_coords()
+
+    def _step_before(self, index: int) -> int:
+        """Absolute step row `index`'s dstep is counted from"""
+        if index == 0:
+            return self._base_step
+        return self._base_step + int(self._rows[:index, 0].sum(dtype=np.int64))
+
+    def save_chunks(self, prefix: Path) -> Optional[Path]:
+        """
+        Write the rows not yet saved under prefix to the next chunk.
+
+        The first save to a prefix continues numbering after any chunks
+        already there (e.g. from a previous session of the same run).
+
+        Args:
+            prefix: Chunk path without the _NNNN.npz part, e.g. run_dir / "<run_id>_trace"
+
+        Returns:
+            Path of the chunk written, or None if there was nothing new
+        """
+        prefix = Path(prefix)
+        if prefix not in self._saved:
+            existing = [int(_CHUNK_RE.search(p.name).group(1)) for p in chunk_paths(prefix)]
+            self._saved[prefix] = (0, max(existing, default=-1) + 1)
+        saved, index = self._saved[prefix]
+        if saved >= self._size:
+            return None
+        path = prefix.parent / f"{prefix.name}_{index:04d}.npz"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, rows=self._rows[saved:self._size], base_step=np.int64(self._step_before(saved)))
+        self._saved[prefix] = (self._size, index + 1)
+        return path
+
+
+def trace_prefix_for(coords_path: Path) -> Path:
+    """Chunk prefix that replaces a <name>_coords.json file: <name>_trace"""
+    coords_path = Path(coords_path)
+    stem = coords_path.stem
+    if stem.endswith('_coords'):
+        stem = stem[:-len('_coords')]
+    return coords_path.parent / (stem + TRACE_SUFFIX)
+
+
+def chunk_paths(prefix: Path) -> List[Path]:
+    """Chunks saved under a prefix, in order"""
+    prefix = Path(prefix)
+    if not prefix.parent.is_dir():
+        return []
+    return sorted(prefix.parent.glob(f"{glob.escape(prefix.name)}_[0-9][0-9][0-9][0-9].npz"))
+
+
+def _resolve_chunks(path: Path) -> List[Path]:
+    if path.suffix == '.npz' and path.exists():
+        return [path]
+    if path.is_dir():
+        return sorted(path.glob(f"*{TRACE_SUFFIX}_[0-9][0-9][0-9][0-9].npz"))
+    if path.suffix == '.json':
+        path = trace_prefix_for(path)
+    return chunk_paths(path)
+
+
+def load_trace(path: Union[str, Path]) -> PathTrace:
+    """
+    Load a trace saved by PathTraceRecorder.
+
+    Args:
+        path: A chunk file, a chunk prefix, a run directory, or the run's
+            <run_id>_coords.json path (the chunks next to it are read)
+
+    Returns:
+        PathTrace with all chunks concatenated (empty if none exist)
+    """
+    parts = []
+    for chunk in _resolve_chunks(Path(path)):
+        with np.load(chunk) as data:
+            parts.append(_decode(data['rows'], int(data['base_step'])))
+    if not parts:
+        empty = np.zeros(0, dtype=TRACE_DTYPE)
+        return PathTrace(np.zeros(0, dtype=np.int64), empty, empty, empty)
+    return PathTrace(*(np.concatenate([getattr(p, f) for p in parts]) for f in ('steps', 'map_ids', 'gy', 'gx')))
+
+
+def load_map_coords(path: Union[str, Path]) -> Dict[str, List[List[int]]]:
+    """
+    Load {"<map_id or step key>": [[gy, gx], ...]} from a coords JSON file or
+    from trace chunks (see load_trace for accepted paths).
+
+    A JSON path that does not exist falls back to the trace chunks next to it.
+    """
+    path = Path(path)
+    if path.suffix == '.json' and path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return load_trace(path).map_coords()
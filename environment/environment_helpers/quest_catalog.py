@@ -0,0 +1,175 @@
+# quest_catalog.py
+"""
+Single parsed copy of required_completions.json.
+
+The quest definitions used to be loaded and linearly scanned separately by
+the web server, QuestManager, QuestProgressionEngine, ConsolidatedNavigator,
+game_session and the speech bubbles.  QuestCatalog parses the file once and
+builds the lookups they need:
+
+- by_id:          int quest id      -> definition
+- by_padded_id:   "001"-style id    -> definition
+- by_location:    location_id       -> sorted int quest ids
+- triggers:       trigger id ("001_0") -> TriggerInfo
+- triggers_by_quest: int quest id   -> [TriggerInfo, ...] in definition order
+
+plus the definitions pre-serialized as JSON and gzip for HTTP clients.
+The definitions are shared: treat them as read-only.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+QUESTS_PATH = Path(__file__).parent / "required_completions.json"
+
+QuestId = Union[int, str]
+
+
+def normalize_quest_id(quest_id: Optional[QuestId]) -> Optional[int]:
+    """Return the int form of a quest id given as 3, "3" or "003" (None if invalid)."""
+    if quest_id is None or isinstance(quest_id, bool):
+        return None
+    try:
+        return int(str(quest_id).strip())
+    except ValueError:
+        return None
+
+
+def index_by_id(quests: Iterable[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+    """Map int quest id -> definition for any list of quest definitions."""
+    index = {}
+    for quest in quests:
+        quest_id = normalize_quest_id(quest.get('quest_id'))
+        if quest_id is not None:
+            index.setdefault(quest_id, quest)
+    return index
+
+
+@dataclass(frozen=True)
+class TriggerInfo:
+    """Precomputed metadata for one entry of a quest's event_triggers"""
+    trigger_id: str      # "<padded quest id>_<index>", as used in the status files
+    quest_id: int
+    index: int
+    type: str
+    definition: Dict[str, Any]
+
+
+class QuestCatalog:
+    """Parsed, indexed quest definitions"""
+
+    def __init__(self, path: Path = QUESTS_PATH, quests: Optional[List[Dict[str, Any]]] = None):
+        """
+        Args:
+            path: required_completions.json to load
+            quests: Already loaded definitions (path is then only informative)
+        """
+        self.path = Path(path)
+        if quests is None:
+            quests = self._load(self.path)
+        self.quests: List[Dict[str, Any]] = self._validate(quests)
+        self.by_id = index_by_id(self.quests)
+        self.by_padded_id = {f"{quest_id:03d}": quest for quest_id, quest in self.by_id.items()}
+        self.ids: List[int] = list(self.by_id)
+
+        by_location = defaultdict(list)
+        self.triggers: Dict[str, TriggerInfo] = {}
+        self.triggers_by_quest: Dict[int, List[TriggerInfo]] = {}
+        for quest_id, quest in self.by_id.items():
+            try:
+                by_location[int(quest['location_id'])].append(quest_id)
+            except (KeyError, TypeError, ValueError):
+                pass
+            infos = []
+            for index, trigger in enumerate(quest.get('event_triggers') or []):
+                info = TriggerInfo(f"{quest_id:03d}_{index}", quest_id, index,
+                                   trigger.get('type', 'unknown'), trigger)
+                infos.append(info)
+                self.triggers[info.trigger_id] = info
+            self.triggers_by_quest[quest_id] = infos
+        self.by_location: Dict[int, List[int]] = {loc: sorted(ids) for loc, ids in by_location.items()}
+
+        self._payload_lock = threading.Lock()
+        self._json: Optional[bytes] = None
+        self._gzip: Optional[bytes] = None
+
+    def __len__(self) -> int:
+        return len(self.quests)
+
+    def get(self, quest_id: Optional[QuestId]) -> Optional[Dict[str, Any]]:
+        """Definition for a quest id in any of its forms, or None."""
+        return self.by_id.get(normalize_quest_id(quest_id))
+
+    def quests_at(self, location_id: int) -> List[int]:
+        return self.by_location.get(location_id, [])
+
+    def triggers_for(self, quest_id: Optional[QuestId]) -> List[TriggerInfo]:
+        return self.triggers_by_quest.get(normalize_quest_id(quest_id), [])
+
+    def json_payload(self) -> bytes:
+        """The definitions as JSON, serialized once."""
+        with self._payload_lock:
+            if self._json is None:
+                self._json = json.dumps(self.quests, separators=(',', ':')).encode()
+            return self._json
+
+    def gzip_payload(self) -> bytes:
+        """json_payload() gzip-compressed once (mtime fixed so the bytes are stable)."""
+        payload = self.json_payload()
+        with self._payload_lock:
+            if self._gzip is None:
+                self._gzip = gzip.compress(payload, compresslevel=9, mtime=0)
+            return self._gzip
+
+    @property
+    def etag(self) -> str:
+        return hashlib.sha1(self.json_payload()).hexdigest()[:16]
+
+    @staticmethod
+    def _load(path: Path) -> List[Dict[str, Any]]:
+        try:
+            with path.open('r') as f:
+                loaded = json.load(f)
+        except FileNotFoundError:
+            print(f"QuestCatalog: Quest definitions file not found: {path}")
+            return []
+        except Exception as e:
+            print(f"QuestCatalog: Failed to load quest definitions from {path}: {e}")
+            return []
+        if not isinstance(loaded, list):
+            print(f"QuestCatalog: Quest definitions file contains invalid format (not a list): {type(loaded)}")
+            return []
+        return loaded
+
+    @staticmethod
+    def _validate(quests: List[Any]) -> List[Dict[str, Any]]:
+        valid = []
+        for i, quest in enumerate(quests):
+            if not isinstance(quest, dict):
+                print(f"QuestCatalog: Skipping invalid quest definition at index {i} (not a dict): {type(quest)}")
+                continue
+            if normalize_quest_id(quest.get('quest_id')) is None:
+                print(f"QuestCatalog: Skipping quest definition with missing or invalid quest_id at index {i}: {quest.get('quest_id')!r}")
+                continue
+            valid.append(quest)
+        return valid
+
+
+_catalog: Optional[QuestCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_quest_catalog() -> QuestCatalog:
+    """The process-wide catalog of the bundled required_completions.json"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = QuestCatalog()
+            print(f"QuestCatalog: Loaded {len(_catalog)} quest definitions")
+        return _catalog
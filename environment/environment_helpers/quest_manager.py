@@ -11,9 +11,10 @@ from environment.data.recorder_data.global_map import local_to_global
 import json
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
-from collections import defaultdict
 from environment.data.environment_data.item_handler import ItemHandler
 from environment.environment_helpers.quest_helper import QuestWarpBlocker
+from environment.environment_helpers.quest_catalog import QuestCatalog, get_quest_catalog
+from environment.environment_helpers.event_log import emit_event, NO_QUEST
 
 # Simple nurse joy coordinate mapping (global coordinates for standing in front of nurse joy)
 NURSE_JOY_COORD_MAP = {
@@ -49,80 +50,14 @@ class QuestManager:
             self.quest_completed_path = Path("quest_status.json") 
             print("Warning: QuestManager initialized without run_dir. Quest status will be local.")
 
-        try:
-            rc_file_path = Path(required_completions_path) if required_completions_path else Path(__file__).parent / "required_completions.json"
-            
-            # Validate file exists before loading
-            if not rc_file_path.exists():
-                print(f"QuestManager __init__: Quest definitions file not found: {rc_file_path}")
-                self.quest_definitions = []
-                self.quests_by_location = {}
-                return
-                
-            with rc_file_path.open('r') as f:
-                loaded_data = json.load(f)
-            
-            # Validate the loaded data is a list
-            if not isinstance(loaded_data, list):
-                print(f"QuestManager __init__: Quest definitions file contains invalid format (not a list): {type(loaded_data)}")
-                self.quest_definitions = []
-                self.quests_by_location = {}
-                return
-                
-            self.quest_definitions: List[Dict[str, Any]] = loaded_data
-            
-            # Validate quest definitions and log loading status
-            valid_quests = []
-            for i, q_def in enumerate(self.quest_definitions):
-                if not isinstance(q_def, dict):
-                    print(f"QuestManager __init__: Skipping invalid quest definition at index {i} (not a dict): {type(q_def)}")
-                    continue
-                    
-                quest_id = q_def.get("quest_id")
-                if quest_id is None:
-                    print(f"QuestManager __init__: Skipping quest definition missing quest_id at index {i}: {q_def}")
-                    continue
-                    
-                try:
-                    # Ensure quest_id can be converted to int
-                    quest_id_int = int(quest_id)
-                    valid_quests.append(q_def)
-                    print(f"QuestManager __init__: Successfully loaded quest {quest_id_int:03d}: {q_def.get('begin_quest_text', 'No description')[:50]}...")
-                except (ValueError, TypeError) as e:
-                    print(f"QuestManager __init__: Skipping quest with invalid quest_id '{quest_id}': {e}")
-                    continue
-            
-            self.quest_definitions = valid_quests
-            print(f"QuestManager __init__: Successfully loaded {len(self.quest_definitions)} valid quest definitions")
-            
-            # Build mapping from location to sorted list of quest IDs (as integers)
-            quests_by_location: Dict[int, List[int]] = defaultdict(list)
-            for q_def in self.quest_definitions:
-                try:
-                    loc = int(q_def["location_id"])
-                    # FIXED: Ensure quest_id is converted to int consistently
-                    quest_id_raw = q_def["quest_id"]
-                    if isinstance(quest_id_raw, str):
-                        quest_id_int = int(quest_id_raw.lstrip('0') or '0')
-                    else:
-                        quest_id_int = int(quest_id_raw)
-                    quests_by_location[loc].append(quest_id_int)
-                except (ValueError, TypeError, KeyError) as e:
-                    print(f"QuestManager __init__: Error processing quest for location mapping: {q_def.get('quest_id', 'UNKNOWN')}, error: {e}")
-                    continue
-                    
-            for loc, qlist in quests_by_location.items():
-                qlist.sort()
-            self.quests_by_location = dict(quests_by_location)
-            
-            print(f"QuestManager __init__: Quest location mapping: {dict(self.quests_by_location)}")
-
-        except Exception as e:
-            print(f"QuestManager __init__: Failed to load quest definitions: {e}")
-            import traceback
-            traceback.print_exc()
-            self.quest_definitions = []
-            self.quests_by_location = {}
+        # Shared catalog unless a different definitions file was asked for
+        if required_completions_path:
+            self.quest_catalog = QuestCatalog(Path(required_completions_path))
+        else:
+            self.quest_catalog = get_quest_catalog()
+        self.quest_definitions: List[Dict[str, Any]] = self.quest_catalog.quests
+        self.quests_by_location: Dict[int, List[int]] = self.quest_catalog.by_location
+        print(f"QuestManager __init__: Using {len(self.quest_definitions)} quest definitions")
 
         self.quest_completed_status: Dict[str, bool] = {} # Stores "001": True, "002": False etc.
         self._load_quest_completion_status() # Load initial status
@@ -226,6 +161,8 @@ class QuestManager:
                     # FIXED: Only do expensive setup work when quest actually changes
                     old_quest_id = self.current_quest_id
                     self.current_quest_id = quest_id_int
+                    emit_event("quest_transition", from_quest=NO_QUEST if old_quest_id is None else old_quest_id,
+                               to_quest=quest_id_int)
                     
                     # Update warp blocker with new quest - only when quest changes
                     self.warp_blocker.update_quest_blocks(self.current_quest_id)
@@ -248,6 +185,7 @@ class QuestManager:
 
         # If loop completes, no actionable quest found (e.g., all done)
         if self.current_quest_id is not None:
+             emit_event("quest_transition", from_quest=self.current_quest_id, to_quest=NO_QUEST)
              self.current_quest_id = None # Explicitly set to None
         if hasattr(self.env, 'current_loaded_quest_id'):
             self.env.current_loaded_quest_id = None
@@ -263,10 +201,7 @@ class QuestManager:
     def get_quest_definition(self, quest_id: Optional[int]) -> Optional[Dict[str, Any]]:
         if quest_id is None:
             return None
-        for q_def in self.quest_definitions:
-            if int(q_def["quest_id"]) == quest_id:
-                return q_def
-        return None
+        return self.quest_catalog.get(quest_id)
 
     def update_progress(self): # This method might be simplified or its responsibility shifted
         """Called periodically to update quest states or UI. Now mostly a stub."""
@@ -12,6 +12,8 @@ import os
 from anyio import current_time
 sys.path.append('/puffertank/grok_plays_pokemon')
 from utils.logging_config import get_pokemon_logger
+from environment.environment_helpers.quest_catalog import get_quest_catalog, index_by_id, normalize_quest_id
+from environment.environment_helpers.event_log import emit_event
 
 class QuestProgressionEngine:
     def __init__(self, env, navigator, quest_manager, 
@@ -33,6 +35,9 @@ class QuestProgressionEngine:
         self.navigator = navigator
         self.quest_manager = quest_manager
         self.quests_definitions = quests_definitions # Store the static definitions
+        catalog = get_quest_catalog()
+        # Reuse the catalog's index when given its definitions
+        self._quests_by_id = catalog.by_id if quests_definitions is catalog.quests else index_by_id(quests_definitions or [])
         self.quest_ids_all = quest_ids_all # This seems to be just a list of integer IDs
         self.status_queue = status_queue
         self.run_dir = run_dir
@@ -178,36 +183,11 @@ class QuestProgressionEngine:
             self.logger.log_error("QuestProgressionEngine", "No quest definitions loaded")
             return None
         
-        # Search for quest definition
-        for quest_data in self.quests_definitions:
-            try:
-                quest_id_from_data = quest_data.get('quest_id')
-                if quest_id_from_data is None:
-                    self.logger.log_error("QuestProgressionEngine", f"Quest data missing quest_id field: {quest_data}")
-                    continue
-                
-                # FIXED: Robust conversion handling
-                # Convert both to integers for comparison
-                if isinstance(quest_id_from_data, str):
-                    # Handle string format like "002" or "2"
-                    quest_id_int = int(quest_id_from_data.lstrip('0') or '0')
-                else:
-                    quest_id_int = int(quest_id_from_data)
-                
-                # Also handle the case where quest_id_to_find might be passed as string
-                if isinstance(quest_id_to_find, str):
-                    quest_id_to_find_int = int(quest_id_to_find.lstrip('0') or '0')
-                else:
-                    quest_id_to_find_int = int(quest_id_to_find)
-                    
-                if quest_id_int == quest_id_to_find_int:
-                    # self.logger.log_quest_event(str(quest_id_to_find), "Quest data found", {'quest_data_keys': list(quest_data.keys())})  # Verbose logging suppressed
-                    return quest_data
-                    
-            except (ValueError, TypeError) as e:
-                self.logger.log_error("QuestProgressionEngine", f"Error parsing quest_id from quest data: {quest_data.get('quest_id', 'MISSING')}, error: {e}")
-                continue
-        
+        # Indexed lookup ("2", "002" and 2 all resolve to the same quest)
+        quest_data = self._quests_by_id.get(normalize_quest_id(quest_id_to_find))
+        if quest_data is not None:
+            return quest_data
+
         # Quest not found - this is now a detailed error
         self.logger.log_error("QuestProgressionEngine", f"Quest data not found for quest_id: {quest_id_to_find}", {
             'searched_quest_id': quest_id_to_find,
@@ -322,6 +302,7 @@ class QuestProgressionEngine:
                             result = eval_dict["result"]
                             values_str = eval_dict["values_str"]
                             debug_str = eval_dict["debug_str"]
+                            emit_event("trigger_evaluated", trigger_id=tid, result=bool(result), values=values_str)
 
                             # Remove excessive logging - state change detection handles this
                             
@@ -0,0 +1,193 @@
+# run_index.py
+"""
+SQLite index of recorded runs.
+
+RunManager used to answer "latest run for map X" by parsing every run
+directory's run_metadata.json.  RunIndex keeps one row per run in
+<recordings>/run_index.sqlite3 instead:
+
+    run_id, run_dir, start_map_name, map_id, date, sequence,
+    created_at, ended_at, steps, final_quest, <artifact paths>
+
+run_dir is the directory name and artifact paths are file names inside it,
+so the recordings tree can be moved.  Timestamps are epoch seconds.
+
+RunManager writes rows in a transaction when a run is created and when its
+final state is saved.  RunManager.sync_index() reconciles the index with the
+directory tree (one directory listing; only directories not yet indexed are
+parsed) and rebuild_index() re-creates it from scratch, so the database is
+only ever a cache of run_metadata.json files.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+SCHEMA_VERSION = 1
+INDEX_FILENAME = "run_index.sqlite3"
+
+ARTIFACT_COLUMNS = ("start_state_path", "end_state_path", "coords_path", "actions_path",
+                    "quest_status_path", "trigger_status_path")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    run_dir TEXT NOT NULL,
+    start_map_name TEXT NOT NULL,
+    map_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    sequence INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    ended_at REAL,
+    steps INTEGER,
+    final_quest TEXT,
+    {', '.join(f'{c} TEXT' for c in ARTIFACT_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS runs_by_map_id ON runs (map_id, created_at);
+CREATE INDEX IF NOT EXISTS runs_by_map_name ON runs (start_map_name, created_at);
+CREATE INDEX IF NOT EXISTS runs_by_created ON runs (created_at);
+"""
+
+
+class RunIndex:
+    """Thread-safe SQLite table of runs keyed by run_id"""
+
+    def __init__(self, db_path: Path):
+        """
+        Args:
+            db_path: SQLite file (created if missing; ':memory:' for tests)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # Only a cache of the directory tree: an old layout is dropped and rebuilt by sync()
+                self._conn.execute("DROP TABLE IF EXISTS runs")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _transaction(self):
+        return _Transaction(self._conn, self._lock)
+
+    def upsert(self, row: Dict[str, Any]):
+        """Insert or replace one run (row keys are column names)."""
+        self.upsert_many([row])
+
+    def upsert_many(self, rows: Iterable[Dict[str, Any]], replace_all: bool = False):
+        """
+        Insert or replace runs in one transaction.
+
+        Args:
+            rows: Column dicts
+            replace_all: Delete every other row first (rebuild)
+        """
+        rows = [_normalize(row) for row in rows]
+        with self._transaction() as conn:
+            if replace_all:
+                conn.execute("DELETE FROM runs")
+            for row in rows:
+                columns = ', '.join(row)
+                placeholders = ', '.join(f":{c}" for c in row)
+                updates = ', '.join(f"{c} = excluded.{c}" for c in row if c != 'run_id')
+                conn.execute(f"INSERT INTO runs ({columns}) VALUES ({placeholders}) "
+                             f"ON CONFLICT(run_id) DO UPDATE SET {updates}", row)
+
+    def update(self, run_id: str, **fields) -> bool:
+        """
+        Set columns of an indexed run.
+
+        Returns:
+            bool: False if the run is not indexed
+        """
+        if not fields:
+            return False
+        fields = _normalize(fields)
+        assignments = ', '.join(f"{c} = :{c}" for c in fields)
+        with self._transaction() as conn:
+            cursor = conn.execute(f"UPDATE runs SET {assignments} WHERE run_id = :run_id", dict(fields, run_id=run_id))
+        return cursor.rowcount > 0
+
+    def remove(self, run_ids: Iterable[str]):
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM runs WHERE run_id = ?", [(r,) for r in run_ids])
+
+    def run_dirs(self) -> Dict[str, str]:
+        """Indexed run_id -> run directory name"""
+        with self._lock:
+            return {r[0]: r[1] for r in self._conn.execute("SELECT run_id, run_dir FROM runs")}
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def query(self, map_name: Optional[str] = None, map_id: Optional[int] = None,
+              newest_first: bool = True, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Runs filtered by start map, ordered by creation time.
+
+        Args:
+            map_name: Exact start_map_name (already cleaned like run ids)
+            map_id: Start map id
+            newest_first: Order by created_at descending
+            limit: Most rows returned
+        """
+        clauses, params = [], []
+        if map_name is not None:
+            clauses.append("start_map_name = ?")
+            params.append(map_name)
+        if map_id is not None:
+            clauses.append("map_id = ?")
+            params.append(map_id)
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        order = "DESC" if newest_first else "ASC"
+        sql += f" ORDER BY created_at {order}, sequence {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK under the index lock"""
+
+    def __init__(self, conn, lock):
+        self._conn = conn
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire()
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self._lock.release()
+            raise
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._lock.release()
+
+
+def _normalize(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Paths as strings; everything else as given."""
+    return {k: (str(v) if isinstance(v, Path) else v) for k, v in row.items()}
@@ -1,11 +1,19 @@
 import json
 import io
 import re
+import shutil
+import sqlite3
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any, Tuple, List
 from dataclasses import dataclass
 
+from .action_log import ACTION_LOG_SUFFIX, ActionLog, convert_to_json
+from .path_trace import TRACE_SUFFIX, PathTraceRecorder, trace_prefix_for
+from .checkpoint_store import CheckpointStore
+from .event_log import EVENTS_SUFFIX
+from .run_index import ARTIFACT_COLUMNS, INDEX_FILENAME, RunIndex
+
 
 @dataclass
 class RunInfo:
@@ -25,6 +33,26 @@ class RunInfo:
     state_bytes: Optional[bytes] = None  # Store loaded state bytes
     state_file: Optional[Path] = None    # Store which file the state was loaded from
 
+    @property
+    def action_log_path(self) -> Optional[Path]:
+        """Append-only NDJSON action log next to the (legacy) actions JSON"""
+        return self.actions_path.with_suffix(ACTION_LOG_SUFFIX) if self.actions_path else None
+
+    @property
+    def trace_prefix(self) -> Optional[Path]:
+        """Prefix of the .npz path trace chunks next to the (legacy) coords JSON"""
+        return trace_prefix_for(self.coords_path) if self.coords_path else None
+
+    @property
+    def event_log_path(self) -> Path:
+        """Binary typed event log (see event_log.py)"""
+        return self.run_dir / f"{self.run_id}{EVENTS_SUFFIX}"
+
+    @property
+    def checkpoint_dir(self) -> Path:
+        """Deduplicated emulator state checkpoints (autosaves)"""
+        return self.run_dir / "checkpoints"
+
 
 class RunManager:
     """Unified run management system for Pokemon Red gameplay sessions"""
@@ -43,7 +71,129 @@ class RunManager:
             self.base_dir = Path(base_recordings_dir)
         
         self.base_dir.mkdir(parents=True, exist_ok=True)
-        
+        self._index: Optional[RunIndex] = None
+        self._unindexable: set = set()  # Directories that are not runs (not re-parsed on every sync)
+
+    @property
+    def index(self) -> Optional[RunIndex]:
+        """SQLite run index in base_dir (None if it cannot be opened)"""
+        if self._index is None:
+            try:
+                self._index = RunIndex(self.base_dir / INDEX_FILENAME)
+            except sqlite3.Error as e:
+                print(f"Warning: Could not open run index in {self.base_dir}: {e}")
+        return self._index
+
+    def sync_index(self) -> bool:
+        """
+        Bring the run index in line with the directory tree
+
+        Runs whose directory disappeared are dropped; directories not yet
+        indexed (e.g. created by another process or copied in) are parsed
+        and added. Indexed runs are not re-read.
+
+        Returns:
+            bool: False if the index is unavailable (callers scan directories)
+        """
+        index = self.index
+        if index is None:
+            return False
+        try:
+            on_disk = {d.name for d in self.base_dir.iterdir() if d.is_dir()}
+            indexed = index.run_dirs()
+            stale = [run_id for run_id, name in indexed.items() if name not in on_disk]
+            missing = on_disk - set(indexed.values()) - self._unindexable
+            rows = []
+            for name in sorted(missing):
+                run_info = self._parse_run_directory(self.base_dir / name)
+                if run_info is None:
+                    self._unindexable.add(name)
+                    continue
+                rows.append(self._index_row(run_info))
+            if stale:
+                index.remove(stale)
+            if rows:
+                index.upsert_many(rows)
+            return True
+        except sqlite3.Error as e:
+            print(f"Warning: Run index unavailable, scanning directories instead: {e}")
+            return False
+
+    def rebuild_index(self) -> int:
+        """
+        Re-create the run index from the run directories
+
+        Returns:
+            int: Number of runs indexed
+        """
+        self._unindexable.clear()
+        rows = [self._index_row(r) for r in self._scan_runs()]
+        if self.index is not None:
+            self.index.upsert_many(rows, replace_all=True)
+        return len(rows)
+
+    def _index_row(self, run_info: RunInfo) -> Dict[str, Any]:
+        """Index columns for a run (paths relative to base_dir / run_dir)"""
+        metadata = self._read_metadata(run_info.run_dir)
+        row = {
+            "run_id": run_info.run_id,
+            "run_dir": run_info.run_dir.name,
+            "start_map_name": run_info.start_map_name,
+            "map_id": run_info.map_id,
+            "date": run_info.date,
+            "sequence": run_info.sequence,
+            "created_at": self._created_timestamp(run_info, metadata),
+            "ended_at": _iso_timestamp(metadata.get("ended_at")),
+            "steps": metadata.get("steps"),
+            "final_quest": _quest_text(metadata.get("final_quest")),
+        }
+        for column in ARTIFACT_COLUMNS:
+            path = getattr(run_info, column)
+            row[column] = path.name if path is not None else None
+        return row
+
+    def _run_info_from_row(self, row: Dict[str, Any]) -> RunInfo:
+        run_dir = self.base_dir / row["run_dir"]
+        artifacts = {c: (run_dir / row[c] if row[c] else None) for c in ARTIFACT_COLUMNS}
+        return RunInfo(run_id=row["run_id"], start_map_name=row["start_map_name"], map_id=row["map_id"],
+                       date=row["date"], sequence=row["sequence"], run_dir=run_dir, **artifacts)
+
+    @staticmethod
+    def _read_metadata(run_dir: Path) -> Dict[str, Any]:
+        try:
+            with open(run_dir / "run_metadata.json", "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _created_timestamp(run_info: RunInfo, metadata: Dict[str, Any]) -> float:
+        """Creation time from metadata, else the directory date plus sequence (ms) for ordering"""
+        created_at = _iso_timestamp(metadata.get("created_at"))
+        if created_at is not None:
+            return created_at
+        date_str = run_info.date  # ddmmyyyy format
+        if len(date_str) == 8 and date_str.isdigit():
+            try:
+                day, month, year = int(date_str[:2]), int(date_str[2:4]), int(date_str[4:8])
+                return datetime(year, month, day).timestamp() + run_info.sequence / 1000
+            except ValueError:
+                pass
+        print(f"Warning: Malformed date '{date_str}' in run {run_info.run_id}")
+        return 0.0
+
+    def _update_metadata(self, run_info: RunInfo, **fields):
+        """Merge fields into run_metadata.json (so rebuild_index() recovers them)"""
+        metadata_path = run_info.run_dir / "run_metadata.json"
+        metadata = self._read_metadata(run_info.run_dir)
+        if not metadata:
+            return
+        metadata.update(fields)
+        tmp_path = metadata_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(metadata, f, indent=4)
+        tmp_path.replace(metadata_path)
+
     def generate_run_id(self, start_map_name: str, map_id: int) -> str:
         """
         Generate a unique run ID following the format: sequence-start_map_name-map_id-ddmmyyyy
@@ -56,7 +206,7 @@ class RunManager:
             Unique run ID string
         """
         # Clean map name for filesystem compatibility
-        clean_map_name = re.sub(r'[^\w\-_]', '_', start_map_name.upper())
+        clean_map_name = _clean_map_name(start_map_name)
         
         # Get current date in ddmmyyyy format
         date_str = datetime.now().strftime("%d%m%Y")
@@ -116,16 +266,21 @@ class RunManager:
         )
         
         # Create a run metadata file
+        created_at = datetime.now()
         metadata = {
             "run_id": run_id,
             "start_map_name": start_map_name,
             "map_id": map_id,
-            "created_at": datetime.now().isoformat(),
+            "created_at": created_at.isoformat(),
             "files": {
                 "start_state": f"{run_id}_start.state",
                 "end_state": f"{run_id}_end.state",
                 "coordinates": f"{run_id}_coords.json",
                 "actions": f"{run_id}_actions.json",
+                "action_log": f"{run_id}_actions{ACTION_LOG_SUFFIX}",
+                "path_trace": f"{run_id}{TRACE_SUFFIX}_NNNN.npz",
+                "checkpoints": "checkpoints",
+                "events": f"{run_id}{EVENTS_SUFFIX}",
                 "quest_status": "quest_status.json",
                 "trigger_status": "trigger_status.json"
             }
@@ -134,6 +289,12 @@ class RunManager:
         metadata_path = run_dir / "run_metadata.json"
         with open(metadata_path, "w") as f:
             json.dump(metadata, f, indent=4)
+
+        if self.index is not None:
+            try:
+                self.index.upsert(self._index_row(run_info))
+            except sqlite3.Error as e:
+                print(f"Warning: Could not index run {run_id}: {e}")
         
         print(f"Created run directory: {run_dir}")
         return run_info
@@ -149,44 +310,17 @@ class RunManager:
         Returns:
             RunInfo for the latest run, or None if no runs found
         """
-        runs = self.list_runs(map_name=map_name, map_id=map_id)
+        if self.sync_index():
+            try:
+                rows = self.index.query(map_name=_clean_map_name(map_name), map_id=map_id, limit=1)
+                return self._run_info_from_row(rows[0]) if rows else None
+            except sqlite3.Error as e:
+                print(f"Warning: Run index query failed, scanning directories instead: {e}")
+
+        runs = self._scan_runs(map_name=map_name, map_id=map_id)
         if not runs:
             return None
-        
-        # FIXED: Use actual creation timestamp from metadata for proper sorting
-        def sort_key(r):
-            try:
-                # Try to read creation timestamp from metadata
-                metadata_path = r.run_dir / "run_metadata.json"
-                if metadata_path.exists():
-                    with open(metadata_path, 'r') as f:
-                        metadata = json.load(f)
-                        created_at_str = metadata.get("created_at")
-                        if created_at_str:
-                            # Parse ISO format timestamp
-                            from datetime import datetime
-                            dt = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
-                            return dt
-                
-                # Fallback to date parsing from directory name
-                date_str = r.date  # ddmmyyyy format
-                if len(date_str) == 8 and date_str.isdigit():
-                    day, month, year = date_str[:2], date_str[2:4], date_str[4:8]
-                    # Convert to datetime for proper chronological sorting
-                    from datetime import datetime
-                    dt = datetime(int(year), int(month), int(day))
-                    # Add sequence as microseconds for sub-day ordering
-                    dt = dt.replace(microsecond=r.sequence * 1000)
-                    return dt
-                else:
-                    # Fallback for malformed dates - use string comparison
-                    print(f"Warning: Malformed date '{date_str}' in run {r.run_id}")
-                    return datetime.min
-            except Exception as e:
-                print(f"Warning: Error parsing timestamp for run {r.run_id}: {e}")
-                return datetime.min
-        
-        runs.sort(key=sort_key, reverse=True)
+        runs.sort(key=lambda r: self._created_timestamp(r, self._read_metadata(r.run_dir)), reverse=True)
         return runs[0]
     
     def list_runs(self, map_name: Optional[str] = None, map_id: Optional[int] = None) -> List[RunInfo]:
@@ -198,8 +332,18 @@ class RunManager:
             map_id: Filter by starting map ID (optional)
             
         Returns:
-            List of RunInfo objects
+            List of RunInfo objects, newest first
         """
+        if self.sync_index():
+            try:
+                rows = self.index.query(map_name=_clean_map_name(map_name), map_id=map_id)
+                return [self._run_info_from_row(row) for row in rows]
+            except sqlite3.Error as e:
+                print(f"Warning: Run index query failed, scanning directories instead: {e}")
+        return self._scan_runs(map_name=map_name, map_id=map_id)
+
+    def _scan_runs(self, map_name: Optional[str] = None, map_id: Optional[int] = None) -> List[RunInfo]:
+        """Parse every run directory (index rebuild and fallback when SQLite fails)"""
         runs = []
         
         for run_dir in self.base_dir.iterdir():
@@ -214,8 +358,7 @@ class RunManager:
                     
                 # Apply filters
                 if map_name is not None:
-                    clean_filter_name = re.sub(r'[^\w\-_]', '_', map_name.upper())
-                    if run_info.start_map_name != clean_filter_name:
+                    if run_info.start_map_name != _clean_map_name(map_name):
                         continue
                         
                 if map_id is not None and run_info.map_id != map_id:
@@ -337,9 +480,50 @@ class RunManager:
             print(f"End state saved to {run_info.end_state_path}")
         except Exception as e:
             print(f"Error saving end state to {run_info.end_state_path}: {e}")
+        self.record_run_end(run_info, steps=getattr(env, "step_count", None), final_quest=_current_quest(env))
+
+    def record_run_end(self, run_info: RunInfo, steps: Optional[int] = None, final_quest: Any = None):
+        """
+        Store end time, step count and final quest in the run metadata and index
+
+        Args:
+            run_info: Run that ended (or was snapshotted)
+            steps: Environment steps taken
+            final_quest: Quest id active at the end
+        """
+        ended_at = datetime.now()
+        try:
+            self._update_metadata(run_info, ended_at=ended_at.isoformat(), steps=steps,
+                                  final_quest=final_quest)
+        except (OSError, TypeError) as e:
+            print(f"Error updating run metadata for {run_info.run_id}: {e}")
+        if self.index is None:
+            return
+        try:
+            fields = dict(ended_at=ended_at.timestamp(), steps=steps, final_quest=_quest_text(final_quest))
+            if not self.index.update(run_info.run_id, **fields) and run_info.run_dir.parent == self.base_dir:
+                self.index.upsert(self._index_row(run_info))
+        except sqlite3.Error as e:
+            print(f"Warning: Could not update run index for {run_info.run_id}: {e}")
     
-    def save_coordinates(self, coords_data: Dict[str, Any], run_info: RunInfo):
-        """Save coordinate trace data"""
+    def save_coordinates(self, coords_data, run_info: RunInfo):
+        """
+        Save coordinate trace data
+
+        Args:
+            coords_data: A PathTraceRecorder (only rows recorded since the
+                last save go into a new .npz chunk) or a legacy coords dict
+                (written as JSON)
+            run_info: Target run
+        """
+        if isinstance(coords_data, PathTraceRecorder):
+            try:
+                chunk = coords_data.save_chunks(run_info.trace_prefix)
+                if chunk is not None:
+                    print(f"Path trace saved to {chunk}")
+            except Exception as e:
+                print(f"Error saving path trace to {run_info.trace_prefix}: {e}")
+            return
         try:
             with open(run_info.coords_path, "w") as f:
                 json.dump(coords_data, f, indent=4)
@@ -347,9 +531,37 @@ class RunManager:
         except Exception as e:
             print(f"Error saving coordinates to {run_info.coords_path}: {e}")
     
-    def save_actions(self, actions_data: List[Any], run_info: RunInfo):
-        """Save action sequence data"""
+    def open_checkpoint_store(self, run_info: RunInfo, keep: int = 50,
+                              max_bytes: Optional[int] = 256 * 1024 * 1024) -> CheckpointStore:
+        """
+        Open a run's checkpoint store
+
+        Args:
+            run_info: Run whose checkpoints/ directory holds the store
+            keep: Most autosaves kept
+            max_bytes: Disk budget for the store's chunks (None: unbounded)
+        """
+        return CheckpointStore(run_info.checkpoint_dir, keep=keep, max_bytes=max_bytes)
+
+    def open_action_log(self, run_info: RunInfo) -> ActionLog:
+        """Open (append to) the run's NDJSON action log"""
+        return ActionLog(run_info.action_log_path)
+    
+    def save_actions(self, actions_data, run_info: RunInfo):
+        """
+        Save action sequence data
+        
+        An ActionLog only has its new actions written and fsynced; if it
+        belongs to another run directory (manual snapshots) it is also
+        converted to that run's actions JSON. Plain lists are written as JSON.
+        """
         try:
+            if isinstance(actions_data, ActionLog):
+                actions_data.flush(fsync=True)
+                if actions_data.path is not None and actions_data.path != run_info.action_log_path:
+                    count = convert_to_json(actions_data.path, run_info.actions_path)
+                    print(f"Actions ({count}) saved to {run_info.actions_path}")
+                return
             with open(run_info.actions_path, "w") as f:
                 json.dump(actions_data, f, indent=4)
             print(f"Actions saved to {run_info.actions_path}")
@@ -511,15 +723,51 @@ class RunManager:
             map_name: Filter by starting map name (optional)
             map_id: Filter by starting map ID (optional)
         """
-        runs = self.list_runs(map_name=map_name, map_id=map_id)
-        runs.sort(key=lambda r: (r.date, r.sequence), reverse=True)
+        runs = self.list_runs(map_name=map_name, map_id=map_id)  # newest first
         
         runs_to_delete = runs[keep_latest:]
+        deleted = []
         
         for run_info in runs_to_delete:
             try:
-                import shutil
                 shutil.rmtree(run_info.run_dir)
+                deleted.append(run_info.run_id)
                 print(f"Deleted old run: {run_info.run_id}")
             except Exception as e:
-                print(f"Error deleting run {run_info.run_id}: {e}") 
\ No newline at end of file
+                print(f"Error deleting run {run_info.run_id}: {e}")
+
+        if deleted and self.index is not None:
+            try:
+                self.index.remove(deleted)
+            except sqlite3.Error as e:
+                print(f"Warning: Could not remove deleted runs from the run index: {e}")
+
+
+def _clean_map_name(map_name: Optional[str]) -> Optional[str]:
+    """Map name as it appears in run ids (filesystem-safe, upper case)"""
+    return re.sub(r'[^\w\-_]', '_', map_name.upper()) if map_name is not None else None
+
+
+def _iso_timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _quest_text(quest_id: Any) -> Optional[str]:
+    """Quest ids are stored as zero-padded strings like the quest files ('015')"""
+    if quest_id is None:
+        return None
+    try:
+        return f"{int(quest_id):03d}"
+    except (TypeError, ValueError):
+        return str(quest_id)
+
+
+def _current_quest(env) -> Any:
+    quest_manager = getattr(env, "quest_manager", None)
+    quest_id = getattr(quest_manager, "current_quest_id", None)
+    return quest_id if quest_id is not None else getattr(env, "current_loaded_quest_id", None) 
\ No newline at end of file
@@ -2,10 +2,14 @@ import json
 import io
 from pathlib import Path
 from .run_manager import RunManager, RunInfo
+from .action_log import ActionLog
+from .event_log import open_event_log, close_event_log, get_event_log
 from datetime import datetime
 
 # Global run manager instance
 _run_manager = None
+# Open checkpoint stores by run directory
+_checkpoint_stores = {}
 
 def get_run_manager() -> RunManager:
     """Get the global run manager instance"""
@@ -14,6 +18,12 @@ def get_run_manager() -> RunManager:
         _run_manager = RunManager()
     return _run_manager
 
+def set_recordings_dir(base_dir):
+    """Keep this process's runs under base_dir (e.g. one directory per orchestrated session)"""
+    global _run_manager
+    _run_manager = RunManager(Path(base_dir))
+    _checkpoint_stores.clear()
+
 def save_initial_state(env, run_info: RunInfo):
     """Save the initial emulator state using RunManager"""
     run_manager = get_run_manager()
@@ -23,6 +33,38 @@ def _recording_disabled(env) -> bool:
     """Helper: return True if environment indicates recordings are disabled."""
     return not getattr(env, "record_replays", False) or getattr(env, "disable_recordings", False)
 
+def open_action_log(env, run_info: RunInfo | None) -> ActionLog:
+    """Action recorder for a run: its NDJSON log, or a counting-only log when recordings are off."""
+    if run_info is None or _recording_disabled(env):
+        return ActionLog(None)
+    return get_run_manager().open_action_log(run_info)
+
+def autosave_checkpoint(env, step: int, keep: int = 50, max_bytes: int | None = 256 * 1024 * 1024):
+    """
+    Add an autosave of the emulator state to the current run's checkpoint store.
+
+    Autosaves are deduplicated against earlier ones, and the oldest are pruned
+    beyond keep checkpoints / max_bytes of disk.
+
+    Returns:
+        dict: The checkpoint manifest, or None if nothing was saved
+    """
+    if _recording_disabled(env):
+        return None
+    run_info = getattr(env, 'current_run_info', None)
+    if run_info is None:
+        return None
+
+    store = _checkpoint_stores.get(run_info.run_dir)
+    if store is None:
+        store = get_run_manager().open_checkpoint_store(run_info, keep=keep, max_bytes=max_bytes)
+        _checkpoint_stores[run_info.run_dir] = store
+    try:
+        return store.save_env(env, f"auto_{step:09d}", step=step)
+    except Exception as e:
+        print(f"Error saving checkpoint at step {step} to {store.root}: {e}")
+        return None
+
 def save_loop_state(env, recorded_playthrough):
     """Save actions and path trace data during the main loop to the current run directory."""
     # Skip completely when recordings are disabled
@@ -42,8 +84,13 @@ def save_loop_state(env, recorded_playthrough):
     if hasattr(env, 'path_trace_data') and env.path_trace_data:
         run_manager.save_coordinates(env.path_trace_data, run_info)
 
+    # Flush buffered typed events
+    event_log = get_event_log()
+    if event_log is not None:
+        event_log.flush()
+
 def save_final_state(env, run_info: RunInfo, recorded_playthrough=None, coords_data=None):
-    """Save final actions JSON, coords JSON, and end state file after the session ends."""
+    """Save final actions, path trace, and end state file after the session ends."""
     if _recording_disabled(env):
         return
 
@@ -55,11 +102,22 @@ def save_final_state(env, run_info: RunInfo, recorded_playthrough=None, coords_d
     # Save actions if provided
     if recorded_playthrough is not None:
         run_manager.save_actions(recorded_playthrough, run_info)
+        if isinstance(recorded_playthrough, ActionLog):
+            recorded_playthrough.close()
 
     # Save coordinates if provided
     if coords_data is not None:
         run_manager.save_coordinates(coords_data, run_info)
 
+    close_event_log()
+
+def _open_run_event_log(run_info: RunInfo):
+    """Send typed events to the run's event log (appending when a run is resumed)"""
+    try:
+        open_event_log(run_info.event_log_path)
+    except Exception as e:
+        print(f"saver.py: could not open event log {run_info.event_log_path}: {e}")
+
 def create_new_run(env, start_map_name: str, map_id: int) -> RunInfo | None:
     """Create a new run directory (unless recordings are disabled) and return RunInfo."""
     if _recording_disabled(env):
@@ -71,6 +129,7 @@ def create_new_run(env, start_map_name: str, map_id: int) -> RunInfo | None:
     # Store run info in environment for easy access
     env.current_run_info = run_info
     env.current_run_dir = run_info.run_dir  # Maintain backward compatibility
+    _open_run_event_log(run_info)
 
     return run_info
 
@@ -83,6 +142,8 @@ def load_latest_run(env, map_name: str = None, map_id: int = None) -> RunInfo |
         print(f"saver.py: load_latest_run(): successfully loaded state from {run_info.state_file}")
         env.current_run_info = run_info
         env.current_run_dir = run_info.run_dir  # Maintain backward compatibility
+        if not _recording_disabled(env):
+            _open_run_event_log(run_info)
 
         # Reset the environment with the loaded state, marking it as an internal call
         # to prevent re-triggering run creation logic within env.reset()
@@ -273,7 +334,7 @@ def save_full_snapshot(env, recorded_playthrough=None, coords_data=None, snapsho
     # 2. Action log
     if recorded_playthrough is None:
         recorded_playthrough = getattr(env, "recorded_playthrough", None)
-    if recorded_playthrough:
+    if recorded_playthrough is not None:  # an ActionLog reopened on resume has len 0
         run_manager.save_actions(recorded_playthrough, snapshot_run_info)
 
     # 3. Coordinate trace
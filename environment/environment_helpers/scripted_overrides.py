@@ -0,0 +1,268 @@
+# Scripted tile overrides for Pokemon Red
+"""
+Scripted Tile Overrides: quest-specific button overrides keyed by the tile the
+player stands on.
+
+These rules used to be hand-written ``if glob_y == ... and glob_x == ...``
+chains inside play.py main().  They are now declared once in
+SCRIPTED_TILE_OVERRIDES and indexed when ScriptedOverrideTable is built, so
+resolving the override for the current step is a single dict lookup keyed by
+(quest, global coord, facing) followed by the rule's flag checks.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from environment.data.environment_data.constants import ITEM_NAME_TO_ID_DICT
+from environment.data.environment_data.species import Species
+from environment.data.recorder_data.global_map import local_to_global
+
+# =============================================================================
+# SCRIPTED_TILE_OVERRIDES CONFIGURATION FORMAT DOCUMENTATION
+# =============================================================================
+#
+# SCRIPTED_TILE_OVERRIDES = {
+#     quest_id: [
+#         {
+#             'global_coords': (y, x),          # Global coordinates (y, x order).
+#                                               # Omit for quest-wide rules.
+#             'facing': 'up' | ('down', ...),   # Player facing; omit for any.
+#             'flags': {                        # All must hold (optional)
+#                 'never_run_again': True/False,
+#                 'item_check': {'item': 'TOWN_MAP', 'has': True/False},
+#                 'party_check': {'species': 'MAGIKARP', 'has': True/False},
+#                 'step_parity': 0/1,           # env.step_count % 2
+#                 'dialog_contains_any': ['text', ...],
+#             },
+#             'action': 'down'/'left'/'right'/'up'/'a'/'b',
+#             'effect': 'stock_poke_balls',     # Optional side effect (SCRIPTED_EFFECTS)
+#         },
+#     ]
+# }
+#
+# IMPORTANT NOTES:
+# - Rules for one tile are evaluated in declaration order; the first rule
+#   whose flags hold wins.  Quest-wide rules are checked after tile rules.
+# - A rule with an 'effect' but no 'action' applies the effect and lets the
+#   play loop continue with its normal action.
+# =============================================================================
+
+FACING_DIRECTIONS = ("down", "up", "left", "right", "unknown")
+
+ACTION_NAME_TO_INDEX = {
+    'down': 0,
+    'left': 1,
+    'right': 2,
+    'up': 3,
+    'a': 4,
+    'b': 5,
+}
+
+
+def _walk(tiles: List[Tuple[int, int]], facing: str, action: str, **extra) -> List[Dict[str, Any]]:
+    """Expand a straight run of tiles that all share one facing/action rule."""
+    return [
+        {'global_coords': coords, 'facing': facing, 'action': action, **extra}
+        for coords in tiles
+    ]
+
+
+_TOWN_MAP_RULES = [
+    # Blue's sister: talk to her for the Town Map, then walk back out.
+    {'global_coords': (340, 107), 'facing': 'up',
+     'flags': {'item_check': {'item': 'TOWN_MAP', 'has': False}}, 'action': 'a'},
+    {'global_coords': (340, 107), 'facing': 'up',
+     'flags': {'item_check': {'item': 'TOWN_MAP', 'has': True}}, 'action': 'down'},
+    *_walk([(341, 107), (342, 107), (343, 107)], 'down', 'down'),
+]
+
+SCRIPTED_TILE_OVERRIDES: Dict[int, List[Dict[str, Any]]] = {
+    1: [
+        # Oak's intro monologue: advance with A until the naming screen.
+        {'flags': {'never_run_again': False,
+                   'dialog_contains_any': ["Welcome to the", "My", "People", "inhabited",
+                                           "creatures", "Fo", "Others", "First"]},
+         'action': 'a'},
+    ],
+    15: list(_TOWN_MAP_RULES),
+    16: list(_TOWN_MAP_RULES),
+    17: [
+        *_TOWN_MAP_RULES,
+        {'global_coords': (292, 97), 'action': 'up'},
+        {'global_coords': (294, 97), 'action': 'left'},
+    ],
+    21: [
+        {'global_coords': (299, 32), 'facing': 'left', 'action': 'a'},
+        {'global_coords': (294, 97), 'action': 'left'},
+    ],
+    22: [
+        # Viridian Mart counter: make sure the bag holds Poke Balls.
+        {'global_coords': (299, 132), 'effect': 'stock_poke_balls'},
+    ],
+    46: [
+        # Walk up to the Magikarp salesman, buy, then walk back out.
+        {'global_coords': (151, 152), 'facing': ('down', 'left', 'right', 'unknown'),
+         'flags': {'never_run_again': False}, 'action': 'up'},
+        {'global_coords': (151, 152), 'facing': 'up',
+         'flags': {'never_run_again': False}, 'action': 'a'},
+        {'global_coords': (151, 152), 'flags': {'never_run_again': True}, 'action': 'down'},
+        {'global_coords': (152, 152), 'facing': 'down',
+         'flags': {'never_run_again': True}, 'action': 'right'},
+        *_walk([(152, x) for x in range(153, 159)], 'right', 'right',
+               flags={'never_run_again': True}),
+        {'global_coords': (152, 159), 'facing': 'right',
+         'flags': {'never_run_again': True}, 'action': 'down'},
+        {'global_coords': (153, 159), 'facing': 'down',
+         'flags': {'never_run_again': True,
+                   'party_check': {'species': 'MAGIKARP', 'has': False}}, 'action': 'a'},
+        {'global_coords': (153, 159), 'facing': 'down',
+         'flags': {'never_run_again': True, 'step_parity': 0,
+                   'party_check': {'species': 'MAGIKARP', 'has': True}}, 'action': 'b'},
+        {'global_coords': (153, 159), 'facing': 'down',
+         'flags': {'never_run_again': True, 'step_parity': 1,
+                   'party_check': {'species': 'MAGIKARP', 'has': True}}, 'action': 'left'},
+        *_walk([(153, x) for x in range(158, 153, -1)], 'left', 'left'),
+        {'global_coords': (153, 153), 'facing': 'left', 'action': 'down'},
+        *_walk([(154, 153), (155, 153)], 'down', 'down'),
+    ],
+}
+
+
+def _stock_poke_balls(env) -> None:
+    """Force four Poke Balls into the bag at the Viridian Mart counter."""
+    env.item_handler.buy_item(ITEM_NAME_TO_ID_DICT["POKE_BALL"], 4, 0)
+    env.item_handler.force_refresh_item_cache()
+
+
+SCRIPTED_EFFECTS: Dict[str, Callable[[Any], None]] = {
+    'stock_poke_balls': _stock_poke_balls,
+}
+
+
+class ScriptedOverrideTable:
+    """Indexes SCRIPTED_TILE_OVERRIDES once and resolves overrides per step"""
+
+    def __init__(self, overrides: Optional[Dict[int, List[Dict[str, Any]]]] = None):
+        if overrides is None:
+            overrides = SCRIPTED_TILE_OVERRIDES
+
+        # (quest_id, gy, gx, facing) -> ordered rules for that tile
+        self._index: Dict[Tuple[int, int, int, str], Tuple[Dict[str, Any], ...]] = {}
+        # (quest_id, gy, gx) tiles with rules; lets resolve() skip the facing scan off-tile
+        self._tiles: set = set()
+        # quest_id -> ordered rules that apply anywhere
+        self._quest_wide: Dict[int, Tuple[Dict[str, Any], ...]] = {}
+
+        index: Dict[Tuple[int, int, int, str], List[Dict[str, Any]]] = {}
+        quest_wide: Dict[int, List[Dict[str, Any]]] = {}
+        for quest_id, rules in overrides.items():
+            quest_id = int(quest_id)
+            for rule in rules:
+                self._validate_rule(quest_id, rule)
+                coords = rule.get('global_coords')
+                if coords is None:
+                    quest_wide.setdefault(quest_id, []).append(rule)
+                    continue
+                gy, gx = coords
+                self._tiles.add((quest_id, gy, gx))
+                facing = rule.get('facing')
+                if facing is None:
+                    facings = FACING_DIRECTIONS
+                elif isinstance(facing, str):
+                    facings = (facing,)
+                else:
+                    facings = tuple(facing)
+                for direction in facings:
+                    index.setdefault((quest_id, gy, gx, direction), []).append(rule)
+
+        self._index = {key: tuple(rules) for key, rules in index.items()}
+        self._quest_wide = {qid: tuple(rules) for qid, rules in quest_wide.items()}
+        self._quests = frozenset(qid for qid, _, _ in self._tiles) | frozenset(self._quest_wide)
+
+    @staticmethod
+    def _validate_rule(quest_id: int, rule: Dict[str, Any]) -> None:
+        action = rule.get('action')
+        effect = rule.get('effect')
+        if action is None and effect is None:
+            raise ValueError(f"Scripted override for quest {quest_id} has neither 'action' nor 'effect': {rule}")
+        if action is not None and action not in ACTION_NAME_TO_INDEX:
+            raise ValueError(f"Scripted override for quest {quest_id} has unknown action '{action}'")
+        if effect is not None and effect not in SCRIPTED_EFFECTS:
+            raise ValueError(f"Scripted override for quest {quest_id} has unknown effect '{effect}'")
+
+    def has_quest(self, quest_id: Optional[int]) -> bool:
+        """Return True if any override is registered for quest_id."""
+        return quest_id in self._quests
+
+    def candidates(self, quest_id: int, global_coords: Tuple[int, int], facing: str) -> Tuple[Dict[str, Any], ...]:
+        """Return the rules registered for a tile/facing followed by quest-wide rules."""
+        gy, gx = global_coords
+        return self._index.get((quest_id, gy, gx, facing), ()) + self._quest_wide.get(quest_id, ())
+
+    def resolve(self, env, quest_id: Optional[int]) -> Optional[int]:
+        """
+        Resolve the scripted override for the environment's current step.
+
+        Applies any matching side effect and returns the overriding action
+        index, or None when the play loop should carry on normally.
+        """
+        if quest_id not in self._quests:
+            return None
+
+        local_x, local_y, map_id = env.get_game_coords()
+        gy, gx = local_to_global(local_y, local_x, map_id)
+
+        rules: Tuple[Dict[str, Any], ...] = ()
+        if (quest_id, gy, gx) in self._tiles:
+            facing = env._get_direction(env.pyboy.game_area())
+            rules = self._index.get((quest_id, gy, gx, facing), ())
+        rules = rules + self._quest_wide.get(quest_id, ())
+
+        cache: Dict[str, Any] = {}
+        for rule in rules:
+            if not self._flags_hold(env, rule.get('flags'), cache):
+                continue
+            effect = rule.get('effect')
+            if effect is not None:
+                SCRIPTED_EFFECTS[effect](env)
+            action = rule.get('action')
+            if action is not None:
+                return ACTION_NAME_TO_INDEX[action]
+        return None
+
+    @staticmethod
+    def _flags_hold(env, flags: Optional[Dict[str, Any]], cache: Dict[str, Any]) -> bool:
+        """Check a rule's flags, reading each piece of game state at most once."""
+        if not flags:
+            return True
+
+        if 'never_run_again' in flags and bool(getattr(env, 'never_run_again', False)) != flags['never_run_again']:
+            return False
+
+        if 'step_parity' in flags and getattr(env, 'step_count', 0) % 2 != flags['step_parity']:
+            return False
+
+        item_check = flags.get('item_check')
+        if item_check is not None:
+            key = f"item:{item_check['item']}"
+            if key not in cache:
+                item_id = ITEM_NAME_TO_ID_DICT[item_check['item']]
+                cache[key] = env.item_handler.get_item_quantity(item_id) > 0
+            if cache[key] != item_check['has']:
+                return False
+
+        party_check = flags.get('party_check')
+        if party_check is not None:
+            if 'party' not in cache:
+                cache['party'] = set(env.read_party())
+            has_species = Species[party_check['species']].value in cache['party']
+            if has_species != party_check['has']:
+                return False
+
+        dialog_any = flags.get('dialog_contains_any')
+        if dialog_any is not None:
+            if 'dialog' not in cache:
+                cache['dialog'] = env.read_dialog() or ''
+            if not any(text in cache['dialog'] for text in dialog_any):
+                return False
+
+        return True
@@ -0,0 +1,198 @@
+# Status publisher for the web/Tk UIs
+"""
+Status Publisher: delta-only, rate-limited status_queue publishing.
+
+update_quest_ui used to push every status key on every UI tick whether or
+not it changed, including the warp minimap as nested lists and the emulator
+and collision-overlay screens as raw RGB bytes.  StatusPublisher sits in
+front of status_queue and:
+
+- remembers the last value sent per key and drops unchanged values,
+- enforces a minimum interval per channel (CHANNEL_MIN_INTERVALS), keeping
+  the newest suppressed value pending until flush() may send it,
+- writes frames into a double-buffered shared-memory FrameChannel and
+  queues a small FrameRef (channel name + frame sequence) instead of
+  pickled pixel bytes.
+
+Consumers resolve a FrameRef with read_frame() or map the channel directly
+via frame_channel.get_channel(); plain (bytes, w, h, mode) tuples are still
+accepted by both consumers.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from environment.environment_helpers.frame_channel import (
+    FrameChannel,
+    get_channel,
+    register_channel,
+    unregister_channel,
+)
+
+# Minimum seconds between sends per channel.  Channels not listed are only
+# delta-filtered.
+CHANNEL_MIN_INTERVALS: Dict[str, float] = {
+    '__emulator_screen__': 0.1,
+    '__collision_overlay_screen__': 0.5,
+    '__warp_minimap__': 1.0,
+    '__pokemon_team__': 1.0,
+    '__quest_data__': 1.0,
+}
+
+FRAME_CHANNELS = ('__emulator_screen__', '__collision_overlay_screen__')
+
+
+@dataclass(frozen=True)
+class FrameRef:
+    """Queue payload announcing frame `seq` in the FrameChannel called shm_name"""
+    shm_name: str
+    seq: int
+    width: int
+    height: int
+    mode: str = "RGB"
+
+
+def read_frame(ref: FrameRef) -> Optional[np.ndarray]:
+    """Resolve a FrameRef to a copy of the channel's newest (H, W, 3) frame.
+
+    Returns None if the channel is gone or the frame was being overwritten
+    while it was copied.  A frame newer than ref.seq is returned as is.
+    """
+    channel = get_channel(ref.shm_name)
+    if channel is None:
+        return None
+    seq, frame = channel.read()
+    if seq < ref.seq:
+        return None
+    return frame
+
+
+class StatusPublisher:
+    """Publishes status updates to status_queue, sending only changed values"""
+
+    def __init__(self, status_queue, channel_intervals: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            status_queue: Queue read by the web server / quest_ui poller
+            channel_intervals: Per-key minimum seconds between sends
+                (defaults to CHANNEL_MIN_INTERVALS)
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.status_queue = status_queue
+        self.channel_intervals = dict(CHANNEL_MIN_INTERVALS if channel_intervals is None else channel_intervals)
+        self._clock = clock
+        self._last_value: Dict[str, Any] = {}
+        self._last_sent_at: Dict[str, float] = {}
+        self._pending: Dict[str, Any] = {}
+        self._channels: Dict[str, FrameChannel] = {}
+        # Frame keys that must be resent even if the pixels did not change
+        self._stale_frames: set = set()
+        self.sent = 0
+        self.suppressed = 0
+
+    def ready(self, key: str) -> bool:
+        """Return True if key's rate limit allows a send now.
+
+        Callers use this to skip building expensive payloads that would be
+        rate-limited anyway.
+        """
+        interval = self.channel_intervals.get(key)
+        if not interval:
+            return True
+        last = self._last_sent_at.get(key)
+        return last is None or self._clock() - last >= interval
+
+    def publish(self, key: str, value: Any) -> bool:
+        """Queue value for key if it changed. Returns True if it was sent now."""
+        if key in self._last_value and _same(self._last_value[key], value):
+            self._pending.pop(key, None)
+            self.suppressed += 1
+            return False
+        if not self.ready(key):
+            self._pending[key] = value
+            return False
+        self._pending.pop(key, None)
+        self._send(key, value)
+        return True
+
+    def publish_frame(self, key: str, frame: Optional[np.ndarray]) -> bool:
+        """Copy a new (H, W, C) uint8 frame into key's FrameChannel and queue its FrameRef."""
+        if frame is None or frame.ndim != 3 or not self.ready(key):
+            return False
+
+        height, width = frame.shape[0], frame.shape[1]
+        channel = self._channels.get(key)
+        if channel is None or channel.width != width or channel.height != height:
+            channel = self._replace_channel(key, width, height)
+        elif key not in self._stale_frames:
+            # Compare against the front buffer itself; no private copy needed
+            seq, front = channel.front()
+            if seq > 0 and np.array_equal(front, frame[:, :, :3]):
+                self.suppressed += 1
+                return False
+
+        seq = channel.write(frame)
+        self._stale_frames.discard(key)
+        self._send(key, FrameRef(channel.name, seq, width, height), remember=False)
+        return True
+
+    def channel(self, key: str) -> Optional[FrameChannel]:
+        """Return the FrameChannel backing a frame key, if one was created."""
+        return self._channels.get(key)
+
+    def flush(self) -> int:
+        """Send pending rate-limited values whose interval has elapsed."""
+        sent = 0
+        for key in [k for k in self._pending if self.ready(k)]:
+            self._send(key, self._pending.pop(key))
+            sent += 1
+        return sent
+
+    def invalidate(self, key: Optional[str] = None):
+        """Forget what was sent so the next publish resends (e.g. a new consumer attached)."""
+        if key is None:
+            self._last_value.clear()
+            self._stale_frames.update(self._channels)
+        else:
+            self._last_value.pop(key, None)
+            if key in self._channels:
+                self._stale_frames.add(key)
+
+    def close(self):
+        """Release the shared-memory frame channels."""
+        for channel in self._channels.values():
+            unregister_channel(channel)
+            channel.close()
+        self._channels.clear()
+
+    def _send(self, key: str, value: Any, remember: bool = True):
+        self.status_queue.put((key, value))
+        self._last_sent_at[key] = self._clock()
+        if remember:
+            self._last_value[key] = value
+        self.sent += 1
+
+    def _replace_channel(self, key: str, width: int, height: int) -> FrameChannel:
+        old = self._channels.pop(key, None)
+        if old is not None:
+            unregister_channel(old)
+            old.close()
+        channel = FrameChannel(width, height)
+        register_channel(channel)
+        self._channels[key] = channel
+        return channel
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Equality that tolerates numpy arrays inside status payloads."""
+    try:
+        result = a == b
+        if isinstance(result, np.ndarray):
+            return a.shape == b.shape and bool(result.all())
+        return bool(result)
+    except (ValueError, TypeError):
+        return False
@@ -0,0 +1,137 @@
+# Status sampler for unattended play loops
+"""
+Status Sampler: rate-limited, non-blocking status publishing for the web/Tk UIs.
+
+play.py pushes the full UI payload onto status_queue on a 0.5 s timer from
+inside the loop.  A headless run that steps the emulator flat out cannot
+afford that, and must never stall because a consumer is slow or missing.
+StatusSampler.maybe_publish() is called once per step and costs a single
+clock read until a sample is due; a sample is a small snapshot put with
+put_nowait(), and the whole sample is shed when the consumer is behind.
+The screen goes into a shared-memory FrameChannel and the queue only
+carries its FrameRef, as with StatusPublisher.publish_frame().
+"""
+
+import queue
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from environment.data.recorder_data.global_map import local_to_global
+from environment.environment_helpers.frame_channel import FrameChannel, register_channel, unregister_channel
+from environment.environment_helpers.status_publisher import FrameRef
+
+
+class StatusSampler:
+    """Publishes periodic status snapshots to status_queue without blocking"""
+
+    def __init__(self, status_queue, rate_hz: float = 2.0, include_screen: bool = True,
+                 max_backlog: int = 256, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            status_queue: Queue read by web_server.monitor_status_queue / quest_ui
+            rate_hz: Samples per second; 0 or less disables publishing
+            include_screen: Also publish the emulator frame (as a FrameRef)
+            max_backlog: Skip a sample while the queue holds more items than this
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.status_queue = status_queue
+        self.interval = 1.0 / rate_hz if rate_hz and rate_hz > 0 else None
+        self.include_screen = include_screen
+        self.max_backlog = max_backlog
+        self._clock = clock
+        self._next_due = clock()
+        self._frames: Optional[FrameChannel] = None
+        self.samples_published = 0
+        self.samples_dropped = 0
+
+    def due(self) -> bool:
+        """Return True when the next sample should be taken."""
+        return self.interval is not None and self._clock() >= self._next_due
+
+    def maybe_publish(self, env, quest_manager, navigator, total_steps: int,
+                      steps_per_sec: float = 0.0) -> bool:
+        """Publish a snapshot if one is due. Returns True if a sample was queued."""
+        if not self.due():
+            return False
+        # Schedule from now rather than from the missed deadline so a long
+        # stall does not cause a burst of catch-up samples.
+        self._next_due = self._clock() + self.interval
+
+        if self._backlogged():
+            self.samples_dropped += 1
+            return False
+
+        try:
+            items = self.snapshot(env, quest_manager, navigator, total_steps, steps_per_sec)
+        except Exception as e:
+            print(f"StatusSampler: failed to build snapshot: {e}")
+            return False
+
+        for item in items:
+            try:
+                self.status_queue.put_nowait(item)
+            except queue.Full:
+                self.samples_dropped += 1
+                return False
+        self.samples_published += 1
+        return True
+
+    def _backlogged(self) -> bool:
+        try:
+            return self.status_queue.qsize() > self.max_backlog
+        except NotImplementedError:
+            # qsize() is not available on every platform's multiprocessing queues
+            return False
+
+    def snapshot(self, env, quest_manager, navigator, total_steps: int,
+                 steps_per_sec: float = 0.0) -> List[Tuple[str, Any]]:
+        """Collect the (key, value) status items for one sample."""
+        x, y, map_id = env.get_game_coords()
+        global_y, global_x = local_to_global(y, x, map_id)
+        items: List[Tuple[str, Any]] = [
+            ('__total_steps__', total_steps),
+            ('__stats_steps__', total_steps),
+            ('__stats_steps_per_sec__', round(steps_per_sec, 1)),
+            ('__location__', {
+                'x': x, 'y': y,
+                'map_id': map_id,
+                'map_name': env.get_map_name_by_id(map_id),
+                'gx': global_x,
+                'gy': global_y,
+            }),
+            ('__nav_status__', getattr(navigator, 'navigation_status', 'unknown')),
+        ]
+
+        current_quest = getattr(quest_manager, 'current_quest_id', None)
+        if current_quest:
+            items.append(('__current_quest__', current_quest))
+
+        if self.include_screen:
+            screen_item = self._screen_item(env)
+            if screen_item is not None:
+                items.append(screen_item)
+        return items
+
+    def _screen_item(self, env) -> Optional[Tuple[str, Any]]:
+        raw_frame = env.render()
+        if raw_frame is None:
+            return None
+        if raw_frame.ndim == 2:
+            raw_frame = raw_frame[:, :, None].repeat(3, axis=2)
+        elif raw_frame.ndim != 3:
+            return None
+        height, width = raw_frame.shape[0], raw_frame.shape[1]
+        channel = self._frames
+        if channel is None or channel.width != width or channel.height != height:
+            self.close()
+            channel = self._frames = FrameChannel(width, height)
+            register_channel(channel)
+        seq = channel.write(raw_frame)
+        return ('__emulator_screen__', FrameRef(channel.name, seq, width, height))
+
+    def close(self):
+        """Release the shared-memory screen channel."""
+        if self._frames is not None:
+            unregister_channel(self._frames)
+            self._frames.close()
+            self._frames = None
@@ -1,93 +1,209 @@
-from PIL import Image, ImageDraw
+from PIL import Image
 import numpy as np
 
+# Numeric collision codes produced by RedGymEnv.get_collision_grid():
+# 0=walkable, 1=wall, 2=sprite, 3-6=player facing up/down/left/right
+COLLISION_COLORS = {
+    0: (0, 255, 0),      # Green for paths
+    1: (255, 0, 0),      # Red for walls
+    2: (0, 0, 255),      # Blue for sprites
+    3: (255, 255, 0),    # Yellow for player
+    4: (255, 255, 0),
+    5: (255, 255, 0),
+    6: (255, 255, 0),
+}
+
+# Visual characters used by convert_numeric_to_visual_map() -> numeric code
+VISUAL_CHAR_CODES = {'·': 0, '█': 1, 'S': 2, '↑': 3, '↓': 4, '←': 5, '→': 6}
+
+# Codes without a colour (e.g. '?') are drawn fully transparent
+_NO_TILE = 255
+
+GRID_ROWS, GRID_COLS = 9, 10
+TILE_SIZE = 16  # 160x144 screen / 10x9 grid
+
+
+class CollisionOverlayRenderer:
+    """
+    Draws the 9x10 collision grid over the 160x144 screen with numpy.
+
+    The grid is expanded to pixels by broadcasting it into a (9, 16, 10, 16)
+    view of a reusable code buffer (the in-place equivalent of
+    np.kron(grid, np.ones((16, 16)))), colours come from a 256-entry palette
+    lookup, and blending is integer math into preallocated buffers.  Nothing
+    is allocated per call once the alpha value has been seen.
+    """
+
+    def __init__(self, rows: int = GRID_ROWS, cols: int = GRID_COLS, tile_size: int = TILE_SIZE):
+        self.rows, self.cols, self.tile_size = rows, cols, tile_size
+        height, width = rows * tile_size, cols * tile_size
+        self.shape = (height, width)
+
+        self._codes = np.full((height, width), _NO_TILE, dtype=np.uint8)
+        self._code_tiles = self._codes.reshape(rows, tile_size, cols, tile_size)
+
+        self._color_lut = np.zeros((256, 3), dtype=np.uint16)
+        self._known = np.zeros(256, dtype=bool)
+        for code, rgb in COLLISION_COLORS.items():
+            self._color_lut[code] = rgb
+            self._known[code] = True
+        self._alpha_lut = np.zeros(256, dtype=np.uint16)
+        self._rgba_lut = np.zeros((256, 4), dtype=np.uint8)
+        self._lut_alpha = None
+
+        self._alpha = np.zeros((height, width, 1), dtype=np.uint16)
+        self._color = np.zeros((height, width, 3), dtype=np.uint16)
+        self._work = np.zeros((height, width, 3), dtype=np.uint16)
+        self._rgba = np.zeros((height, width, 4), dtype=np.uint8)
+        self._out = np.zeros((height, width, 3), dtype=np.uint8)
+
+    def _set_alpha(self, alpha: int):
+        if alpha == self._lut_alpha:
+            return
+        alpha = int(np.clip(alpha, 0, 255))
+        self._alpha_lut[:] = np.where(self._known, alpha, 0)
+        self._rgba_lut[:, :3] = self._color_lut
+        self._rgba_lut[:, 3] = self._alpha_lut
+        self._lut_alpha = alpha
+
+    def _expand(self, grid):
+        grid = np.asarray(grid)
+        if grid.shape != (self.rows, self.cols):
+            raise ValueError(f"Collision grid must be {self.rows}x{self.cols}, got {grid.shape}")
+        self._code_tiles[...] = grid.astype(np.uint8, copy=False)[:, None, :, None]
+
+    def overlay(self, grid, alpha: int = 128) -> np.ndarray:
+        """Return the (H, W, 4) RGBA overlay for grid. The buffer is reused by the next call."""
+        self._set_alpha(alpha)
+        self._expand(grid)
+        np.take(self._rgba_lut, self._codes, axis=0, out=self._rgba)
+        return self._rgba
+
+    def blend(self, screen: np.ndarray, grid, alpha: int = 128, out: np.ndarray = None) -> np.ndarray:
+        """
+        Alpha-blend the grid overlay onto an (H, W, 3+) uint8 screen.
+
+        Args:
+            screen: Screen pixels; an alpha channel, if present, is ignored
+            grid: 9x10 numeric collision grid
+            alpha: Overlay opacity (0-255)
+            out: Optional (H, W, 3) uint8 destination (may be screen[..., :3])
+
+        Returns:
+            np.ndarray: Blended (H, W, 3) uint8 image (the internal buffer
+            unless out is given; it is overwritten by the next call)
+        """
+        self._set_alpha(alpha)
+        self._expand(grid)
+        if out is None:
+            out = self._out
+        rgb = screen[:, :, :3]
+
+        np.take(self._alpha_lut, self._codes, out=self._alpha[:, :, 0])
+        np.take(self._color_lut, self._codes, axis=0, out=self._color)
+        # out = (rgb * (255 - a) + color * a + 127) // 255, all in uint16
+        np.multiply(self._color, self._alpha, out=self._color)
+        np.subtract(255, self._alpha, out=self._alpha)
+        np.multiply(rgb, self._alpha, out=self._work)
+        np.add(self._work, self._color, out=self._work)
+        np.add(self._work, 127, out=self._work)
+        np.floor_divide(self._work, 255, out=self._work)
+        np.copyto(out, self._work, casting='unsafe')
+        return out
+
+
+_default_renderer = None
+
+
+def _get_default_renderer() -> CollisionOverlayRenderer:
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = CollisionOverlayRenderer()
+    return _default_renderer
+
+
+def parse_collision_grid(collision_map_str):
+    """
+    Parse the numeric collision map string into a 9x10 uint8 array.
+
+    Args:
+        collision_map_str (str): Numeric collision map (0=walkable, 1=wall, 2=sprite, 3-6=player)
+
+    Returns:
+        np.ndarray or None if no grid rows were found
+    """
+    if not collision_map_str or not isinstance(collision_map_str, str):
+        return None
+    rows = []
+    for line in collision_map_str.strip().split('\n'):
+        line = line.strip()
+        if line.startswith('Legend:'):
+            break
+        if line and all(c in '0123456789 ' for c in line):
+            rows.append([int(v) for v in line.split()])
+    if not rows:
+        return None
+    return np.array(rows, dtype=np.uint8)
+
+
 def create_tile_overlay(collision_map_str, alpha=128):
     """
     Create a transparent overlay showing walkable/unwalkable tiles from the collision map string.
-    
+
     Args:
         collision_map_str (str): ASCII collision map from emulator
         alpha (int): Transparency value (0-255)
-        
+
     Returns:
         PIL.Image: RGBA image overlay
     """
     if not collision_map_str:
         return None
-        
+
     # Parse the collision map string
     lines = collision_map_str.split('\n')
     # Remove the border lines and legend
     map_lines = [line[1:-1] for line in lines[1:-1] if line.startswith('|')]
-    
-    # Create a transparent image (160x144 is the Game Boy resolution)
-    overlay = Image.new('RGBA', (160, 144), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
-    
-    # Calculate tile size
-    tile_width = 160 // 10  # 10 columns
-    tile_height = 144 // 9  # 9 rows
-    
-    # Draw tiles
-    for row, line in enumerate(map_lines):
-        for col, char in enumerate(line):
-            x1 = col * tile_width
-            y1 = row * tile_height
-            x2 = x1 + tile_width
-            y2 = y1 + tile_height
-            
-            if char == '█':  # Wall/obstacle
-                draw.rectangle([x1, y1, x2, y2], fill=(255, 0, 0, alpha))  # Red for walls
-            elif char == '·':  # Walkable path
-                draw.rectangle([x1, y1, x2, y2], fill=(0, 255, 0, alpha))  # Green for paths
-            elif char == 'S':  # Sprite/NPC
-                draw.rectangle([x1, y1, x2, y2], fill=(0, 0, 255, alpha))  # Blue for sprites
-            elif char in '↑↓←→':  # Player
-                draw.rectangle([x1, y1, x2, y2], fill=(255, 255, 0, alpha))  # Yellow for player
-                
-    return overlay
+    grid = np.array([[VISUAL_CHAR_CODES.get(char, _NO_TILE) for char in line] for line in map_lines],
+                    dtype=np.uint8)
+
+    overlay = _get_default_renderer().overlay(grid, alpha)
+    return Image.fromarray(overlay.copy(), 'RGBA')
 
 def overlay_on_screenshot(screenshot, collision_map_str, alpha=128):
     """
     Create a new image with the tile overlay blended onto the screenshot.
-    
+
     Args:
         screenshot (PIL.Image): Original screenshot
-        collision_map_str (str): ASCII collision map from emulator (numeric or character format)
+        collision_map_str (str): Numeric collision map from emulator
         alpha (int): Transparency value (0-255)
-        
+
     Returns:
-        PIL.Image: Screenshot with overlay
+        PIL.Image: RGB screenshot with overlay
     """
-    # Convert numeric format to visual format if needed
-    converted_map_str = convert_numeric_to_visual_map(collision_map_str)
-    
-    overlay = create_tile_overlay(converted_map_str, alpha)
-    if overlay is None:
+    grid = parse_collision_grid(collision_map_str)
+    if grid is None:
         return screenshot
-        
-    # Ensure screenshot is in RGBA mode for alpha blending
-    if screenshot.mode != 'RGBA':
-        screenshot = screenshot.convert('RGBA')
-    
-    # Composite the images
-    return Image.alpha_composite(screenshot, overlay)
+
+    blended = _get_default_renderer().blend(np.asarray(screenshot.convert('RGB')), grid, alpha)
+    return Image.fromarray(blended.copy(), 'RGB')
 
 def convert_numeric_to_visual_map(collision_map_str):
     """
     Convert numeric collision map format to visual character format.
-    
+
     Args:
         collision_map_str (str): Numeric collision map (0=walkable, 1=wall, 2=sprite, 3-6=player)
-        
+
     Returns:
         str: Visual collision map with borders and characters
     """
     if not collision_map_str or not isinstance(collision_map_str, str):
         return None
-    
+
     lines = collision_map_str.strip().split('\n')
-    
+
     # Filter out legend lines and empty lines
     map_lines = []
     in_legend = False
@@ -100,10 +216,10 @@ def convert_numeric_to_visual_map(collision_map_str):
             continue
         if line and all(c in '0123456789 ' for c in line):  # Only lines with numbers and spaces
             map_lines.append(line)
-    
+
     if not map_lines:
         return None
-    
+
     # Convert numeric codes to visual characters
     visual_lines = []
     for line in map_lines:
@@ -129,13 +245,13 @@ def convert_numeric_to_visual_map(collision_map_str):
                 visual_line += '?'  # unknown
         visual_line += "|"  # Add border
         visual_lines.append(visual_line)
-    
+
     # Add top and bottom borders
     if visual_lines:
         border_width = len(visual_lines[0])
         top_border = "+" + "-" * (border_width - 2) + "+"
         bottom_border = top_border
-        
+
         return top_border + "\n" + "\n".join(visual_lines) + "\n" + bottom_border
-    
-    return None 
\ No newline at end of file
+
+    return None
@@ -0,0 +1,478 @@
+# game_session.py
+"""
+Game session setup shared by every play loop.
+
+play.py (pygame + Tk + web UI) and headless_runner.py (no display, as fast as
+the emulator allows) both need the same non-UI wiring: resolve the config,
+reset the environment, then build the navigator, trigger evaluator, run
+directory, QuestManager and QuestProgressionEngine in the right order.  That
+wiring lives here so neither entry point has to import the other's UI
+dependencies.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from queue import SimpleQueue
+from typing import Any, Dict, List
+
+from omegaconf import OmegaConf, DictConfig
+
+from environment.environment_helpers.navigator import InteractiveNavigator
+from environment.environment_helpers.quest_manager import QuestManager
+from environment.environment_helpers.quest_progression import QuestProgressionEngine
+from environment.environment_helpers.saver import load_latest_run, create_new_run
+from environment.environment_helpers.trigger_evaluator import TriggerEvaluator
+from environment.environment_helpers.quest_catalog import get_quest_catalog
+
+# Quest definitions (shared, parsed-once catalog)
+QUESTS = get_quest_catalog().quests
+
+
+@dataclass
+class GameSession:
+    """Everything a play loop needs after startup wiring is done"""
+    env: Any
+    obs: Any
+    info: Dict[str, Any]
+    status_queue: Any
+    all_quest_ids: List[int]
+    navigator: Any
+    trigger_evaluator: Any
+    run_info: Any
+    run_dir: Path
+    quest_manager: Any
+    quest_progression_engine: Any
+    navigation_monitor: Any
+    initial_quest_statuses: Dict[Any, Any]
+    initial_trigger_statuses: Dict[str, Any]
+    start_map_id: int
+
+
+def execute_action_step(env, action, quest_manager=None, navigator=None, logger=None, total_steps=0):
+    """
+    Centralized action execution function that ensures all environment systems stay synchronized.
+    This is the ONLY function that should call env.step() to prevent desynchronization.
+
+    Args:
+        env: The environment wrapper
+        action: The action to execute
+        quest_manager: Quest manager instance (optional)
+        navigator: Navigator instance (optional)
+        logger: Logger instance (optional)
+        total_steps: Current total step count
+
+    Returns:
+        tuple: (obs, reward, terminated, truncated, info, updated_total_steps)
+    """
+    try:
+        # Execute the action in the environment - THE ONLY PLACE env.process_action() SHOULD BE CALLED
+        obs, reward, terminated, truncated, info = env.process_action(action, source="PlayLoop")
+        total_steps += 1
+
+        # Update all environment systems that depend on the step
+        # Note: update_after_step methods don't currently exist, but we'll check for them
+        if quest_manager:
+            try:
+                if hasattr(quest_manager, 'update_after_step'):
+                    quest_manager.update_after_step(obs, reward, terminated, truncated, info)
+                # Fallback to existing methods
+                elif hasattr(quest_manager, 'update_progress'):
+                    quest_manager.update_progress()
+            except Exception as e:
+                if logger:
+                    logger.warning(f"Quest manager update failed: {e}")
+
+        if navigator:
+            try:
+                if hasattr(navigator, 'update_after_step'):
+                    navigator.update_after_step(obs, reward, terminated, truncated, info)
+                # Navigator might not need step-by-step updates
+            except Exception as e:
+                if logger:
+                    logger.warning(f"Navigator update failed: {e}")
+
+        # Log the action if logger is available
+        if logger:
+            logger.debug(f"Executed action {action} at step {total_steps}")
+
+        return obs, reward, terminated, truncated, info, total_steps
+
+    except Exception as e:
+        if logger:
+            import traceback
+            # Get the full traceback with line numbers, function names, and files
+            tb_str = traceback.format_exc()
+            logger.error(f"Error executing action {action}: {e}\n"
+                        f"Full traceback:\n{tb_str}")
+        # Return safe defaults
+        return None, 0.0, True, True, {}, total_steps
+
+
+def get_default_config(
+    gb_path,
+    state_dir,
+    override_init_state=None,
+    init_from_last_ending_state=True,
+    interactive_mode=True,
+    record_replays=True,
+    headless=False,
+    video_dir="video",
+    emulator_delay=11,
+    action_freq=24,
+    save_video=False,
+    fast_video=False,
+    n_record=10,
+    perfect_ivs=True,
+    auto_flash=False,
+    disable_wild_encounters=False,
+    auto_teach_cut=True,
+    auto_use_cut=True,
+    auto_teach_surf=True,
+    auto_use_surf=True,
+    auto_teach_strength=True,
+    auto_use_strength=True,
+    auto_solve_strength_puzzles=True,
+    auto_remove_all_nonuseful_items=False,
+    auto_pokeflute=True,
+    auto_next_elevator_floor=True,
+    skip_safari_zone=False,
+    infinite_safari_steps=False,
+    insert_saffron_guard_drinks=False,
+    infinite_money=True,
+    infinite_health=True,
+    infinite_pp_and_move_hack=False,
+    animate_scripts=True,
+    disable_recordings=False,
+):
+    env_config = {
+        "gb_path": gb_path,
+        "state_dir": state_dir,
+        "override_init_state": override_init_state,
+        "init_from_last_ending_state": init_from_last_ending_state,
+        "interactive_mode": interactive_mode,
+        "record_replays": record_replays,
+        "headless": headless,
+        "video_dir": video_dir,
+        "emulator_delay": emulator_delay,
+        "action_freq": action_freq,
+        "save_video": save_video,
+        "fast_video": fast_video,
+        "n_record": n_record,
+        "perfect_ivs": perfect_ivs,
+        "auto_flash": auto_flash,
+        "disable_wild_encounters": disable_wild_encounters,
+        "auto_teach_cut": auto_teach_cut,
+        "auto_use_cut": auto_use_cut,
+        "auto_teach_surf": auto_teach_surf,
+        "auto_use_surf": auto_use_surf,
+        "auto_teach_strength": auto_teach_strength,
+        "auto_use_strength": auto_use_strength,
+        "auto_solve_strength_puzzles": auto_solve_strength_puzzles,
+        "auto_remove_all_nonuseful_items": auto_remove_all_nonuseful_items,
+        "auto_pokeflute": auto_pokeflute,
+        "auto_next_elevator_floor": auto_next_elevator_floor,
+        "skip_safari_zone": skip_safari_zone,
+        "infinite_safari_steps": infinite_safari_steps,
+        "insert_saffron_guard_drinks": insert_saffron_guard_drinks,
+        "infinite_money": infinite_money,
+        "infinite_health": infinite_health,
+        "infinite_pp_and_move_hack": infinite_pp_and_move_hack,
+        "animate_scripts": animate_scripts,
+        "disable_recordings": disable_recordings,
+    }
+    return OmegaConf.create(env_config)
+
+
+def setup_configuration(args, project_root_path):
+    """
+    Merge config.yaml with non-None CLI arguments into the resolved run config
+
+    Args:
+        args: Namespace with at least config_path and rom_path
+        project_root_path: Repository root a relative ROM path is resolved against
+
+    Returns:
+        DictConfig: Config for build_game_session / ConfiguredEnvWrapper
+    """
+    yaml_path = Path(args.config_path)
+    yaml_config = OmegaConf.load(yaml_path) if yaml_path.exists() else OmegaConf.create()
+
+    cli_args = {k: v for k, v in vars(args).items() if v is not None}
+
+    # Extract env settings from YAML
+    env_yaml = yaml_config.get('env', {})
+
+    # Build defaults from YAML + hardcoded defaults
+    defaults = get_default_config(
+        gb_path=cli_args.get('rom_path', env_yaml.get('gb_path')),
+        state_dir=env_yaml.get('state_dir'),
+        override_init_state=env_yaml.get('override_init_state'),
+        init_from_last_ending_state=env_yaml.get('init_from_last_ending_state'),
+        interactive_mode=env_yaml.get('interactive_mode'),
+        record_replays=env_yaml.get('record_replays'),
+        headless=env_yaml.get('headless'),
+        video_dir=env_yaml.get('video_dir'),
+        emulator_delay=env_yaml.get('emulator_delay'),
+        action_freq=env_yaml.get('action_freq'),
+        save_video=env_yaml.get('save_video'),
+        fast_video=env_yaml.get('fast_video'),
+        n_record=env_yaml.get('n_record'),
+        perfect_ivs=env_yaml.get('perfect_ivs'),
+        auto_flash=env_yaml.get('auto_flash'),
+        disable_wild_encounters=env_yaml.get('disable_wild_encounters'),
+        auto_teach_cut=env_yaml.get('auto_teach_cut'),
+        auto_use_cut=env_yaml.get('auto_use_cut'),
+        auto_teach_surf=env_yaml.get('auto_teach_surf'),
+        auto_use_surf=env_yaml.get('auto_use_surf'),
+        auto_teach_strength=env_yaml.get('auto_teach_strength'),
+        auto_use_strength=env_yaml.get('auto_use_strength'),
+        auto_solve_strength_puzzles=env_yaml.get('auto_solve_strength_puzzles'),
+        auto_remove_all_nonuseful_items=env_yaml.get('auto_remove_all_nonuseful_items'),
+        auto_pokeflute=env_yaml.get('auto_pokeflute'),
+        auto_next_elevator_floor=env_yaml.get('auto_next_elevator_floor'),
+        skip_safari_zone=env_yaml.get('skip_safari_zone'),
+        infinite_safari_steps=env_yaml.get('infinite_safari_steps'),
+        insert_saffron_guard_drinks=env_yaml.get('insert_saffron_guard_drinks'),
+        infinite_money=env_yaml.get('infinite_money'),
+        infinite_health=env_yaml.get('infinite_health'),
+        infinite_pp_and_move_hack=env_yaml.get('infinite_pp_and_move_hack'),
+        animate_scripts=env_yaml.get('animate_scripts'),
+        disable_recordings=env_yaml.get('disable_recordings'),
+    )
+
+    # Merge defaults + YAML + CLI
+    final_config = OmegaConf.merge(defaults, yaml_config.get('env', {}), OmegaConf.create(cli_args))
+
+    # Validate and resolve paths
+    if not final_config.gb_path:
+        raise ValueError("ROM path ('gb_path') cannot be None.")
+    resolved_rom = Path(final_config.gb_path)
+    if not resolved_rom.is_absolute():
+        resolved_rom = project_root_path / resolved_rom
+    final_config.gb_path = str(resolved_rom)
+
+    # Sync agent settings
+    if 'agent' in yaml_config:
+        final_config.agent = OmegaConf.merge(yaml_config.agent)
+        final_config.grok_on = final_config.agent.get('grok_on')
+
+    # Session ID
+    if not final_config.get('session_id'):
+        final_config.session_id = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+    return final_config
+
+
+def build_game_session(env, config: DictConfig, logger, status_queue=None,
+                       run_startup_checks: bool = True) -> GameSession:
+    """
+    Reset the environment and wire up the quest/navigation systems around it.
+
+    Args:
+        env: ConfiguredEnvWrapper instance (not yet reset)
+        config: Fully resolved config from setup_configuration
+        logger: PokemonLogger from utils.logging_config
+        status_queue: Queue shared with the UI consumers; a new SimpleQueue if None
+        run_startup_checks: Validate quest files and run the navigation monitor's
+            startup verification (slow; headless batch runs may skip it)
+
+    Returns:
+        GameSession with every component attached to env
+    """
+    # --- CRITICAL SECTION FOR INITIALIZATION ORDER ---
+
+    # 1. Reset the environment FIRST to load state and get initial info
+    # This call to env.reset() is where 'loaded_quest_statuses' and
+    # 'loaded_trigger_statuses' are populated in the env object's persisted attributes if a load occurs.
+    obs, info = env.reset()
+
+    print(f"game_session.py: build_game_session(): Received info dictionary from env.reset(): {info}") # Keep for general debugging
+
+    # Get current map ID after reset for run creation
+    current_map_id_after_reset = env.get_game_coords()[2]
+
+    # 2. Use the environment's persisted statuses for initialization.
+    # These are populated by env.reset() if a state (and its quest/trigger data) was loaded.
+    # If no load, they default to {} or what was set in env.__init__.
+    initial_quest_statuses_from_save = env.persisted_loaded_quest_statuses if env.persisted_loaded_quest_statuses is not None else {}
+    initial_trigger_statuses_from_save = env.persisted_loaded_trigger_statuses if env.persisted_loaded_trigger_statuses is not None else {}
+
+    # FIX: Convert old list format to new dictionary format for backwards compatibility
+    if isinstance(initial_trigger_statuses_from_save, list):
+        print(f"game_session.py: Converting old list format trigger statuses to dictionary format")
+        old_list = initial_trigger_statuses_from_save
+        initial_trigger_statuses_from_save = {trigger_id: True for trigger_id in old_list}
+        print(f"game_session.py: Converted {len(old_list)} trigger IDs from list to dictionary")
+
+    print(f"game_session.py: Sourced initial_quest_statuses_from_save from env: {initial_quest_statuses_from_save}")
+    print(f"game_session.py: Sourced initial_trigger_statuses_from_save from env: {initial_trigger_statuses_from_save}")
+
+    # 3. Initialize status_queue and all_quest_ids BEFORE QuestProgressionEngine
+    if status_queue is None:
+        status_queue = SimpleQueue()
+    all_quest_ids = [int(q["quest_id"]) for q in QUESTS]
+
+    # 4. Initialize Navigator (must be initialized before use)
+    navigator = InteractiveNavigator(env)
+    if hasattr(env, 'set_navigator'):
+        env.set_navigator(navigator)
+    elif hasattr(env, 'env') and hasattr(env.env, 'set_navigator'):
+        env.env.set_navigator(navigator)
+
+    # 5. Initialize TriggerEvaluator
+    trigger_evaluator = TriggerEvaluator(env)
+    setattr(env, "trigger_evaluator", trigger_evaluator)
+    print(f"[Setup] Created and attached trigger_evaluator to environment using global map tracking")
+
+    # 6. Initialize QuestManager now that run_dir is known
+    # Load (or reuse) an existing run so QuestManager can use its run_dir
+    # Priority order:
+    #   1. A run the environment just created during `env.reset()`
+    #   2. The latest previously-saved run on disk (via `load_latest_run`)
+    #   3. Create a brand-new run if neither of the above exist
+
+    # 1️⃣ Prefer a run that the environment may have already created. This
+    #     prevents a second directory (e.g. "002-…") from being made a few
+    #     frames later.
+    run_info = getattr(env, "current_run_info", None)
+
+    # 2️⃣ If the environment didn't create one (e.g. running from a saved
+    #     state), fall back to whatever the RunManager thinks is latest.
+    if run_info is None:
+        run_info = load_latest_run(env)
+
+    # 3️⃣ If still None, we really do need a fresh run directory.
+    if run_info is None:
+        current_map_name = env.get_map_name_by_id(current_map_id_after_reset)
+        run_info = create_new_run(env, current_map_name, current_map_id_after_reset)
+
+    # 🔀 NEW: Gracefully handle the case where recordings are disabled and
+    # no RunInfo could be created.  Many downstream systems (QuestManager,
+    # QuestProgressionEngine, etc.) rely on the presence of a valid
+    # directory path for persisting transient JSON files even when video
+    # recordings are turned off.  If `run_info` is still `None` at this
+    # point, synthesize an in-memory *temporary* run directory so the rest
+    # of the application can continue to operate without crashing.
+    if run_info is None:
+        from tempfile import mkdtemp
+        from environment.environment_helpers.run_manager import RunInfo
+        temp_dir_path = Path(mkdtemp(prefix="temp_run_"))
+        # Ensure mkdtemp created directory; already exists. Print message.
+        print(f"[Fallback] Recordings disabled – using temporary run directory at {temp_dir_path}")
+        import datetime as _dt
+        run_info = RunInfo(
+            run_id="TEMP_RUN",
+            start_map_name=env.get_map_name_by_id(current_map_id_after_reset),
+            map_id=current_map_id_after_reset,
+            date=_dt.datetime.now().strftime("%d%m%Y"),
+            sequence=0,
+            run_dir=temp_dir_path,
+        )
+        # Expose the synthetic run info on the environment so that helper
+        # utilities expecting it (e.g. saver.save_*) do not fail.
+        env.current_run_info = run_info
+        env.current_run_dir = run_info.run_dir
+
+    run_dir = run_info.run_dir
+
+    # Initialize QuestManager with run_dir for proper quest status synchronization
+    quest_manager = QuestManager(env, run_dir=run_dir)
+    env.quest_manager = quest_manager
+
+    # PREVENTION: Validate quest system integrity at startup
+    if run_startup_checks:
+        try:
+            from environment.environment_helpers.quest_validator import validate_quest_system
+            print("Validating quest coordinate files...")
+            validation_results = validate_quest_system(output_report=False)
+
+            if not validation_results.get('validation_passed'):
+                critical_count = validation_results.get('total_critical_errors', 0)
+                warning_count = validation_results.get('total_warnings', 0)
+
+                if critical_count > 0:
+                    print(f"⚠️  QUEST VALIDATION: {critical_count} critical errors found in quest files!")
+                    print("This may cause navigation issues. Check quest_validation_report.txt for details.")
+
+                    # Log the validation issues
+                    logger.log_system_event("QUEST_VALIDATION_FAILED", {
+                        'critical_errors': critical_count,
+                        'warnings': warning_count,
+                        'failed_quests': validation_results.get('quests_with_errors', 0)
+                    })
+                else:
+                    print(f"✅ Quest validation passed with {warning_count} warnings")
+            else:
+                print("✅ All quest coordinate files validated successfully")
+
+        except Exception as e:
+            print(f"Warning: Could not validate quest files: {e}")
+            logger.log_error("QUEST_VALIDATION", f"Quest validation failed: {e}", {})
+
+    # 7. NOW, instantiate QuestProgressionEngine with the correctly loaded statuses (SINGLE INITIALIZATION)
+    quest_progression_engine = QuestProgressionEngine(
+        env=env,
+        navigator=navigator,
+        quest_manager=quest_manager,
+        quests_definitions=QUESTS,
+        quest_ids_all=all_quest_ids,
+        status_queue=status_queue,
+        run_dir=run_dir,
+        initial_quest_statuses=initial_quest_statuses_from_save, # This is critical
+        initial_trigger_statuses=initial_trigger_statuses_from_save, # This is critical
+        logger=logger, # CRITICAL FIX: Pass logger to enable trigger evaluation logging
+        persistence_enabled=not config.get("disable_recordings", False) and config.get("record_replays", True)
+    )
+
+    quest_manager.quest_progression_engine = quest_progression_engine
+
+    # 8. Initialize NavigationSystemMonitor for comprehensive validation
+    from environment.environment_helpers.navigation_system_monitor import NavigationSystemMonitor
+    navigation_monitor = NavigationSystemMonitor(
+        env=env,
+        navigator=navigator,
+        quest_manager=quest_manager,
+        quest_progression_engine=quest_progression_engine,
+        logger=logger
+    )
+
+    # Store reference in main components for easy access
+    env.navigation_monitor = navigation_monitor
+    navigator.navigation_monitor = navigation_monitor
+    quest_manager.navigation_monitor = navigation_monitor
+
+    # CRITICAL: Run startup verification to catch any initialization issues
+    if run_startup_checks:
+        print("Running navigation system startup verification...")
+        startup_results = navigation_monitor.check_at_startup()
+        if startup_results.get("total_issues", 0) > 0:
+            print(f"⚠️  Startup verification found {startup_results['total_issues']} issues")
+        else:
+            print("✅ Startup verification passed")
+
+    # 9. Refresh QuestManager's current quest and load coordinates into navigator
+    quest_manager.get_current_quest() # This should pick up the correct starting quest
+    if quest_manager.current_quest_id is not None:
+        navigator.load_coordinate_path(quest_manager.current_quest_id)
+        print(f"game_session.py: Loaded quest {quest_manager.current_quest_id} into navigator post-reset, aligning with QuestManager.")
+
+    status_queue.put(('__current_quest__', quest_manager.current_quest_id))
+
+    return GameSession(
+        env=env,
+        obs=obs,
+        info=info,
+        status_queue=status_queue,
+        all_quest_ids=all_quest_ids,
+        navigator=navigator,
+        trigger_evaluator=trigger_evaluator,
+        run_info=run_info,
+        run_dir=run_dir,
+        quest_manager=quest_manager,
+        quest_progression_engine=quest_progression_engine,
+        navigation_monitor=navigation_monitor,
+        initial_quest_statuses=initial_quest_statuses_from_save,
+        initial_trigger_statuses=initial_trigger_statuses_from_save,
+        start_map_id=current_map_id_after_reset,
+    )
@@ -0,0 +1,344 @@
+# headless_runner.py
+"""
+Headless high-throughput runner.
+
+Drives the game through execute_action_step as fast as the emulator allows:
+no pygame window, no frame pacing, no idle sleeps.  Actions come from the
+same sources the interactive loop uses when nobody is at the keyboard
+(scripted tile overrides, then dialog advance, then quest path following).
+UI/web updates go through a non-blocking StatusSampler at a configurable
+rate, and the achieved steps/sec is reported while running and at exit.
+
+Usage:
+    python environment/headless_runner.py --max_steps 20000 --web --ui_rate_hz 2
+"""
+import sys
+from pathlib import Path
+
+# Ensure the project root is in the Python path
+project_root_path = Path(__file__).resolve().parent.parent
+if str(project_root_path) not in sys.path:
+    sys.path.insert(0, str(project_root_path))
+
+import argparse
+import contextlib
+import json
+import os
+import threading
+import time
+from queue import Empty
+
+from pyboy.utils import WindowEvent
+from omegaconf import OmegaConf
+
+from environment.environment import VALID_ACTIONS, PATH_FOLLOW_ACTION
+from environment.wrappers.configured_env_wrapper import ConfiguredEnvWrapper
+from environment.game_session import build_game_session, execute_action_step, setup_configuration
+from environment.environment_helpers.saver import (
+    save_loop_state, save_final_state, open_action_log, autosave_checkpoint, set_recordings_dir
+)
+from environment.environment_helpers.status_sampler import StatusSampler
+from environment.replay import annotate_action_record
+
+A_BUTTON_ACTION = VALID_ACTIONS.index(WindowEvent.PRESS_BUTTON_A)
+
+
+def _report(message: str):
+    """Progress output that still reaches the terminal when --quiet silences stdout."""
+    print(message, file=sys.__stdout__, flush=True)
+
+
+def choose_action(env, quest_manager, navigator):
+    """
+    Pick the next action for an unattended run.
+
+    Mirrors what play.py does when no key is pressed and Grok is off:
+    scripted tile overrides first, StageManager noops during the intro,
+    A to advance any open dialog, otherwise follow the current quest path.
+
+    Returns:
+        tuple: (action, source) where source labels the action in the recording
+    """
+    override_action = env.resolve_scripted_override(quest_manager.current_quest_id)
+    if override_action is not None:
+        return override_action, 'scripted'
+
+    dialog = env.read_dialog() or ''
+    # Noops during the intro are rewritten by StageManager into START/A/B presses
+    if quest_manager.current_quest_id == 1 and "NAME" not in dialog:
+        return getattr(env, 'noop_button_index', 8), 'stage'
+
+    if dialog.strip():
+        return A_BUTTON_ACTION, 'dialog'
+
+    current_q = quest_manager.current_quest_id
+    if current_q is not None and navigator.active_quest_id != current_q:
+        if navigator.load_coordinate_path(current_q):
+            setattr(env, 'current_loaded_quest_id', current_q)
+        else:
+            print(f"headless_runner.py: Failed to load quest {current_q} coordinates")
+    return quest_manager.filter_action(PATH_FOLLOW_ACTION), 'navigator'
+
+
+def _drain(status_queue):
+    """Discard queued status items when no UI consumer is attached."""
+    try:
+        while True:
+            status_queue.get_nowait()
+    except Empty:
+        pass
+
+
+def write_progress(path, progress):
+    """Atomically replace the JSON progress file an orchestrator polls"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(progress, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"headless_runner.py: could not write progress to {path}: {e}")
+
+
+def run_headless(session, logger, max_steps=None, max_seconds=None, sampler=None,
+                 report_interval=5.0, log_frequency=1000, save_state=True, drain_queue=False,
+                 checkpoint_every=500, checkpoint_keep=50, progress_path=None):
+    """
+    Step the session until max_steps/max_seconds is reached or the game ends.
+
+    Args:
+        session: GameSession from build_game_session
+        logger: PokemonLogger instance
+        max_steps: Stop after this many steps (None for no limit)
+        max_seconds: Stop after this much wall time (None for no limit)
+        sampler: StatusSampler for UI updates (None to publish nothing)
+        report_interval: Seconds between steps/sec progress reports
+        log_frequency: Save loop state every N steps
+        save_state: Persist actions/path trace via saver like play.py does
+        drain_queue: Empty status_queue at each report (no consumer attached)
+        checkpoint_every: Autosave an emulator checkpoint every N steps (0 to disable)
+        checkpoint_keep: Autosave checkpoints kept per run
+        progress_path: Rewrite this JSON file with the run's progress at every report
+
+    Returns:
+        tuple: (stats, recorded_playthrough) -- run statistics including steps
+        and steps_per_sec, and the run's action log
+    """
+    env = session.env
+    quest_manager = session.quest_manager
+    navigator = session.navigator
+    quest_progression_engine = session.quest_progression_engine
+    trigger_evaluator = session.trigger_evaluator
+
+    recorded_playthrough = open_action_log(env, session.run_info if save_state else None)
+    total_steps = 0
+    total_reward = 0.0
+    start_quest = quest_manager.current_quest_id
+    stop_reason = "max_steps"
+    run_id = session.run_info.run_id if session.run_info else None
+
+    def progress(finished=False):
+        return {
+            'pid': os.getpid(),
+            'run_id': run_id,
+            'steps': total_steps,
+            'steps_per_sec': round(steps_per_sec, 2),
+            'elapsed_seconds': round(time.perf_counter() - start_time, 3),
+            'start_quest': start_quest,
+            'current_quest': quest_manager.current_quest_id,
+            'updated': time.time(),
+            'finished': finished,
+        }
+
+    start_time = time.perf_counter()
+    last_report_time = start_time
+    last_report_steps = 0
+    steps_per_sec = 0.0
+
+    while max_steps is None or total_steps < max_steps:
+        action, source = choose_action(env, quest_manager, navigator)
+        obs, reward, terminated, truncated, info, total_steps = execute_action_step(
+            env, action, quest_manager, navigator, logger, total_steps
+        )
+        total_reward += reward
+        recorded_playthrough.append(annotate_action_record(env, {
+            'step': total_steps,
+            'action': action,
+            'original_action': None,
+            'timestamp': time.time(),
+            'source': source,
+        }, total_steps))
+
+        try:
+            quest_progression_engine.step(trigger_evaluator)
+        except Exception as e:
+            print(f"[ERROR] Exception in quest progression: {str(e)}")
+            logger.log_error("QUEST_PROGRESSION", f"Error in quest progression: {str(e)}", {
+                'current_quest_id': quest_manager.current_quest_id,
+                'total_steps': total_steps
+            })
+
+        now = time.perf_counter()
+        elapsed = now - start_time
+        if sampler is not None:
+            sampler.maybe_publish(env, quest_manager, navigator, total_steps, steps_per_sec)
+
+        if save_state and total_steps % log_frequency == 0:
+            save_loop_state(env, recorded_playthrough)
+        if save_state and checkpoint_every and total_steps % checkpoint_every == 0:
+            autosave_checkpoint(env, total_steps, keep=checkpoint_keep)
+
+        if now - last_report_time >= report_interval:
+            steps_per_sec = (total_steps - last_report_steps) / (now - last_report_time)
+            _report(f"[Headless] Step: {total_steps}, Steps/sec: {steps_per_sec:.1f} "
+                    f"(avg {total_steps / elapsed:.1f}), Current Quest: {quest_manager.current_quest_id}")
+            last_report_time = now
+            last_report_steps = total_steps
+            if progress_path:
+                write_progress(progress_path, progress())
+            if drain_queue:
+                _drain(session.status_queue)
+
+        if terminated or truncated:
+            stop_reason = "terminated"
+            break
+        if max_seconds is not None and elapsed >= max_seconds:
+            stop_reason = "max_seconds"
+            break
+
+    elapsed = time.perf_counter() - start_time
+    if progress_path:
+        steps_per_sec = total_steps / elapsed if elapsed > 0 else 0.0
+        write_progress(progress_path, dict(progress(finished=True), stop_reason=stop_reason))
+    stats = {
+        'steps': total_steps,
+        'elapsed_seconds': round(elapsed, 3),
+        'steps_per_sec': round(total_steps / elapsed, 2) if elapsed > 0 else 0.0,
+        'total_reward': total_reward,
+        'start_quest': start_quest,
+        'end_quest': quest_manager.current_quest_id,
+        'stop_reason': stop_reason,
+        'ui_samples_published': sampler.samples_published if sampler else 0,
+        'ui_samples_dropped': sampler.samples_dropped if sampler else 0,
+    }
+    return stats, recorded_playthrough
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the game headless as fast as the emulator allows")
+    parser.add_argument("--config_path", type=str, default=str(project_root_path / "config.yaml"))
+    parser.add_argument("--rom_path", type=str, default=None)
+    parser.add_argument("--max_steps", type=int, default=10000, help="Stop after N steps (0 for no limit)")
+    parser.add_argument("--max_seconds", type=float, default=None, help="Stop after N seconds of wall time")
+    parser.add_argument("--web", action="store_true", help="Start the web UI server fed by the sampler")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--ui_rate_hz", type=float, default=2.0, help="UI status samples per second (0 disables)")
+    parser.add_argument("--no_screen", action="store_true", help="Do not send emulator frames to the UI")
+    parser.add_argument("--report_interval", type=float, default=5.0, help="Seconds between steps/sec reports")
+    parser.add_argument("--report_path", type=str, default=None, help="Write final run statistics JSON here")
+    parser.add_argument("--skip_startup_checks", action="store_true", help="Skip quest file validation and navigation startup verification")
+    parser.add_argument("--quiet", action="store_true", help="Silence per-step prints from the environment while stepping")
+    parser.add_argument("--no_save_state", action="store_true", help="Do not persist actions/state to the run directory")
+    parser.add_argument("--recordings_dir", type=str, default=None,
+                        help="Run directories go here instead of environment/replays/recordings")
+    parser.add_argument("--state", type=str, default=None,
+                        help="Start a new run from this savestate instead of resuming the latest run")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the latest run (end state or restored checkpoint) whatever the config says")
+    parser.add_argument("--progress_path", type=str, default=None,
+                        help="Keep a JSON progress file updated at every report (for orchestrators)")
+    args = parser.parse_args()
+
+    config = setup_configuration(argparse.Namespace(config_path=args.config_path, rom_path=args.rom_path), project_root_path)
+    config.headless = True
+    config.interactive_mode = False
+    if args.state:
+        config.override_init_state = str(Path(args.state).resolve())
+        config.init_from_last_ending_state = False
+    elif args.resume:
+        config.override_init_state = None
+        config.init_from_last_ending_state = True
+    if args.recordings_dir:
+        set_recordings_dir(args.recordings_dir)
+
+    import shared
+    # Headless runs never hand control to Grok; the loop starts immediately
+    shared.grok_enabled.clear()
+    shared.game_started.set()
+
+    from utils.logging_config import setup_logging
+    logger = setup_logging(logs_dir="logs", overwrite_logs=True, redirect_stdout=False)
+    logger.log_system_event("headless_runner.py main() starting", {
+        'config_path': args.config_path,
+        'max_steps': args.max_steps,
+        'ui_rate_hz': args.ui_rate_hz,
+    })
+
+    env = ConfiguredEnvWrapper(base_conf=config, cli_args=args)
+    env.headless = True
+    # Unlimited emulation speed: pacing is the one thing this runner must not do
+    env.pyboy.set_emulation_speed(0)
+
+    session = build_game_session(env, config, logger, run_startup_checks=not args.skip_startup_checks)
+    session.status_queue.put(('__config__', OmegaConf.to_container(config, resolve=True)))
+
+    sampler = None
+    if args.web:
+        from web.web_server import start_server
+        ui_thread = threading.Thread(
+            target=start_server,
+            args=(session.status_queue, '0.0.0.0', args.port),
+            daemon=True
+        )
+        ui_thread.start()
+        print(f"Web UI server started on http://localhost:{args.port}")
+        sampler = StatusSampler(session.status_queue, rate_hz=args.ui_rate_hz,
+                                include_screen=not args.no_screen)
+
+    save_state = config.get("save_state", True) and not args.no_save_state
+    max_steps = args.max_steps if args.max_steps > 0 else None
+    _report(f"[Headless] Starting at quest {session.quest_manager.current_quest_id}, "
+            f"max_steps={max_steps}, max_seconds={args.max_seconds}")
+
+    output = open(os.devnull, 'w') if args.quiet else sys.stdout
+    try:
+        with contextlib.redirect_stdout(output):
+            stats, recorded_playthrough = run_headless(
+                session,
+                logger,
+                max_steps=max_steps,
+                max_seconds=args.max_seconds,
+                sampler=sampler,
+                report_interval=args.report_interval,
+                log_frequency=config.get("log_frequency", 1000),
+                save_state=save_state,
+                drain_queue=not args.web,
+                checkpoint_every=config.get("checkpoint_every", 500),
+                checkpoint_keep=config.get("checkpoint_keep", 50),
+                progress_path=args.progress_path,
+            )
+    finally:
+        if args.quiet:
+            output.close()
+        if sampler is not None:
+            sampler.close()
+
+    _report(f"[Headless] Finished {stats['steps']} steps in {stats['elapsed_seconds']:.1f}s "
+            f"({stats['steps_per_sec']:.1f} steps/sec), quest {stats['start_quest']} -> {stats['end_quest']}")
+
+    if save_state and session.run_info:
+        save_final_state(env, session.run_info, recorded_playthrough)
+
+    if args.report_path:
+        try:
+            with open(args.report_path, 'w') as f:
+                json.dump(stats, f, indent=4)
+            print(f"Run statistics saved to {args.report_path}")
+        except Exception as e:
+            print(f"Failed to save run statistics: {e}")
+
+    env.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,534 @@
+# orchestrator.py
+"""
+Run many headless sessions at once.
+
+Each session is a separate headless_runner.py process with its own
+recordings directory (<out>/<name>/recordings), so run directories,
+checkpoints and quest/trigger status files never collide, and each emulator
+gets its own interpreter, GIL and shared-memory segments.  Up to --parallel
+sessions (default: one per core) run at a time; the rest wait in order.
+
+Children are started with single-threaded BLAS/OpenMP pools and a dummy SDL
+driver so N sessions keep to N cores, optionally at a lower nice level,
+pinned to one core each, and under an address-space limit (--max_memory_mb).
+
+A session that exits nonzero (crash, OOM kill, MemoryError, or a stall
+longer than --stall_seconds) is restarted up to --max_restarts times.
+Before a restart the newest valid autosave checkpoint of its latest run is
+written over that run's end state, and the session is relaunched with
+--resume, so it continues from the checkpoint with the run's persisted
+quest/trigger status instead of from the beginning.  Steps are counted
+across restarts and a restarted session only runs the remainder of its
+max_steps.
+
+Progress comes from the progress.json each child rewrites at every report;
+the orchestrator prints an aggregated table every --report_interval seconds
+and writes the final summary to <out>/summary.json.
+
+Sessions come from -n (copies of one config/state) or a YAML/JSON file:
+
+    sessions:
+      - name: route22
+        state: states/route22.state
+        max_steps: 50000
+      - name: brock
+        config_path: configs/brock.yaml
+        args: ["--max_seconds", "3600"]
+
+Usage:
+    python environment/orchestrator.py -n 32 --state run_end.state --max_steps 100000 --out orchestrated/
+    python environment/orchestrator.py --sessions sessions.yaml --parallel 16 --max_memory_mb 1500
+"""
+import sys
+from pathlib import Path
+
+# Ensure the project root is in the Python path
+project_root_path = Path(__file__).resolve().parent.parent
+if str(project_root_path) not in sys.path:
+    sys.path.insert(0, str(project_root_path))
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from omegaconf import OmegaConf
+
+from environment.environment_helpers.checkpoint_store import CheckpointStore
+from environment.environment_helpers.run_manager import RunManager
+
+HEADLESS_RUNNER = project_root_path / "environment" / "headless_runner.py"
+
+# One emulator per core: keep native thread pools from oversubscribing it
+CHILD_ENV = {
+    'OMP_NUM_THREADS': '1',
+    'OPENBLAS_NUM_THREADS': '1',
+    'MKL_NUM_THREADS': '1',
+    'NUMEXPR_NUM_THREADS': '1',
+    'SDL_VIDEODRIVER': 'dummy',
+    'SDL_AUDIODRIVER': 'dummy',
+    'PYTHONUNBUFFERED': '1',
+}
+
+
+@dataclass
+class SessionSpec:
+    """One headless session to run"""
+    name: str
+    config_path: str = str(project_root_path / "config.yaml")
+    state: Optional[str] = None
+    max_steps: int = 10000
+    max_seconds: Optional[float] = None
+    args: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SessionRun:
+    """A session's process and its accumulated progress"""
+    spec: SessionSpec
+    session_dir: Path
+    status: str = "pending"  # pending, running, restarting, finished, failed
+    process: Optional[subprocess.Popen] = None
+    attempts: int = 0
+    restarts: int = 0
+    steps_done: int = 0
+    started: Optional[float] = None
+    ended: Optional[float] = None
+    next_start: float = 0.0
+    last_progress: Dict = field(default_factory=dict)
+    last_update: Optional[float] = None
+    exit_codes: List[int] = field(default_factory=list)
+    restored_from: List[str] = field(default_factory=list)
+    cpu: Optional[int] = None
+
+    @property
+    def recordings_dir(self) -> Path:
+        return self.session_dir / "recordings"
+
+    @property
+    def progress_path(self) -> Path:
+        return self.session_dir / "progress.json"
+
+    @property
+    def log_path(self) -> Path:
+        return self.session_dir / "session.log"
+
+    @property
+    def steps(self) -> int:
+        """Steps over all attempts, including the running one's last report"""
+        return self.steps_done + (self.last_progress.get('steps', 0) if self.status == "running" else 0)
+
+    @property
+    def remaining_steps(self) -> Optional[int]:
+        if not self.spec.max_steps:
+            return None
+        return max(self.spec.max_steps - self.steps_done, 0)
+
+
+def make_specs(count: int, config_path: str, state: Optional[str], max_steps: int,
+               max_seconds: Optional[float] = None, extra_args: Optional[List[str]] = None) -> List[SessionSpec]:
+    """count identical sessions named session_000, session_001, ..."""
+    return [SessionSpec(name=f"session_{i:03d}", config_path=config_path, state=state, max_steps=max_steps,
+                        max_seconds=max_seconds, args=list(extra_args or []))
+            for i in range(count)]
+
+
+def load_specs(path: Path, defaults: SessionSpec) -> List[SessionSpec]:
+    """
+    Read session specs from a YAML/JSON file
+
+    Args:
+        path: File with a `sessions` list (or a bare list) of spec mappings
+        defaults: Values for fields an entry leaves out (its name is ignored)
+
+    Returns:
+        list: SessionSpec per entry; unnamed entries are numbered
+    """
+    data = OmegaConf.to_container(OmegaConf.load(path), resolve=True)
+    entries = data.get('sessions', []) if isinstance(data, dict) else data
+    specs = []
+    for i, entry in enumerate(entries):
+        values = dict(asdict(defaults), name=f"session_{i:03d}")
+        values.update(entry or {})
+        values['args'] = [str(a) for a in values.get('args') or []]
+        specs.append(SessionSpec(**values))
+    names = [s.name for s in specs]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate session names in {path}: {duplicates}")
+    return specs
+
+
+def headless_command(run: SessionRun, resume: bool, rom_path: Optional[str] = None) -> List[str]:
+    """
+    headless_runner.py command line for the next attempt of a session
+
+    The first attempt starts a new run from the spec's state (or whatever the
+    config says); later attempts continue the session's latest run.
+    """
+    spec = run.spec
+    cmd = [sys.executable, str(HEADLESS_RUNNER),
+           "--config_path", str(spec.config_path),
+           "--recordings_dir", str(run.recordings_dir),
+           "--progress_path", str(run.progress_path),
+           "--max_steps", str(run.remaining_steps or 0),
+           "--skip_startup_checks", "--quiet"]
+    if rom_path:
+        cmd += ["--rom_path", str(rom_path)]
+    if spec.max_seconds:
+        cmd += ["--max_seconds", str(spec.max_seconds)]
+    if resume:
+        cmd.append("--resume")
+    elif spec.state:
+        cmd += ["--state", str(Path(spec.state).resolve())]
+    return cmd + list(spec.args)
+
+
+def restore_from_checkpoint(recordings_dir: Path) -> Optional[Path]:
+    """
+    Make the newest valid autosave the end state of the latest run
+
+    A crashed session never writes its end state, so without this a resumed
+    session would go back to the previous end state (or the run's start).
+    Checkpoints whose chunks fail their digest are skipped for older ones.
+
+    Args:
+        recordings_dir: The session's RunManager base directory
+
+    Returns:
+        Path: The end state that was written, or None if nothing newer was found
+    """
+    run_info = RunManager(Path(recordings_dir)).get_latest_run()
+    if run_info is None or run_info.end_state_path is None or not run_info.checkpoint_dir.exists():
+        return None
+    end_state = run_info.end_state_path
+    end_mtime = end_state.stat().st_mtime if end_state.exists() else 0.0
+
+    store = CheckpointStore(run_info.checkpoint_dir)
+    for manifest in reversed(store.checkpoints()):
+        if manifest.get('created', 0.0) <= end_mtime:
+            break
+        try:
+            blob = store.get(manifest['name'])
+        except (ValueError, OSError, zlib.error) as e:
+            print(f"orchestrator.py: skipping checkpoint {manifest['name']} in {run_info.checkpoint_dir}: {e}")
+            continue
+        tmp_path = end_state.with_name(end_state.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp_path, end_state)
+        print(f"orchestrator.py: restored checkpoint {manifest['name']} (step {manifest.get('step')}) to {end_state}")
+        return end_state
+    return None
+
+
+def read_progress(path: Path) -> Optional[Dict]:
+    """The child's last progress report, or None if there is none (yet)"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def limit_resources(max_memory_mb: Optional[int] = None, nice: int = 0, cpu: Optional[int] = None) -> Callable:
+    """
+    preexec_fn applying per-session limits in the child before exec
+
+    Args:
+        max_memory_mb: Address-space limit (RLIMIT_AS); allocations past it fail in the child only
+        nice: Niceness added so the sessions yield to interactive work
+        cpu: Pin the child to this core
+    """
+    def apply():
+        os.setsid()  # own process group, so a session can be killed with its children
+        if max_memory_mb:
+            import resource
+            limit = int(max_memory_mb) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        if nice:
+            os.nice(nice)
+        if cpu is not None and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {cpu})
+    return apply
+
+
+class Orchestrator:
+    """Launches, watches and restarts headless sessions"""
+
+    def __init__(self, specs: List[SessionSpec], out_dir: Path, parallel: Optional[int] = None,
+                 max_restarts: int = 3, restart_backoff: float = 5.0, stall_seconds: Optional[float] = None,
+                 max_memory_mb: Optional[int] = None, nice: int = 0, pin_cpus: bool = False,
+                 rom_path: Optional[str] = None, command: Optional[Callable] = None):
+        """
+        Args:
+            specs: Sessions to run
+            out_dir: Each session gets out_dir/<name>/ (recordings, progress.json, session.log)
+            parallel: Sessions running at once (default: all cores)
+            max_restarts: Restarts allowed per session before it is marked failed
+            restart_backoff: Seconds before the first restart, doubled for each further one
+            stall_seconds: Kill and restart a session whose progress file stops changing this long (None: never)
+            max_memory_mb: Per-session address-space limit
+            nice: Niceness added to every session
+            pin_cpus: Pin session slots to cores round robin
+            rom_path: Passed through to headless_runner.py
+            command: command(run, resume) -> argv, replacing headless_command
+        """
+        self.out_dir = Path(out_dir)
+        self.parallel = parallel or os.cpu_count() or 1
+        self.max_restarts = max_restarts
+        self.restart_backoff = restart_backoff
+        self.stall_seconds = stall_seconds
+        self.max_memory_mb = max_memory_mb
+        self.nice = nice
+        self.pin_cpus = pin_cpus
+        self.command = command or (lambda run, resume: headless_command(run, resume, rom_path))
+        self.runs = [SessionRun(spec, self.out_dir / spec.name) for spec in specs]
+        self.started = None
+
+    def running(self) -> List[SessionRun]:
+        return [r for r in self.runs if r.status == "running"]
+
+    def done(self) -> bool:
+        return all(r.status in ("finished", "failed") for r in self.runs)
+
+    def _free_cpu(self) -> Optional[int]:
+        if not self.pin_cpus:
+            return None
+        used = {r.cpu for r in self.running()}
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else range(os.cpu_count() or 1)
+        return next((c for c in cpus if c not in used), None)
+
+    def launch(self, run: SessionRun):
+        """Start the next attempt of a session"""
+        resume = run.attempts > 0
+        if resume:
+            restored = restore_from_checkpoint(run.recordings_dir)
+            if restored:
+                run.restored_from.append(str(restored))
+        run.session_dir.mkdir(parents=True, exist_ok=True)
+        if run.progress_path.exists():
+            run.progress_path.unlink()
+
+        run.cpu = self._free_cpu()
+        cmd = self.command(run, resume)
+        env = dict(os.environ, **CHILD_ENV)
+        with open(run.log_path, 'a') as log:
+            log.write(f"\n=== attempt {run.attempts + 1} at {time.strftime('%Y-%m-%d %H:%M:%S')}: {' '.join(cmd)}\n")
+            log.flush()
+            run.process = subprocess.Popen(
+                cmd, cwd=str(project_root_path), env=env, stdout=log, stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                preexec_fn=limit_resources(self.max_memory_mb, self.nice, run.cpu) if os.name == 'posix' else None,
+            )
+        run.attempts += 1
+        run.status = "running"
+        run.last_progress = {}
+        run.last_update = time.monotonic()
+        if run.started is None:
+            run.started = time.time()
+
+    def _kill(self, run: SessionRun, sig=signal.SIGTERM):
+        try:
+            os.killpg(run.process.pid, sig)
+        except (ProcessLookupError, PermissionError, AttributeError):
+            run.process.send_signal(sig)
+
+    def _finish_attempt(self, run: SessionRun, returncode: int):
+        progress = read_progress(run.progress_path) or run.last_progress
+        run.steps_done += progress.get('steps', 0)
+        run.last_progress = progress
+        run.exit_codes.append(returncode)
+        run.process = None
+        run.cpu = None
+
+        if returncode == 0 or (run.remaining_steps is not None and run.remaining_steps == 0):
+            run.status = "finished"
+            run.ended = time.time()
+        elif run.restarts >= self.max_restarts:
+            run.status = "failed"
+            run.ended = time.time()
+            print(f"orchestrator.py: {run.spec.name} failed (exit {returncode}) after {run.restarts} restarts, "
+                  f"see {run.log_path}")
+        else:
+            run.restarts += 1
+            run.status = "restarting"
+            run.next_start = time.monotonic() + self.restart_backoff * 2 ** (run.restarts - 1)
+            print(f"orchestrator.py: {run.spec.name} exited with {returncode} at {run.steps} steps, "
+                  f"restart {run.restarts}/{self.max_restarts}")
+
+    def poll(self):
+        """Collect progress and exits, then start waiting sessions into free slots"""
+        now = time.monotonic()
+        for run in self.running():
+            progress = read_progress(run.progress_path)
+            if progress and progress.get('updated') != run.last_progress.get('updated'):
+                run.last_progress = progress
+                run.last_update = now
+            returncode = run.process.poll()
+            if returncode is None and self.stall_seconds and now - run.last_update > self.stall_seconds:
+                print(f"orchestrator.py: {run.spec.name} made no progress for {self.stall_seconds:.0f}s, killing it")
+                self._kill(run, signal.SIGKILL)
+                returncode = run.process.wait()
+            if returncode is not None:
+                self._finish_attempt(run, returncode)
+
+        slots = self.parallel - len(self.running())
+        for run in self.runs:
+            if slots <= 0:
+                break
+            if run.status == "pending" or (run.status == "restarting" and now >= run.next_start):
+                self.launch(run)
+                slots -= 1
+
+    def stop(self):
+        """Terminate every running session (their next start resumes from a checkpoint)"""
+        for run in self.running():
+            self._kill(run)
+        deadline = time.monotonic() + 10
+        for run in self.running():
+            try:
+                run.process.wait(timeout=max(deadline - time.monotonic(), 0.1))
+            except subprocess.TimeoutExpired:
+                self._kill(run, signal.SIGKILL)
+                run.process.wait()
+            self._finish_attempt(run, run.process.returncode)
+            run.status = "stopped"
+
+    def run(self, poll_interval: float = 1.0, report_interval: float = 30.0, report: Optional[Callable] = None) -> Dict:
+        """
+        Run every session to completion
+
+        Args:
+            poll_interval: Seconds between checks of the children
+            report_interval: Seconds between calls to report
+            report: report(summary) for periodic progress (None for no reports)
+
+        Returns:
+            dict: The final summary
+        """
+        self.started = time.time()
+        last_report = time.monotonic()
+        try:
+            while not self.done():
+                self.poll()
+                if report and time.monotonic() - last_report >= report_interval:
+                    report(self.summary())
+                    last_report = time.monotonic()
+                if not self.done():
+                    time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            print("orchestrator.py: interrupted, stopping sessions")
+            self.stop()
+        return self.summary()
+
+    def summary(self) -> Dict:
+        """Aggregated progress over all sessions"""
+        elapsed = time.time() - self.started if self.started else 0.0
+        sessions = {}
+        for run in self.runs:
+            progress = run.last_progress
+            sessions[run.spec.name] = {
+                'status': run.status,
+                'steps': run.steps,
+                'max_steps': run.spec.max_steps,
+                'steps_per_sec': progress.get('steps_per_sec', 0.0) if run.status == "running" else 0.0,
+                'current_quest': progress.get('current_quest'),
+                'run_id': progress.get('run_id'),
+                'attempts': run.attempts,
+                'restarts': run.restarts,
+                'exit_codes': run.exit_codes,
+                'restored_from': run.restored_from,
+                'session_dir': str(run.session_dir),
+            }
+        statuses = [s['status'] for s in sessions.values()]
+        total_steps = sum(s['steps'] for s in sessions.values())
+        return {
+            'elapsed_seconds': round(elapsed, 1),
+            'sessions_total': len(sessions),
+            'running': statuses.count("running"),
+            'finished': statuses.count("finished"),
+            'failed': statuses.count("failed"),
+            'restarts': sum(s['restarts'] for s in sessions.values()),
+            'total_steps': total_steps,
+            'steps_per_sec': round(sum(s['steps_per_sec'] for s in sessions.values()), 1),
+            'avg_steps_per_sec': round(total_steps / elapsed, 1) if elapsed > 0 else 0.0,
+            'sessions': sessions,
+        }
+
+
+def format_summary(summary: Dict) -> str:
+    """Progress table for the console"""
+    lines = [f"{'session':<20} {'status':<10} {'steps':>10} {'steps/s':>8} {'quest':>6} {'restarts':>8}"]
+    for name, s in summary['sessions'].items():
+        quest = s['current_quest'] if s['current_quest'] is not None else "-"
+        lines.append(f"{name:<20} {s['status']:<10} {s['steps']:>10} {s['steps_per_sec']:>8.1f} "
+                     f"{quest:>6} {s['restarts']:>8}")
+    lines.append(f"{summary['running']} running, {summary['finished']} finished, {summary['failed']} failed of "
+                 f"{summary['sessions_total']}; {summary['total_steps']} steps, {summary['steps_per_sec']:.1f} steps/s "
+                 f"now ({summary['avg_steps_per_sec']:.1f} avg) after {summary['elapsed_seconds']:.0f}s")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many headless sessions in parallel with crash restarts")
+    parser.add_argument("-n", "--num_sessions", type=int, default=None, help="Run N copies of one session")
+    parser.add_argument("--sessions", type=Path, default=None, help="YAML/JSON file listing the sessions")
+    parser.add_argument("--out", type=Path, default=project_root_path / "orchestrated",
+                        help="Session directories and summary.json go here")
+    parser.add_argument("--config_path", type=str, default=str(project_root_path / "config.yaml"))
+    parser.add_argument("--rom_path", type=str, default=None)
+    parser.add_argument("--state", type=str, default=None, help="Savestate every session starts from")
+    parser.add_argument("--max_steps", type=int, default=10000, help="Steps per session, over all its restarts")
+    parser.add_argument("--max_seconds", type=float, default=None, help="Wall time per attempt")
+    parser.add_argument("--parallel", type=int, default=None, help="Sessions running at once (default: all cores)")
+    parser.add_argument("--max_restarts", type=int, default=3)
+    parser.add_argument("--restart_backoff", type=float, default=5.0, help="Seconds before a restart, doubling")
+    parser.add_argument("--stall_seconds", type=float, default=None,
+                        help="Restart a session whose progress has not changed for this long")
+    parser.add_argument("--max_memory_mb", type=int, default=None, help="Address-space limit per session")
+    parser.add_argument("--nice", type=int, default=0, help="Niceness added to the sessions")
+    parser.add_argument("--pin_cpus", action="store_true", help="Pin each running session to its own core")
+    parser.add_argument("--report_interval", type=float, default=30.0, help="Seconds between progress tables")
+    args, extra = parser.parse_known_args(argv)
+
+    defaults = SessionSpec(name="", config_path=args.config_path, state=args.state, max_steps=args.max_steps,
+                           max_seconds=args.max_seconds, args=extra)
+    if args.sessions:
+        specs = load_specs(args.sessions, defaults)
+    elif args.num_sessions:
+        specs = make_specs(args.num_sessions, args.config_path, args.state, args.max_steps,
+                           args.max_seconds, extra)
+    else:
+        parser.error("give -n N or --sessions FILE")
+    if not specs:
+        print("No sessions to run")
+        return 1
+
+    orchestrator = Orchestrator(specs, args.out, parallel=args.parallel, max_restarts=args.max_restarts,
+                                restart_backoff=args.restart_backoff, stall_seconds=args.stall_seconds,
+                                max_memory_mb=args.max_memory_mb, nice=args.nice, pin_cpus=args.pin_cpus,
+                                rom_path=args.rom_path)
+    print(f"Running {len(specs)} sessions, {orchestrator.parallel} at a time, in {args.out}")
+
+    def report(summary):
+        print(format_summary(summary), flush=True)
+
+    summary = orchestrator.run(report_interval=args.report_interval, report=report)
+    print(format_summary(summary))
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    summary_path = args.out / "summary.json"
+    with open(summary_path, 'w') as f:
+        json.dump(summary, f, indent=2, sort_keys=True)
+    print(f"Summary saved to {summary_path}")
+    return 0 if summary['failed'] == 0 and summary['finished'] == len(specs) else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,7 +38,9 @@ from environment.environment import VALID_ACTIONS, PATH_FOLLOW_ACTION, VALID_ACT
 from pyboy.utils import WindowEvent
 from environment.data.recorder_data.global_map import local_to_global
 from environment.environment_helpers.navigator import InteractiveNavigator
-from environment.environment_helpers.saver import save_initial_state, save_loop_state, save_final_state, load_latest_run, create_new_run
+from environment.environment_helpers.status_publisher import StatusPublisher
+from environment.environment_helpers.saver import save_initial_state, save_loop_state, save_final_state, load_latest_run, create_new_run, open_action_log, autosave_checkpoint
+from environment.replay import annotate_action_record, tick_record
 from environment.environment_helpers.warp_tracker import record_warp_step, backtrack_warp_sequence
 from environment.environment_helpers.quest_manager import QuestManager, verify_quest_system_integrity, determine_starting_quest, describe_trigger
 from ui.quest_ui import start_quest_ui
@@ -52,10 +54,15 @@ from environment.data.environment_data.battle import StatusCondition
 from environment.data.environment_data.constants import ITEM_NAME_TO_ID_DICT
 VALID_ACTIONS_STRVALID_ACTIONS_STR = ["down", "left", "right", "up", "a", "b", "path", "start"]
 
-# Load quest definitions
-QUESTS_FILE = Path(__file__).parent / "environment_helpers" / "required_completions.json"
-with open(QUESTS_FILE, 'r') as f:
-    QUESTS = json.load(f)
+# Quest definitions, config helpers and execute_action_step are shared with
+# the headless runner via game_session.py
+from environment.game_session import (
+    QUESTS,
+    execute_action_step,
+    get_default_config,
+    setup_configuration,
+    build_game_session,
+)
 
 # Diagnostic functions moved to navigator.py
 
@@ -112,65 +119,6 @@ def run_intro_bootstrap(env, executor, quest_manager, navigator, logger, max_ste
 
     return total
 
-def execute_action_step(env, action, quest_manager=None, navigator=None, logger=None, total_steps=0):
-    """
-    Centralized action execution function that ensures all environment systems stay synchronized.
-    This is the ONLY function that should call env.step() to prevent desynchronization.
-    
-    Args:
-        env: The environment wrapper
-        action: The action to execute
-        quest_manager: Quest manager instance (optional)
-        navigator: Navigator instance (optional) 
-        logger: Logger instance (optional)
-        total_steps: Current total step count
-        
-    Returns:
-        tuple: (obs, reward, terminated, truncated, info, updated_total_steps)
-    """
-    try:
-        # Execute the action in the environment - THE ONLY PLACE env.process_action() SHOULD BE CALLED
-        obs, reward, terminated, truncated, info = env.process_action(action, source="PlayLoop")
-        total_steps += 1
-        
-        # Update all environment systems that depend on the step
-        # Note: update_after_step methods don't currently exist, but we'll check for them
-        if quest_manager:
-            try:
-                if hasattr(quest_manager, 'update_after_step'):
-                    quest_manager.update_after_step(obs, reward, terminated, truncated, info)
-                # Fallback to existing methods
-                elif hasattr(quest_manager, 'update_progress'):
-                    quest_manager.update_progress()
-            except Exception as e:
-                if logger:
-                    logger.warning(f"Quest manager update failed: {e}")
-        
-        if navigator:
-            try:
-                if hasattr(navigator, 'update_after_step'):
-                    navigator.update_after_step(obs, reward, terminated, truncated, info)
-                # Navigator might not need step-by-step updates
-            except Exception as e:
-                if logger:
-                    logger.warning(f"Navigator update failed: {e}")
-        
-        # Log the action if logger is available
-        if logger:
-            logger.debug(f"Executed action {action} at step {total_steps}")
-            
-        return obs, reward, terminated, truncated, info, total_steps
-        
-    except Exception as e:
-        if logger:
-            import traceback
-            # Get the full traceback with line numbers, function names, and files
-            tb_str = traceback.format_exc()
-            logger.error(f"Error executing action {action}: {e}\n"
-                        f"Full traceback:\n{tb_str}")
-        # Return safe defaults
-        return None, 0.0, True, True, {}, total_steps
-
 def process_frame_for_pygame(frame_from_env_render):
     # Ensure frame has shape (H, W, 3) for Pygame surface
     if frame_from_env_render.ndim == 2:
@@ -197,150 +145,6 @@ def update_screen(screen, frame_rgb, target_width, target_height):
     pygame.display.flip()
 
 
-def get_default_config(
-    gb_path,
-    state_dir,
-    override_init_state=None,
-    init_from_last_ending_state=True,
-    interactive_mode=True,
-    record_replays=True,
-    headless=False,
-    video_dir="video",
-    emulator_delay=11,
-    action_freq=24,
-    save_video=False,
-    fast_video=False,
-    n_record=10,
-    perfect_ivs=True,
-    auto_flash=False,
-    disable_wild_encounters=False,
-    auto_teach_cut=True,
-    auto_use_cut=True,
-    auto_teach_surf=True,
-    auto_use_surf=True,
-    auto_teach_strength=True,
-    auto_use_strength=True,
-    auto_solve_strength_puzzles=True,
-    auto_remove_all_nonuseful_items=False,
-    auto_pokeflute=True,
-    auto_next_elevator_floor=True,
-    skip_safari_zone=False,
-    infinite_safari_steps=False,
-    insert_saffron_guard_drinks=False,
-    infinite_money=True,
-    infinite_health=True,
-    infinite_pp_and_move_hack=False,
-    animate_scripts=True,
-    disable_recordings=False,
-):
-    env_config = {
-        "gb_path": gb_path,
-        "state_dir": state_dir,
-        "override_init_state": override_init_state,
-        "init_from_last_ending_state": init_from_last_ending_state,
-        "interactive_mode": interactive_mode,
-        "record_replays": record_replays,
-        "headless": headless,
-        "video_dir": video_dir,
-        "emulator_delay": emulator_delay,
-        "action_freq": action_freq,
-        "save_video": save_video,
-        "fast_video": fast_video,
-        "n_record": n_record,
-        "perfect_ivs": perfect_ivs,
-        "auto_flash": auto_flash,
-        "disable_wild_encounters": disable_wild_encounters,
-        "auto_teach_cut": auto_teach_cut,
-        "auto_use_cut": auto_use_cut,
-        "auto_teach_surf": auto_teach_surf,
-        "auto_use_surf": auto_use_surf,
-        "auto_teach_strength": auto_teach_strength,
-        "auto_use_strength": auto_use_strength,
-        "auto_solve_strength_puzzles": auto_solve_strength_puzzles,
-        "auto_remove_all_nonuseful_items": auto_remove_all_nonuseful_items,
-        "auto_pokeflute": auto_pokeflute,
-        "auto_next_elevator_floor": auto_next_elevator_floor,
-        "skip_safari_zone": skip_safari_zone,
-        "infinite_safari_steps": infinite_safari_steps,
-        "insert_saffron_guard_drinks": insert_saffron_guard_drinks,
-        "infinite_money": infinite_money,
-        "infinite_health": infinite_health,
-        "infinite_pp_and_move_hack": infinite_pp_and_move_hack,
-        "animate_scripts": animate_scripts,
-        "disable_recordings": disable_recordings,
-    }
-    return OmegaConf.create(env_config)
-
-def _setup_configuration(args, project_root_path):
-    yaml_path = Path(args.config_path)
-    yaml_config = OmegaConf.load(yaml_path) if yaml_path.exists() else OmegaConf.create()
-
-    cli_args = {k: v for k, v in vars(args).items() if v is not None}
-
-    # Extract env settings from YAML
-    env_yaml = yaml_config.get('env', {})
-
-    # Build defaults from YAML + hardcoded defaults
-    defaults = get_default_config(
-        gb_path=cli_args.get('rom_path', env_yaml.get('gb_path')),
-        state_dir=env_yaml.get('state_dir'),
-        override_init_state=env_yaml.get('override_init_state'),
-        init_from_last_ending_state=env_yaml.get('init_from_last_ending_state'),
-        interactive_mode=env_yaml.get('interactive_mode'),
-        record_replays=env_yaml.get('record_replays'),
-        headless=env_yaml.get('headless'),
-        video_dir=env_yaml.get('video_dir'),
-        emulator_delay=env_yaml.get('emulator_delay'),
-        action_freq=env_yaml.get('action_freq'),
-        save_video=env_yaml.get('save_video'),
-        fast_video=env_yaml.get('fast_video'),
-        n_record=env_yaml.get('n_record'),
-        perfect_ivs=env_yaml.get('perfect_ivs'),
-        auto_flash=env_yaml.get('auto_flash'),
-        disable_wild_encounters=env_yaml.get('disable_wild_encounters'),
-        auto_teach_cut=env_yaml.get('auto_teach_cut'),
-        auto_use_cut=env_yaml.get('auto_use_cut'),
-        auto_teach_surf=env_yaml.get('auto_teach_surf'),
-        auto_use_surf=env_yaml.get('auto_use_surf'),
-        auto_teach_strength=env_yaml.get('auto_teach_strength'),
-        auto_use_strength=env_yaml.get('auto_use_strength'),
-        auto_solve_strength_puzzles=env_yaml.get('auto_solve_strength_puzzles'),
-        auto_remove_all_nonuseful_items=env_yaml.get('auto_remove_all_nonuseful_items'),
-        auto_pokeflute=env_yaml.get('auto_pokeflute'),
-        auto_next_elevator_floor=env_yaml.get('auto_next_elevator_floor'),
-        skip_safari_zone=env_yaml.get('skip_safari_zone'),
-        infinite_safari_steps=env_yaml.get('infinite_safari_steps'),
-        insert_saffron_guard_drinks=env_yaml.get('insert_saffron_guard_drinks'),
-        infinite_money=env_yaml.get('infinite_money'),
-        infinite_health=env_yaml.get('infinite_health'),
-        infinite_pp_and_move_hack=env_yaml.get('infinite_pp_and_move_hack'),
-        animate_scripts=env_yaml.get('animate_scripts'),
-        disable_recordings=env_yaml.get('disable_recordings'),
-    )
-
-    # Merge defaults + YAML + CLI
-    final_config = OmegaConf.merge(defaults, yaml_config.get('env', {}), OmegaConf.create(cli_args))
-
-    # Validate and resolve paths
-    if not final_config.gb_path:
-        raise ValueError("ROM path ('gb_path') cannot be None.")
-    resolved_rom = Path(final_config.gb_path)
-    if not resolved_rom.is_absolute():
-        resolved_rom = project_root_path / resolved_rom
-    final_config.gb_path = str(resolved_rom)
-
-    # Sync agent settings
-    if 'agent' in yaml_config:
-        final_config.agent = OmegaConf.merge(yaml_config.agent)
-        final_config.grok_on = final_config.agent.get('grok_on')
-
-    # Session ID
-    if not final_config.get('session_id'):
-        final_config.session_id = datetime.now().strftime("%Y%m%d-%H%M%S")
-
-    return final_config
-
-
 # def _setup_configuration(args, project_root_path):
 #     # Load YAML config if it exists
 #     yaml_path = Path(args.config_path)
@@ -441,7 +245,7 @@ def main():
 
     args = parser.parse_args()
 
-    config = _setup_configuration(args, project_root_path)
+    config = setup_configuration(args, project_root_path)
     import shared
     # Set or clear the Grok enabled event based on config
     if config.grok_on:
@@ -480,6 +284,7 @@ def main():
     # FIXED: Load persistent step counter
     step_counter_file = Path("total_steps.json")
     total_steps = 0
+    last_checkpoint_step = None  # total_steps stands still while waiting for input
     try:
         if step_counter_file.exists():
             with open(step_counter_file, 'r') as f:
@@ -489,185 +294,22 @@ def main():
     except Exception as e:
         print(f"Could not load step counter: {e}")
 
-    # Create or load run using RunManager - FIXED: Only create/load once
-    from environment.environment_helpers.saver import create_new_run, load_latest_run
-    
-    # --- CRITICAL SECTION FOR INITIALIZATION ORDER ---
-    
-    # 1. Reset the environment FIRST to load state and get initial info
-    # This call to env.reset() is where 'loaded_quest_statuses' and 
-    # 'loaded_trigger_statuses' are populated in the env object's persisted attributes if a load occurs.
-    obs, info = env.reset() 
-
-    print(f"play.py: main(): Received info dictionary from env.reset(): {info}") # Keep for general debugging
-
-    # Get current map ID after reset for run creation
-    current_map_id_after_reset = env.get_game_coords()[2]
-
-    # 2. Use the environment's persisted statuses for initialization.
-    # These are populated by env.reset() if a state (and its quest/trigger data) was loaded.
-    # If no load, they default to {} or what was set in env.__init__.
-    initial_quest_statuses_from_save = env.persisted_loaded_quest_statuses if env.persisted_loaded_quest_statuses is not None else {}
-    initial_trigger_statuses_from_save = env.persisted_loaded_trigger_statuses if env.persisted_loaded_trigger_statuses is not None else {}
-    
-    # FIX: Convert old list format to new dictionary format for backwards compatibility
-    if isinstance(initial_trigger_statuses_from_save, list):
-        print(f"play.py: Converting old list format trigger statuses to dictionary format")
-        old_list = initial_trigger_statuses_from_save
-        initial_trigger_statuses_from_save = {trigger_id: True for trigger_id in old_list}
-        print(f"play.py: Converted {len(old_list)} trigger IDs from list to dictionary")
-    
-    print(f"play.py: Sourced initial_quest_statuses_from_save from env: {initial_quest_statuses_from_save}")
-    print(f"play.py: Sourced initial_trigger_statuses_from_save from env: {initial_trigger_statuses_from_save}")
-
-    # 3. Initialize other components like Pygame screen, status_queue, all_quest_ids BEFORE QuestProgressionEngine
-    status_queue = SimpleQueue()
-    all_quest_ids = [int(q["quest_id"]) for q in QUESTS]
-
-    # 4. Initialize Navigator (must be initialized before use)
-    navigator = InteractiveNavigator(env)
-    if hasattr(env, 'set_navigator'):
-        env.set_navigator(navigator)
-    elif hasattr(env, 'env') and hasattr(env.env, 'set_navigator'):
-        env.env.set_navigator(navigator)
-
-    # 5. Initialize TriggerEvaluator
-    trigger_evaluator = TriggerEvaluator(env)
-    setattr(env, "trigger_evaluator", trigger_evaluator)
-    print(f"[Setup] Created and attached trigger_evaluator to environment using global map tracking")
-
-    # 6b. Initialize QuestManager now that run_dir is known
-    # Load (or reuse) an existing run so QuestManager can use its run_dir
-    # Priority order:
-    #   1. A run the environment just created during `env.reset()`
-    #   2. The latest previously-saved run on disk (via `load_latest_run`)
-    #   3. Create a brand-new run if neither of the above exist
-
-    # 1️⃣ Prefer a run that the environment may have already created. This
-    #     prevents a second directory (e.g. "002-…") from being made a few
-    #     frames later.
-    run_info = getattr(env, "current_run_info", None)
-
-    # 2️⃣ If the environment didn't create one (e.g. running from a saved
-    #     state), fall back to whatever the RunManager thinks is latest.
-    if run_info is None:
-        run_info = load_latest_run(env)
-
-    # 3️⃣ If still None, we really do need a fresh run directory.
-    if run_info is None:
-        current_map_name = env.get_map_name_by_id(current_map_id_after_reset)
-        run_info = create_new_run(env, current_map_name, current_map_id_after_reset)
-
-    # 🔀 NEW: Gracefully handle the case where recordings are disabled and
-    # no RunInfo could be created.  Many downstream systems (QuestManager,
-    # QuestProgressionEngine, etc.) rely on the presence of a valid
-    # directory path for persisting transient JSON files even when video
-    # recordings are turned off.  If `run_info` is still `None` at this
-    # point, synthesize an in-memory *temporary* run directory so the rest
-    # of the application can continue to operate without crashing.
-    if run_info is None:
-        from tempfile import mkdtemp
-        from environment.environment_helpers.run_manager import RunInfo
-        temp_dir_path = Path(mkdtemp(prefix="temp_run_"))
-        # Ensure mkdtemp created directory; already exists. Print message.
-        print(f"[Fallback] Recordings disabled – using temporary run directory at {temp_dir_path}")
-        import datetime as _dt
-        run_info = RunInfo(
-            run_id="TEMP_RUN",
-            start_map_name=env.get_map_name_by_id(current_map_id_after_reset),
-            map_id=current_map_id_after_reset,
-            date=_dt.datetime.now().strftime("%d%m%Y"),
-            sequence=0,
-            run_dir=temp_dir_path,
-        )
-        # Expose the synthetic run info on the environment so that helper
-        # utilities expecting it (e.g. saver.save_*) do not fail.
-        env.current_run_info = run_info
-        env.current_run_dir = run_info.run_dir
-
-    run_dir = run_info.run_dir
-
-    # Initialize QuestManager with run_dir for proper quest status synchronization
-    quest_manager = QuestManager(env, run_dir=run_dir)
-    env.quest_manager = quest_manager
-    
-    # PREVENTION: Validate quest system integrity at startup
-    try:
-        from environment.environment_helpers.quest_validator import validate_quest_system
-        print("Validating quest coordinate files...")
-        validation_results = validate_quest_system(output_report=False)
-        
-        if not validation_results.get('validation_passed'):
-            critical_count = validation_results.get('total_critical_errors', 0)
-            warning_count = validation_results.get('total_warnings', 0)
-            
-            if critical_count > 0:
-                print(f"⚠️  QUEST VALIDATION: {critical_count} critical errors found in quest files!")
-                print("This may cause navigation issues. Check quest_validation_report.txt for details.")
-                
-                # Log the validation issues
-                logger.log_system_event("QUEST_VALIDATION_FAILED", {
-                    'critical_errors': critical_count,
-                    'warnings': warning_count,
-                    'failed_quests': validation_results.get('quests_with_errors', 0)
-                })
-            else:
-                print(f"✅ Quest validation passed with {warning_count} warnings")
-        else:
-            print("✅ All quest coordinate files validated successfully")
-            
-    except Exception as e:
-        print(f"Warning: Could not validate quest files: {e}")
-        logger.log_error("QUEST_VALIDATION", f"Quest validation failed: {e}", {})
-
-    # 7. NOW, instantiate QuestProgressionEngine with the correctly loaded statuses (SINGLE INITIALIZATION)
-    quest_progression_engine = QuestProgressionEngine(
-        env=env,
-        navigator=navigator,
-        quest_manager=quest_manager,
-        quests_definitions=QUESTS,
-        quest_ids_all=all_quest_ids,
-        status_queue=status_queue,
-        run_dir=run_dir, 
-        initial_quest_statuses=initial_quest_statuses_from_save, # This is critical
-        initial_trigger_statuses=initial_trigger_statuses_from_save, # This is critical
-        logger=logger, # CRITICAL FIX: Pass logger to enable trigger evaluation logging
-        persistence_enabled=not config.get("disable_recordings", False) and config.get("record_replays", True)
-    )
-    
-    quest_manager.quest_progression_engine = quest_progression_engine
-
-    # 8. Initialize NavigationSystemMonitor for comprehensive validation
-    from environment.environment_helpers.navigation_system_monitor import NavigationSystemMonitor
-    navigation_monitor = NavigationSystemMonitor(
-        env=env,
-        navigator=navigator,
-        quest_manager=quest_manager,
-        quest_progression_engine=quest_progression_engine,
-        logger=logger
-    )
-    
-    # Store reference in main components for easy access
-    env.navigation_monitor = navigation_monitor
-    navigator.navigation_monitor = navigation_monitor
-    quest_manager.navigation_monitor = navigation_monitor
-    
-    # CRITICAL: Run startup verification to catch any initialization issues
-    print("Running navigation system startup verification...")
-    startup_results = navigation_monitor.check_at_startup()
-    if startup_results.get("total_issues", 0) > 0:
-        print(f"⚠️  Startup verification found {startup_results['total_issues']} issues")
-    else:
-        print("✅ Startup verification passed")
-    
-    # 9. Refresh QuestManager's current quest and load coordinates into navigator
-    quest_manager.get_current_quest() # This should pick up the correct starting quest
-    if quest_manager.current_quest_id is not None:
-        navigator.load_coordinate_path(quest_manager.current_quest_id)
-        print(f"Play.py: Loaded quest {quest_manager.current_quest_id} into navigator post-reset, aligning with QuestManager.")
+    # Reset the environment and build navigator, triggers, run dir and quest
+    # systems in the required order (see game_session.build_game_session)
+    session = build_game_session(env, config, logger)
+    obs, info = session.obs, session.info
+    status_queue = session.status_queue
+    all_quest_ids = session.all_quest_ids
+    navigator = session.navigator
+    trigger_evaluator = session.trigger_evaluator
+    run_info = session.run_info
+    run_dir = session.run_dir
+    quest_manager = session.quest_manager
+    quest_progression_engine = session.quest_progression_engine
+    navigation_monitor = session.navigation_monitor
+    initial_quest_statuses_from_save = session.initial_quest_statuses
+    initial_trigger_statuses_from_save = session.initial_trigger_statuses
 
-    status_queue.put(('__current_quest__', quest_manager.current_quest_id))
-    
     # Propagate configs to web_server
     status_queue.put(('__config__', OmegaConf.to_container(config, resolve=True)))
 
@@ -684,8 +326,8 @@ def main():
     current_action = 0
     total_reward = 0.0
     
-    # Action recording for replay functionality
-    recorded_playthrough = []
+    # Action recording for replay functionality (append-only NDJSON in the run directory)
+    recorded_playthrough = open_action_log(env, run_info)
     
     # Button repeat functionality
     last_key_pressed = None
@@ -758,12 +400,17 @@ def main():
         # Save the initial emulator state using RunManager
         save_initial_state(env, run_info)
 
+    # Delta-only, rate-limited publishing for the UI channels; frames go
+    # through shared memory instead of the queue
+    status_publisher = StatusPublisher(status_queue)
+
     # Function to update quest UI with environment data
     def update_quest_ui():
         nonlocal total_steps, action_source
+        publish = status_publisher.publish
         try:
             # Update basic stats
-            status_queue.put(('__total_steps__', total_steps))
+            publish('__total_steps__', total_steps)
 
             # Get current coordinates
             x, y, map_id = env.get_game_coords()
@@ -772,59 +419,61 @@ def main():
             global_y, global_x = local_to_global(y, x, map_id)
 
             # Send location data with proper global coords
-            status_queue.put(('__location__', {
+            publish('__location__', {
                 'x': x, 'y': y,
                 'map_id': map_id,
                 'map_name': map_name,
                 'gx': global_x,
                 'gy': global_y
-            }))
+            })
 
 
             # Send current quest info
             if quest_manager and quest_manager.current_quest_id:
-                status_queue.put(('__current_quest__', quest_manager.current_quest_id))
+                publish('__current_quest__', quest_manager.current_quest_id)
 
             # Send additional environment data
             try:
                 dialog = env.read_dialog() or ""
-                status_queue.put(('__dialog__', dialog.strip()))
+                publish('__dialog__', dialog.strip())
             except:
-                status_queue.put(('__dialog__', ""))
+                dialog = ""
+                publish('__dialog__', "")
 
             # Send pokemon team data to UI
-            try:
-                # Use the updated read_party_pokemon method that includes nicknames
-                pokemon_list = env.read_party_pokemon()
-                party_data = []
-                
-                for i, pokemon in enumerate(pokemon_list):
-                    # Map memory code to human-friendly name
-                    species_name = Species(pokemon.species_id).name.title()
-                    # Status condition
-                    status_code = env.read_m(f"wPartyMon{i+1}Status")
-                    status_name = StatusCondition(status_code).get_status_name()
-                    # Experience (3-byte field)
-                    bank, exp_addr = env.pyboy.symbol_lookup(f"wPartyMon{i+1}Exp")
-                    exp0 = env.read_m(exp_addr)
-                    exp1 = env.read_m(exp_addr + 1)
-                    exp2 = env.read_m(exp_addr + 2)
-                    exp_val = exp0 + (exp1 << 8) + (exp2 << 16)
-                    
-                    party_data.append({
-                        'slot': i,
-                        'id': pokemon.species_id,
-                        'speciesName': species_name,
-                        'nickname': pokemon.nickname,  # Include the nickname!
-                        'status': status_name,
-                        'experience': exp_val,
-                        'level': env.read_m(f"wPartyMon{i+1}Level"),
-                        'hp': env.read_short(f"wPartyMon{i+1}HP"),
-                        'maxHp': env.read_short(f"wPartyMon{i+1}MaxHP"),
-                    })
-                status_queue.put(('__pokemon_team__', party_data))
-            except Exception as e:
-                logger.debug(f"Failed to get pokemon team for UI: {e}")
+            if status_publisher.ready('__pokemon_team__'):
+                try:
+                    # Use the updated read_party_pokemon method that includes nicknames
+                    pokemon_list = env.read_party_pokemon()
+                    party_data = []
+
+                    for i, pokemon in enumerate(pokemon_list):
+                        # Map memory code to human-friendly name
+                        species_name = Species(pokemon.species_id).name.title()
+                        # Status condition
+                        status_code = env.read_m(f"wPartyMon{i+1}Status")
+                        status_name = StatusCondition(status_code).get_status_name()
+                        # Experience (3-byte field)
+                        bank, exp_addr = env.pyboy.symbol_lookup(f"wPartyMon{i+1}Exp")
+                        exp0 = env.read_m(exp_addr)
+                        exp1 = env.read_m(exp_addr + 1)
+                        exp2 = env.read_m(exp_addr + 2)
+                        exp_val = exp0 + (exp1 << 8) + (exp2 << 16)
+
+                        party_data.append({
+                            'slot': i,
+                            'id': pokemon.species_id,
+                            'speciesName': species_name,
+                            'nickname': pokemon.nickname,  # Include the nickname!
+                            'status': status_name,
+                            'experience': exp_val,
+                            'level': env.read_m(f"wPartyMon{i+1}Level"),
+                            'hp': env.read_short(f"wPartyMon{i+1}HP"),
+                            'maxHp': env.read_short(f"wPartyMon{i+1}MaxHP"),
+                        })
+                    publish('__pokemon_team__', party_data)
+                except Exception as e:
+                    logger.debug(f"Failed to get pokemon team for UI: {e}")
 
             # Send game statistics
             try:
@@ -836,27 +485,27 @@ def main():
                     'steps': total_steps # Using the loop's total_steps
                 }
                 for stat_name, value in stats.items():
-                    status_queue.put((f'__stats_{stat_name}__', value))
+                    publish(f'__stats_{stat_name}__', value)
             except Exception as e:
                 logger.debug(f"Failed to get game stats for UI: {e}")
 
             # Send quest data
-            if quest_manager and quest_manager.quest_progression_engine:
+            if quest_manager and quest_manager.quest_progression_engine and status_publisher.ready('__quest_data__'):
                 quest_statuses = quest_manager.quest_progression_engine.get_quest_status()
                 trigger_statuses = quest_manager.quest_progression_engine.get_trigger_status()
-                
+
                 # Combine statuses into a single object for the UI
                 all_statuses = {
                     "quests": quest_statuses,
                     "triggers": trigger_statuses
                 }
-                
-                status_queue.put(('__quest_data__', all_statuses))
+
+                publish('__quest_data__', all_statuses)
 
             # Send navigation status
             nav_status = getattr(navigator, 'navigation_status', 'unknown')
-            status_queue.put(('__nav_status__', nav_status))
-            
+            publish('__nav_status__', nav_status)
+
             # FIXED: Send proper status
             if dialog and dialog.strip():
                 status = "Dialog Active"
@@ -866,8 +515,8 @@ def main():
                 status = f"Quest {quest_manager.current_quest_id:03d}"
             else:
                 status = "Exploring"
-            status_queue.put(('__status__', status))
-            
+            publish('__status__', status)
+
             # FIXED: Send last action information
             if hasattr(env, 'action_taken') and env.action_taken is not None:
                 try:
@@ -876,78 +525,59 @@ def main():
                     action_name = f"Action_{env.action_taken}"
             else:
                 action_name = "None"
-            status_queue.put(('__last_action__', action_name))
-            
+            publish('__last_action__', action_name)
+
             # FIXED: Send action source
-            if hasattr(update_quest_ui, 'last_action_source'):
-                status_queue.put(('__action_source__', update_quest_ui.last_action_source))
-            else:
-                status_queue.put(('__action_source__', "Unknown"))
-            
+            publish('__action_source__', getattr(update_quest_ui, 'last_action_source', "Unknown"))
+
             # Send battle status
             try:
                 in_battle = env.read_m(0xD057) > 0  # Battle type memory
-                status_queue.put(('__in_battle__', in_battle))
+                publish('__in_battle__', in_battle)
             except:
-                status_queue.put(('__in_battle__', False))
+                publish('__in_battle__', False)
 
             # Send warp minimap data and debug info to UI
-            try:
-                obs = env._get_obs()
-                warp_minimap_data = obs.get("minimap_warp_obs")
-                if warp_minimap_data is not None:
-                    # Get detailed debug info
-                    warp_debug_info = env.get_warp_debug_info()
-                    # Send both minimap data and debug info
-                    combined_data = {
-                        "minimap": warp_minimap_data.tolist(),
-                        "debug_info": warp_debug_info
-                    }
-                    status_queue.put(('__warp_minimap__', combined_data))
-            except Exception as e:
-                print(f"Error getting warp minimap data: {e}")
+            if status_publisher.ready('__warp_minimap__'):
+                try:
+                    obs = env._get_obs()
+                    warp_minimap_data = obs.get("minimap_warp_obs")
+                    if warp_minimap_data is not None:
+                        # Get detailed debug info
+                        warp_debug_info = env.get_warp_debug_info()
+                        # Send both minimap data and debug info
+                        combined_data = {
+                            "minimap": warp_minimap_data.tolist(),
+                            "debug_info": warp_debug_info
+                        }
+                        publish('__warp_minimap__', combined_data)
+                except Exception as e:
+                    print(f"Error getting warp minimap data: {e}")
 
             # Send Grok status
-            status_queue.put(('__grok_enabled__', grok_enabled.is_set()))
-            
-            # Send emulator screen data to UI
+            publish('__grok_enabled__', grok_enabled.is_set())
+
+            # Send emulator screen data to UI (shared-memory frame channel)
             try:
-                raw_screen_frame = env.render() # This is a numpy array HxW or HxWx1 (grayscale)
-                if raw_screen_frame is not None:
-                    img_height, img_width = raw_screen_frame.shape[0], raw_screen_frame.shape[1]
-                    # Convert to RGB bytes for Pillow Image.frombytes
-                    if raw_screen_frame.ndim == 2:
-                        # Grayscale -> replicate channels
-                        rgb_frame = np.stack((raw_screen_frame,) * 3, axis=-1)
-                    elif raw_screen_frame.ndim == 3:
-                        # RGB or RGBA -> keep first three channels
-                        rgb_frame = raw_screen_frame[:, :, :3]
-                    else:
-                        rgb_frame = None
-                    img_mode = "RGB"
-
-                    if rgb_frame is not None:
-                        pixel_data_bytes = rgb_frame.tobytes()
-                        status_queue.put(('__emulator_screen__', (pixel_data_bytes, img_width, img_height, img_mode)))
-
-                        # Send collision overlay screen data
-                        collision_overlay_frame = env.get_screenshot_with_overlay(alpha=128)
-                        if collision_overlay_frame is not None:
-                            collision_array = np.array(collision_overlay_frame)
-                            if collision_array.ndim == 3 and collision_array.shape[2] == 3:  # RGB
-                                collision_bytes = collision_array.tobytes()
-                                collision_height, collision_width = collision_array.shape[0], collision_array.shape[1]
-                                status_queue.put(('__collision_overlay_screen__', (collision_bytes, collision_width, collision_height, "RGB")))
-                            elif collision_array.ndim == 3 and collision_array.shape[2] == 4:  # RGBA
-                                # Convert RGBA to RGB
-                                collision_rgb = collision_array[:, :, :3]
-                                collision_bytes = collision_rgb.tobytes()
-                                collision_height, collision_width = collision_rgb.shape[0], collision_rgb.shape[1]
-                                status_queue.put(('__collision_overlay_screen__', (collision_bytes, collision_width, collision_height, "RGB")))
+                if status_publisher.ready('__emulator_screen__'):
+                    raw_screen_frame = env.render() # HxWx4 RGBA from PyBoy
+                    if raw_screen_frame is not None:
+                        status_publisher.publish_frame('__emulator_screen__', process_frame_for_pygame(raw_screen_frame))
+
+                # Send collision overlay screen data
+                if status_publisher.ready('__collision_overlay_screen__'):
+                    # Refresh warp data as get_screenshot_with_overlay() did, then blend
+                    # straight from the emulator framebuffer; publish_frame copies it
+                    env.clear_warp_cache()
+                    status_publisher.publish_frame('__collision_overlay_screen__',
+                                                   env.render_collision_overlay(alpha=128))
             except Exception as e:
                 # print(f"Error generating screen data for UI: {e}") # Avoid console spam
                 pass
 
+            # Send values that were held back by a channel rate limit
+            status_publisher.flush()
+
         except Exception as e:
             print(f"Error in update_quest_ui: {e}")
 
@@ -1114,6 +744,34 @@ def main():
         grok_thread = threading.Thread(target=fetch_action, daemon=True)
         grok_thread.start()
 
+    # Every frame the loop advances goes into the action log so replays stay in sync:
+    # env steps through recorded_step(), bare emulator ticks through idle_tick()
+    pending_ticks = 0
+    def idle_tick():
+        nonlocal pending_ticks
+        env.pyboy.tick()
+        pending_ticks += 1
+
+    def flush_idle_ticks():
+        nonlocal pending_ticks
+        if pending_ticks:
+            recorded_playthrough.append(tick_record(total_steps, pending_ticks))
+            pending_ticks = 0
+
+    def recorded_step(action, source, original_action=None):
+        """execute_action_step() that appends the action to recorded_playthrough"""
+        flush_idle_ticks()
+        record = {
+            'step': total_steps,
+            'action': action,
+            'original_action': original_action,
+            'timestamp': time.time(),
+            'source': source
+        }
+        result = execute_action_step(env, action, quest_manager, navigator, logger, total_steps)
+        recorded_playthrough.append(annotate_action_record(env, record, result[-1]))
+        return result
+
 
     # Enter main loop
     while running:
@@ -1124,7 +782,7 @@ def main():
                     if event.type == pygame.QUIT:
                         running = False
                 # Tick emulator and render frame even when not started
-                env.pyboy.tick()
+                idle_tick()
                 raw_frame = env.render()
                 processed_frame = process_frame_for_pygame(raw_frame)
                 update_screen(screen, processed_frame, screen_width, screen_height)
@@ -1134,7 +792,7 @@ def main():
                 loop_clock.tick(5)
             else:
                 # Headless mode: tick emulator and update UI
-                env.pyboy.tick()
+                idle_tick()
                 update_ui_if_needed()
                 time.sleep(0.1)
             continue
@@ -1176,6 +834,7 @@ def main():
                         from environment.environment_helpers.saver import save_full_snapshot
                         import datetime
                         ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                        flush_idle_ticks()
                         save_full_snapshot(
                             env,
                             recorded_playthrough=recorded_playthrough,
@@ -1275,11 +934,9 @@ def main():
                                     key_repeat_timer = current_time
                                 else:
                                     # FIXED: Override with quest-specific emulator action using centralized execution
-                                    current_obs, current_reward, current_terminated, current_truncated, current_info, total_steps = execute_action_step(
-                                        env, desired, quest_manager, navigator, logger, total_steps
+                                    current_obs, current_reward, current_terminated, current_truncated, current_info, total_steps = recorded_step(
+                                        desired, 'manual_filtered', original_action=PATH_FOLLOW_ACTION
                                     )
-                                    # Record the override action
-                                    recorded_playthrough.append(desired)
                                     # Update observation and info for this frame
                                     obs, reward, terminated, truncated, info = current_obs, current_reward, current_terminated, current_truncated, current_info
                                     # Set up key repeat for the 5 key with the filtered action
@@ -1392,11 +1049,9 @@ def main():
                             current_action = PATH_FOLLOW_ACTION
                         else:
                             # FIXED: Override with quest-specific emulator action using centralized execution
-                            current_obs, current_reward, current_terminated, current_truncated, current_info, total_steps = execute_action_step(
-                                env, desired, quest_manager, navigator, logger, total_steps
+                            current_obs, current_reward, current_terminated, current_truncated, current_info, total_steps = recorded_step(
+                                desired, 'grok', original_action=PATH_FOLLOW_ACTION
                             )
-                            # Record the override action
-                            recorded_playthrough.append(desired)
                             # Update observation and info for this frame
                             obs, reward, terminated, truncated, info = current_obs, current_reward, current_terminated, current_truncated, current_info
                     
@@ -1404,289 +1059,22 @@ def main():
                     # Regular non-path-follow Grok action
                     current_action = retrieved
         
-        if env.quest_manager.current_quest_id == 1:
-            search_strings = ["Welcome to the", "My", "People", "inhabited", "creatures", "Fo", "Others", "First"]
-            if any(s in env.read_dialog() for s in search_strings) and not env.never_run_again:
-                print(f"play.py: main(): is our a key thing triggering??? matching items {any(s in env.read_dialog() for s in search_strings)} in {env.read_dialog()}")
-                noop_action = getattr(env, "a", 4)
-                print(f"play.py: main(): noop_action: {noop_action}")
-                # Advance with a
-                obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                    env,
-                    noop_action,
-                    quest_manager,
-                    navigator,
-                    logger,
-                    total_steps,
-                )
-                print(f"play.py: main(): noop_action: got past the execute_action_step {noop_action}")
-                env.pyboy.tick()
-                raw_frame = env.render()
-                processed_frame_rgb = process_frame_for_pygame(raw_frame)  # Process the frame
-                update_screen(screen, processed_frame_rgb, screen_width, screen_height)
-                # Update UI without advancing game state
-                update_ui_if_needed()
-                loop_clock.tick(30)
-
-                time.sleep(0.05)
-                continue
-            
-        if env.quest_manager.current_quest_id == 46:
-            print(f'play.py: main(): quest_manager.current_quest_id == {env.quest_manager.current_quest_id}')
-            local_x, local_y, map_id = env.get_game_coords()
-            glob_y, glob_x = local_to_global(local_y, local_x, map_id)
-            facing_direction = env._get_direction(env.pyboy.game_area())
-            noop_action = None
-            print(f"play.py: main(): glob_y: {glob_y}, glob_x: {glob_x}, facing_direction: {facing_direction}")
-            print(f"play.py: main(): env.never_run_again: {env.never_run_again}")
-            if glob_y == 151 and glob_x == 152:
-                print(f"play.py: main(): glob_y == 151 and glob_x == 152")
-                if env.never_run_again == False and facing_direction != "up":
-                    noop_action = getattr(env, "up", 3)
-                elif env.never_run_again == False and facing_direction == "up":
-                    noop_action = getattr(env, "a", 4)
-                elif env.never_run_again == True:
-                    noop_action = getattr(env, "down", 0)
-                print(f"play.py: main(): noop_action: {noop_action}")
-                
-            elif glob_y == 152 and glob_x == 152 and env.never_run_again == True:
-                print(f"TRIGERING 152, 152 FACING {facing_direction} {env.never_run_again}")
-                if facing_direction == "down":
-                    noop_action = getattr(env, "right", 2)
-                    print(f"152, 152: {noop_action}")
-                    # raise Exception("play.py: main(): glob_y == 152 and glob_x == 152 and env.never_run_again == True")
-            elif glob_y == 152 and glob_x == 153 and env.never_run_again == True:
-                if facing_direction == "right":
-                    noop_action = getattr(env, "right", 2)
-            elif glob_y == 152 and glob_x == 154 and env.never_run_again == True:
-                if facing_direction == "right":
-                    noop_action = getattr(env, "right", 2)
-            elif glob_y == 152 and glob_x == 155 and env.never_run_again == True:
-                if facing_direction == "right":
-                    noop_action = getattr(env, "right", 2)
-            elif glob_y == 152 and glob_x == 156 and env.never_run_again == True:
-                if facing_direction == "right":
-                    noop_action = getattr(env, "right", 2)
-            elif glob_y == 152 and glob_x == 157 and env.never_run_again == True:
-                if facing_direction == "right":
-                    noop_action = getattr(env, "right", 2)
-            elif glob_y == 152 and glob_x == 158 and env.never_run_again == True:
-                if facing_direction == "right":
-                    noop_action = getattr(env, "right", 2)
-            elif glob_y == 152 and glob_x == 159 and env.never_run_again == True:
-                if facing_direction == "right":
-                    noop_action = getattr(env, "down", 0)
-            elif glob_y == 153 and glob_x == 159 and env.never_run_again == True:
-                if facing_direction == "down" and "MAGIKARP" not in env.read_party():
-                    noop_action = getattr(env, "a", 4)
-                elif facing_direction == "down" and "MAGIKARP" in env.read_party():
-                    if env.step_count % 2 == 0:
-                        noop_action = getattr(env, "b", 5)
-                    else:
-                        noop_action = getattr(env, "left", 1)
-            elif glob_y == 153 and glob_x == 158:
-                if facing_direction == "left":
-                    noop_action = getattr(env, "left", 1)
-            elif glob_y == 153 and glob_x == 157:
-                if facing_direction == "left":
-                    noop_action = getattr(env, "left", 1)
-            elif glob_y == 153 and glob_x == 156:
-                if facing_direction == "left":
-                    noop_action = getattr(env, "left", 1)
-            elif glob_y == 153 and glob_x == 155:
-                if facing_direction == "left":
-                    noop_action = getattr(env, "left", 1) 
-            elif glob_y == 153 and glob_x == 154:
-                if facing_direction == "left":
-                    noop_action = getattr(env, "left", 1)
-            elif glob_y == 153 and glob_x == 153:
-                if facing_direction == "left":
-                    noop_action = getattr(env, "down", 0)
-            elif glob_y == 154 and glob_x == 153:
-                if facing_direction == "down":
-                    noop_action = getattr(env, "down", 0)
-            elif glob_y == 155 and glob_x == 153:
-                if facing_direction == "down":
-                    noop_action = getattr(env, "down", 0)   
-                    
-            time.sleep(0.1)                 
-                
-            print(f"152, 152: after the ifs: {noop_action}")
-
-            if noop_action is not None:
-                obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                    env,
-                    noop_action,
-                    quest_manager,
-                    navigator,
-                    logger,
-                    total_steps,
-                )
-                print(f"play.py: main(): noop_action for quest 46: got past the execute_action_step {noop_action}")
-                env.pyboy.tick()
-                raw_frame = env.render()
-                processed_frame_rgb = process_frame_for_pygame(raw_frame)  # Process the frame
-                update_screen(screen, processed_frame_rgb, screen_width, screen_height)
-                # Update UI without advancing game state
-                update_ui_if_needed()
-                loop_clock.tick(30)
-
-                time.sleep(0.05)
-                continue
-        
-        # fix town map stuck 
-        if env.quest_manager.current_quest_id == 15 or env.quest_manager.current_quest_id == 16 or env.quest_manager.current_quest_id == 17:
-            local_x, local_y, map_id = env.get_game_coords()
-            glob_y, glob_x = local_to_global(local_y, local_x, map_id)
-            facing_direction = env._get_direction(env.pyboy.game_area())
-            dialog = env.read_dialog() or ""
-            noop_action = None
-            print(f"play.py: main(): glob_y: {glob_y}, glob_x: {glob_x}, facing_direction: {facing_direction}")
-            print(f"play.py: main(): env.never_run_again: {env.never_run_again}")
-            if env.item_handler.get_item_quantity(ITEM_NAME_TO_ID_DICT["TOWN_MAP"]) > 0:
-                print(f'play.py: main(): town map found: {env.item_handler.get_item_quantity(ITEM_NAME_TO_ID_DICT["TOWN_MAP"])}')
-                # Remove the raise Exception here, as the map is now correctly found
-                # raise Exception(f"play.py: main(): town map found: {env.item_handler.get_item_quantity(ITEM_NAME_TO_ID_DICT['TOWN_MAP'])}")
-            # If the map is found, we should not be in this condition trying to get it.
-            # The original condition was `> 0`, which is where the exception was.
-            # Now that the map is being acquired, we need to allow normal progression.
-            # The condition for being stuck in Blue's sister's house was expecting TOWN_MAP == 0
-            # I will remove the logic that makes the agent press 'A' when it has the map.
-            if glob_y == 340 and glob_x == 107 and env.item_handler.get_item_quantity(ITEM_NAME_TO_ID_DICT["TOWN_MAP"]) == 0 and facing_direction == "up":
-                noop_action = getattr(env, "a", 4) # This action is to trigger the dialogue to get the map
-                print(f'play.py: main(): glob_y == 340 and glob_x == 107 and env.item_handler.get_item_quantity(ITEM_NAME_TO_ID_DICT["TOWN_MAP"]) == 0')              
-            elif glob_y == 340 and glob_x == 107 and env.item_handler.get_item_quantity(ITEM_NAME_TO_ID_DICT["TOWN_MAP"]) > 0 and facing_direction == "up":
-                # If we have the map, we should move down to exit the house
-                noop_action = getattr(env, "down", 0)
-                print(f'play.py: main(): glob_y == 340 and glob_x == 107 and env.item_handler.get_item_quantity(ITEM_NAME_TO_ID_DICT["TOWN_MAP"]) > 0')              
-            elif glob_y == 341 and glob_x == 107 and facing_direction == "down":
-                noop_action = getattr(env, "down", 0)
-                print(f'play.py: main(): glob_y == 341 and glob_x == 107 and facing_direction == "down"')              
-            elif glob_y == 342 and glob_x == 107 and facing_direction == "down":
-                noop_action = getattr(env, "down", 0)
-                print(f'TRIGERING 342, 107 FACING {facing_direction}')
-            elif glob_y == 343 and glob_x == 107 and facing_direction == "down":
-                print(f'TRIGERING 343, 107 FACING {facing_direction}')
-                noop_action = getattr(env, "down", 0)
-                print(f'343, 107: {noop_action}')
-            # Remove the extensive hardcoded movement after getting the map, allow normal navigation
-            # The original code continued with many elifs from 344 to 389, which are no longer needed
-                                
-            time.sleep(0.1)                 
-
-            if noop_action is not None:
-                obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                    env,
-                    noop_action,
-                    quest_manager,
-                    navigator,
-                    logger,
-                    total_steps,
-                )
-                print(f'play.py: main(): noop_action for quest 15: got past the execute_action_step {noop_action}')
-                env.pyboy.tick()
-                raw_frame = env.render()
-                processed_frame_rgb = process_frame_for_pygame(raw_frame)  # Process the frame
-                update_screen(screen, processed_frame_rgb, screen_width, screen_height)
-                # Update UI without advancing game state
-                update_ui_if_needed()
-                loop_clock.tick(30)
-
-                time.sleep(0.05)
-                continue
-            
-        if env.quest_manager.current_quest_id == 17:
-            print(f"play.py: main(): quest_manager.current_quest_id == {env.quest_manager.current_quest_id}")
-            local_x, local_y, map_id = env.get_game_coords()
-            glob_y, glob_x = local_to_global(local_y, local_x, map_id)
-            facing_direction = env._get_direction(env.pyboy.game_area())
-            dialog = env.read_dialog() or ""
-            noop_action = None
-            print(f"play.py: main(): glob_y: {glob_y}, glob_x: {glob_x}, facing_direction: {facing_direction}")
-            print(f"play.py: main(): env.never_run_again: {env.never_run_again}")
-            if glob_y == 292 and glob_x == 97:
-                noop_action = getattr(env, "up", 3)
-            elif glob_y == 294 and glob_x == 97:
-                noop_action = getattr(env, "left", 1)
-                                
-            time.sleep(0.1)                 
-
-            if noop_action is not None:
-                obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                    env,
-                    noop_action,
-                    quest_manager,
-                    navigator,
-                    logger,
-                    total_steps,
-                )
-                print(f'play.py: main(): noop_action for quest 46: got past the execute_action_step {noop_action}')
-                env.pyboy.tick()
-                raw_frame = env.render()
-                processed_frame_rgb = process_frame_for_pygame(raw_frame)  # Process the frame
-                update_screen(screen, processed_frame_rgb, screen_width, screen_height)
-                # Update UI without advancing game state
-                update_ui_if_needed()
-                loop_clock.tick(30)
-
-                time.sleep(0.05)
-                continue
-            
-        if env.quest_manager.current_quest_id == 21:
-            print(f"play.py: main(): quest_manager.current_quest_id == {env.quest_manager.current_quest_id}")
-            local_x, local_y, map_id = env.get_game_coords()
-            glob_y, glob_x = local_to_global(local_y, local_x, map_id)
-            facing_direction = env._get_direction(env.pyboy.game_area())
-            dialog = env.read_dialog() or ""
-            noop_action = None
-            print(f"play.py: main(): glob_y: {glob_y}, glob_x: {glob_x}, facing_direction: {facing_direction}")
-            print(f"play.py: main(): env.never_run_again: {env.never_run_again}")
-            if glob_y == 299 and glob_x == 32 and facing_direction == "left":
-                noop_action = getattr(env, "a", 4)
-            elif glob_y == 294 and glob_x == 97:
-                noop_action = getattr(env, "left", 1)
-                                
-            time.sleep(0.1)                 
-
-            if noop_action is not None:
-                obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                    env,
-                    noop_action,
-                    quest_manager,
-                    navigator,
-                    logger,
-                    total_steps,
-                )
-                print(f'play.py: main(): noop_action for quest 46: got past the execute_action_step {noop_action}')
-                env.pyboy.tick()
+        # Quest-specific scripted tile overrides (quests 1, 15-17, 21, 22, 46).
+        # The rules live in scripted_overrides.SCRIPTED_TILE_OVERRIDES and are
+        # resolved with one table lookup per step.
+        override_action = env.resolve_scripted_override(env.quest_manager.current_quest_id)
+        if override_action is not None:
+            obs, reward, terminated, truncated, info, total_steps = recorded_step(override_action, 'scripted_override')
+            idle_tick()
+            if not env.headless:
                 raw_frame = env.render()
                 processed_frame_rgb = process_frame_for_pygame(raw_frame)  # Process the frame
                 update_screen(screen, processed_frame_rgb, screen_width, screen_height)
-                # Update UI without advancing game state
-                update_ui_if_needed()
                 loop_clock.tick(30)
+            # Update UI without advancing game state
+            update_ui_if_needed()
+            continue
 
-                time.sleep(0.05)
-                continue
-            
-        if quest_manager.current_quest_id == 22:
-            print(f"play.py: main(): quest_manager.current_quest_id == {env.quest_manager.current_quest_id}")
-            local_x, local_y, map_id = env.get_game_coords()
-            glob_y, glob_x = local_to_global(local_y, local_x, map_id)
-            facing_direction = env._get_direction(env.pyboy.game_area())
-            dialog = env.read_dialog() or ""
-            noop_action = None
-            print(f"play.py: main(): glob_y: {glob_y}, glob_x: {glob_x}, facing_direction: {facing_direction}")
-            if glob_y == 299 and glob_x == 132:
-                # force place pokeballs in bag
-                env.item_handler.buy_item(0x04, 4, 0)
-                env.item_handler.force_refresh_item_cache()
-            
-            time.sleep(0.1)                 
-            
-            
-            
-                    
         if current_action is None:
             # When no explicit player/AI action is available we must still
             # advance the emulator so that StageManager, quest triggers and
@@ -1699,17 +1087,10 @@ def main():
             if "na..." in env.read_dialog():
                 print(f"play.py: main(): na... in dialog")
                 noop_action = getattr(env, 'a', 4)
-                obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                    env,
-                    noop_action,
-                    quest_manager,
-                    navigator,
-                    logger,
-                    total_steps,
-                )
+                obs, reward, terminated, truncated, info, total_steps = recorded_step(noop_action, 'intro')
 
                 print(f'play.py: main(): pressing a single a button: pressing single button: {noop_action}')
-                env.pyboy.tick()
+                idle_tick()
                 raw_frame = env.render()
                 processed_frame_rgb = process_frame_for_pygame(raw_frame)  # Process the frame
                 update_screen(screen, processed_frame_rgb, screen_width, screen_height)
@@ -1725,22 +1106,11 @@ def main():
                 noop_action = getattr(env, 'noop_button_index', 8)
 
                 # Advance one frame with the noop
-                obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                    env,
-                    noop_action,
-                    quest_manager,
-                    navigator,
-                    logger,
-                    total_steps,
-                )
+                obs, reward, terminated, truncated, info, total_steps = recorded_step(noop_action, 'noop')
 
                 # Prevent a second manual tick/render later this iteration
                 already_stepped = True
 
-                # NOTE: We deliberately do *not* add the noop to `recorded_playthrough`
-                # to avoid cluttering replays with frames that carry no semantic
-                # intent.
-
             # look right to charmander, press a a bunch until naming screen
             if env.quest_manager.current_quest_id == 4:
                 local_x, local_y, map_id = env.get_game_coords()
@@ -1752,84 +1122,35 @@ def main():
                 if env.get_game_coords() == (5, 5, 40) and facing_direction == "up":
                     print(f'play.py: main(): env.get_game_coords() == (5, 5, 40) and facing_direction == "up"')
                     noop_action = getattr(env, "up", 3)
-                    obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                        env,
-                        noop_action,
-                        quest_manager,
-                        navigator,
-                        logger,
-                        total_steps,
-                    )
+                    obs, reward, terminated, truncated, info, total_steps = recorded_step(noop_action, 'quest_4')
                 elif env.get_game_coords() == (5, 4, 40) and facing_direction == "up":
                     print(f"play.py: main(): env.get_game_coords() == (5, 4, 40) and facing_direction == 'up'")
                     noop_action = getattr(env, "up", 3)
-                    obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                        env,
-                        noop_action,
-                        quest_manager,
-                        navigator,
-                        logger,
-                        total_steps,
-                    )
+                    obs, reward, terminated, truncated, info, total_steps = recorded_step(noop_action, 'quest_4')
                     
                 elif env.get_game_coords() == (5, 3, 40) and facing_direction == "right":
                     print(f"play.py: main(): env.get_game_coords() == (5, 3, 40) and facing_direction == 'right'")
                     noop_action = None
                     if not env._get_direction(env.pyboy.game_area()) == "right" and env.read_dialog() == '' and env.party_size < 1:
                         noop_action = getattr(env, 'right', 2)
-                        obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                            env,
-                            noop_action,
-                            quest_manager,
-                            navigator,
-                            logger,
-                            total_steps,
-                        )
+                        obs, reward, terminated, truncated, info, total_steps = recorded_step(noop_action, 'quest_4')
                     elif env._get_direction(env.pyboy.game_area()) == "right" and env.read_dialog() == '' and env.party_size < 1:
                         noop_action = getattr(env, 'a', 4)
-                        obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                            env,
-                            noop_action,
-                            quest_manager,
-                            navigator,
-                            logger,
-                            total_steps,
-                        )
+                        obs, reward, terminated, truncated, info, total_steps = recorded_step(noop_action, 'quest_4')
                     elif env._get_direction(env.pyboy.game_area()) == "right" and env.read_dialog() != '' and env.party_size < 1:
                         noop_action = getattr(env, 'a', 4)
-                        obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                            env,
-                            noop_action,
-                            quest_manager,
-                            navigator,
-                            logger,
-                            total_steps,
-                        )
+                        obs, reward, terminated, truncated, info, total_steps = recorded_step(noop_action, 'quest_4')
                     elif "►YES\nNO\ngive a nickname" in env.read_dialog() or "Do you want to" in env.read_dialog():
                         noop_action = getattr(env, 'a', 4)
-                        obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                            env,
-                            noop_action,
-                            quest_manager,
-                            navigator,
-                            logger,
-                            total_steps,
-                        )
+                        obs, reward, terminated, truncated, info, total_steps = recorded_step(noop_action, 'quest_4')
                     elif "A B C" in env.read_dialog() or "T U V" in env.read_dialog():
                         continue
                     elif env.party_size > 0 and env.read_dialog() == '':
                         noop_action = getattr(env, 'a', 4)
-                        obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                            env,
-                            noop_action,
-                            quest_manager,
-                            navigator,
-                            logger,
-                            total_steps,
-                        )
+                        obs, reward, terminated, truncated, info, total_steps = recorded_step(noop_action, 'quest_4')
 
                 # print(f"play.py: main(): CHARMANDER:pressing a single '{noop_action}' button: pressing single button: {noop_action}")
-                env.pyboy.tick()
+                idle_tick()
                 raw_frame = env.render()
                 processed_frame_rgb = process_frame_for_pygame(raw_frame)  # Process the frame
                 update_screen(screen, processed_frame_rgb, screen_width, screen_height)
@@ -1846,7 +1167,7 @@ def main():
         if current_action is None: # Still no action (e.g. interactive mode with no key press)
             if not env.headless: # Only render UI in interactive, do not advance game state
                 # Always tick the emulator even without action
-                env.pyboy.tick()
+                idle_tick()
                 raw_frame = env.render()
                 processed_frame_rgb = process_frame_for_pygame(raw_frame)  # Process the frame
                 update_screen(screen, processed_frame_rgb, screen_width, screen_height)
@@ -1855,7 +1176,7 @@ def main():
                 loop_clock.tick(30)
             else: # Headless, no action -> could be intentional pause
                 # Always tick the emulator in headless mode too
-                env.pyboy.tick()
+                idle_tick()
                 # Render UI update without game state advancement
                 update_ui_if_needed()
                 # Slow down headless idle loop without advancing game state
@@ -1916,20 +1237,12 @@ def main():
 
             # Store for UI update
             update_quest_ui.last_action_source = action_source
-            
-            # Record action for replay functionality
-            recorded_playthrough.append({
-                'step': total_steps,
-                'action': current_action,
-                'original_action': original_action if original_action != current_action else None,
-                'timestamp': time.time(),
-                'source': action_source
-            })
 
-        # Execute environment step only if we have a valid action
+        # Execute environment step only if we have a valid action (recorded for replay functionality)
         if current_action is not None:
-            obs, reward, terminated, truncated, info, total_steps = execute_action_step(
-                env, current_action, quest_manager, navigator, logger, total_steps
+            obs, reward, terminated, truncated, info, total_steps = recorded_step(
+                current_action, action_source,
+                original_action=original_action if original_action != current_action else None,
             )
             total_reward += reward
         else:
@@ -2032,8 +1345,16 @@ def main():
             print(f"Step: {total_steps}, Reward: {total_reward:.2f}, Steps/sec: {steps_per_sec:.2f}, Current Quest: {current_quest_display}")
             if config.get("save_state", True) and run_info:
                 # Save loop state (records action sequence) using recorded_playthrough
+                flush_idle_ticks()
                 save_loop_state(env, recorded_playthrough)
         
+        checkpoint_every = config.get("checkpoint_every", 500)
+        if (checkpoint_every and total_steps % checkpoint_every == 0 and total_steps != last_checkpoint_step
+                and config.get("save_state", True) and run_info):
+            # Rolling, deduplicated emulator autosaves for rollback/debugging
+            autosave_checkpoint(env, total_steps, keep=config.get("checkpoint_keep", 50))
+            last_checkpoint_step = total_steps
+
         if not env.headless:
             raw_frame = env.render()
             processed_frame_rgb = process_frame_for_pygame(raw_frame)  # Process the frame
@@ -2054,20 +1375,14 @@ def main():
     except Exception as e:
         print(f"Could not save final step counter: {e}")
     
-    # Save recorded playthrough
-    if recorded_playthrough and run_dir:
-        try:
-            playthrough_file = run_dir / "recorded_playthrough.json"
-            with open(playthrough_file, 'w') as f:
-                json.dump(recorded_playthrough, f, indent=2)
-            print(f"Recorded playthrough saved to {playthrough_file}")
-        except Exception as e:
-            print(f"Failed to save recorded playthrough: {e}")
-    
+    flush_idle_ticks()
     if config.get("save_state", True) and run_info:
         # Save final state using RunManager
         save_final_state(env, run_info, recorded_playthrough)
+    # Recorded actions are already in the run's action log; make sure they are on disk
+    recorded_playthrough.close()
     
+    status_publisher.close()
     env.close()
     if not env.headless:
         pygame.quit()
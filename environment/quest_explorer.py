@@ -0,0 +1,399 @@
+# quest_explorer.py
+"""
+Parallel quest exploration from savestates.
+
+Checks whether quest N can be completed from a given emulator state without
+playing it live: the savestate is loaded into K independent headless
+RedGymEnv workers (one process per core, each with its own emulator and
+GameSession), quest N is made the current quest, and each trial follows the
+quest_paths/NNN coordinate path the way headless_runner.py does while the
+QuestProgressionEngine evaluates the quest's triggers every step.
+
+Trial 0 of a quest replays the unmodified policy; the other trials replace
+each path-following action with a random button press with probability
+--perturb, seeded per trial, so the report shows how robust a quest path is
+and not just whether one deterministic attempt succeeds.
+
+The report gives, per quest, the completion rate and the step counts of the
+completed trials.  Quests listed before N in the quest catalog are marked
+completed when a trial starts; the savestate is assumed to be at (or before)
+the start of quest N.
+
+Usage:
+    python environment/quest_explorer.py --state quest_states/ --trials 8 --perturb 0.05 \\
+        --max_steps 3000 --output quest_explore.json
+    python environment/quest_explorer.py --state run_end.state --quests 12 13 --workers 4
+"""
+import sys
+from pathlib import Path
+
+# Ensure the project root is in the Python path
+project_root_path = Path(__file__).resolve().parent.parent
+if str(project_root_path) not in sys.path:
+    sys.path.insert(0, str(project_root_path))
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from environment.environment_helpers.quest_catalog import get_quest_catalog
+
+# Actions a perturbed trial may substitute (down/left/right/up/a/b, see VALID_ACTIONS)
+PERTURB_ACTIONS = (0, 1, 2, 3, 4, 5)
+
+# Quest ids in catalog order; quests before N are marked completed for a trial of N
+QUEST_ORDER = [int(q["quest_id"]) for q in get_quest_catalog().quests]
+
+
+@dataclass
+class ExploreTask:
+    """One trial: run quest_id from the savestate at state_path"""
+    quest_id: int
+    trial: int
+    state_path: str
+    seed: int
+    perturb: float
+    max_steps: int
+
+    def failed(self, error: str) -> Dict[str, Any]:
+        return {'quest': self.quest_id, 'trial': self.trial, 'seed': self.seed, 'perturb': self.perturb,
+                'completed': False, 'steps': 0, 'error': error}
+
+
+def find_quest_states(state: Path, quest_ids: Iterable[int]) -> Dict[int, Path]:
+    """
+    Savestate for each quest.
+
+    Args:
+        state: A savestate file (used for every quest) or a directory of
+            .state files named after the quest they start: 012.state,
+            012_viridian_mart.state, ...
+        quest_ids: Quests to find states for
+
+    Returns:
+        dict: quest_id -> state file (quests without a state are left out)
+    """
+    state = Path(state)
+    if state.is_file():
+        return {qid: state for qid in quest_ids}
+    files = sorted(state.glob("*.state")) if state.is_dir() else []
+    states = {}
+    for qid in quest_ids:
+        prefix = f"{qid:03d}"
+        match = next((p for p in files if p.stem == prefix or p.stem.startswith((prefix + "_", prefix + "-"))), None)
+        if match is not None:
+            states[qid] = match
+    return states
+
+
+def make_tasks(quest_states: Dict[int, Path], trials: int, perturb: float, max_steps: int,
+               seed: int = 0) -> List[ExploreTask]:
+    """
+    Trials to run, interleaved across quests so slow quests do not all land
+    on the same workers.  Trial 0 of every quest is unperturbed.
+    """
+    tasks = []
+    for trial in range(max(1, trials)):
+        for qid in sorted(quest_states):
+            tasks.append(ExploreTask(
+                quest_id=qid,
+                trial=trial,
+                state_path=str(quest_states[qid]),
+                seed=seed * 1_000_003 + qid * 1009 + trial,
+                perturb=perturb if trial > 0 else 0.0,
+                max_steps=max_steps,
+            ))
+    return tasks
+
+
+def perturb_action(rng: random.Random, action: int, probability: float) -> int:
+    """A random button press instead of action with the given probability"""
+    if probability > 0 and rng.random() < probability:
+        return rng.choice(PERTURB_ACTIONS)
+    return action
+
+
+def force_quest(session, quest_id: int):
+    """
+    Make quest_id the current quest: earlier quests (and their triggers)
+    completed, quest_id and later ones not, navigator on quest_id's path.
+    """
+    engine = session.quest_progression_engine
+    earlier = set(QUEST_ORDER[:QUEST_ORDER.index(quest_id)]) if quest_id in QUEST_ORDER else set()
+    engine.quest_completed = set(earlier)
+    catalog = get_quest_catalog()
+    engine.trigger_completed = {info.trigger_id for qid in earlier for info in catalog.triggers_for(qid)}
+    engine.logged_blocked_prereqs = set()
+    engine.last_current_qid = None
+    # Check triggers on every step: the wall-clock throttle would make results depend on emulator speed
+    engine.step_interval = 0
+    engine.last_step_time = 0
+
+    quest_manager = session.quest_manager
+    quest_manager._last_status_check = 0  # drop the cached statuses
+    quest_manager.get_current_quest()
+    if quest_manager.current_quest_id != quest_id:
+        print(f"quest_explorer.py: force_quest(): quest manager picked {quest_manager.current_quest_id}, "
+              f"expected {quest_id}")
+
+    navigator = session.navigator
+    navigator.reset_quest_state()
+    if navigator.load_coordinate_path(quest_id):
+        setattr(session.env, 'current_loaded_quest_id', quest_id)
+    else:
+        print(f"quest_explorer.py: force_quest(): no coordinate path for quest {quest_id}")
+
+
+def run_trial(session, logger, task: ExploreTask, state: bytes) -> Dict[str, Any]:
+    """
+    Run one trial in an existing session.
+
+    Returns:
+        dict: quest, trial, seed, perturb, completed, steps, perturbed_actions,
+            end_quest, end_location and elapsed_seconds
+    """
+    from environment.game_session import execute_action_step
+    from environment.headless_runner import choose_action, _drain
+
+    env = session.env
+    quest_manager = session.quest_manager
+    navigator = session.navigator
+    engine = session.quest_progression_engine
+
+    env.reset(options={"state": state})
+    force_quest(session, task.quest_id)
+    rng = random.Random(task.seed)
+
+    steps = 0
+    perturbed = 0
+    completed = False
+    start = time.perf_counter()
+    while steps < task.max_steps:
+        action, source = choose_action(env, quest_manager, navigator)
+        if source == 'navigator':
+            new_action = perturb_action(rng, action, task.perturb)
+            perturbed += new_action != action
+            action = new_action
+        _, _, terminated, truncated, _, steps = execute_action_step(
+            env, action, quest_manager, navigator, logger, steps
+        )
+        try:
+            engine.step(session.trigger_evaluator)
+        except Exception as e:
+            print(f"quest_explorer.py: run_trial(): quest progression error: {e}")
+        if task.quest_id in engine.quest_completed:
+            completed = True
+            break
+        if terminated or truncated:
+            break
+        if steps % 500 == 0:
+            _drain(session.status_queue)
+    _drain(session.status_queue)
+
+    try:
+        end_location = list(env.get_game_coords())
+    except Exception:
+        end_location = None
+    return {
+        'quest': task.quest_id,
+        'trial': task.trial,
+        'seed': task.seed,
+        'perturb': task.perturb,
+        'completed': completed,
+        'steps': steps,
+        'perturbed_actions': perturbed,
+        'end_quest': quest_manager.current_quest_id,
+        'end_location': end_location,
+        'elapsed_seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+# Per-process session, built once by _init_worker and reused by every task
+_worker: Optional[Dict[str, Any]] = None
+
+
+def _init_worker(config_path: str, rom_path: Optional[str], quiet: bool,
+                 overrides: Optional[Dict[str, Any]] = None):
+    """Build a headless env and GameSession for this process (recordings off)"""
+    global _worker
+    import shared
+    from environment.game_session import build_game_session
+    from environment.replay import build_replay_env
+    from utils.logging_config import setup_logging
+
+    shared.grok_enabled.clear()
+    shared.game_started.set()
+    output = open(os.devnull, 'w') if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        logger = setup_logging(logs_dir=str(Path("logs") / "quest_explorer" / f"worker_{os.getpid()}"),
+                               overwrite_logs=True, redirect_stdout=False)
+        env = build_replay_env(config_path, rom_path, overrides=overrides)
+        env.headless = True
+        session = build_game_session(env, env.conf, logger, run_startup_checks=False)
+    _worker = {'session': session, 'logger': logger, 'output': output, 'states': {}}
+
+
+def _run_task(run: Callable, task) -> Dict[str, Any]:
+    """Worker entry point: run(session, logger, task, state) in this process's session"""
+    states = _worker['states']
+    if task.state_path not in states:
+        states[task.state_path] = Path(task.state_path).read_bytes()
+    with contextlib.redirect_stdout(_worker['output']):
+        try:
+            return run(_worker['session'], _worker['logger'], task, states[task.state_path])
+        except Exception as e:
+            return task.failed(f"{type(e).__name__}: {e}")
+
+
+def run_in_workers(run: Callable, tasks: List[Any], config_path: str, rom_path: Optional[str] = None,
+                   workers: Optional[int] = None, quiet: bool = True, progress=None,
+                   overrides: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Run tasks on a pool of worker processes, one emulator each.
+
+    Args:
+        run: Module-level function (session, logger, task, state bytes) -> result dict
+        tasks: Objects with quest_id, state_path and failed(error) -> result dict
+        config_path: config.yaml for the workers' environments
+        rom_path: ROM override (None: from the config)
+        workers: Worker processes (None: all cores); 1 runs in this process
+        quiet: Silence the environment's per-step prints
+        progress: Called with each result as it finishes
+        overrides: Config values set on every worker's environment
+
+    Returns:
+        list: Results in task order
+    """
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+    if workers <= 1:
+        _init_worker(config_path, rom_path, quiet, overrides)
+        for i, task in enumerate(tasks):
+            results[i] = _run_task(run, task)
+            if progress is not None:
+                progress(results[i])
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(config_path, rom_path, quiet, overrides)) as pool:
+        futures = {pool.submit(_run_task, run, task): i for i, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:  # worker died (e.g. emulator crash)
+                results[i] = tasks[i].failed(f"{type(e).__name__}: {e}")
+            if progress is not None:
+                progress(results[i])
+    return results
+
+
+def explore(tasks: List[ExploreTask], config_path: str, rom_path: Optional[str] = None,
+            workers: Optional[int] = None, quiet: bool = True, progress=None) -> List[Dict[str, Any]]:
+    """Run exploration trials from make_tasks on all cores (see run_in_workers)"""
+    return run_in_workers(run_trial, tasks, config_path, rom_path, workers=workers, quiet=quiet,
+                          progress=progress)
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Completion rate and step counts per quest.
+
+    Returns:
+        dict: {'quests': {quest: stats}, 'trials', 'completed', 'completion_rate'};
+            step statistics cover completed trials only
+    """
+    by_quest: Dict[int, List[Dict[str, Any]]] = {}
+    for result in results:
+        by_quest.setdefault(int(result['quest']), []).append(result)
+
+    quests = {}
+    for qid in sorted(by_quest):
+        trials = by_quest[qid]
+        done = sorted(r['steps'] for r in trials if r['completed'])
+        baseline = next((r for r in trials if r.get('trial') == 0), None)
+        quests[f"{qid:03d}"] = {
+            'trials': len(trials),
+            'completed': len(done),
+            'completion_rate': round(len(done) / len(trials), 3),
+            'baseline_completed': baseline['completed'] if baseline else None,
+            'steps_mean': round(sum(done) / len(done), 1) if done else None,
+            'steps_median': done[len(done) // 2] if done else None,
+            'steps_min': done[0] if done else None,
+            'steps_max': done[-1] if done else None,
+            'errors': sum(1 for r in trials if r.get('error')),
+        }
+    completed = sum(1 for r in results if r['completed'])
+    return {
+        'quests': quests,
+        'trials': len(results),
+        'completed': completed,
+        'completion_rate': round(completed / len(results), 3) if results else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate quests from savestates with parallel headless trials")
+    parser.add_argument("--state", type=Path, required=True,
+                        help="Savestate file, or a directory of NNN*.state files named after their quest")
+    parser.add_argument("--quests", type=int, nargs="+", default=None, help="Quest ids (default: every quest with a state)")
+    parser.add_argument("--trials", type=int, default=4, help="Trials per quest; trial 0 is unperturbed")
+    parser.add_argument("--perturb", type=float, default=0.05, help="Chance a path-following action is randomized")
+    parser.add_argument("--max_steps", type=int, default=3000, help="Give up on a trial after N steps")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config_path", type=str, default=str(project_root_path / "config.yaml"))
+    parser.add_argument("--rom_path", type=str, default=None)
+    parser.add_argument("--output", type=Path, default=None, help="Write trial results and summary JSON here")
+    parser.add_argument("--verbose", action="store_true", help="Keep the environment's per-step prints")
+    args = parser.parse_args(argv)
+
+    quest_states = find_quest_states(args.state, args.quests or QUEST_ORDER)
+    if args.quests:
+        for qid in sorted(set(args.quests) - set(quest_states)):
+            print(f"No savestate for quest {qid:03d} in {args.state}")
+    if not quest_states:
+        print(f"No savestates found for the requested quests in {args.state}")
+        return 1
+
+    tasks = make_tasks(quest_states, args.trials, args.perturb, args.max_steps, seed=args.seed)
+    workers = args.workers or os.cpu_count() or 1
+    print(f"Exploring {len(quest_states)} quests x {max(1, args.trials)} trials on {min(workers, len(tasks))} workers")
+
+    def progress(result):
+        status = "done" if result['completed'] else ("ERROR " + result['error'] if result.get('error') else "not done")
+        print(f"quest {result['quest']:03d} trial {result['trial']}: {status} after {result['steps']} steps",
+              file=sys.__stdout__, flush=True)
+
+    start = time.perf_counter()
+    results = explore(tasks, args.config_path, args.rom_path, workers=workers, quiet=not args.verbose,
+                      progress=progress)
+    summary = summarize(results)
+    summary['elapsed_seconds'] = round(time.perf_counter() - start, 1)
+
+    print(f"\n{'quest':<6} {'rate':>5} {'done':>9} {'steps mean':>11} {'min':>7} {'max':>7}")
+    for qid, stats in summary['quests'].items():
+        mean = f"{stats['steps_mean']:.0f}" if stats['steps_mean'] is not None else "-"
+        print(f"{qid:<6} {stats['completion_rate']:>5.0%} {stats['completed']:>4}/{stats['trials']:<4} {mean:>11} "
+              f"{stats['steps_min'] if stats['steps_min'] is not None else '-':>7} "
+              f"{stats['steps_max'] if stats['steps_max'] is not None else '-':>7}")
+    print(f"\n{summary['completed']}/{summary['trials']} trials completed "
+          f"({summary['completion_rate']:.0%}) in {summary['elapsed_seconds']}s")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'summary': summary, 'tasks': [asdict(t) for t in tasks], 'results': results},
+                      f, indent=2, sort_keys=True)
+        print(f"Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
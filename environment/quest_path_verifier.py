@@ -0,0 +1,411 @@
+# quest_path_verifier.py
+"""
+Emulator-driven verification of quest coordinate paths.
+
+scripts/validate_quests.py and quest_validator.py check the NNN_coords.json
+files statically; they cannot tell whether a path walks through a solid tile
+or misses a warp.  This verifier loads each quest's start state into a
+headless RedGymEnv (see quest_explorer.py for the worker pool and state
+lookup), loads the path into the session's ConsolidatedNavigator, lets the
+navigator bring the player onto the path, and then walks the path one
+coordinate at a time using the emulator's collision grid and real movement.
+
+The first problem per quest is reported:
+
+    blocked_tile   the next coordinate is a wall in the collision grid and
+                   moving into it fails
+    unreachable    moving toward the next coordinate has no effect, leads
+                   off the path, or the next coordinate is not adjacent
+    warp_mismatch  the path changes map but no warp fires, or the warp leads
+                   to a different map/tile than the path expects
+    interrupted    a dialog or battle could not be cleared
+    approach       the navigator never got the player onto the path
+
+Wild encounters are disabled in the workers so random battles do not stop
+a walk.  Ledge jumps and warps that land further along the path are
+followed (the walk resyncs to the furthest matching coordinate nearby).
+
+Usage:
+    python environment/quest_path_verifier.py --state quest_states/ --output quest_paths_report.json
+    python environment/quest_path_verifier.py --state run_end.state --quests 12 --workers 1 --verbose
+"""
+import sys
+from pathlib import Path
+
+# Ensure the project root is in the Python path
+project_root_path = Path(__file__).resolve().parent.parent
+if str(project_root_path) not in sys.path:
+    sys.path.insert(0, str(project_root_path))
+
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pyboy.utils import WindowEvent
+
+from environment.environment import VALID_ACTIONS, PATH_FOLLOW_ACTION
+from environment.quest_explorer import QUEST_ORDER, find_quest_states, force_quest, run_in_workers
+
+# Global (gy, gx) delta -> (action index, name)
+DIRECTIONS = {
+    (1, 0): (VALID_ACTIONS.index(WindowEvent.PRESS_ARROW_DOWN), "down"),
+    (0, -1): (VALID_ACTIONS.index(WindowEvent.PRESS_ARROW_LEFT), "left"),
+    (0, 1): (VALID_ACTIONS.index(WindowEvent.PRESS_ARROW_RIGHT), "right"),
+    (-1, 0): (VALID_ACTIONS.index(WindowEvent.PRESS_ARROW_UP), "up"),
+}
+A_ACTION = VALID_ACTIONS.index(WindowEvent.PRESS_BUTTON_A)
+
+# Collision grid (env.get_collision_grid): 9x10, player at (4, 4)
+GRID_CENTER = (4, 4)
+WALL = 1
+SPRITE = 2
+
+ISSUE_KINDS = ("blocked_tile", "unreachable", "warp_mismatch", "interrupted", "approach")
+
+
+@dataclass
+class VerifyTask:
+    """Verify one quest's path from the savestate at state_path"""
+    quest_id: int
+    state_path: str
+    approach_steps: int = 200
+    retries: int = 4
+    max_steps: int = 5000
+
+    def failed(self, error: str) -> Dict[str, Any]:
+        return {'quest': self.quest_id, 'ok': False, 'issue': None, 'steps': 0, 'error': error}
+
+
+class PathWalker:
+    """Walks a loaded coordinate path tile by tile and stops at the first problem"""
+
+    def __init__(self, env, navigator, step: Callable[[int], Any], coords: List[Tuple[int, int]],
+                 map_ids: List[int], retries: int = 4, max_waits: int = 40, lookahead: int = 4,
+                 max_steps: int = 5000):
+        """
+        Args:
+            env: Environment (get_game_coords, get_collision_grid, read_dialog, read_m)
+            navigator: ConsolidatedNavigator with the path loaded; its
+                coordinate index is kept on the walker's position
+            step: Executes one action in the environment
+            coords: Global (gy, gx) path coordinates
+            map_ids: Map id of each coordinate
+            retries: Attempts per move before giving up
+            max_waits: A presses spent clearing one dialog/battle
+            lookahead: Path coordinates ahead searched after a ledge or warp
+            max_steps: Hard limit on actions for the whole walk
+        """
+        self.env = env
+        self.navigator = navigator
+        self._step = step
+        self.coords = [tuple(c) for c in coords]
+        self.map_ids = list(map_ids)
+        self.retries = retries
+        self.max_waits = max_waits
+        self.lookahead = lookahead
+        self.max_steps = max_steps
+        self.index = 0
+        self.steps = 0
+        self.last_direction: Optional[Tuple[int, int]] = None
+
+    def position(self) -> Tuple[Optional[Tuple[int, int]], int]:
+        """Player's global (gy, gx) and map id"""
+        return self.navigator._get_player_global_coords(), self.env.get_game_coords()[2]
+
+    def step(self, action: int):
+        self.steps += 1
+        self._step(action)
+
+    def issue(self, kind: str, index: int, detail: str) -> Dict[str, Any]:
+        pos, map_id = self.position()
+        return {
+            'kind': kind,
+            'index': index,
+            'coord': list(self.coords[index]) if 0 <= index < len(self.coords) else None,
+            'map_id': self.map_ids[index] if 0 <= index < len(self.map_ids) else None,
+            'player': list(pos) if pos else None,
+            'player_map': map_id,
+            'detail': detail,
+        }
+
+    def settle(self) -> bool:
+        """Clear dialogs and battles with A; False if they do not go away"""
+        for _ in range(self.max_waits):
+            in_battle = self.env.read_m("wIsInBattle") > 0
+            if not in_battle and not (self.env.read_dialog() or "").strip():
+                return True
+            self.step(A_ACTION)
+        return False
+
+    def grid_cell(self, delta: Tuple[int, int]) -> Optional[int]:
+        """Collision code of the tile next to the player in direction delta"""
+        try:
+            grid = self.env.get_collision_grid()
+        except Exception as e:
+            print(f"quest_path_verifier.py: grid_cell(): collision grid unavailable: {e}")
+            return None
+        if grid is None:
+            return None
+        return int(grid[GRID_CENTER[0] + delta[0]][GRID_CENTER[1] + delta[1]])
+
+    def match_ahead(self, pos, map_id) -> Optional[int]:
+        """Furthest path index within lookahead at pos on map_id"""
+        end = min(len(self.coords), self.index + 1 + self.lookahead)
+        matches = [j for j in range(self.index + 1, end)
+                   if self.coords[j] == pos and self.map_ids[j] == map_id]
+        return matches[-1] if matches else None
+
+    def advance_to(self, index: int):
+        self.index = index
+        self.navigator.current_coordinate_index = index
+
+    def start(self) -> Optional[int]:
+        """First path index the player stands on, or None"""
+        pos, map_id = self.position()
+        matches = [j for j, (c, m) in enumerate(zip(self.coords, self.map_ids)) if c == pos and m == map_id]
+        return matches[0] if matches else None
+
+    def walk(self, start_index: int) -> Optional[Dict[str, Any]]:
+        """
+        Walk from start_index to the end of the path.
+
+        Returns:
+            dict: The first issue (see ISSUE_KINDS), or None if the whole path was walked
+        """
+        self.advance_to(start_index)
+        while self.index + 1 < len(self.coords):
+            if self.steps >= self.max_steps:
+                return self.issue("unreachable", self.index + 1, f"step limit {self.max_steps} reached")
+            if not self.settle():
+                return self.issue("interrupted", self.index + 1, "dialog or battle did not clear")
+
+            target_index = self.index + 1
+            target, target_map = self.coords[target_index], self.map_ids[target_index]
+            pos, map_id = self.position()
+            if pos is None:
+                return self.issue("unreachable", target_index, "player position unavailable")
+            if pos == target and map_id == target_map:
+                self.advance_to(target_index)
+                continue
+
+            delta = (target[0] - pos[0], target[1] - pos[1])
+            if target_map != map_id and delta not in DIRECTIONS:
+                problem = self.take_warp(target_index)
+            elif delta in DIRECTIONS:
+                problem = self.move(target_index, delta)
+            else:
+                distance = abs(delta[0]) + abs(delta[1])
+                problem = self.issue("unreachable", target_index,
+                                     f"not adjacent: {distance} tiles from the player on the same map")
+            if problem is not None:
+                return problem
+        return None
+
+    def after_move(self, target_index: int, before) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Classify the position after an action.
+
+        Returns:
+            (moved, issue): moved is True once the walk made progress
+        """
+        pos, map_id = self.position()
+        ahead = self.match_ahead(pos, map_id)
+        if ahead is not None:
+            self.advance_to(ahead)
+            return True, None
+        if (pos, map_id) == before:
+            return False, None
+        if map_id != before[1]:
+            # The warp should lead to the first path coordinate off the old map
+            arrival = next((j for j in range(target_index, len(self.coords)) if self.map_ids[j] != before[1]),
+                           target_index)
+            expected, expected_map = self.coords[arrival], self.map_ids[arrival]
+            if map_id == expected_map and abs(pos[0] - expected[0]) + abs(pos[1] - expected[1]) <= 1:
+                # Warped next to the path; the next move steps onto it
+                self.advance_to(max(self.index, arrival - 1))
+                return True, None
+            return True, self.issue("warp_mismatch", arrival,
+                                    f"warped to map {map_id} at {list(pos)}, path expects map {expected_map} "
+                                    f"at {list(expected)}")
+        return True, self.issue("unreachable", target_index, f"moved to {list(pos)} instead")
+
+    def move(self, target_index: int, delta: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        action, name = DIRECTIONS[delta]
+        before = self.position()
+        cell = None
+        for _ in range(self.retries):
+            cell = self.grid_cell(delta)
+            self.step(action)
+            self.last_direction = delta
+            moved, problem = self.after_move(target_index, before)
+            if moved:
+                return problem
+            if not self.settle():
+                return self.issue("interrupted", target_index, "dialog or battle did not clear")
+        if cell == WALL:
+            return self.issue("blocked_tile", target_index, f"moving {name} runs into a solid tile")
+        reason = "a sprite is in the way" if cell == SPRITE else "the move has no effect"
+        return self.issue("unreachable", target_index, f"moving {name} failed: {reason}")
+
+    def take_warp(self, target_index: int) -> Optional[Dict[str, Any]]:
+        """Fire the warp from the current tile: press into walls, continuing direction first"""
+        before = self.position()
+        candidates = [self.last_direction] if self.last_direction else []
+        candidates += [d for d in DIRECTIONS if d != self.last_direction and self.grid_cell(d) == WALL]
+        for delta in candidates:
+            for _ in range(2):
+                self.step(DIRECTIONS[delta][0])
+                moved, problem = self.after_move(target_index, before)
+                if problem is not None:
+                    return problem
+                if moved:
+                    if self.position()[1] != before[1] or self.index >= target_index:
+                        return None
+                    return self.issue("warp_mismatch", target_index,
+                                      f"pressing {DIRECTIONS[delta][1]} moved the player without a warp")
+        target_map = self.map_ids[target_index]
+        return self.issue("warp_mismatch", target_index,
+                          f"no warp to map {target_map} from {list(before[0]) if before[0] else None}")
+
+
+def approach_path(session, walker: PathWalker, max_steps: int) -> Optional[int]:
+    """Let the navigator bring the player onto the path; the path index reached or None"""
+    from environment.game_session import execute_action_step
+
+    index = walker.start()
+    steps = 0
+    while index is None and steps < max_steps:
+        execute_action_step(session.env, PATH_FOLLOW_ACTION, session.quest_manager, session.navigator,
+                            None, steps)
+        steps += 1
+        index = walker.start()
+    walker.steps += steps
+    return index
+
+
+def verify_quest(session, logger, task: VerifyTask, state: bytes) -> Dict[str, Any]:
+    """
+    Walk one quest's coordinate path from its start state.
+
+    Returns:
+        dict: quest, ok, issue (first problem or None), coordinates,
+            start_index, reached_index, maps, steps and elapsed_seconds
+    """
+    from environment.game_session import execute_action_step
+    from environment.headless_runner import _drain
+
+    env = session.env
+    navigator = session.navigator
+    start = time.perf_counter()
+
+    env.reset(options={"state": state})
+    force_quest(session, task.quest_id)
+    coords = list(navigator.sequential_coordinates)
+    map_ids = list(navigator.coord_map_ids)
+    result = {
+        'quest': task.quest_id,
+        'coordinates': len(coords),
+        'maps': len(set(map_ids)),
+        'start_index': None,
+        'reached_index': None,
+    }
+    if not coords:
+        result.update(ok=False, steps=0, error=f"no coordinate path for quest {task.quest_id:03d}",
+                      issue=None, elapsed_seconds=round(time.perf_counter() - start, 3))
+        return result
+
+    def step(action):
+        execute_action_step(env, action, session.quest_manager, navigator, logger, walker.steps)
+
+    walker = PathWalker(env, navigator, step, coords, map_ids, retries=task.retries, max_steps=task.max_steps)
+    start_index = approach_path(session, walker, task.approach_steps)
+    if start_index is None:
+        issue = walker.issue("approach", 0, f"player not on the path after {task.approach_steps} navigator steps")
+    else:
+        issue = walker.walk(start_index)
+    _drain(session.status_queue)
+
+    result.update(
+        ok=issue is None,
+        issue=issue,
+        start_index=start_index,
+        reached_index=walker.index if start_index is not None else None,
+        steps=walker.steps,
+        elapsed_seconds=round(time.perf_counter() - start, 3),
+    )
+    return result
+
+
+def build_report(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Machine-readable report: per-quest results plus counts by issue kind"""
+    by_kind: Dict[str, List[str]] = {}
+    for r in results:
+        if r.get('issue'):
+            by_kind.setdefault(r['issue']['kind'], []).append(f"{r['quest']:03d}")
+    return {
+        'quests': {f"{r['quest']:03d}": r for r in sorted(results, key=lambda r: r['quest'])},
+        'total': len(results),
+        'passed': sum(1 for r in results if r.get('ok')),
+        'errors': sorted(f"{r['quest']:03d}" for r in results if r.get('error')),
+        'issues': {kind: sorted(quests) for kind, quests in sorted(by_kind.items())},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk every quest coordinate path in the emulator")
+    parser.add_argument("--state", type=Path, required=True,
+                        help="Savestate file, or a directory of NNN*.state files named after their quest")
+    parser.add_argument("--quests", type=int, nargs="+", default=None, help="Quest ids (default: every quest with a state)")
+    parser.add_argument("--approach_steps", type=int, default=200, help="Navigator steps allowed to reach the path")
+    parser.add_argument("--retries", type=int, default=4, help="Attempts per move before reporting it")
+    parser.add_argument("--max_steps", type=int, default=5000, help="Action limit per quest")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--config_path", type=str, default=str(project_root_path / "config.yaml"))
+    parser.add_argument("--rom_path", type=str, default=None)
+    parser.add_argument("--output", type=Path, default=None, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the environment's per-step prints")
+    args = parser.parse_args(argv)
+
+    quest_states = find_quest_states(args.state, args.quests or QUEST_ORDER)
+    if args.quests:
+        for qid in sorted(set(args.quests) - set(quest_states)):
+            print(f"No savestate for quest {qid:03d} in {args.state}", file=sys.stderr)
+    if not quest_states:
+        print(f"No savestates found for the requested quests in {args.state}", file=sys.stderr)
+        return 1
+
+    tasks = [VerifyTask(qid, str(path), approach_steps=args.approach_steps, retries=args.retries,
+                        max_steps=args.max_steps) for qid, path in sorted(quest_states.items())]
+
+    def progress(result):
+        issue = result.get('issue')
+        if result.get('error'):
+            status = f"ERROR {result['error']}"
+        elif issue:
+            status = f"{issue['kind']} at index {issue['index']}: {issue['detail']}"
+        else:
+            status = f"ok ({result['coordinates']} coordinates)"
+        print(f"quest {result['quest']:03d}: {status}", file=sys.__stderr__, flush=True)
+
+    start = time.perf_counter()
+    results = run_in_workers(verify_quest, tasks, args.config_path, args.rom_path, workers=args.workers,
+                             quiet=not args.verbose, progress=progress,
+                             overrides={'disable_wild_encounters': True})
+    report = build_report(results)
+    report['elapsed_seconds'] = round(time.perf_counter() - start, 1)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+        print(f"{report['passed']}/{report['total']} quest paths walked; report saved to {args.output}",
+              file=sys.stderr)
+    else:
+        print(text)
+    return 0 if report['passed'] == report['total'] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,389 +1,362 @@
+# replay.py
+"""
+Deterministic headless replay of a recorded run.
+
+A run directory holds <run_id>_start.state and the action log
+<run_id>_actions.ndjson (or a legacy actions JSON list).  ReplayEngine loads
+the start state into a RedGymEnv, re-executes the recorded actions through
+env.step() with no frame pacing, and stores emulator keyframes every
+keyframe_every actions in a CheckpointStore (<run_dir>/replay_keyframes), so
+seek(i) restores the nearest keyframe at or before i and replays at most
+keyframe_every actions instead of starting over.
+
+Recording loops call annotate_action_record() on each action, which adds the
+action the emulator actually ran (PATH_FOLLOW_ACTION is converted by the
+navigator inside step(), which a replay does not have; None when the step
+sent no input, e.g. a move the navigator refused) and, every RAM_HASH_EVERY
+steps, a hash of work RAM.  The replay compares its own RAM hash at those
+entries and reports every divergence.  Frames a loop advances outside
+env.step() are recorded as tick_record() entries and replayed as plain ticks.
+
+Keyframes restore emulator state only; Python-side environment state other
+than step_count is whatever the replay has at that point.
+
+Usage:
+    python environment/replay.py --run_dir environment/replays/recordings/<run_id> [--seek N] [--view]
+"""
+import sys
+from pathlib import Path
+
+# Ensure the project root is in the Python path
+project_root_path = Path(__file__).resolve().parent.parent
+if str(project_root_path) not in sys.path:
+    sys.path.insert(0, str(project_root_path))
+
 import argparse
-# import heapq # No longer needed for A* here
+import hashlib
 import json
-from pathlib import Path
-# import pprint # No longer needed
-# from typing import Optional, Union, Any # No longer needed
-import numpy as np
-import pygame
-# import io # No longer needed
-from datetime import datetime
-import yaml
-from omegaconf import DictConfig
+import time
+from typing import Any, Dict, List, Optional
 
-import sys
-# Add project root (DATAPlaysPokemon) to sys.path
-# Assuming replay.py is in DATAPlaysPokemon/rewrite/recorder/
-project_root_path = Path(__file__).resolve().parent.parent.parent
-sys.path.insert(0, str(project_root_path))
-
-# from map_data import map_locations # Removed unused import
-from rewrite.recorder.environment import RedGymEnv
-# from pyboy.utils import WindowEvent # Not directly used now
-from stats_wrapper import StatsWrapper # Keep if used independently
-from wrappers.configured_env_wrapper import ConfiguredEnvWrapper
-# from global_map import local_to_global, global_to_local # No longer needed here
-
-
-def print_info_nicely(info):
-    # Find the longest key length for proper alignment
-    if not info:
-        print("Info: (empty)")
-        return
-    max_key_len = max(len(key) for key in info.keys())
-    
-    print("--- Game Info ---")
-    for key, value in info.items():
-        if isinstance(value, dict):
-            print(f"{key:<{max_key_len}}: (see below)")
-            for sub_key, sub_value in value.items():
-                print(f"  {sub_key:<{max_key_len-2}}: {sub_value}")
-        elif isinstance(value, list):
-            print(f"{key:<{max_key_len}}: (see below)")
-            for i, item in enumerate(value):
-                print(f"  [{i}]: {item}")
-        else:
-            print(f"{key:<{max_key_len}}: {value}")
-    print("-----------------")
-
-def get_default_config(rom_path, initial_state_path):
-    # If initial_state_path is None, default to "has_pokedex_nballs"
-    # Otherwise, use the stem of the provided path.
-    default_init_state_name = "has_pokedex_nballs"
-    current_init_state_name = Path(initial_state_path).stem if initial_state_path else default_init_state_name
-
-    return {
-        "video_dir": Path("./videos/play_sessions/"),
-        "emulator_delay": 11,
-        "headless": False,
-        "state_dir": Path("./states/"),
-        "init_state": current_init_state_name,
-        "action_freq": 24,
-        "max_steps": 1_000_000,
-        "save_video": False,
-        "fast_video": False,
-        "n_record": 0,
-        "perfect_ivs": False,
-        "reduce_res": False,
-        "gb_path": rom_path,
-        "log_frequency": 1000,
-        "two_bit": False,
-        "auto_flash": False,
-        "required_tolerance": None,
-        "disable_wild_encounters": False,
-        "auto_teach_cut": False,
-        "auto_teach_surf": False,
-        "auto_teach_strength": False,
-        "auto_use_cut": False,
-        "auto_use_strength": False,
-        "auto_use_surf": False,
-        "auto_solve_strength_puzzles": False,
-        "auto_remove_all_nonuseful_items": False,
-        "auto_pokeflute": False,
-        "auto_next_elevator_floor": False,
-        "skip_safari_zone": False,
-        "infinite_safari_steps": False,
-        "insert_saffron_guard_drinks": False,
-        "infinite_money": False,
-        "infinite_health": False,
-        "use_global_map": False,
-        "save_state": False,
-        "animate_scripts": True,
-        "exploration_inc": 0.01,
-        "exploration_max": 1.0,
-        "max_steps_scaling": 0.0,
-        "map_id_scalefactor": 1.0,
-    }
-
-def update_screen(screen, frame_surface, screen_width, screen_height):
-    # The new frame_surface is already a Pygame surface
-    screen.blit(pygame.transform.scale(frame_surface, (screen_width, screen_height)), (0, 0))
-    pygame.display.flip()
-
-def process_frame_for_pygame(frame_from_env_render, target_resolution=(160,144)):
-    # env.render() returns a 2D numpy array (H, W) of type uint8 (grayscale)
-    # Pygame needs a 3D array (H, W, 3) for color, or use a grayscale palette.
-    
-    if not isinstance(frame_from_env_render, np.ndarray):
-        # print(f"Warning: frame is not a numpy array, type: {type(frame_from_env_render)}")
-        # Attempt to handle if it's already an image or surface (though env.render() should be numpy)
-        if hasattr(frame_from_env_render, 'convert_alpha'): # Pygame surface
-            return frame_from_env_render
-        try:
-            # Try to convert from PIL image if that's what came through
-            frame_from_env_render = np.array(frame_from_env_render)
-        except:
-            # Fallback: create a black frame
-            print("Error: Could not convert frame to numpy array. Using black frame.")
-            black_frame = np.zeros((target_resolution[1], target_resolution[0]), dtype=np.uint8)
-            frame_rgb = np.stack((black_frame,) * 3, axis=-1)
-            return pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
-
-
-    if frame_from_env_render.ndim == 2: # Grayscale H, W
-        frame_rgb = np.stack((frame_from_env_render,) * 3, axis=-1) # H, W, 3
-    elif frame_from_env_render.ndim == 3 and frame_from_env_render.shape[2] == 1: # Grayscale H, W, 1
-        frame_rgb = np.concatenate([frame_from_env_render] * 3, axis=-2) # H, W, 3
-    elif frame_from_env_render.ndim == 3 and frame_from_env_render.shape[2] == 3: # Already RGB H, W, 3
-        frame_rgb = frame_from_env_render
-    else:
-        # Fallback: create a black frame if format is unexpected
-        print(f"Error: Unexpected frame format: {frame_from_env_render.shape}. Using black frame.")
-        black_frame = np.zeros((target_resolution[1], target_resolution[0]), dtype=np.uint8) # H, W
-        frame_rgb = np.stack((black_frame,) * 3, axis=-1) # H, W, 3
-
-    # Pygame wants (width, height, channels) for make_surface from array,
-    # but surfarray.make_surface expects array with shape (W,H) or (W,H,3) where W is index 0
-    # Numpy arrays are typically (H,W,C). So, we need to swap axes.
-    frame_surface = pygame.surfarray.make_surface(frame_rgb.swapaxes(0, 1))
-    return frame_surface
-
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--run_dir", type=str, help="Path to the replay run directory")
-    parser.add_argument("--headless", action="store_true")
-    parser.add_argument('--wait', type=int, default=0, help='Time to wait between frames in ms')
-    parser.add_argument('--config_file', type=str, default='../config.yaml')
-
-    args = parser.parse_args()
-
-    # Determine run directory and files
-    run_dir = Path(args.run_dir)
-    if not run_dir.is_dir():
-        print(f"Run directory not found: {run_dir}")
-        return
-    run_name = run_dir.name
-
-    # Load initial state if available
-    state_file = run_dir / f"{run_name}.state"
-    # If no default state file, try the _start.state variant
-    if not state_file.is_file():
-        alt_state = run_dir / f"{run_name}_start.state"
-        if alt_state.is_file():
-            state_file = alt_state
-    if state_file.is_file():
+from environment.environment_helpers.action_log import ACTION_LOG_SUFFIX, read_action_log
+from environment.environment_helpers.checkpoint_store import CheckpointStore
+
+RAM_HASH_EVERY = 100
+WRAM_START, WRAM_END = 0xC000, 0xE000
+KEYFRAME_EVERY = 500
+
+
+def ram_hash(pyboy) -> str:
+    """Short digest of the Game Boy work RAM (0xC000-0xDFFF)"""
+    return hashlib.blake2b(bytes(pyboy.memory[WRAM_START:WRAM_END]), digest_size=8).hexdigest()
+
+
+def annotate_action_record(env, record: Dict[str, Any], total_steps: int) -> Dict[str, Any]:
+    """
+    Add replay data to an action record after its step has run.
+
+    Args:
+        env: Environment that just executed the action
+        record: Action log entry ({'step', 'action', ...})
+        total_steps: Step count after the action
+
+    Returns:
+        dict: record, with 'emulator_action' (None if no input was sent) and
+        (every RAM_HASH_EVERY steps) 'ram_hash'
+    """
+    if hasattr(env, 'last_emulator_action'):
+        record['emulator_action'] = env.last_emulator_action
+    if total_steps % RAM_HASH_EVERY == 0:
         try:
-            state_bytes = state_file.read_bytes()
-            options = {"state": state_bytes}
+            record['ram_hash'] = ram_hash(env.pyboy)
         except Exception as e:
-            print(f"Error reading initial state file {state_file}: {e}. Starting new game.")
-            options = {}
+            print(f"replay.py: could not hash RAM at step {total_steps}: {e}")
+    return record
+
+
+def tick_record(total_steps: int, ticks: int) -> Dict[str, Any]:
+    """Action log entry for frames advanced with pyboy.tick() outside env.step()"""
+    return {'step': total_steps, 'action': None, 'ticks': ticks}
+
+
+def sends_no_input(entry: Any) -> bool:
+    """True for a recorded step that ran without pressing anything on the emulator"""
+    return isinstance(entry, dict) and 'emulator_action' in entry and entry['emulator_action'] is None
+
+
+def replay_action(entry: Any) -> Optional[int]:
+    """The action to feed env.step() for an action log entry (None if unusable)."""
+    if isinstance(entry, dict):
+        action = entry.get('emulator_action', entry.get('action'))
     else:
-        print(f"Initial state file not found at {state_file}. Starting new game.")
-        options = {}
+        action = entry
+    return action if isinstance(action, int) and not isinstance(action, bool) else None
+
+
+def find_start_state(run_dir: Path) -> Optional[Path]:
+    """<run_id>_start.state, or the older <run_id>.state"""
+    for name in (f"{run_dir.name}_start.state", f"{run_dir.name}.state"):
+        if (run_dir / name).is_file():
+            return run_dir / name
+    return None
+
 
-    # Load recorded actions JSON: find any JSON file containing a list of ints
-    actions_file = None
-    for json_path in run_dir.glob("*.json"):
+def load_recorded_actions(run_dir: Path) -> List[Any]:
+    """
+    A run's recorded actions: its NDJSON action log, else a JSON actions list.
+
+    Raises:
+        FileNotFoundError: No action recording in run_dir
+    """
+    logs = sorted(run_dir.glob(f"*_actions{ACTION_LOG_SUFFIX}"))
+    if logs:
+        return list(read_action_log(logs[0]))
+    for json_path in sorted(run_dir.glob("*.json")):
         try:
             with open(json_path, "r") as f:
                 data = json.load(f)
-            if isinstance(data, list) and all(isinstance(x, int) for x in data):
-                actions_file = json_path
-                break
-        except Exception:
+        except (OSError, json.JSONDecodeError):
             continue
-    if actions_file is None:
-        print(f"No actions file found in {run_dir}. Expected a JSON file containing a list of ints.")
-        return
-    with open(actions_file, "r") as f:
-        action_list = json.load(f)
-
-    # 1. Establish base configuration from replay.py's own defaults
-    # Use args.init_state for initial_state_path and a default for rom_path.
-    # The actual gb_path used by RedGymEnv will be resolved from the final merged config.
-    default_rom_for_base_config = "./PokemonRed.gb" # A sensible default for generating base config
-    
-    base_env_config_dict = get_default_config(
-        rom_path=default_rom_for_base_config,
-        initial_state_path=None
-    )
-
-    # 2. Load configuration from YAML file, if specified
-    env_config_from_yaml = {}
-    config_path = Path(args.config_file)
-    if config_path.exists():
-        try:
-            with open(config_path, 'r') as f:
-                yaml_full_config = yaml.safe_load(f)
-            if yaml_full_config and isinstance(yaml_full_config.get('env_config'), dict):
-                env_config_from_yaml = yaml_full_config['env_config']
-            elif yaml_full_config:
-                print(f"Warning: 'env_config' section not found or not a dict in {config_path}. Using base defaults and CLI args.")
+        if isinstance(data, list) and data and all(replay_action(x) is not None for x in data):
+            return data
+    raise FileNotFoundError(f"No action log found in {run_dir}")
+
+
+class ReplayEngine:
+    """Re-executes recorded actions with keyframe seeking and RAM hash checks"""
+
+    def __init__(self, env, start_state: bytes, actions: List[Any],
+                 keyframe_every: int = KEYFRAME_EVERY, keyframe_dir: Optional[Path] = None):
+        """
+        Args:
+            env: RedGymEnv (or wrapper) with recordings disabled
+            start_state: pyboy state the recording started from
+            actions: Action log entries
+            keyframe_every: Actions between emulator keyframes
+            keyframe_dir: Where keyframes persist between replays (None keeps
+                them in a temporary store for this engine only)
+        """
+        self.env = env
+        self.start_state = start_state
+        self.actions = actions
+        self.keyframe_every = max(1, keyframe_every)
+        self.position = 0
+        self.mismatches: List[Dict[str, Any]] = []
+        self.verified = 0
+
+        if keyframe_dir is None:
+            import tempfile
+            self._tmpdir = tempfile.TemporaryDirectory(prefix="replay_keyframes_")
+            keyframe_dir = Path(self._tmpdir.name)
+        self.keyframes = CheckpointStore(keyframe_dir, keep=0, max_bytes=None)
+        start_digest = hashlib.blake2b(start_state, digest_size=16).hexdigest()
+        for manifest in self.keyframes.checkpoints():
+            if manifest["meta"].get("start") != start_digest:
+                self.keyframes.delete(manifest["name"])  # keyframes of a different recording
+        self._start_digest = start_digest
+
+    @classmethod
+    def from_run(cls, env, run_dir: Path, keyframe_every: int = KEYFRAME_EVERY, persist_keyframes: bool = True):
+        """
+        Build an engine for a recorded run directory.
+
+        Raises:
+            FileNotFoundError: The run has no start state or no action log
+        """
+        run_dir = Path(run_dir)
+        state_path = find_start_state(run_dir)
+        if state_path is None:
+            raise FileNotFoundError(f"No start state found in {run_dir}")
+        keyframe_dir = run_dir / "replay_keyframes" if persist_keyframes else None
+        return cls(env, state_path.read_bytes(), load_recorded_actions(run_dir),
+                   keyframe_every=keyframe_every, keyframe_dir=keyframe_dir)
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def _keyframe_name(self, position: int) -> str:
+        return f"key_{position:09d}"
+
+    def reset(self):
+        """Load the start state; position 0."""
+        self.env.reset(options={"state": self.start_state})
+        self.position = 0
+        self._store_keyframe()
+
+    def _store_keyframe(self):
+        name = self._keyframe_name(self.position)
+        if name not in self.keyframes:
+            self.keyframes.save_env(self.env, name, step=self.position, pinned=True,
+                                    meta={"start": self._start_digest})
+
+    def step(self) -> bool:
+        """
+        Execute the next recorded action.
+
+        Returns:
+            bool: False at the end of the log or when the environment ends
+        """
+        if self.position >= len(self.actions):
+            return False
+        entry = self.actions[self.position]
+        self.position += 1
+        terminated = truncated = False
+        if isinstance(entry, dict) and entry.get('ticks'):
+            self.env.pyboy.tick(entry['ticks'], render=False)
+        elif sends_no_input(entry):
+            self.env.step_count += 1
+        else:
+            action = replay_action(entry)
+            if action is None:
+                print(f"replay.py: skipping action {self.position - 1} with unexpected format: {entry}")
+                return True
+            _, _, terminated, truncated, _ = self.env.step(action)
+
+        if isinstance(entry, dict) and entry.get('ram_hash'):
+            actual = ram_hash(self.env.pyboy)
+            self.verified += 1
+            if actual != entry['ram_hash']:
+                self.mismatches.append({'index': self.position - 1, 'step': entry.get('step'),
+                                        'expected': entry['ram_hash'], 'actual': actual})
+                print(f"replay.py: RAM hash mismatch after action {self.position - 1} "
+                      f"(recorded step {entry.get('step')}): expected {entry['ram_hash']}, got {actual}")
+        if self.position % self.keyframe_every == 0:
+            self._store_keyframe()
+        return not (terminated or truncated)
+
+    def run(self, until: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Replay forward to action index until (default: the end of the log).
+
+        Returns:
+            dict: actions executed, seconds, actions_per_sec, verified, mismatches
+        """
+        until = len(self.actions) if until is None else min(until, len(self.actions))
+        start_position = self.position
+        start_time = time.perf_counter()
+        while self.position < until and self.step():
+            pass
+        elapsed = time.perf_counter() - start_time
+        executed = self.position - start_position
+        return {
+            'actions': executed,
+            'position': self.position,
+            'seconds': elapsed,
+            'actions_per_sec': executed / elapsed if elapsed > 0 else 0.0,
+            'verified': self.verified,
+            'mismatches': len(self.mismatches),
+        }
+
+    def seek(self, index: int) -> Dict[str, Any]:
+        """
+        Move to action index: restore the nearest keyframe at or before it
+        (unless replaying forward from the current position is shorter),
+        then replay the remainder.
+        """
+        index = max(0, min(index, len(self.actions)))
+        keyframe = (index // self.keyframe_every) * self.keyframe_every
+        while keyframe > 0 and self._keyframe_name(keyframe) not in self.keyframes:
+            keyframe -= self.keyframe_every
+        if not (keyframe <= self.position <= index):
+            if keyframe == 0 and self._keyframe_name(0) not in self.keyframes:
+                self.reset()
             else:
-                print(f"Warning: Config file {config_path} is empty. Using base defaults and CLI args.")
-        except Exception as e:
-            print(f"Error loading or parsing config file {config_path}: {e}. Using base defaults and CLI args.")
-    else:
-        print(f"Warning: Config file {config_path} not found. Using base defaults and CLI arguments.")
-
-    # 3. Merge configurations: Start with base, then update with YAML overrides
-    final_merged_config_dict = base_env_config_dict.copy()
-    final_merged_config_dict.update(env_config_from_yaml)
-
-    # 4. Apply specific CLI argument overrides (highest precedence for these)
-    if args.headless is not None: # Check if specified, as action="store_true" defaults to False if not present
-        final_merged_config_dict['headless'] = args.headless
-    
-    # For replay, we derive state solely from options, so disable config init_state
-    final_merged_config_dict['init_state'] = None
-    # Disable recording for replay mode
-    final_merged_config_dict['record_replays'] = False
-    
-    # gb_path precedence: YAML > default from get_default_config.
-    # No direct CLI arg for gb_path in replay.py.
-
-    env_config_for_redgymenv = DictConfig(final_merged_config_dict)
-
-    # Initialize Pygame and Environment
-    # Use the 'headless' value from the final merged config for consistency
-    if not final_merged_config_dict.get('headless', False): 
-        pygame.init()
-        screen_width = 3 * 160  # Scaled screen width
-        screen_height = 3 * 144  # Scaled screen height
-        screen = pygame.display.set_mode((screen_width, screen_height))
-        pygame.display.set_caption("Pokemon Red Replay")
-        clock = pygame.time.Clock()
-    else:
-        screen = None # No screen if headless
-        clock = None
-
-    # Use the configured wrapper to load base defaults, YAML, and CLI args
-    env = ConfiguredEnvWrapper(
-        base_env_config_dict,
-        cli_args=args,
-        config_path=Path(__file__).parent.parent / "config.yaml"
-    )
-    # ReplayExtender instance removed: # extender = ReplayExtender(pyboy_instance=env.pyboy, env_instance=env)
-
-    # stats_wrapper = StatsWrapper(pyboy) # Old, pyboy is now env.pyboy
-    stats_wrapper = StatsWrapper(env.pyboy) # Updated if StatsWrapper is still needed
-
-    current_action_index = 0
+                self.keyframes.restore_env(self.env, self._keyframe_name(keyframe))
+                self.position = keyframe
+                self.env.step_count = keyframe
+        return self.run(until=index)
+
+
+def build_replay_env(config_path: str, rom_path: Optional[str] = None, view: bool = False,
+                     overrides: Optional[Dict[str, Any]] = None):
+    """RedGymEnv configured for replay: recordings off, no init state, unpaced unless viewing.
+
+    overrides are extra config values applied last (e.g. disable_wild_encounters)."""
+    from environment.game_session import setup_configuration
+    from environment.wrappers.configured_env_wrapper import ConfiguredEnvWrapper
+
+    config = setup_configuration(argparse.Namespace(config_path=config_path, rom_path=rom_path), project_root_path)
+    config.headless = not view
+    config.interactive_mode = False
+    config.record_replays = False
+    config.disable_recordings = True
+    config.init_from_last_ending_state = False
+    config.override_init_state = None
+    for key, value in (overrides or {}).items():
+        config[key] = value
+    env = ConfiguredEnvWrapper(base_conf=config)
+    env.pyboy.set_emulation_speed(1 if view else 0)
+    return env
+
+
+def _view(env, engine: ReplayEngine, scale: int = 3):
+    """Step through the replay in a pygame window (SPACE pauses, RIGHT steps, ESC quits)."""
+    import numpy as np
+    import pygame
+
+    pygame.init()
+    screen = pygame.display.set_mode((160 * scale, 144 * scale))
+    pygame.display.set_caption("Pokemon Red Replay")
+    clock = pygame.time.Clock()
     paused = False
     running = True
-    
-    # Initial observation and screen render
-    obs, info = env.reset(options=options)
-    if not args.headless and screen:
-        raw_frame = env.render()
-        frame_surface = process_frame_for_pygame(raw_frame)
-        update_screen(screen, frame_surface, screen_width, screen_height)
-
+    while running:
+        advance = not paused
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                paused = not paused
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_RIGHT and paused:
+                advance = True
+        if advance and not engine.step():
+            paused = True
+        frame = np.asarray(env.render())
+        if frame.ndim == 3 and frame.shape[2] == 1:
+            frame = frame[:, :, 0]
+        if frame.ndim == 2:
+            frame = np.stack((frame,) * 3, axis=-1)
+        surface = pygame.surfarray.make_surface(frame[:, :, :3].swapaxes(0, 1))
+        screen.blit(pygame.transform.scale(surface, screen.get_size()), (0, 0))
+        pygame.display.flip()
+        clock.tick(60)
+    pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded run headless and verify determinism")
+    parser.add_argument("--run_dir", type=Path, required=True, help="Run directory (environment/replays/recordings/<run_id>)")
+    parser.add_argument("--config_path", type=str, default=str(project_root_path / "config.yaml"))
+    parser.add_argument("--rom_path", type=str, default=None)
+    parser.add_argument("--seek", type=int, default=None, help="Stop at this action index instead of the end")
+    parser.add_argument("--keyframe_every", type=int, default=KEYFRAME_EVERY)
+    parser.add_argument("--no_persist_keyframes", action="store_true", help="Do not keep keyframes in <run_dir>/replay_keyframes")
+    parser.add_argument("--save_end_state", type=Path, default=None, help="Write the emulator state at the end of the replay here")
+    parser.add_argument("--view", action="store_true", help="Show the replay in a pygame window")
+    args = parser.parse_args(argv)
+
+    env = build_replay_env(args.config_path, args.rom_path, view=args.view)
     try:
-        while running and current_action_index < len(action_list):
-            if not args.headless and screen: # Ensure screen exists before processing events
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                    elif event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
-                            running = False
-                        elif event.key == pygame.K_SPACE:
-                            paused = not paused
-                            print("Paused" if paused else "Resumed")
-                        elif event.key == pygame.K_RIGHT and paused: 
-                            if current_action_index < len(action_list):
-                                action_item_paused = action_list[current_action_index]
-                                if isinstance(action_item_paused, dict) and "action" in action_item_paused:
-                                    action_to_send_paused = action_item_paused["action"]
-                                elif isinstance(action_item_paused, int):
-                                    action_to_send_paused = action_item_paused
-                                else:
-                                    print(f"Error: Paused step: Action item at index {current_action_index} has unexpected format: {action_item_paused}")
-                                    running = False
-                                    continue
-                                
-                                print(f"Step Replay: Action {action_to_send_paused} ({type(action_to_send_paused)})")
-                                obs, reward, terminated, truncated, info = env.step(action_to_send_paused) # new gymnasium, expects 5 values
-                                current_action_index += 1
-                                if not args.headless:
-                                    raw_frame = env.render()
-                                    frame_surface = process_frame_for_pygame(raw_frame)
-                                    update_screen(screen, frame_surface, screen_width, screen_height)
-                                    print_info_nicely(info if info else {})
-                                if terminated or truncated:
-                                    print("Environment terminated or truncated during replay.")
-                                    running = False
-                            else:
-                                print("End of replay reached.")
-
-            if not paused and running:
-                # === Automated Navigation Step === REMOVED
-                # if extender.navigation_status not in ["idle", "completed", "failed"]:
-                #    nav_status_msg = extender.step()
-                #    if nav_status_msg:
-                #        print(nav_status_msg)
-                # elif extender.navigation_status == "completed":
-                #    print(f"Nav completed for {extender.current_navigation_target_grid}. Waiting for new goal. (Press W)")
-                #    extender.reset_navigation() 
-                # elif extender.navigation_status == "failed":
-                #    print(f"Nav failed for {extender.current_navigation_target_grid}. Resetting. (Press W for new goal)")
-                #    extender.reset_navigation()
-                
-                # === Replay Action Step ===
-                # Only execute replayed action (navigation status check is removed)
-                if current_action_index < len(action_list):
-                    action_item = action_list[current_action_index]
-                    if isinstance(action_item, dict) and "action" in action_item:
-                        action_to_send = action_item["action"]
-                    elif isinstance(action_item, int): # Handles older formats if they just store int
-                        action_to_send = action_item
-                    else:
-                        print(f"Error: Action item at index {current_action_index} has unexpected format: {action_item}")
-                        running = False # Stop replay if action format is wrong
-                        continue
-
-                    # print(f"Replay: Action {action_to_send}")
-                    
-                    obs, reward, terminated, truncated, info = env.step(action_to_send) # new gymnasium, expects 5 values
-                    
-                    current_action_index += 1
-
-                    if not args.headless:
-                        # print_info_nicely(info if info else {}) # Print after render
-                        pass
-
-                    if terminated or truncated:
-                        print("Environment terminated or truncated during replay.")
-                        running = False
-                elif current_action_index >= len(action_list):
-                    print("End of replay and no active navigation. Press ESC to quit.")
-                    # Keep running for interactive navigation post-replay
-                    paused = True # Pause to allow user to interact or quit
-
-
-            if not args.headless:
-                raw_frame = env.render()
-                frame_surface = process_frame_for_pygame(raw_frame)
-                update_screen(screen, frame_surface, screen_width, screen_height)
-                if not paused and info: # Only print game info if not paused
-                     print_info_nicely(info if info else {})
-                clock.tick(60) # Limit FPS
-            
-            if args.wait > 0 and not paused : # only wait if not paused
-                pygame.time.wait(args.wait)
-
-
-    except KeyboardInterrupt:
-        print("Replay interrupted by user.")
+        engine = ReplayEngine.from_run(env, args.run_dir, keyframe_every=args.keyframe_every,
+                                       persist_keyframes=not args.no_persist_keyframes)
+        engine.reset()
+        if args.view:
+            _view(env, engine)
+            stats = {'position': engine.position, 'verified': engine.verified, 'mismatches': len(engine.mismatches)}
+        elif args.seek is not None:
+            stats = engine.seek(args.seek)
+        else:
+            stats = engine.run()
+        print(json.dumps(stats, indent=2))
+        if args.save_end_state:
+            with open(args.save_end_state, "wb") as f:
+                env.pyboy.save_state(f)
+            print(f"Saved replay end state to {args.save_end_state}")
     finally:
-        print("Stopping environment...")
-        env.close()
-        if not args.headless:
-            pygame.quit()
-        print("Replay finished.")
-        # Save ending game state to run directory
-        try:
-            timestamp = datetime.now().strftime("%m%d%Y_%H%M%S")
-            end_state_name = f"{run_name}__{timestamp}.state"
-            end_state_path = run_dir / end_state_name
-            run_dir.mkdir(parents=True, exist_ok=True)
-            with open(end_state_path, "wb") as f_end:
-                env.pyboy.save_state(f_end)
-            print(f"Saved ending game state to {end_state_path}")
-        except Exception as e:
-            print(f"Error saving ending game state: {e}")
+        # Not env.close(): without a run it writes an end state into state_dir
+        env.pyboy.stop(save=False)
+    return 1 if engine.mismatches else 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
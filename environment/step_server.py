@@ -0,0 +1,546 @@
+# step_server.py
+"""
+Process-isolated emulator step server.
+
+play.py runs pygame, the Tk UI, the Grok thread, the web server and the
+emulator in one process, so anything GIL-heavy in the UI stalls emulation.
+This module runs RedGymEnv (with the same GameSession wiring as the
+headless runner) in its own process and serves a small command protocol
+over a multiprocessing Connection -- a pipe to a child process
+(launch_step_server) or a local socket (python environment/step_server.py).
+
+Commands (request: (name, kwargs); reply: ('ok', result) or ('error', text)):
+
+    hello                       shared-memory names and server status
+    step(action, repeat, obs)   execute_action_step + quest progression
+    reset(state)                env.reset, optionally from state bytes
+    save_state / load_state     raw pyboy state bytes
+    read_ram(ranges)            bytes of (address or symbol, length) ranges
+    status                      steps, location, current quest
+    shutdown                    stop serving
+
+Step replies are small (reward, flags, info, sequence numbers); the screen
+and a RAM window are published through shared memory after every step:
+the screen in a FrameChannel (frame_channel.py), the RAM window in a
+RamMirror.  Clients read them without a round trip and without copying
+through the server.
+
+Socket connections are authenticated with a key: STEP_SERVER_AUTHKEY if
+set, otherwise a random key generated at launch and written (mode 0600) to
+~/.step_server/<host>_<port>.key, where StepClient.connect finds it.  The
+protocol unpickles requests, so listening on a non-loopback address is
+refused unless STEP_SERVER_AUTHKEY is set.
+
+Usage:
+    python environment/step_server.py --address 127.0.0.1:5577
+    client = StepClient.connect(("127.0.0.1", 5577)); client.step(6); seq, frame = client.frame()
+"""
+import sys
+from pathlib import Path
+
+# Ensure the project root is in the Python path
+project_root_path = Path(__file__).resolve().parent.parent
+if str(project_root_path) not in sys.path:
+    sys.path.insert(0, str(project_root_path))
+
+import argparse
+import contextlib
+import io
+import ipaddress
+import multiprocessing
+import os
+import secrets
+import time
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from environment.environment_helpers.frame_channel import FrameChannel
+
+AUTHKEY_ENV = "STEP_SERVER_AUTHKEY"
+AUTHKEY_DIR = Path.home() / ".step_server"
+# Work RAM (0xC000-0xDFFF) holds the player, map, party and event flags
+DEFAULT_RAM_WINDOW = (0xC000, 0x2000)
+SCREEN_SHAPE = (144, 160)
+DRAIN_EVERY = 500  # steps between discarding queued UI status updates
+
+_RAM_HEADER = 3  # int64: version, start address, length
+
+
+class RamMirror:
+    """A RAM window in shared memory, updated by one writer with a seqlock"""
+
+    def __init__(self, start: int, length: int, name: Optional[str] = None):
+        """
+        Args:
+            start: First mirrored address
+            length: Mirrored bytes
+            name: Attach to an existing mirror instead of creating one
+        """
+        size = _RAM_HEADER * 8 + length
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self.name = self._shm.name
+        self.start = start
+        self.length = length
+        self._header = np.ndarray((_RAM_HEADER,), dtype='<i8', buffer=self._shm.buf)
+        self._data = np.ndarray((length,), dtype=np.uint8, buffer=self._shm.buf, offset=_RAM_HEADER * 8)
+        if self._owner:
+            self._header[:] = (0, start, length)
+
+    @classmethod
+    def attach(cls, name: str) -> "RamMirror":
+        """Attach by name, reading the window from the header"""
+        probe = shared_memory.SharedMemory(name=name)
+        try:
+            header = np.ndarray((_RAM_HEADER,), dtype='<i8', buffer=probe.buf)
+            start, length = int(header[1]), int(header[2])
+            del header
+        finally:
+            probe.close()
+        return cls(start, length, name=name)
+
+    @property
+    def seq(self) -> int:
+        """Number of completed writes"""
+        return int(self._header[0]) // 2
+
+    def write(self, data) -> int:
+        """Copy length bytes into the mirror; returns the new sequence number"""
+        version = int(self._header[0])
+        self._header[0] = version + 1  # odd: write in progress
+        self._data[:] = np.frombuffer(bytes(data), dtype=np.uint8, count=self.length)
+        self._header[0] = version + 2
+        return (version + 2) // 2
+
+    def read(self, retries: int = 100) -> Tuple[int, Optional[np.ndarray]]:
+        """(seq, copy of the window), or (seq, None) if every attempt raced a write"""
+        for _ in range(retries):
+            before = int(self._header[0])
+            if before % 2:
+                time.sleep(0)
+                continue
+            data = self._data.copy()
+            if int(self._header[0]) == before:
+                return before // 2, data
+        return self.seq, None
+
+    def peek(self, address: int, length: int = 1) -> Optional[bytes]:
+        """Bytes at an absolute address inside the window (None if outside or torn)"""
+        offset = address - self.start
+        if offset < 0 or offset + length > self.length:
+            return None
+        _, data = self.read()
+        return None if data is None else data[offset:offset + length].tobytes()
+
+    def close(self):
+        self._header = None
+        self._data = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class StepServer:
+    """Executes client commands against one GameSession"""
+
+    def __init__(self, session, logger=None, ram_window: Tuple[int, int] = DEFAULT_RAM_WINDOW):
+        """
+        Args:
+            session: GameSession from build_game_session
+            logger: PokemonLogger passed to execute_action_step
+            ram_window: (start, length) of RAM mirrored after every step
+        """
+        self.session = session
+        self.env = session.env
+        self.logger = logger
+        self.steps = 0
+        self._drained_at = 0
+        self.running = True
+        self.frames = FrameChannel(SCREEN_SHAPE[1], SCREEN_SHAPE[0])
+        self.ram = RamMirror(*ram_window)
+        self.commands = {
+            'hello': self.hello,
+            'step': self.step,
+            'reset': self.reset,
+            'save_state': self.save_state,
+            'load_state': self.load_state,
+            'read_ram': self.read_ram,
+            'status': self.status,
+            'shutdown': self.shutdown,
+        }
+        self.publish()
+
+    def publish(self):
+        """Screen and RAM window to shared memory"""
+        pyboy = self.env.pyboy
+        self.frames.write(pyboy.screen.ndarray)
+        start, length = self.ram.start, self.ram.length
+        self.ram.write(pyboy.memory[start:start + length])
+
+    def _sequences(self) -> Dict[str, int]:
+        return {'steps': self.steps, 'frame_seq': self.frames.seq, 'ram_seq': self.ram.seq}
+
+    def hello(self) -> Dict[str, Any]:
+        return {
+            'pid': os.getpid(),
+            'frame_channel': self.frames.name,
+            'ram_mirror': self.ram.name,
+            'ram_window': (self.ram.start, self.ram.length),
+            **self._sequences(),
+        }
+
+    def step(self, action: int, repeat: int = 1, obs: bool = False) -> Dict[str, Any]:
+        """Execute action repeat times (stopping early if the episode ends)"""
+        from environment.game_session import execute_action_step
+
+        session = self.session
+        reward_total = 0.0
+        result = None
+        for _ in range(max(1, repeat)):
+            result = execute_action_step(self.env, action, session.quest_manager, session.navigator,
+                                         self.logger, self.steps)
+            self.steps = result[5]
+            reward_total += result[1]
+            if session.quest_progression_engine is not None:
+                try:
+                    session.quest_progression_engine.step(session.trigger_evaluator)
+                except Exception as e:
+                    print(f"step_server.py: step(): quest progression error: {e}")
+            if result[2] or result[3]:
+                break
+        if self.steps - self._drained_at >= DRAIN_EVERY and session.status_queue is not None:
+            # Nothing consumes the session's UI status queue in a server process
+            from environment.headless_runner import _drain
+            _drain(session.status_queue)
+            self._drained_at = self.steps
+        self.publish()
+        reply = {'reward': reward_total, 'terminated': result[2], 'truncated': result[3],
+                 'info': result[4], **self._sequences()}
+        if obs:
+            reply['obs'] = result[0]
+        return reply
+
+    def reset(self, state: Optional[bytes] = None) -> Dict[str, Any]:
+        _, info = self.env.reset(options={"state": state} if state is not None else None)
+        self.publish()
+        return {'info': info, **self._sequences()}
+
+    def save_state(self) -> bytes:
+        buffer = io.BytesIO()
+        self.env.pyboy.save_state(buffer)
+        return buffer.getvalue()
+
+    def load_state(self, state: bytes) -> Dict[str, int]:
+        self.env.pyboy.load_state(io.BytesIO(state))
+        self.publish()
+        return self._sequences()
+
+    def read_ram(self, ranges: Sequence[Tuple[Union[int, str], int]]) -> List[bytes]:
+        """Bytes of each (address or wram symbol, length) range"""
+        pyboy = self.env.pyboy
+        out = []
+        for address, length in ranges:
+            if isinstance(address, str):
+                address = pyboy.symbol_lookup(address)[1]
+            out.append(bytes(pyboy.memory[address:address + length]))
+        return out
+
+    def status(self) -> Dict[str, Any]:
+        quest_manager = self.session.quest_manager
+        try:
+            location = list(self.env.get_game_coords())
+        except Exception:
+            location = None
+        return {'location': location,
+                'current_quest': getattr(quest_manager, 'current_quest_id', None),
+                **self._sequences()}
+
+    def shutdown(self) -> bool:
+        self.running = False
+        return True
+
+    def handle(self, request) -> Tuple[str, Any]:
+        """One request tuple -> reply tuple"""
+        try:
+            name, kwargs = request
+            handler = self.commands.get(name)
+            if handler is None:
+                return 'error', f"unknown command {name!r}"
+            return 'ok', handler(**(kwargs or {}))
+        except Exception as e:
+            return 'error', f"{type(e).__name__}: {e}"
+
+    def serve(self, conn):
+        """Answer requests on conn until shutdown or the client goes away"""
+        while self.running:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                return
+            reply = self.handle(request)
+            try:
+                conn.send(reply)
+            except (EOFError, OSError):
+                return
+            except Exception as e:  # reply not picklable
+                conn.send(('error', f"could not send reply to {request[0]!r}: {e}"))
+
+    def close(self):
+        self.frames.close()
+        self.ram.close()
+
+
+class StepClient:
+    """Client side of the step server protocol"""
+
+    def __init__(self, conn, process=None):
+        """
+        Args:
+            conn: Connection to the server
+            process: Server process when this client launched it
+        """
+        self.conn = conn
+        self.process = process
+        self.server = self.call('hello')
+        self._frames: Optional[FrameChannel] = None
+        self._ram: Optional[RamMirror] = None
+
+    @classmethod
+    def connect(cls, address, authkey: Optional[bytes] = None) -> "StepClient":
+        """Connect to a server started with serve_socket / the CLI (key: see read_authkey)"""
+        return cls(Client(tuple(address), authkey=authkey or read_authkey(address)))
+
+    def call(self, name: str, **kwargs):
+        """Send a command and return its result (RuntimeError on a server-side error)"""
+        self.conn.send((name, kwargs))
+        status, result = self.conn.recv()
+        if status != 'ok':
+            raise RuntimeError(f"step server: {name}: {result}")
+        return result
+
+    def step(self, action: int, repeat: int = 1, obs: bool = False) -> Dict[str, Any]:
+        return self.call('step', action=action, repeat=repeat, obs=obs)
+
+    def reset(self, state: Optional[bytes] = None) -> Dict[str, Any]:
+        return self.call('reset', state=state)
+
+    def save_state(self) -> bytes:
+        return self.call('save_state')
+
+    def load_state(self, state: bytes) -> Dict[str, int]:
+        return self.call('load_state', state=state)
+
+    def read_ram(self, *ranges: Tuple[Union[int, str], int]) -> List[bytes]:
+        return self.call('read_ram', ranges=list(ranges))
+
+    def status(self) -> Dict[str, Any]:
+        return self.call('status')
+
+    def frame(self) -> Tuple[int, Optional[np.ndarray]]:
+        """(seq, copy) of the newest screen from shared memory"""
+        if self._frames is None:
+            self._frames = FrameChannel.attach(self.server['frame_channel'])
+        return self._frames.read()
+
+    def ram(self) -> Tuple[int, Optional[np.ndarray]]:
+        """(seq, copy) of the mirrored RAM window from shared memory"""
+        if self._ram is None:
+            self._ram = RamMirror.attach(self.server['ram_mirror'])
+        return self._ram.read()
+
+    def close(self, shutdown: bool = True):
+        """Detach; shutdown also stops the server (and joins it if this client launched it)"""
+        for shared in (self._frames, self._ram):
+            if shared is not None:
+                shared.close()
+        self._frames = self._ram = None
+        if shutdown:
+            try:
+                self.call('shutdown')
+            except (EOFError, OSError, RuntimeError):
+                pass
+        self.conn.close()
+        if self.process is not None:
+            self.process.join(timeout=30)
+            if self.process.is_alive():
+                self.process.terminate()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_server_session(config_path: str, rom_path: Optional[str] = None, state: Optional[Path] = None,
+                         quiet: bool = False):
+    """Headless env + GameSession for a step server (like headless_runner.py)"""
+    import shared
+    from environment.game_session import build_game_session, setup_configuration
+    from environment.wrappers.configured_env_wrapper import ConfiguredEnvWrapper
+    from utils.logging_config import setup_logging
+
+    config = setup_configuration(argparse.Namespace(config_path=config_path, rom_path=rom_path), project_root_path)
+    config.headless = True
+    config.interactive_mode = False
+    if state is not None:
+        config.override_init_state = str(state)
+        config.init_from_last_ending_state = False
+    shared.grok_enabled.clear()
+    shared.game_started.set()
+
+    output = open(os.devnull, 'w') if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        logger = setup_logging(logs_dir=str(Path("logs") / "step_server" / str(os.getpid())),
+                               overwrite_logs=True, redirect_stdout=False)
+        env = ConfiguredEnvWrapper(base_conf=config)
+        env.headless = True
+        env.pyboy.set_emulation_speed(0)
+        session = build_game_session(env, config, logger, run_startup_checks=False)
+    return session, logger
+
+
+def _serve_pipe(conn, config_path, rom_path, state, quiet):
+    """Child process entry point of launch_step_server"""
+    session, logger = build_server_session(config_path, rom_path, state, quiet)
+    server = StepServer(session, logger)
+    try:
+        server.serve(conn)
+    finally:
+        server.close()
+        session.env.close()
+
+
+def launch_step_server(config_path: str = str(project_root_path / "config.yaml"), rom_path: Optional[str] = None,
+                       state: Optional[Path] = None, quiet: bool = True) -> StepClient:
+    """
+    Start a step server in a child process and return a client connected by pipe.
+
+    The child is spawned (not forked) so it does not inherit the caller's
+    UI threads or SDL state.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = ctx.Pipe()
+    process = ctx.Process(target=_serve_pipe, args=(child_conn, config_path, rom_path, state, quiet),
+                          name="step-server", daemon=True)
+    process.start()
+    child_conn.close()
+    return StepClient(parent_conn, process)
+
+
+def authkey_path(address: Tuple[str, int]) -> Path:
+    """Where a server on address leaves its generated key"""
+    host, port = address
+    return AUTHKEY_DIR / f"{host}_{port}.key"
+
+
+def write_authkey(path: Path, authkey: bytes):
+    """Write a key (hex) readable by the current user only"""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        os.fchmod(f.fileno(), 0o600)
+        f.write(authkey.hex())
+
+
+def read_authkey(address: Tuple[str, int]) -> bytes:
+    """STEP_SERVER_AUTHKEY if set, else the key the server on address wrote"""
+    if os.environ.get(AUTHKEY_ENV):
+        return os.environ[AUTHKEY_ENV].encode()
+    path = authkey_path(address)
+    try:
+        return bytes.fromhex(path.read_text().strip())
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"No step server key for {address[0]}:{address[1]} ({path}: {e}); "
+                           f"set {AUTHKEY_ENV} or pass authkey") from e
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve_socket(server: StepServer, address: Tuple[str, int], authkey: bytes):
+    """Serve clients one after another on a local socket until one sends shutdown"""
+    with Listener(address, authkey=authkey) as listener:
+        print(f"step_server.py: listening on {listener.address} "
+              f"(frames: {server.frames.name}, ram: {server.ram.name})", file=sys.__stdout__, flush=True)
+        while server.running:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError) as e:
+                print(f"step_server.py: rejected connection: {e}", file=sys.__stdout__, flush=True)
+                continue
+            with conn:
+                server.serve(conn)
+
+
+def _parse_address(text: str) -> Tuple[str, int]:
+    host, _, port = text.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve RedGymEnv steps to clients in other processes")
+    parser.add_argument("--address", type=str, default="127.0.0.1:5577", help="HOST:PORT to listen on")
+    parser.add_argument("--config_path", type=str, default=str(project_root_path / "config.yaml"))
+    parser.add_argument("--rom_path", type=str, default=None)
+    parser.add_argument("--state", type=Path, default=None, help="Start from this savestate")
+    parser.add_argument("--ram_window", type=str, default=None,
+                        help="RAM mirrored to shared memory as START:LENGTH in hex (default C000:2000)")
+    parser.add_argument("--quiet", action="store_true", help="Silence the environment's prints")
+    args = parser.parse_args(argv)
+
+    address = _parse_address(args.address)
+    explicit_key = bool(os.environ.get(AUTHKEY_ENV))
+    if not (explicit_key or is_loopback(address[0])):
+        print(f"step_server.py: refusing to listen on {args.address} without {AUTHKEY_ENV} set "
+              f"(requests are unpickled, so a connected client can run code in the server)")
+        return 1
+    if explicit_key:
+        authkey = os.environ[AUTHKEY_ENV].encode()
+    else:
+        authkey = secrets.token_bytes(32)
+        write_authkey(authkey_path(address), authkey)
+        print(f"step_server.py: authkey written to {authkey_path(address)}")
+
+    ram_window = DEFAULT_RAM_WINDOW
+    if args.ram_window:
+        start, _, length = args.ram_window.partition(":")
+        ram_window = (int(start, 16), int(length, 16))
+
+    session, logger = build_server_session(args.config_path, args.rom_path, args.state, args.quiet)
+    server = StepServer(session, logger, ram_window=ram_window)
+    output = open(os.devnull, 'w') if args.quiet else sys.stdout
+    try:
+        with contextlib.redirect_stdout(output):
+            serve_socket(server, address, authkey)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        session.env.close()
+        if not explicit_key:
+            authkey_path(address).unlink(missing_ok=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
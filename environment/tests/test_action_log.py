@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from environment.environment_helpers import saver
+from environment.environment_helpers.action_log import ActionLog, convert_to_json, read_action_log
+from environment.environment_helpers.run_manager import RunManager
+
+
+def _actions(n, start=0):
+    return [{'step': i, 'action': i % 8, 'original_action': None, 'source': 'ai'} for i in range(start, start + n)]
+
+
+def test_appends_across_sessions_and_skips_torn_line(tmp_path):
+    path = tmp_path / "run_actions.ndjson"
+    with ActionLog(path, flush_every=4) as log:
+        for entry in _actions(10):
+            log.append(entry)
+        log.append(3)  # play.py also records bare action ints
+        assert len(log) == 11
+    with ActionLog(path) as log:
+        for entry in _actions(2, start=10):
+            log.append(entry)
+        assert len(log) == 2
+        assert len(list(log)) == 13
+
+    with open(path, 'ab') as f:
+        f.write(b'{"step": 12, "act')  # crash mid-write
+    assert list(read_action_log(path)) == _actions(10) + [3] + _actions(2, start=10)
+
+
+@pytest.mark.parametrize("indent", [4, 2, None])
+def test_converter_matches_old_json_format(tmp_path, indent):
+    actions = _actions(5) + [7, {'nested': {'a': [1, 2]}}]
+    with ActionLog(tmp_path / "a.ndjson") as log:
+        for entry in actions:
+            log.append(entry)
+    assert convert_to_json(tmp_path / "a.ndjson", tmp_path / "a.json", indent) == len(actions)
+    assert (tmp_path / "a.json").read_text() == json.dumps(actions, indent=indent)
+
+    (tmp_path / "empty.ndjson").touch()
+    convert_to_json(tmp_path / "empty.ndjson", tmp_path / "empty.json", indent)
+    assert (tmp_path / "empty.json").read_text() == json.dumps([], indent=indent)
+
+
+def test_run_manager_saves_only_new_actions(tmp_path):
+    manager = RunManager(tmp_path)
+    run_info = manager.create_run_directory("PALLET TOWN", 0)
+    log = manager.open_action_log(run_info)
+    for entry in _actions(3):
+        log.append(entry)
+    manager.save_actions(log, run_info)
+    assert run_info.action_log_path.read_text().count('\n') == 3
+    assert not run_info.actions_path.exists()
+
+    # A snapshot directory gets a JSON copy for tools
+    snapshot = manager.create_run_directory("PALLET TOWN", 0)
+    manager.save_actions(log, snapshot)
+    assert json.loads(snapshot.actions_path.read_text()) == _actions(3)
+    log.close()
+
+
+def test_snapshot_right_after_resume_keeps_earlier_actions(tmp_path, monkeypatch):
+    manager = RunManager(tmp_path)
+    monkeypatch.setattr(saver, "_run_manager", manager)
+    run_info = manager.create_run_directory("PALLET TOWN", 0)
+    with manager.open_action_log(run_info) as log:
+        for entry in _actions(4):
+            log.append(entry)
+
+    resumed = manager.open_action_log(run_info)  # nothing appended yet this session
+    assert len(resumed) == 0
+    assert saver.save_full_snapshot(object(), resumed, coords_data=[], snapshot_name="snap", base_run_info=run_info)
+    snapshot = run_info.run_dir / "manual_snapshots" / "snap" / "snap_actions.json"
+    assert json.loads(snapshot.read_text()) == _actions(4)
+    resumed.close()
@@ -0,0 +1,60 @@
+import io
+import json
+
+from environment.benchmark import SubsystemTimer, benchmark_engine, compare, write_results
+from environment.replay import ReplayEngine
+
+
+class _FakePyBoy:
+    def __init__(self):
+        self.memory = bytearray(0x10000)
+
+    def save_state(self, f):
+        f.write(bytes(self.memory))
+
+    def load_state(self, f):
+        self.memory[:] = f.read()
+
+
+class _FakeEnv:
+    def __init__(self):
+        self.pyboy = _FakePyBoy()
+        self.step_count = 0
+
+    def reset(self, options=None):
+        self.pyboy.load_state(io.BytesIO(options["state"]))
+
+    def read_dialog(self):
+        return self.read_dialog_inner()
+
+    def read_dialog_inner(self):
+        return ''
+
+    def step(self, action):
+        self.read_dialog()
+        self.read_dialog()
+        self.pyboy.memory[0xC000 + action] += 1
+        return None, 0.0, False, False, {}
+
+
+def test_benchmark_times_subsystems_and_restores_methods(tmp_path):
+    env = _FakeEnv()
+    engine = ReplayEngine(env, bytes(0x10000), [i % 4 for i in range(50)], keyframe_dir=tmp_path)
+    results = benchmark_engine(engine, max_actions=40)
+
+    assert results['actions'] == 40 and results['mismatches'] == 0
+    assert results['subsystem_calls']['dialog'] == 80
+    assert results['latency_ms']['p50'] <= results['latency_ms']['p99'] <= results['latency_ms']['max']
+    assert 'read_dialog' not in vars(env)
+
+    # Nested calls inside one subsystem are timed once
+    timer = SubsystemTimer(env, {'dialog': ('', ['read_dialog', 'read_dialog_inner'])})
+    env.read_dialog()
+    timer.restore()
+    assert timer.calls['dialog'] == 1
+
+    write_results({'runs': {'run': results}}, tmp_path / "baseline.json")
+    baseline = json.loads((tmp_path / "baseline.json").read_text())
+    assert compare({'runs': {'run': results}}, baseline) == []
+    slower = dict(results, steps_per_sec=baseline['runs']['run']['steps_per_sec'] * 0.5)
+    assert [line.split(' ')[1] for line in compare({'runs': {'run': slower}}, baseline)] == ['steps_per_sec']
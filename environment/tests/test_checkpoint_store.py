@@ -0,0 +1,41 @@
+import numpy as np
+
+from environment.environment_helpers.checkpoint_store import CheckpointStore, chunk_boundaries
+
+
+def _state(seed=0, size=120_000):
+    """Stand-in for a save_state blob: low-entropy bytes with a zeroed region"""
+    blob = bytearray(np.random.default_rng(seed).integers(0, 16, size, dtype=np.uint8).tobytes())
+    blob[30_000:70_000] = bytes(40_000)
+    return blob
+
+
+def test_boundaries_are_content_defined():
+    blob = bytes(_state())
+    cuts = chunk_boundaries(blob)
+    assert cuts[-1] == len(blob) and cuts == sorted(set(cuts))
+    # Inserting bytes near the start leaves the later cut points in place (shifted)
+    shifted = chunk_boundaries(b"xyz" + blob)
+    assert len(set(c + 3 for c in cuts) & set(shifted)) >= len(cuts) - 2
+
+
+def test_dedup_roundtrip_and_bounded_autosaves(tmp_path):
+    store = CheckpointStore(tmp_path, keep=3)
+    blob = _state()
+    first = store.put("start", bytes(blob), step=0, pinned=True)
+    assert first["new_bytes"] < len(blob) // 2
+
+    for step in range(1, 8):
+        blob[step * 997] ^= 0xFF
+        manifest = store.put(f"auto_{step:09d}", bytes(blob), step=step)
+        assert manifest["new_bytes"] < first["new_bytes"] // 4
+
+    assert [m["name"] for m in store.checkpoints()] == ["start", "auto_000000005", "auto_000000006", "auto_000000007"]
+    assert store.get("auto_000000007") == bytes(blob)
+
+    # Reopening sees the same checkpoints; pruned chunks are gone from disk
+    reopened = CheckpointStore(tmp_path, keep=3)
+    assert reopened.get("start") == bytes(_state())
+    assert len(list((tmp_path / "chunks").glob("*/*.z"))) == len(reopened._chunk_sizes)
+    reopened.delete("start")
+    assert "start" not in reopened and reopened.latest()["name"] == "auto_000000007"
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import socket
+import time
+
+from web.event_fanout import STALL_TIMEOUT, EventFanout, _Client, sse_message
+
+
+def _events(payload: bytes):
+    return [json.loads(chunk[len(b"data: "):]) for chunk in payload.split(b"\n\n") if chunk.startswith(b"data: ")]
+
+
+def test_state_events_coalesce_and_one_offs_queue():
+    client = _Client(max_pending=10)
+    for i in range(5):
+        client.offer('location', sse_message('location', i), seq=i)
+    client.offer('speech_bubble', sse_message('speech_bubble', 'a'), seq=5)
+    client.offer('speech_bubble', sse_message('speech_bubble', 'b'), seq=6)
+    events = _events(b''.join(client.pending.values()))
+    assert events == [
+        {'type': 'location', 'data': 4},
+        {'type': 'speech_bubble', 'data': 'a'},
+        {'type': 'speech_bubble', 'data': 'b'},
+    ]
+
+
+def test_overflow_resyncs_then_drops():
+    fanout = EventFanout(lambda: [('location', {'x': 1})], max_pending=3)
+    client = _Client(fanout.max_pending)
+    fanout._clients.add(client)
+
+    for i in range(4):
+        fanout._dispatch('action', sse_message('action', i))
+    assert fanout.resyncs == 1 and client.resyncing
+    assert _events(b''.join(client.pending.values())) == [{'type': 'location', 'data': {'x': 1}}]
+
+    # A client that is still reading is resynced again
+    for i in range(4):
+        fanout._dispatch('action', sse_message('action', i))
+    assert fanout.resyncs == 2 and not client.dropped
+
+    # One that has not completed a write for a while is disconnected
+    client.last_progress -= STALL_TIMEOUT + 1
+    for i in range(4):
+        fanout._dispatch('action', sse_message('action', i))
+    assert client.dropped and fanout.drops == 1
+    assert fanout.client_count == 0
+
+
+def test_clients_get_snapshot_then_broadcasts():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    fanout = EventFanout(lambda: [('connected', {'server_id': 1}), ('stats', None)], '127.0.0.1', port)
+    fanout.start()
+    assert fanout.running.wait(5)
+
+    async def run():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"GET /events HTTP/1.1\r\nHost: x\r\n\r\n")
+        headers = await reader.readuntil(b"\r\n\r\n")
+        first = await reader.readuntil(b"\n\n")
+        while fanout.client_count == 0:
+            await asyncio.sleep(0.01)
+        fanout.broadcast('location', {'x': 2})
+        second = await asyncio.wait_for(reader.readuntil(b"\n\n"), 5)
+        writer.close()
+        return headers, first, second
+
+    headers, first, second = asyncio.run(run())
+    assert b"text/event-stream" in headers
+    assert _events(first) == [{'type': 'connected', 'data': {'server_id': 1}}]
+    assert _events(second) == [{'type': 'location', 'data': {'x': 2}}]
+
+
+def test_client_that_never_reads_is_disconnected():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    fanout = EventFanout(lambda: [], '127.0.0.1', port, stall_timeout=0.5)
+    fanout.start()
+    assert fanout.running.wait(5)
+
+    with socket.socket() as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.connect(('127.0.0.1', port))
+        sock.sendall(b"GET /events HTTP/1.1\r\nHost: x\r\n\r\n")
+        deadline = time.monotonic() + 10
+        while fanout.client_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # Fill the socket buffers until the server's write stalls, then wait it out
+        payload = 'x' * 256 * 1024
+        while fanout.drops == 0 and time.monotonic() < deadline:
+            fanout.broadcast('action', payload)
+            time.sleep(0.05)
+        assert fanout.drops == 1 and fanout.client_count == 0
+
+        # The server side is gone, not just forgotten
+        sock.settimeout(5)
+        try:
+            while sock.recv(1 << 20):
+                pass
+        except ConnectionResetError:
+            pass
@@ -0,0 +1,47 @@
+from environment.environment_helpers.event_log import EventLog, iter_events, load_events
+from scripts.query_events import count_by
+
+
+def test_typed_events_roundtrip_filter_and_aggregate(tmp_path):
+    path = tmp_path / "run_events.bin"
+    with EventLog(path) as log:
+        for step in range(100):
+            log.set_context(step, 3 if step < 50 else 4)
+            log.emit("position", map_id=0, x=step % 10, y=5, gy=300 + step, gx=100)
+            log.emit("trigger_evaluated", trigger_id=f"{log.quest:03d}_0", result=step % 25 == 24, values="map 0")
+        log.emit("quest_transition", from_quest=3, to_quest=4)
+    with open(path, "ab") as f:
+        f.write(b"\x10\x00\x05")  # torn record
+
+    tables = load_events(path)
+    assert len(tables["position"]["step"]) == 100 and tables["position"]["gy"][-1] == 399
+    assert tables["quest_transition"]["to_quest"].tolist() == [4]
+
+    triggers = load_events(path, kinds=["trigger_evaluated"], steps=(40, 79), quest=4)
+    assert set(triggers) == {"trigger_evaluated"}
+    assert triggers["trigger_evaluated"]["step"].tolist() == list(range(50, 80))
+    assert count_by(triggers, ["trigger_id", "result"]) == {("004_0", False): 29, ("004_0", True): 1}
+
+    # Appending to an existing log keeps it readable
+    with EventLog(path.with_name("b.bin")) as log:
+        log.emit("stage_action", action=3, original_action=6, source="path_follow")
+    with EventLog(path.with_name("b.bin")) as log:
+        log.emit("nav_snap", map_id=1, from_index=2, to_index=9, distance=4, recovery="normal")
+    kinds = [kind for kind, *_ in iter_events(path.with_name("b.bin"))]
+    assert kinds == ["stage_action", "nav_snap"]
+
+
+def test_append_after_torn_record(tmp_path):
+    path = tmp_path / "run_events.bin"
+    with EventLog(path) as log:
+        log.emit("quest_transition", from_quest=1, to_quest=2)
+    with open(path, "ab") as f:
+        f.write(b"\x10\x00\x05")  # crash mid-write
+
+    with EventLog(path) as log:
+        for step in range(5):
+            log.set_context(step, 2)
+            log.emit("position", map_id=0, x=step, y=1, gy=0, gx=0)
+    events = list(iter_events(path))
+    assert [kind for kind, *_ in events] == ["quest_transition"] + ["position"] * 5
+    assert [fields["x"] for kind, _, _, _, fields in events[1:]] == [0, 1, 2, 3, 4]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from environment.environment_helpers.frame_channel import FrameChannel, get_channel
+
+
+@pytest.fixture
+def channel():
+    ch = FrameChannel(4, 2)
+    yield ch
+    ch.close()
+
+
+def _frame(value):
+    return np.full((2, 4, 3), value, dtype=np.uint8)
+
+
+def test_empty_channel_has_no_frame(channel):
+    assert channel.seq == 0
+    assert channel.read() == (0, None)
+
+
+def test_write_flips_buffers_and_bumps_sequence(channel):
+    assert channel.write(_frame(1)) == 1
+    assert channel.write(_frame(2)) == 2
+    seq, view = channel.front()
+    assert seq == 2
+    assert int(view[0, 0, 0]) == 2
+    # Frame 1 is still intact in the back buffer until the next write starts
+    assert channel.still_valid(1)
+    channel.back_buffer()
+    assert not channel.still_valid(1)
+
+
+def test_in_place_render_into_back_buffer(channel):
+    back = channel.back_buffer()
+    back[:] = 7
+    seq = channel.publish()
+    assert channel.read()[0] == seq
+    assert int(channel.read()[1][1, 3, 2]) == 7
+
+
+def test_attach_by_name_sees_writer_frames(channel):
+    channel.write(_frame(5))
+    reader = FrameChannel.attach(channel.name)
+    try:
+        assert (reader.width, reader.height) == (4, 2)
+        seq, frame = reader.read()
+        assert seq == 1 and int(frame[1, 1, 1]) == 5
+        channel.write(_frame(6))
+        assert reader.seq == 2
+    finally:
+        reader.close()
+
+
+def test_get_channel_missing_returns_none():
+    assert get_channel("psm_does_not_exist") is None
@@ -0,0 +1,84 @@
+import asyncio
+import socket
+
+import numpy as np
+import pytest
+
+from environment.environment_helpers.frame_channel import FrameChannel, register_channel, unregister_channel
+from environment.environment_helpers.status_publisher import FrameRef
+from web.frame_codec import FLAG_DELTA, FrameStreamEncoder, decode_message, rle_decode, rle_encode
+from web.stream_server import FrameStreamServer, websockets
+
+SHADES = np.array([[255, 255, 255], [170, 170, 170], [85, 85, 85], [0, 0, 0]], dtype=np.uint8)
+
+
+def _gb_frame(seed):
+    rng = np.random.default_rng(seed)
+    frame = SHADES[rng.integers(0, 4, size=(144, 160))]
+    frame[:60] = SHADES[0]
+    return frame
+
+
+@pytest.mark.parametrize("data", [
+    np.zeros(1000, dtype=np.uint8),
+    np.arange(1000, dtype=np.uint32).astype(np.uint8),
+    np.array([1, 1, 2, 3, 3, 3, 3, 4], dtype=np.uint8),
+])
+def test_rle_round_trip(data):
+    assert np.array_equal(rle_decode(rle_encode(data), data.size), data)
+
+
+def test_deltas_and_keyframes():
+    encoder = FrameStreamEncoder()
+    first, second = _gb_frame(0), _gb_frame(0)
+    second[100:110, 20:30] = SHADES[3]
+
+    key = encoder.encode(0, 1, first)
+    delta = encoder.encode(0, 2, second)
+    assert delta[2] & FLAG_DELTA and len(delta) < len(key) // 20
+
+    _, _, frame, plane = decode_message(key)
+    assert np.array_equal(frame, first)
+    _, seq, frame, _ = decode_message(delta, plane)
+    assert seq == 2 and np.array_equal(frame, second)
+
+    # Viewers that had frame 1 get the delta, everyone else a keyframe
+    assert encoder.message_for(0, 1) == (2, delta)
+    seq, message = encoder.message_for(0, None)
+    assert not message[2] & FLAG_DELTA
+    assert np.array_equal(decode_message(message)[2], second)
+    assert encoder.message_for(0, 2) is None
+
+
+def test_many_colours_fall_back_to_rgb():
+    frame = np.random.default_rng(1).integers(0, 256, size=(144, 160, 3), dtype=np.uint8)
+    message = FrameStreamEncoder().encode(1, 7, frame)
+    channel, seq, decoded, _ = decode_message(message)
+    assert (channel, seq) == (1, 7) and np.array_equal(decoded, frame)
+
+
+@pytest.mark.skipif(websockets is None, reason="websockets not installed")
+def test_stream_server_sends_frames():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    server = FrameStreamServer('127.0.0.1', port)
+    server.start()
+    assert server.running.wait(5)
+
+    channel = FrameChannel(160, 144)
+    register_channel(channel)
+    try:
+        frame = _gb_frame(2)
+        seq = channel.write(frame)
+        assert server.publish('__emulator_screen__', FrameRef(channel.name, seq, 160, 144))
+
+        async def receive():
+            async with websockets.connect(f"ws://127.0.0.1:{port}/frames") as ws:
+                return await asyncio.wait_for(ws.recv(), 5)
+
+        _, got_seq, decoded, _ = decode_message(asyncio.run(receive()))
+        assert got_seq == seq and np.array_equal(decoded, frame)
+    finally:
+        unregister_channel(channel)
+        channel.close()
@@ -0,0 +1,53 @@
+import logging
+
+from utils.logging_config import LineCountRotatingFileHandler, PokemonLogger, QueueLogWriter
+
+
+def _record(msg):
+    return logging.LogRecord("t", logging.INFO, "", 0, msg, (), None)
+
+
+def test_rotating_handler_keeps_file_open_and_rotates_by_lines(tmp_path):
+    handler = LineCountRotatingFileHandler(tmp_path / "game.log", max_lines=10, backup_count=2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    stream = handler._stream
+    for i in range(9):
+        handler.handle(_record(f"line {i}"))
+    assert handler._stream is stream  # no reopen per record
+    assert handler.current_lines == 10
+
+    for i in range(9, 40):
+        handler.handle(_record(f"line {i}"))
+    handler.close()
+    backups = sorted(tmp_path.glob("game_*.log"))
+    assert len(backups) == 2  # older backups were cleaned up
+    lines = (tmp_path / "game.log").read_text().splitlines()
+    assert lines[0].startswith("# Log rotated") and lines[-1] == "line 39"
+
+    # Reopening counts the existing lines
+    assert LineCountRotatingFileHandler(tmp_path / "game.log", max_lines=10).current_lines == len(lines)
+
+
+def test_queue_writer_drops_instead_of_blocking(tmp_path):
+    writer = QueueLogWriter(maxsize=3)
+    target = LineCountRotatingFileHandler(tmp_path / "q.log", max_lines=1000)
+    front = writer.handler_for(target)
+    for i in range(5):  # writer thread not started: the queue fills up
+        front.handle(_record(f"msg {i}"))
+    assert writer.dropped == 2
+
+    writer.start()
+    assert writer.flush()
+    writer.stop()
+    target.close()
+    assert (tmp_path / "q.log").read_text().splitlines()[1:] == ["msg 0", "msg 1", "msg 2"]
+
+
+def test_pokemon_logger_writes_from_background_thread(tmp_path):
+    logger = PokemonLogger(tmp_path, overwrite_logs=True)
+    logger.log_quest_event("002", "Quest advanced", {"from": 1})
+    logger.log_debug("TEST", "structured", {"x": 1})
+    logger.flush()
+    assert "Quest 002: Quest advanced" in (tmp_path / "quest.log").read_text()
+    assert '"component": "TEST"' in (tmp_path / "debug.log").read_text()
+    logger.close()
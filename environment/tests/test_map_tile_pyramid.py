@@ -0,0 +1,41 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from environment.environment_helpers.map_tile_pyramid import TilePyramid
+
+
+@pytest.fixture
+def pyramid(tmp_path):
+    # 600x300 map: max zoom 2 (3x2 tiles of 256px), zoom 0 is a single 150x75 tile
+    pixels = np.zeros((300, 600, 3), dtype=np.uint8)
+    pixels[:, :, 0] = np.arange(600) % 256
+    pixels[280:, 590:] = (1, 2, 3)
+    path = tmp_path / "map.png"
+    Image.fromarray(pixels).save(path)
+    return TilePyramid(path, tile_size=256), pixels
+
+
+def test_levels_and_edge_tiles(pyramid):
+    pyramid, pixels = pyramid
+    assert pyramid.max_zoom == 2
+    assert pyramid.grid_size(2) == (3, 2)
+    assert pyramid.grid_size(0) == (1, 1)
+    assert pyramid.tile_png(2, 0, 0, timeout=0) is None  # not built yet
+
+    pyramid.build()
+    edge = np.asarray(Image.open(io.BytesIO(pyramid.tile_png(2, 2, 1))))
+    assert edge.shape == (300 - 256, 600 - 512, 3)
+    assert tuple(edge[-1, -1]) == (1, 2, 3)
+    assert np.array_equal(np.asarray(pyramid.tile_image(2, 1, 0)), pixels[:256, 256:512])
+    assert pyramid.tile_image(0, 0, 0).size == (150, 75)
+    assert pyramid.tile_png(2, 3, 0) is None
+
+
+def test_tiles_in_view(pyramid):
+    pyramid, _ = pyramid
+    assert list(pyramid.tiles_in_view(2, 250, 10, 20, 10)) == [(0, 0), (1, 0)]
+    assert list(pyramid.tiles_in_view(2, -100, -100, 50, 50)) == []
+    assert len(list(pyramid.tiles_in_view(2, -1000, -1000, 5000, 5000))) == 6
@@ -0,0 +1,52 @@
+import json
+import sys
+import textwrap
+
+from environment.environment_helpers.checkpoint_store import CheckpointStore
+from environment.environment_helpers.run_manager import RunManager
+from environment.orchestrator import Orchestrator, SessionSpec, load_specs, restore_from_checkpoint
+
+# Reports 40 steps, then crashes on the first attempt and finishes on the second
+_FAKE_SESSION = textwrap.dedent("""
+    import json, sys, time
+    progress_path, resume = sys.argv[1], sys.argv[2] == "1"
+    with open(progress_path, "w") as f:
+        json.dump({"steps": 40, "current_quest": 7 if resume else 5, "updated": time.time()}, f)
+    sys.exit(0 if resume else 3)
+""")
+
+
+def test_restarts_crashed_session_from_checkpoint(tmp_path):
+    def command(run, resume):
+        return [sys.executable, "-c", _FAKE_SESSION, str(run.progress_path), "1" if resume else "0"]
+
+    specs = [SessionSpec(name="a", max_steps=100), SessionSpec(name="b", max_steps=100)]
+    orchestrator = Orchestrator(specs, tmp_path, parallel=1, max_restarts=1, restart_backoff=0.0, command=command)
+
+    # Session a already has a run with autosaves from before its crash
+    run_info = RunManager(orchestrator.runs[0].recordings_dir).create_run_directory("PALLET_TOWN", 0)
+    store = CheckpointStore(run_info.checkpoint_dir)
+    store.put("auto_000000020", b"old" * 1000, step=20)
+    store.put("auto_000000040", b"new" * 1000, step=40)
+
+    summary = orchestrator.run(poll_interval=0.01)
+    assert (summary['finished'], summary['failed'], summary['restarts'], summary['total_steps']) == (2, 0, 2, 160)
+    a = summary['sessions']['a']
+    assert (a['attempts'], a['exit_codes'], a['current_quest']) == (2, [3, 0], 7)
+    assert a['restored_from'] == [str(run_info.end_state_path)]
+    assert run_info.end_state_path.read_bytes() == b"new" * 1000
+    assert summary['sessions']['b']['restored_from'] == []
+    assert "attempt 2" in (tmp_path / "a" / "session.log").read_text()
+
+    # The end state is now newer than every checkpoint
+    assert restore_from_checkpoint(orchestrator.runs[0].recordings_dir) is None
+
+
+def test_load_specs(tmp_path):
+    path = tmp_path / "sessions.json"
+    path.write_text(json.dumps({'sessions': [{'name': "r22", 'max_steps': 50, 'args': ["--max_seconds", 60]}, {}]}))
+    specs = load_specs(path, SessionSpec(name="", state="start.state", max_steps=10))
+    assert [(s.name, s.state, s.max_steps, s.args) for s in specs] == [
+        ("r22", "start.state", 50, ["--max_seconds", "60"]),
+        ("session_001", "start.state", 10, []),
+    ]
@@ -0,0 +1,43 @@
+from scripts.parse_logs import LogIndex, ParallelLogParser, PokemonLogParser, log_file_series
+
+
+def _write_log(path, first_step, steps):
+    lines = []
+    for step in range(first_step, first_step + steps):
+        lines.append(f"environment.py: step(): START OF STEP {step}; location: (5, 6, 0)")
+        lines.append(f"[SNAP_DEBUG] Nearest coordinate: index {step}, coord (10, 20), distance 3")
+        if step % 10 == 0:
+            lines.append(f"[TRIGGER] 012_{step // 10} -> COMPLETED | map 0 | ok")
+        lines.append("2025-01-01 12:00:00 | INFO     | pokemon.game | plain line")
+    with open(path, "a") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def test_parallel_parse_matches_serial_and_index_seeks(tmp_path):
+    log = tmp_path / "game.log"
+    _write_log(tmp_path / "game_20250101_120000.log", 0, 100)
+    _write_log(log, 100, 200)
+    assert log_file_series(log) == [tmp_path / "game_20250101_120000.log", log]
+
+    serial = PokemonLogParser()
+    expected = [e.event_type for f in log_file_series(log) for e in serial.parse_file(f)]
+    parser = ParallelLogParser(workers=2, chunk_bytes=4096)
+    events = parser.parse_files(log_file_series(log))
+    assert [e.event_type for e in events] == expected
+    assert events[-1].data['line_number'] == len(log.read_text().splitlines())
+
+    index = LogIndex.load(log)
+    assert index.size == log.stat().st_size and "NAV_SNAP" in index.type_names
+    snaps = parser.query([log], ["NAV_SNAP"], (150, 159))
+    assert [e.data['index'] for e in snaps] == list(range(150, 160))
+    triggers = parser.query(log_file_series(log), ["TRIGGER_STATUS"], (None, 30))
+    assert [e.data['trigger_id'] for e in triggers] == ["012_0", "012_1", "012_2", "012_3"]
+    plain = parser.query([log], ["STANDARD"], (299, None))
+    assert len(plain) == 1
+
+    # Appended lines are indexed incrementally from the previous size
+    old_size = index.size
+    _write_log(log, 300, 5)
+    index = parser.index(log)
+    assert index.size > old_size and index.last_step == 304
+    assert [e.data['index'] for e in parser.query([log], ["NAV_SNAP"], (303, None))] == [303, 304]
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+
+from environment.environment_helpers.path_trace import PathTraceRecorder, load_map_coords, load_trace
+from environment.environment_helpers.run_manager import RunManager
+
+
+def _legacy_trace(positions):
+    """What update_path_trace used to build"""
+    data = {}
+    for map_n, gy, gx in positions:
+        trace = data.setdefault(str(map_n), [])
+        if not trace or trace[-1] != [gy, gx]:
+            trace.append([gy, gx])
+    return data
+
+
+def test_run_length_rows_and_legacy_dict():
+    positions = [(0, 338, 84)] * 5 + [(0, 339, 84), (0, 339, 84), (37, 340, 90), (0, 339, 84)]
+    recorder = PathTraceRecorder(capacity=2)
+    for step, pos in enumerate(positions):
+        recorder.append(step, *pos)
+
+    assert recorder.rows.dtype == np.int16
+    assert recorder.rows.tolist() == [[0, 0, 338, 84], [5, 0, 339, 84], [2, 37, 340, 90], [1, 0, 339, 84]]
+    assert recorder.trace().steps.tolist() == [0, 5, 7, 8]
+    assert recorder.to_map_coords() == _legacy_trace(positions)
+
+
+def test_chunks_hold_only_new_rows_and_load_back(tmp_path):
+    manager = RunManager(tmp_path)
+    run_info = manager.create_run_directory("PALLET TOWN", 0)
+    recorder = PathTraceRecorder()
+    recorder.append(10, 0, 1, 1)
+    recorder.append(11, 0, 1, 2)
+    manager.save_coordinates(recorder, run_info)
+    manager.save_coordinates(recorder, run_info)  # nothing new: no chunk
+    recorder.append(40_000, 0, 1, 3)  # gap wider than int16
+    manager.save_coordinates(recorder, run_info)
+
+    chunks = sorted(p.name for p in run_info.run_dir.glob("*.npz"))
+    assert chunks == [f"{run_info.run_id}_trace_0000.npz", f"{run_info.run_id}_trace_0001.npz"]
+    trace = load_trace(run_info.run_dir)
+    assert trace.steps.tolist() == [10, 11, 11 + 32767, 40_000]
+    assert load_map_coords(run_info.coords_path) == {"0": [[1, 1], [1, 2], [1, 3]]}
+
+    # A new session of the same run continues the chunk numbering
+    resumed = PathTraceRecorder()
+    resumed.append(50_000, 1, 5, 5)
+    assert resumed.save_chunks(run_info.trace_prefix).name.endswith("_trace_0002.npz")
+    assert len(load_trace(run_info.coords_path)) == 5
+
+    legacy = tmp_path / "001_coords.json"
+    legacy.write_text(json.dumps({"0": [[3, 4]]}))
+    assert load_map_coords(legacy) == {"0": [[3, 4]]}
@@ -0,0 +1,40 @@
+import gzip
+import json
+
+from environment.environment_helpers.quest_catalog import QuestCatalog, get_quest_catalog
+from web import web_server
+
+
+def test_indexes_and_trigger_metadata(tmp_path):
+    path = tmp_path / "quests.json"
+    path.write_text(json.dumps([
+        {"quest_id": "002", "location_id": 12, "event_triggers": [{"type": "current_map_id"}, {"type": "dialog_contains_text"}]},
+        {"quest_id": "001", "location_id": 12},
+        {"quest_id": "bad"},
+        "not a quest",
+    ]))
+    catalog = QuestCatalog(path)
+
+    assert len(catalog) == 2
+    assert catalog.get(2) is catalog.get("2") is catalog.get("002") is catalog.by_padded_id["002"]
+    assert catalog.get(3) is None and catalog.get(None) is None
+    assert catalog.quests_at(12) == [1, 2]
+    assert [t.trigger_id for t in catalog.triggers_for("002")] == ["002_0", "002_1"]
+    assert catalog.triggers["002_1"].type == "dialog_contains_text"
+    assert json.loads(gzip.decompress(catalog.gzip_payload())) == catalog.quests
+
+
+def test_missing_file_gives_empty_catalog(tmp_path):
+    catalog = QuestCatalog(tmp_path / "missing.json")
+    assert len(catalog) == 0 and catalog.get(1) is None
+
+
+def test_route_serves_gzip_with_etag():
+    client = web_server.app.test_client()
+    response = client.get('/required_completions.json', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200 and response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.data)) == get_quest_catalog().quests
+
+    again = client.get('/required_completions.json', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag']})
+    assert again.status_code == 304
+    assert client.get('/required_completions.json').get_json() == get_quest_catalog().quests
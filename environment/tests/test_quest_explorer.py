@@ -0,0 +1,37 @@
+import random
+
+from environment.quest_explorer import find_quest_states, make_tasks, perturb_action, summarize
+
+
+def test_tasks_states_and_summary(tmp_path):
+    (tmp_path / "004.state").write_bytes(b"s4")
+    (tmp_path / "012_viridian_mart.state").write_bytes(b"s12")
+    (tmp_path / "0120.state").write_bytes(b"x")
+    (tmp_path / "013_notes.txt").write_text("not a state")
+    states = find_quest_states(tmp_path, [4, 12, 13])
+    assert {qid: p.name[:3] for qid, p in states.items()} == {4: "004", 12: "012"}
+    assert find_quest_states(tmp_path / "004.state", [1, 2]).keys() == {1, 2}
+
+    tasks = make_tasks(states, trials=3, perturb=0.1, max_steps=100)
+    assert [(t.quest_id, t.trial) for t in tasks[:4]] == [(4, 0), (12, 0), (4, 1), (12, 1)]
+    assert [t.perturb for t in tasks if t.trial == 0] == [0.0, 0.0]
+    assert len({t.seed for t in tasks}) == len(tasks)
+
+    rng_a, rng_b = random.Random(7), random.Random(7)
+    run_a = [perturb_action(rng_a, 6, 0.3) for _ in range(50)]
+    assert run_a == [perturb_action(rng_b, 6, 0.3) for _ in range(50)]
+    assert 6 in run_a and set(run_a) - {6}
+    assert all(perturb_action(rng_a, 6, 0.0) == 6 for _ in range(20))
+
+    results = [
+        {'quest': 4, 'trial': 0, 'completed': True, 'steps': 120},
+        {'quest': 4, 'trial': 1, 'completed': True, 'steps': 80},
+        {'quest': 4, 'trial': 2, 'completed': False, 'steps': 100},
+        {'quest': 12, 'trial': 0, 'completed': False, 'steps': 0, 'error': "RuntimeError: boom"},
+    ]
+    summary = summarize(results)
+    assert summary['completed'] == 2 and summary['completion_rate'] == 0.5
+    q4 = summary['quests']['004']
+    assert (q4['completion_rate'], q4['steps_mean'], q4['steps_min'], q4['steps_max']) == (0.667, 100.0, 80, 120)
+    assert q4['baseline_completed'] is True
+    assert summary['quests']['012']['errors'] == 1 and summary['quests']['012']['steps_mean'] is None
@@ -0,0 +1,124 @@
+import io
+import json
+import os
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from environment.environment_helpers.map_tile_pyramid import TilePyramid
+from web import web_server
+from web.quest_map_cache import QuestMapCache, QuestTileLayer
+from web.quest_map_generator import PAD_COL, PAD_ROW
+
+
+def _write_coords(quest_dir, quest_id, coords):
+    qid = f"{quest_id:03}"
+    path = quest_dir / qid / f"{qid}_coords.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"0": coords}))
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    encoded = []
+
+    def encoder(quest_ids):
+        encoded.append(quest_ids)
+        return f"png{len(encoded)}".encode()
+
+    _write_coords(tmp_path, 1, [[10, 10]])
+    cache = QuestMapCache(tmp_path, encoder=encoder)
+    cache.encoded = encoded
+    return cache
+
+
+def test_get_never_encodes_on_the_calling_thread(cache, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(cache, "_schedule", scheduled.append)
+
+    assert cache.get([1]) is None
+    assert scheduled == [(1,)] and cache.encoded == []
+
+    built = cache.build([1])
+    assert cache.get([1]) is built
+    assert scheduled == [(1,)]
+
+
+def test_quest_file_change_invalidates(cache, monkeypatch, tmp_path):
+    scheduled = []
+    monkeypatch.setattr(cache, "_schedule", scheduled.append)
+    first = cache.build([1])
+
+    path = _write_coords(tmp_path, 1, [[10, 10], [10, 11]])
+    os.utime(path, ns=(1, 1))
+    # Stale bytes keep being served while the rebuild is pending
+    assert cache.get([1]) is first
+    assert scheduled == [(1,)]
+
+    second = cache.build([1])
+    assert second.etag != first.etag
+    # Quest sets are normalised; a different set is a separate entry
+    assert cache.get([1, 1]) is second
+    assert cache.get([2, 1]) is None
+
+
+def test_route_serves_etag_and_304(cache, monkeypatch):
+    cache.build(None)
+    monkeypatch.setattr(web_server, "quest_map_cache", cache)
+    client = web_server.app.test_client()
+
+    response = client.get('/global-map.png')
+    assert response.status_code == 200
+    assert response.data == b"png1"
+    etag = response.headers['ETag']
+
+    response = client.get('/global-map.png', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert client.get('/global-map.png?quests=x').status_code == 400
+
+
+def test_quest_tiles_follow_coords_files(tmp_path):
+    Image.new('RGB', (512, 512)).save(tmp_path / "map.png")
+    layer = QuestTileLayer(TilePyramid(tmp_path / "map.png"), tmp_path, quest_ids=[1])
+    _write_coords(tmp_path, 1, [[PAD_ROW + 1, PAD_COL + 2]])  # map tile (2, 1) -> pixels (32, 16)
+
+    tile = Image.open(io.BytesIO(layer.tile_png(1, 0, 0)))
+    assert tile.getpixel((32, 16))[3] == 255 and tile.getpixel((0, 0))[3] == 0
+    version = layer.version()
+
+    path = _write_coords(tmp_path, 1, [[PAD_ROW, PAD_COL]])
+    os.utime(path, ns=(1, 1))
+    assert layer.version() != version
+    tile = Image.open(io.BytesIO(layer.tile_png(1, 0, 0)))
+    assert tile.getpixel((0, 0))[3] == 255 and tile.getpixel((32, 16))[3] == 0
+    assert layer.tile_png(1, 5, 0) is None
+
+
+def test_builds_share_one_worker_and_quest_sets_are_capped(tmp_path):
+    threads = []
+
+    def encoder(quest_ids):
+        threads.append(threading.current_thread().name)
+        return repr(quest_ids).encode()
+
+    cache = QuestMapCache(tmp_path, encoder=encoder, max_entries=2)
+    assert cache.get([1]) is None and cache.get([2]) is None
+    # A third distinct set is neither built nor allowed to evict the others
+    assert cache.get([3]) is None and cache.rejected == 1
+
+    deadline = time.monotonic() + 5
+    while cache.builds < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get([1]).png == b"(1,)" and cache.get([2]).png == b"(2,)"
+    assert cache.get([3]) is None and cache.builds == 2
+    assert len(set(threads)) == 1
+
+
+def test_route_rejects_unknown_quest_ids(cache, monkeypatch):
+    monkeypatch.setattr(web_server, "quest_map_cache", cache)
+    client = web_server.app.test_client()
+    assert client.get('/global-map.png?quests=1,9999').status_code == 400
+    assert cache.builds == 0 and cache.encoded == []
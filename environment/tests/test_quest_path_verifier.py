@@ -0,0 +1,92 @@
+import numpy as np
+
+from environment.quest_path_verifier import DIRECTIONS, PathWalker, build_report
+
+
+class _GridWorld:
+    """Tile world: walls per map, warps (pos, map) -> (pos, map)"""
+
+    def __init__(self, pos, map_id, walls=(), warps=None):
+        self.pos, self.map_id = pos, map_id
+        self.walls = set(walls)
+        self.warps = warps or {}
+        self.actions = []
+
+    def get_game_coords(self):
+        return self.pos[1], self.pos[0], self.map_id
+
+    def get_collision_grid(self):
+        grid = np.zeros((9, 10), dtype=np.uint8)
+        for (gy, gx, m) in self.walls:
+            dy, dx = gy - self.pos[0], gx - self.pos[1]
+            if m == self.map_id and abs(dy) <= 4 and abs(dx) <= 4:
+                grid[4 + dy, 4 + dx] = 1
+        return grid
+
+    def read_m(self, name):
+        return 0
+
+    def read_dialog(self):
+        return ""
+
+    def step(self, action):
+        self.actions.append(action)
+        delta = next((d for d, (a, _) in DIRECTIONS.items() if a == action), None)
+        if delta is None:
+            return
+        nxt = (self.pos[0] + delta[0], self.pos[1] + delta[1])
+        if (*nxt, self.map_id) in self.walls:
+            return
+        self.pos = nxt
+        if (nxt, self.map_id) in self.warps:
+            self.pos, self.map_id = self.warps[(nxt, self.map_id)]
+
+
+class _Navigator:
+    def __init__(self, world):
+        self.world = world
+        self.current_coordinate_index = 0
+
+    def _get_player_global_coords(self):
+        return self.world.pos
+
+
+def _walker(world, coords, map_ids):
+    return PathWalker(world, _Navigator(world), world.step, coords, map_ids, retries=2)
+
+
+def test_walker_follows_warps_and_reports_first_problem():
+    coords = [(10, 10), (10, 11), (10, 12), (50, 50), (51, 50)]
+    map_ids = [1, 1, 1, 2, 2]
+    warps = {((10, 12), 1): ((50, 50), 2)}
+
+    world = _GridWorld((10, 10), 1, warps=warps)
+    walker = _walker(world, coords, map_ids)
+    assert walker.start() == 0
+    assert walker.walk(0) is None
+    assert walker.index == 4 and walker.navigator.current_coordinate_index == 4
+    assert world.actions == [2, 2, 0]
+
+    # A wall on the path
+    world = _GridWorld((10, 10), 1, walls={(10, 11, 1)}, warps=warps)
+    issue = _walker(world, coords, map_ids).walk(0)
+    assert (issue['kind'], issue['index'], issue['player']) == ("blocked_tile", 1, [10, 10])
+
+    # The door leads somewhere else
+    world = _GridWorld((10, 10), 1, warps={((10, 12), 1): ((70, 70), 3)})
+    issue = _walker(world, coords, map_ids).walk(0)
+    assert (issue['kind'], issue['index'], issue['player_map']) == ("warp_mismatch", 3, 3)
+
+    # Path ends on a tile with no warp (the next segment is on another map)
+    world = _GridWorld((10, 10), 1, walls={(10, 13, 1), (9, 12, 1), (11, 12, 1)})
+    issue = _walker(world, coords, map_ids).walk(0)
+    assert (issue['kind'], issue['index']) == ("warp_mismatch", 3)
+
+    report = build_report([
+        {'quest': 12, 'ok': True, 'issue': None},
+        {'quest': 3, 'ok': False, 'issue': issue},
+        {'quest': 7, 'ok': False, 'issue': None, 'error': "RuntimeError: boom"},
+    ])
+    assert (report['total'], report['passed']) == (3, 1)
+    assert report['issues'] == {"warp_mismatch": ["003"]} and report['errors'] == ["007"]
+    assert list(report['quests']) == ["003", "007", "012"]
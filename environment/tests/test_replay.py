@@ -0,0 +1,105 @@
+import io
+
+from environment.environment_helpers.action_log import ActionLog
+from environment.replay import RAM_HASH_EVERY, ReplayEngine, annotate_action_record, load_recorded_actions, tick_record
+
+
+class _FakePyBoy:
+    """64 KB address space whose save_state is the raw memory"""
+
+    def __init__(self):
+        self.memory = bytearray(0x10000)
+        self.frames = 0
+
+    def tick(self, count=1, render=True):
+        for _ in range(count):
+            self.frames += 1
+            self.memory[0xC000 + self.frames % 0x2000] ^= 0x5A
+
+    def save_state(self, f):
+        f.write(bytes(self.memory))
+
+    def load_state(self, f):
+        self.memory[:] = f.read()
+
+
+class _FakeEnv:
+    """Deterministic stand-in for RedGymEnv: each action mixes into work RAM"""
+
+    def __init__(self):
+        self.pyboy = _FakePyBoy()
+        self.step_count = 0
+        self.steps_run = 0
+
+    def reset(self, options=None):
+        self.pyboy.load_state(io.BytesIO(options["state"]))
+        self.step_count = 0
+
+    def step(self, action):
+        self.step_count += 1
+        self.steps_run += 1
+        self.last_emulator_action = None
+        if action is None:  # e.g. a move the navigator refused
+            return None, 0.0, False, False, {}
+        self.last_emulator_action = action
+        addr = 0xC000 + (self.step_count * 131) % 0x2000
+        self.pyboy.memory[addr] = (self.pyboy.memory[addr] + action + 1) % 256
+        return None, 0.0, False, False, {}
+
+
+def _record(tmp_path, n):
+    env = _FakeEnv()
+    start = bytes(env.pyboy.memory)
+    with ActionLog(tmp_path / "run_actions.ndjson") as log:
+        for i in range(n):
+            env.step(i % 7)
+            log.append(annotate_action_record(env, {'step': i + 1, 'action': 6}, i + 1))
+    return start, env
+
+
+def test_replay_verifies_ram_hashes_and_seeks_from_keyframes(tmp_path):
+    start, recorded_env = _record(tmp_path, 1000)
+    actions = load_recorded_actions(tmp_path)
+    assert actions[RAM_HASH_EVERY - 1]['ram_hash'] and actions[0]['emulator_action'] == 0
+
+    env = _FakeEnv()
+    engine = ReplayEngine(env, start, actions, keyframe_every=100, keyframe_dir=tmp_path / "keys")
+    engine.reset()
+    stats = engine.run()
+    assert stats['actions'] == 1000 and stats['verified'] == 10 and stats['mismatches'] == 0
+    assert env.pyboy.memory == recorded_env.pyboy.memory
+
+    env.steps_run = 0
+    engine.seek(750)
+    assert engine.position == 750 and env.steps_run == 50
+    engine.run(until=800)
+    assert engine.mismatches == []
+
+    # A divergent recording is reported at its hash checkpoints
+    actions[150]['emulator_action'] += 1
+    engine = ReplayEngine(_FakeEnv(), start, actions, keyframe_every=100)
+    engine.reset()
+    assert engine.run()['mismatches'] >= 1
+    assert engine.mismatches[0]['index'] == RAM_HASH_EVERY * 2 - 1
+
+
+def test_replay_reproduces_ticks_and_steps_without_input(tmp_path):
+    env = _FakeEnv()
+    start = bytes(env.pyboy.memory)
+    with ActionLog(tmp_path / "run_actions.ndjson") as log:
+        for i in range(RAM_HASH_EVERY):
+            if i % 3 == 0:
+                env.pyboy.tick(i % 5 + 1)
+                log.append(tick_record(env.step_count, i % 5 + 1))
+            env.step(None if i % 4 == 0 else i % 6)
+            log.append(annotate_action_record(env, {'step': env.step_count, 'action': 6}, env.step_count))
+    actions = load_recorded_actions(tmp_path)
+    assert actions[0]['ticks'] == 1 and actions[1]['emulator_action'] is None
+
+    replay_env = _FakeEnv()
+    engine = ReplayEngine(replay_env, start, actions, keyframe_every=50)
+    engine.reset()
+    stats = engine.run()
+    assert stats['verified'] == 1 and stats['mismatches'] == 0
+    assert replay_env.pyboy.memory == env.pyboy.memory and replay_env.step_count == env.step_count
+    assert replay_env.steps_run == RAM_HASH_EVERY - RAM_HASH_EVERY // 4
@@ -0,0 +1,45 @@
+import json
+import shutil
+
+from environment.environment_helpers.run_index import INDEX_FILENAME
+from environment.environment_helpers.run_manager import RunManager
+
+
+class _Env:
+    step_count = 420
+    current_loaded_quest_id = 15
+
+    class pyboy:
+        @staticmethod
+        def save_state(f):
+            f.write(b"state")
+
+
+def test_index_tracks_creates_saves_and_directory_changes(tmp_path):
+    manager = RunManager(tmp_path)
+    pallet = manager.create_run_directory("Pallet Town", 0)
+    viridian = manager.create_run_directory("VIRIDIAN_CITY", 1)
+    manager.save_final_state(_Env, pallet)
+
+    assert (tmp_path / INDEX_FILENAME).exists()
+    row = manager.index.get(pallet.run_id)
+    assert row["steps"] == 420 and row["final_quest"] == "015" and row["ended_at"] >= row["created_at"]
+    assert manager.get_latest_run().run_id == viridian.run_id
+    latest = manager.get_latest_run(map_id=0)
+    assert latest.run_id == pallet.run_id and latest.end_state_path == pallet.end_state_path
+
+    # A run copied in by hand is picked up; a deleted one disappears
+    copied = tmp_path / "001-CERULEAN_CITY-3-01012020"
+    copied.mkdir()
+    shutil.rmtree(viridian.run_dir)
+    assert [r.run_id for r in manager.list_runs()] == [pallet.run_id, copied.name]
+
+    # A fresh index rebuilt from the tree recovers the end-of-run fields
+    (tmp_path / "not-a-run").mkdir()
+    fresh = RunManager(tmp_path)
+    assert fresh.rebuild_index() == 2
+    assert fresh.index.get(pallet.run_id)["steps"] == 420
+    assert json.loads((pallet.run_dir / "run_metadata.json").read_text())["final_quest"] == 15
+
+    manager.cleanup_old_runs(keep_latest=1)
+    assert not copied.exists() and [r.run_id for r in RunManager(tmp_path).list_runs()] == [pallet.run_id]
@@ -0,0 +1,112 @@
+import pytest
+
+from environment.environment_helpers import scripted_overrides
+from environment.environment_helpers.scripted_overrides import ScriptedOverrideTable
+from environment.data.environment_data.species import Species
+
+
+class DummyItemHandler:
+    def __init__(self, quantities=None):
+        self.quantities = quantities or {}
+        self.bought = []
+
+    def get_item_quantity(self, item_id):
+        return self.quantities.get(item_id, 0)
+
+    def buy_item(self, item_id, quantity, price):
+        self.bought.append((item_id, quantity, price))
+
+    def force_refresh_item_cache(self):
+        pass
+
+
+class DummyPyBoy:
+    def game_area(self):
+        return None
+
+
+class DummyEnv:
+    def __init__(self, coords, facing="down", dialog="", party=(), never_run_again=False, step_count=0, items=None):
+        self.coords = coords
+        self.facing = facing
+        self.dialog = dialog
+        self.party = list(party)
+        self.never_run_again = never_run_again
+        self.step_count = step_count
+        self.item_handler = DummyItemHandler(items)
+        self.pyboy = DummyPyBoy()
+        self.direction_reads = 0
+
+    def get_game_coords(self):
+        return self.coords
+
+    def _get_direction(self, array):
+        self.direction_reads += 1
+        return self.facing
+
+    def read_dialog(self):
+        return self.dialog
+
+    def read_party(self):
+        return self.party
+
+
+@pytest.fixture(autouse=True)
+def identity_global_coords(monkeypatch):
+    # Treat local (x, y) as global (y, x) so tests can address tiles directly
+    monkeypatch.setattr(scripted_overrides, "local_to_global", lambda r, c, map_n: (r, c))
+
+
+def test_unknown_quest_returns_none():
+    table = ScriptedOverrideTable()
+    env = DummyEnv((152, 151, 0))
+    assert table.resolve(env, 99) is None
+    assert env.direction_reads == 0
+
+
+def test_off_tile_skips_direction_scan():
+    table = ScriptedOverrideTable()
+    env = DummyEnv((0, 0, 0))
+    assert table.resolve(env, 46) is None
+    assert env.direction_reads == 0
+
+
+def test_facing_and_flags_select_rule():
+    table = ScriptedOverrideTable()
+    assert table.resolve(DummyEnv((152, 151, 0), facing="left"), 46) == 3  # up
+    assert table.resolve(DummyEnv((152, 151, 0), facing="up"), 46) == 4  # a
+    assert table.resolve(DummyEnv((152, 151, 0), facing="up", never_run_again=True), 46) == 0  # down
+
+
+def test_party_check_and_step_parity():
+    table = ScriptedOverrideTable()
+    magikarp = Species.MAGIKARP.value
+    assert table.resolve(DummyEnv((159, 153, 0), never_run_again=True), 46) == 4
+    assert table.resolve(DummyEnv((159, 153, 0), never_run_again=True, party=[magikarp], step_count=2), 46) == 5
+    assert table.resolve(DummyEnv((159, 153, 0), never_run_again=True, party=[magikarp], step_count=3), 46) == 1
+
+
+def test_item_check():
+    table = ScriptedOverrideTable()
+    town_map = scripted_overrides.ITEM_NAME_TO_ID_DICT["TOWN_MAP"]
+    assert table.resolve(DummyEnv((107, 340, 0), facing="up"), 15) == 4
+    assert table.resolve(DummyEnv((107, 340, 0), facing="up", items={town_map: 1}), 15) == 0
+
+
+def test_quest_wide_dialog_rule():
+    table = ScriptedOverrideTable()
+    assert table.resolve(DummyEnv((0, 0, 0), dialog="Welcome to the world"), 1) == 4
+    assert table.resolve(DummyEnv((0, 0, 0), dialog="YOUR NAME?"), 1) is None
+    assert table.resolve(DummyEnv((0, 0, 0), dialog="Welcome to the", never_run_again=True), 1) is None
+
+
+def test_effect_without_action_falls_through():
+    table = ScriptedOverrideTable()
+    env = DummyEnv((132, 299, 0))
+    assert table.resolve(env, 22) is None
+    assert env.item_handler.bought == [(scripted_overrides.ITEM_NAME_TO_ID_DICT["POKE_BALL"], 4, 0)]
+
+
+def test_invalid_rule_rejected():
+    with pytest.raises(ValueError):
+        ScriptedOverrideTable({1: [{'global_coords': (1, 1), 'action': 'jump'}]})
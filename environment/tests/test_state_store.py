@@ -0,0 +1,57 @@
+import json
+
+from web import web_server
+from web.state_store import VersionedState
+
+
+def _apply(state, patch):
+    for op in patch:
+        assert op['op'] == 'add'
+        keys = [k.replace('~1', '/').replace('~0', '~') for k in op['path'].split('/')[1:]]
+        target = state
+        for key in keys[:-1]:
+            target = target[key]
+        target[keys[-1]] = op['value']
+    return state
+
+
+def test_patches_bring_clients_up_to_date():
+    store = VersionedState({'stats': {'money': 0}, 'quest_data': {'quests': {}}})
+    client = json.loads(store.snapshot_json())
+    assert client['version'] == 2
+
+    store.set_in(('stats', 'money'), 10)
+    store.set_in(('quest_data', 'triggers', 'a/b'), True)  # new container
+    store['location'] = {'map_name': 'Pallet Town'}
+    store.set_in(('stats', 'money'), 20)
+
+    response = json.loads(store.patch_json(client['version'], client['epoch']))
+    assert len(response['patch']) == 3
+    state = _apply(client['state'], response['patch'])
+    assert state == json.loads(store.snapshot_json())['state']
+    assert json.loads(store.patch_json(response['version']))['patch'] == []
+
+    # Unknown epoch or a version from the future: full snapshot
+    assert 'state' in json.loads(store.patch_json(0, 'other'))
+    assert 'state' in json.loads(store.patch_json(store.version + 1))
+
+
+def test_game_state_route_excludes_screens(monkeypatch):
+    monkeypatch.setattr(web_server, 'game_state', VersionedState({'screens': {}, 'stats': {}}))
+    monkeypatch.setattr(web_server, '_encoded_frames', {})
+    monkeypatch.setattr(web_server, '_frame_refs', {})
+    client = web_server.app.test_client()
+    first = client.get('/game-state').get_json()
+
+    web_server.handle_status_update('__emulator_screen__', (bytes(160 * 144 * 3), 160, 144, 'RGB'))
+    web_server.handle_status_update('__stats_money__', 5)
+
+    delta = client.get(f"/game-state?since={first['version']}&epoch={first['epoch']}").get_json()
+    state = _apply(first['state'], delta['patch'])
+    assert state['stats'] == {'money': 5}
+    assert 'base64' not in json.dumps(delta)
+
+    screen = client.get(state['screens']['game_screen']['url'])
+    assert screen.status_code == 200 and screen.mimetype == 'image/png'
+    assert client.get('/screens/game_screen.png', headers={'If-None-Match': screen.headers['ETag']}).status_code == 304
+    assert client.get('/game-state?since=x').status_code == 400
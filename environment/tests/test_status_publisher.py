@@ -0,0 +1,89 @@
+import queue
+
+import numpy as np
+import pytest
+
+from environment.environment_helpers.status_publisher import (
+    FrameRef,
+    StatusPublisher,
+    read_frame,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _drain(q):
+    items = []
+    while not q.empty():
+        items.append(q.get_nowait())
+    return items
+
+
+@pytest.fixture
+def publisher():
+    q = queue.SimpleQueue()
+    clock = FakeClock()
+    pub = StatusPublisher(q, channel_intervals={'__slow__': 1.0, '__emulator_screen__': 0.1}, clock=clock)
+    yield pub, q, clock
+    pub.close()
+
+
+def test_unchanged_values_are_not_resent(publisher):
+    pub, q, clock = publisher
+    assert pub.publish('__location__', {'x': 1, 'y': 2})
+    assert not pub.publish('__location__', {'x': 1, 'y': 2})
+    assert pub.publish('__location__', {'x': 1, 'y': 3})
+    assert [key for key, _ in _drain(q)] == ['__location__', '__location__']
+    assert pub.suppressed == 1
+
+
+def test_rate_limited_channel_keeps_latest_pending_value(publisher):
+    pub, q, clock = publisher
+    assert pub.publish('__slow__', 1)
+    clock.now = 0.2
+    assert not pub.publish('__slow__', 2)
+    assert not pub.publish('__slow__', 3)
+    assert pub.flush() == 0
+    clock.now = 1.0
+    assert pub.flush() == 1
+    assert _drain(q) == [('__slow__', 1), ('__slow__', 3)]
+
+
+def test_pending_value_dropped_when_it_reverts(publisher):
+    pub, q, clock = publisher
+    pub.publish('__slow__', 1)
+    clock.now = 0.2
+    pub.publish('__slow__', 2)
+    pub.publish('__slow__', 1)
+    clock.now = 2.0
+    assert pub.flush() == 0
+
+
+def test_frames_travel_through_shared_memory(publisher):
+    pub, q, clock = publisher
+    frame = np.zeros((144, 160, 4), dtype=np.uint8)
+    frame[10, 20] = (1, 2, 3, 255)
+    assert pub.publish_frame('__emulator_screen__', frame)
+
+    (key, ref), = _drain(q)
+    assert key == '__emulator_screen__'
+    assert isinstance(ref, FrameRef)
+    pixels = read_frame(ref)
+    assert pixels.shape == (144, 160, 3)
+    assert tuple(pixels[10, 20]) == (1, 2, 3)
+
+    # Identical frame is suppressed even once the rate limit has elapsed
+    clock.now = 1.0
+    assert not pub.publish_frame('__emulator_screen__', frame)
+
+    # ...unless a consumer asked for everything to be resent
+    pub.invalidate('__emulator_screen__')
+    assert pub.publish_frame('__emulator_screen__', frame)
+    (_, resent), = _drain(q)
+    assert resent.seq == ref.seq + 1
@@ -0,0 +1,110 @@
+import queue
+
+import numpy as np
+import pytest
+
+from environment.environment_helpers import status_sampler
+from environment.environment_helpers.status_publisher import FrameRef, read_frame
+from environment.environment_helpers.status_sampler import StatusSampler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class DummyEnv:
+    def __init__(self):
+        self.renders = 0
+
+    def get_game_coords(self):
+        return (5, 6, 0)
+
+    def get_map_name_by_id(self, map_id):
+        return "PALLET TOWN"
+
+    def render(self):
+        self.renders += 1
+        return np.full((144, 160, 4), 7, dtype=np.uint8)
+
+
+class DummyQuestManager:
+    current_quest_id = 12
+
+
+class DummyNavigator:
+    navigation_status = "navigating"
+
+
+@pytest.fixture(autouse=True)
+def identity_global_coords(monkeypatch):
+    monkeypatch.setattr(status_sampler, "local_to_global", lambda r, c, map_n: (r, c))
+
+
+def _publish(sampler, env, steps=1):
+    return sampler.maybe_publish(env, DummyQuestManager(), DummyNavigator(), steps)
+
+
+def test_publishes_at_most_once_per_interval():
+    clock = FakeClock()
+    q = queue.SimpleQueue()
+    sampler = StatusSampler(q, rate_hz=2.0, clock=clock)
+    env = DummyEnv()
+
+    assert _publish(sampler, env)
+    clock.now = 0.25
+    assert not _publish(sampler, env)
+    clock.now = 0.5
+    assert _publish(sampler, env)
+    assert sampler.samples_published == 2
+    assert env.renders == 2
+    sampler.close()
+
+
+def test_snapshot_contents():
+    q = queue.SimpleQueue()
+    sampler = StatusSampler(q, rate_hz=1.0, clock=FakeClock())
+    _publish(sampler, DummyEnv(), steps=42)
+
+    items = {}
+    while not q.empty():
+        key, value = q.get_nowait()
+        items[key] = value
+    assert items['__total_steps__'] == 42
+    assert items['__location__']['gy'] == 6 and items['__location__']['gx'] == 5
+    assert items['__current_quest__'] == 12
+    ref = items['__emulator_screen__']
+    assert isinstance(ref, FrameRef) and (ref.width, ref.height, ref.mode, ref.seq) == (160, 144, "RGB", 1)
+    frame = read_frame(ref)
+    assert frame.shape == (144, 160, 3) and int(frame[0, 0, 0]) == 7
+    sampler.close()
+    assert read_frame(ref) is None
+
+
+def test_disabled_rate_never_publishes():
+    q = queue.SimpleQueue()
+    sampler = StatusSampler(q, rate_hz=0, clock=FakeClock())
+    assert not _publish(sampler, DummyEnv())
+    assert q.empty()
+
+
+def test_backlogged_queue_sheds_samples_without_blocking():
+    clock = FakeClock()
+    q = queue.Queue(maxsize=3)
+    sampler = StatusSampler(q, rate_hz=10.0, include_screen=False, max_backlog=100, clock=clock)
+    env = DummyEnv()
+
+    # Snapshot needs more slots than the queue has: dropped, never blocks
+    assert not _publish(sampler, env)
+    assert sampler.samples_dropped == 1
+
+    big = queue.SimpleQueue()
+    for _ in range(5):
+        big.put(('x', 1))
+    sampler = StatusSampler(big, rate_hz=10.0, max_backlog=4, clock=clock)
+    assert not _publish(sampler, env)
+    assert sampler.samples_dropped == 1
+    assert env.renders == 0
@@ -0,0 +1,133 @@
+import os
+import socket
+import stat
+import threading
+from multiprocessing import AuthenticationError, Pipe
+from queue import SimpleQueue
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from environment import step_server
+from environment.step_server import RamMirror, StepClient, StepServer, is_loopback, serve_socket, write_authkey
+
+
+class _FakePyBoy:
+    def __init__(self):
+        self.memory = bytearray(0x10000)
+        self.screen = SimpleNamespace(ndarray=np.zeros((144, 160, 4), dtype=np.uint8))
+
+    def save_state(self, f):
+        f.write(bytes(self.memory))
+
+    def load_state(self, f):
+        self.memory[:] = f.read()
+
+    def symbol_lookup(self, name):
+        return 0, {"wCurMap": 0xD35E}[name]
+
+
+class _FakeEnv:
+    def __init__(self):
+        self.pyboy = _FakePyBoy()
+
+    def process_action(self, action, source=None):
+        self.pyboy.memory[0xC000] = (self.pyboy.memory[0xC000] + 1) % 256
+        self.pyboy.memory[0xD35E] = action
+        self.pyboy.screen.ndarray[0, 0, :3] = action
+        return {}, 1.0, False, False, {'action': action}
+
+    def reset(self, options=None):
+        return {}, {'reset': True}
+
+    def get_game_coords(self):
+        return 3, 4, self.pyboy.memory[0xD35E]
+
+
+def _fake_session():
+    return SimpleNamespace(env=_FakeEnv(), quest_manager=None, navigator=None,
+                           quest_progression_engine=None, trigger_evaluator=None, status_queue=SimpleQueue())
+
+
+@pytest.fixture
+def client():
+    server = StepServer(_fake_session(), ram_window=(0xC000, 0x2000))
+    server_conn, client_conn = Pipe()
+    thread = threading.Thread(target=server.serve, args=(server_conn,), daemon=True)
+    thread.start()
+    c = StepClient(client_conn)
+    yield c
+    c.close()
+    thread.join(timeout=5)
+    server.close()
+
+
+def test_step_protocol_and_shared_memory(client):
+    assert client.server['ram_window'] == (0xC000, 0x2000)
+    reply = client.step(3, repeat=2)
+    assert (reply['reward'], reply['steps'], reply['info']) == (2.0, 2, {'action': 3})
+    assert reply['frame_seq'] == 2 and reply['ram_seq'] == 2  # initial publish + this step
+
+    seq, frame = client.frame()
+    assert seq == reply['frame_seq'] and frame.shape == (144, 160, 3) and int(frame[0, 0, 0]) == 3
+    ram_seq, ram = client.ram()
+    assert ram_seq == reply['ram_seq'] and int(ram[0]) == 2 and int(ram[0xD35E - 0xC000]) == 3
+
+    assert client.read_ram((0xC000, 2), ("wCurMap", 1)) == [b"\x02\x00", b"\x03"]
+    assert client.status()['location'] == [3, 4, 3]
+
+    state = client.save_state()
+    client.step(5)
+    client.load_state(state)
+    assert client.read_ram((0xD35E, 1)) == [b"\x03"]
+    assert client.reset()['info'] == {'reset': True}
+
+    with pytest.raises(RuntimeError, match="unknown command"):
+        client.call('fly')
+
+
+def test_ram_mirror_attach_and_peek():
+    mirror = RamMirror(0xD000, 16)
+    try:
+        reader = RamMirror.attach(mirror.name)
+        assert (reader.start, reader.length, reader.read()[0]) == (0xD000, 16, 0)
+        mirror.write(bytes(range(16)))
+        assert reader.seq == 1 and reader.peek(0xD004, 2) == b"\x04\x05"
+        assert reader.peek(0xCFFF) is None and reader.peek(0xD00F, 2) is None
+        reader.close()
+    finally:
+        mirror.close()
+
+
+def test_socket_clients_need_the_written_key(tmp_path, monkeypatch):
+    monkeypatch.setattr(step_server, "AUTHKEY_DIR", tmp_path / "keys")
+    monkeypatch.delenv(step_server.AUTHKEY_ENV, raising=False)
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        address = s.getsockname()
+    key = os.urandom(32)
+    write_authkey(step_server.authkey_path(address), key)
+    assert stat.S_IMODE(step_server.authkey_path(address).stat().st_mode) == 0o600
+
+    server = StepServer(_fake_session(), ram_window=(0xC000, 16))
+    thread = threading.Thread(target=serve_socket, args=(server, address, key), daemon=True)
+    thread.start()
+    try:
+        for _ in range(100):
+            try:
+                with pytest.raises(AuthenticationError):
+                    StepClient.connect(address, authkey=b"pokered-step-server")
+                break
+            except ConnectionRefusedError:
+                threading.Event().wait(0.05)
+        client = StepClient.connect(address)  # key read from the key file
+        assert client.step(2)['steps'] == 1
+        client.call('shutdown')
+        client.conn.close()
+        thread.join(timeout=5)
+    finally:
+        server.close()
+
+    assert is_loopback("127.0.0.1") and is_loopback("localhost") and is_loopback("::1")
+    assert not is_loopback("0.0.0.0") and not is_loopback("192.168.1.5")
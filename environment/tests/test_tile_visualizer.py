@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from environment.environment_helpers.tile_visualizer import (
+    COLLISION_COLORS,
+    CollisionOverlayRenderer,
+    convert_numeric_to_visual_map,
+    create_tile_overlay,
+    overlay_on_screenshot,
+    parse_collision_grid,
+)
+
+
+def _grid():
+    grid = np.ones((9, 10), dtype=np.uint8)
+    grid[0, 0] = 0
+    grid[2, 3] = 2
+    grid[4, 4] = 4
+    return grid
+
+
+def _numeric_map(grid):
+    lines = [" ".join(str(v) for v in row) for row in grid.tolist()]
+    return "\n".join(lines + ["", "Legend:", "0 - walkable path"])
+
+
+def test_blend_matches_reference_alpha_math():
+    rng = np.random.default_rng(0)
+    screen = rng.integers(0, 256, size=(144, 160, 4), dtype=np.uint8)
+    grid = _grid()
+    alpha = 128
+
+    out = CollisionOverlayRenderer().blend(screen, grid, alpha)
+
+    codes = np.kron(grid, np.ones((16, 16), dtype=np.uint8))
+    colors = np.array([COLLISION_COLORS[c] for c in codes.ravel()]).reshape(144, 160, 3)
+    expected = (screen[:, :, :3].astype(np.int32) * (255 - alpha) + colors * alpha + 127) // 255
+    assert out.shape == (144, 160, 3) and out.dtype == np.uint8
+    assert np.array_equal(out, expected)
+
+
+def test_buffers_are_reused():
+    renderer = CollisionOverlayRenderer()
+    screen = np.zeros((144, 160, 3), dtype=np.uint8)
+    first = renderer.blend(screen, _grid())
+    second = renderer.blend(screen, np.zeros((9, 10), dtype=np.uint8))
+    assert first is second
+    assert tuple(second[20, 20]) == tuple((v * 128 + 127) // 255 for v in COLLISION_COLORS[0])
+
+    with pytest.raises(ValueError):
+        renderer.blend(screen, np.zeros((3, 3), dtype=np.uint8))
+
+
+def test_string_helpers_use_renderer():
+    grid = _grid()
+    numeric = _numeric_map(grid)
+    assert np.array_equal(parse_collision_grid(numeric), grid)
+
+    blended = overlay_on_screenshot(Image.new('RGB', (160, 144)), numeric, alpha=255)
+    assert blended.size == (160, 144)
+    assert blended.getpixel((3 * 16, 2 * 16)) == COLLISION_COLORS[2]
+
+    overlay = create_tile_overlay(convert_numeric_to_visual_map(numeric), alpha=100)
+    assert overlay.mode == 'RGBA'
+    assert overlay.getpixel((0, 0)) == COLLISION_COLORS[0] + (100,)
@@ -0,0 +1,62 @@
+import queue
+
+from ui.quest_ui import coalesce_status_updates
+from ui.render_to_global import PAD, TILE_SIZE, QuestDotLayer
+
+
+class _RecordingCanvas:
+    """Minimal stand-in recording the canvas calls QuestDotLayer makes"""
+
+    def __init__(self):
+        self.calls = []
+        self._next = 0
+
+    def create_oval(self, *coords, **options):
+        self._next += 1
+        self.calls.append(('create', self._next))
+        return self._next
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name,) + args)
+
+
+def test_poller_keeps_latest_per_channel_and_renders_last():
+    q = queue.Queue()
+    for i in range(5):
+        q.put(('__location__', {'x': i}))
+        q.put(('__emulator_screen__', i))
+    q.put(('__trigger_debug__', {'id': '001_0', 'status': False}))
+    q.put(('__trigger_debug__', {'id': '001_1', 'status': True}))
+    q.put(('__trigger_debug__', {'id': '001_0', 'status': True}))
+    q.put(('__facing_direction__', 'Up'))
+
+    updates = coalesce_status_updates(q)
+    assert updates == [
+        ('__trigger_debug__', {'id': '001_1', 'status': True}),
+        ('__trigger_debug__', {'id': '001_0', 'status': True}),
+        ('__facing_direction__', 'Up'),
+        ('__location__', {'x': 4}),
+        ('__emulator_screen__', 4),
+    ]
+    assert q.empty()
+
+
+def test_quest_dots_are_moved_and_restyled_not_recreated():
+    canvas = _RecordingCanvas()
+    coords = [(0, 0, 1), (0, 1, 1), (0, 2, 2), (0, 200, 2)]
+    layer = QuestDotLayer(canvas, coords)
+    origin = -PAD * TILE_SIZE
+
+    layer.render(origin, origin, 100, 100, current_quest=None)
+    assert [c for c in canvas.calls if c[0] == 'create'] == [('create', 1), ('create', 2), ('create', 3)]
+
+    canvas.calls.clear()
+    layer.render(origin + 4, origin, 100, 100, current_quest=None)
+    assert canvas.calls == [('move', 'quest_coordinates', 4, 0)]
+
+    canvas.calls.clear()
+    assert layer.mark_traversed(0, 0, 1).tolist() == [0, 1]
+    assert layer.quest_progress("001") == (2, 2)
+    layer.render(origin + 4, origin, 100, 100, current_quest="002")
+    assert not [c for c in canvas.calls if c[0] in ('create', 'delete')]
+    assert len([c for c in canvas.calls if c[0] == 'itemconfigure']) == 3
@@ -6,7 +6,7 @@ from .env_wrapper import EnvWrapper
 
 class ConfiguredEnvWrapper(EnvWrapper):
     def __init__(self, base_conf: DictConfig, cli_args=None):
-        # Expect base_conf to be the fully resolved DictConfig from play.py's _setup_configuration
+        # Expect base_conf to be the fully resolved DictConfig from game_session.setup_configuration
         # The cli_args are kept for now in case they are used by RedGymEnv or other parts of the wrapper,
         # though the primary configuration comes from base_conf.
         self.conf = base_conf 
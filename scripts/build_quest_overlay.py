@@ -17,12 +17,13 @@ Example
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 from typing import List, Tuple
 
 from PIL import Image, ImageDraw
 
+from environment.environment_helpers.path_trace import load_map_coords
+
 TILE_SIZE = 16
 PAD = 20  # tiles of padding baked into full map PNG
 
@@ -39,14 +40,13 @@ def load_quest_coords(quest_id: str) -> List[Tuple[int, int]]:
     """Return list of (gy, gx) pairs (WITHOUT padding) for the given quest."""
     quest_id = quest_id.zfill(3)
     coords_file = QUEST_PATHS_ROOT / quest_id / f"{quest_id}_coords.json"
-    if not coords_file.exists():
+    # Each key is a frame index; value is list of coordinate pairs.  Quests
+    # recorded as .npz trace chunks next to the JSON path load the same way.
+    data = load_map_coords(coords_file)
+    if not data:
         raise FileNotFoundError(f"Quest coordinate file not found: {coords_file}")
 
     coords: List[Tuple[int, int]] = []
-    with open(coords_file, "r", encoding="utf-8") as fp:
-        data = json.load(fp)
-
-    # Each key is a frame index; value is list of coordinate pairs.
     for step_pairs in data.values():
         for gy, gx in step_pairs:
             coords.append((int(gy), int(gx)))
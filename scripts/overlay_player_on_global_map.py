@@ -23,6 +23,8 @@ Arguments:
   --output     Where to save the overlaid image (default: map dir + "_with_player.png").
   --no-show    Skip opening the resulting image with the system viewer.
   --marker     Choose marker style: "square" (default) or "cross".
+  --trace      A run's path trace (.npz chunk, run directory or coords JSON);
+               marks the last position as the player and the rest in blue.
 
 Verification logic
 ------------------
@@ -198,7 +200,10 @@ def parse_args() -> argparse.Namespace:
 
     # Raw string of coordinate pairs (e.g. "[338, 84] [345,78]")
     parser.add_argument("--coords", type=str, help="String containing one or more 'y,x' pairs; whitespace/newlines ignored.")
-    parser.add_argument("--coord-index", type=int, default=0, help="If --coords has multiple pairs, which pair (0-based) to use.")
+    parser.add_argument("--coord-index", type=int, default=None, help="If --coords/--trace has multiple pairs, which pair (0-based) to use (default: first for --coords, last for --trace).")
+
+    # Recorded path trace (see environment/environment_helpers/path_trace.py)
+    parser.add_argument("--trace", type=str, help="Path trace chunk (.npz), run directory, or <run_id>_coords.json to plot.")
 
     return parser.parse_args()
 
@@ -211,7 +216,23 @@ def main() -> None:
     # ------------------------------------------------------------------
     coords_list_global: list[tuple[int, int]] = []  # store padded global pairs
 
-    if args.coords is not None:
+    if args.trace is not None:
+        from environment.environment_helpers.path_trace import load_trace
+
+        trace = load_trace(args.trace)
+        if not len(trace):
+            print(f"No path trace found at {args.trace}", file=sys.stderr)
+            sys.exit(1)
+
+        coords_list_global = [(int(y), int(x)) for y, x in trace.coords().tolist()]
+        idx = len(coords_list_global) - 1 if args.coord_index is None else args.coord_index
+        if idx < 0 or idx >= len(coords_list_global):
+            print(f"--coord-index {idx} out of range; trace has {len(coords_list_global)} positions.", file=sys.stderr)
+            sys.exit(1)
+        args.coord_index = idx
+        args.global_y, args.global_x = coords_list_global[idx]
+
+    elif args.coords is not None:
         import re
 
         matches = re.findall(r"(-?\d+)\s*,\s*(-?\d+)", args.coords)
@@ -219,7 +240,7 @@ def main() -> None:
             print("Could not parse any 'y,x' pairs from --coords string.", file=sys.stderr)
             sys.exit(1)
 
-        idx = args.coord_index
+        idx = args.coord_index = args.coord_index or 0
         if idx < 0 or idx >= len(matches):
             print(f"--coord-index {idx} out of range; only {len(matches)} pairs found.", file=sys.stderr)
             sys.exit(1)
@@ -10,12 +10,20 @@ Enhanced to work with the new line-based log rotation system and comprehensive
 event pattern matching for Pokemon game analysis.
 
 Usage:
-    python parse_logs.py [logfile]                # Parse specific log file
+    python parse_logs.py [logfile]                # Parse specific log file (and its rotated backups)
     python parse_logs.py                          # Parse from stdin
     python parse_logs.py --analyze                # Run analysis on all logs in directory
     python parse_logs.py --summary                # Generate summary statistics
     python parse_logs.py --csv output.csv         # Export to CSV
     python parse_logs.py --logs-dir /path/to/logs # Specify logs directory
+    python parse_logs.py game.log --type NAV_SNAP --steps 1000:2000   # Indexed query
+    python parse_logs.py game.log --workers 8     # Parallel parse of large files
+
+Large files are split into newline-aligned byte ranges parsed by worker
+processes. Every parse leaves a sidecar index (<log>.idx.npz) of the byte
+offset of each event by type and of the first line of each environment step.
+Later --type/--steps queries seek straight to those lines, and a log that
+only grew since it was indexed is indexed incrementally.
 
 Supported log patterns:
     - Quest events (current, completed, advanced, transitions)
@@ -29,14 +37,19 @@ Supported log patterns:
     - Structured JSON debug logs
 """
 
+import os
 import re
 import sys
 import json
+import hashlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict, Counter
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, Iterable
+
+import numpy as np
 
 class LogEvent:
     """Represents a parsed log event with metadata"""
@@ -74,6 +87,76 @@ class LogEvent:
         
         return ','.join(f'"{col}"' for col in columns)
 
+def _top_level_branches(source: str) -> List[str]:
+    """Split a regex source at its top-level '|' alternations"""
+    branches, depth, in_class, start, i = [], 0, False, 0, 0
+    while i < len(source):
+        c = source[i]
+        if c == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = c != ']'
+        elif c == '[':
+            in_class = True
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == '|' and depth == 0:
+            branches.append(source[start:i])
+            start = i + 1
+        i += 1
+    branches.append(source[start:])
+    return branches
+
+
+def _required_literal(branch: str) -> str:
+    """Leading literal text every match of a (single-branch) regex starts with"""
+    literal = []
+    i = 1 if branch.startswith('^') else 0
+    while i < len(branch):
+        c = branch[i]
+        if c == '\\':
+            if i + 1 < len(branch) and not branch[i + 1].isalnum():
+                literal.append(branch[i + 1])
+                i += 2
+                continue
+            break
+        if c in '.^$*+?{}[]|()':
+            if c in '?*{' and literal:
+                literal.pop()  # Quantifier makes the previous character optional
+            break
+        literal.append(c)
+        i += 1
+    return ''.join(literal)
+
+
+class _Prefilter:
+    """
+    Cheap test for "could any of these patterns match this line"
+
+    Patterns with a required leading literal (per top-level branch) are
+    folded into one alternation of plain literals, which the regex engine
+    scans much faster than an alternation of the full patterns; the rest
+    are searched individually.
+    """
+
+    def __init__(self, patterns):
+        literals, self.others = [], []
+        for pattern, _, _ in patterns:
+            branch_literals = [_required_literal(b) for b in _top_level_branches(pattern.pattern)]
+            if all(len(lit) >= 3 for lit in branch_literals):
+                literals.extend(branch_literals)
+            else:
+                self.others.append(pattern)
+        self.literals = re.compile('|'.join(re.escape(lit) for lit in dict.fromkeys(literals))) if literals else None
+
+    def search(self, line: str) -> bool:
+        if self.literals is not None and self.literals.search(line):
+            return True
+        return any(pattern.search(line) for pattern in self.others)
+
 class PokemonLogParser:
     """Comprehensive log parser for Pokemon game analysis"""
     
@@ -82,6 +165,14 @@ class PokemonLogParser:
         self.events = []
         self.stats = defaultdict(int)
         
+        # Prefilters: one combined scan for all patterns ahead of the STANDARD
+        # fallback and one for the patterns after it. Lines a prefilter
+        # rejects cannot match any of its patterns, so those are skipped.
+        self._fallback_start = next(i for i, (_, event_type, _) in enumerate(self.patterns)
+                                    if event_type == 'STANDARD')
+        self._prefilter = _Prefilter(self.patterns[:self._fallback_start])
+        self._tail_prefilter = _Prefilter(self.patterns[self._fallback_start + 1:])
+        
     def _build_patterns(self) -> List[Tuple[re.Pattern, str, callable]]:
         """Build comprehensive regex patterns for log parsing"""
         
@@ -386,8 +477,8 @@ class PokemonLogParser:
         if not line:
             return None
         
-        # Try each pattern
-        for pattern, event_type, parser_func in self.patterns:
+        # Try each pattern (skipping those the prefilters rule out)
+        for pattern, event_type, parser_func in self._candidate_patterns(line):
             match = pattern.search(line)
             if match:
                 try:
@@ -424,6 +515,31 @@ class PokemonLogParser:
             {'message': line}
         )
     
+    def _candidate_patterns(self, line: str):
+        if self._prefilter.search(line):
+            return self.patterns
+        if self._tail_prefilter.search(line):
+            return self.patterns[self._fallback_start:]
+        return self.patterns[self._fallback_start:self._fallback_start + 1]
+    
+    def event_type_of(self, line: str) -> Optional[str]:
+        """Event type parse_line would assign, without building the event (for indexing)"""
+        line = line.strip()
+        if not line:
+            return None
+        for pattern, event_type, parser_func in self._candidate_patterns(line):
+            match = pattern.search(line)
+            if match:
+                if event_type == 'STRUCTURED':
+                    try:
+                        data = parser_func(match)
+                    except Exception:
+                        return 'PARSE_ERROR'
+                    if 'component' in data:
+                        return f"STRUCTURED_{data['component'].upper()}"
+                return event_type
+        return 'UNKNOWN'
+    
     def parse_file(self, file_path: Path) -> List[LogEvent]:
         """Parse entire log file"""
         events = []
@@ -521,6 +637,327 @@ class PokemonLogParser:
         
         return '\n'.join(summary)
 
+# ---------------------------------------------------------------------------
+# Parallel parsing and the offset index
+# ---------------------------------------------------------------------------
+
+INDEX_SUFFIX = '.idx.npz'
+INDEX_VERSION = 1
+CHUNK_BYTES = 16 * 1024 * 1024   # Byte range handed to one worker
+HEAD_BYTES = 4096                # Digest of the file head detects truncate/overwrite
+UNINDEXED_TYPES = frozenset({'STANDARD', 'UNKNOWN'})  # Nearly every line; found via the step index
+_STEP_RE = re.compile(r'\bSTEP (\d+)\b')
+_BACKUP_RE = r'^{stem}_(\d{{8}}_\d{{6}})(?:_(\d+))?\.log$'
+
+_worker_parser: Optional[PokemonLogParser] = None
+
+
+def log_file_series(log_file: Path) -> List[Path]:
+    """
+    A log file preceded by its rotated backups, oldest first
+
+    LineCountRotatingFileHandler renames full files to
+    <stem>_YYYYmmdd_HHMMSS[_n].log next to the live file.
+    """
+    log_file = Path(log_file)
+    pattern = re.compile(_BACKUP_RE.format(stem=re.escape(log_file.stem)))
+    backups = []
+    for path in log_file.parent.glob(f"{log_file.stem}_*.log"):
+        match = pattern.match(path.name)
+        if match:
+            backups.append(((match.group(1), int(match.group(2) or 0)), path))
+    series = [path for _, path in sorted(backups)]
+    if log_file.exists():
+        series.append(log_file)
+    return series
+
+
+def _head_digest(path: Path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(HEAD_BYTES), digest_size=16).hexdigest()
+
+
+def _byte_ranges(path: Path, start: int, end: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split [start, end) into ranges that begin at line starts"""
+    cuts = [start]
+    with open(path, 'rb') as f:
+        while cuts[-1] + chunk_bytes < end:
+            f.seek(cuts[-1] + chunk_bytes)
+            f.readline()  # Finish the line the cut fell into
+            if f.tell() >= end:
+                break
+            cuts.append(f.tell())
+    return list(zip(cuts, cuts[1:] + [end]))
+
+
+def _parse_byte_range(path: str, start: int, end: int, collect: bool) -> Dict[str, Any]:
+    """
+    Worker: stream the lines of one byte range
+
+    Returns offsets/types/steps of indexable events (step -1 before the
+    first step marker in the range), step markers, the line count and, if
+    collect, the parsed LogEvents with range-relative line numbers.
+    """
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = PokemonLogParser()
+    parser = _worker_parser
+    result = {'offsets': [], 'types': [], 'steps': [], 'step_marks': [], 'lines': 0, 'events': [],
+              'stats': Counter()}
+    step = -1
+    offset = start
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while offset < end:
+            raw = f.readline()
+            if not raw:
+                break
+            result['lines'] += 1
+            line = raw.decode('utf-8', errors='replace')
+            step_match = _STEP_RE.search(line)
+            if step_match and int(step_match.group(1)) != step:
+                step = int(step_match.group(1))
+                result['step_marks'].append((step, offset))
+            if collect:
+                event = parser.parse_line(line)
+                event_type = event.event_type if event is not None else None
+            else:
+                event_type = parser.event_type_of(line)
+            if event_type is not None:
+                result['stats'][event_type] += 1
+                if event_type not in UNINDEXED_TYPES:
+                    result['offsets'].append(offset)
+                    result['types'].append(event_type)
+                    result['steps'].append(step)
+                if collect:
+                    event.data['line_number'] = result['lines']
+                    event.data['source_file'] = path
+                    event.data['step'] = step
+                    result['events'].append(event)
+            offset += len(raw)
+    return result
+
+
+class LogIndex:
+    """Byte offsets of a log file's events by type, and of each step's first line"""
+
+    def __init__(self, log_file: Path, size: int = 0, head: str = '', type_names: Optional[List[str]] = None,
+                 offsets=None, types=None, steps=None, step_values=None, step_offsets=None):
+        self.log_file = Path(log_file)
+        self.size = size
+        self.head = head
+        self.type_names = list(type_names or [])
+        self.offsets = np.asarray(offsets if offsets is not None else [], dtype=np.int64)
+        self.types = np.asarray(types if types is not None else [], dtype=np.uint16)
+        self.steps = np.asarray(steps if steps is not None else [], dtype=np.int64)
+        self.step_values = np.asarray(step_values if step_values is not None else [], dtype=np.int64)
+        self.step_offsets = np.asarray(step_offsets if step_offsets is not None else [], dtype=np.int64)
+
+    @property
+    def index_path(self) -> Path:
+        return self.log_file.with_name(self.log_file.name + INDEX_SUFFIX)
+
+    @property
+    def last_step(self) -> int:
+        return int(self.step_values[-1]) if len(self.step_values) else -1
+
+    def save(self):
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, version=INDEX_VERSION, size=self.size, head=self.head,
+                     type_names=np.array(self.type_names, dtype=str), offsets=self.offsets, types=self.types,
+                     steps=self.steps, step_values=self.step_values, step_offsets=self.step_offsets)
+        tmp_path.replace(self.index_path)
+
+    @classmethod
+    def load(cls, log_file: Path) -> Optional['LogIndex']:
+        index_path = Path(log_file).with_name(Path(log_file).name + INDEX_SUFFIX)
+        try:
+            with np.load(index_path, allow_pickle=False) as data:
+                if int(data['version']) != INDEX_VERSION:
+                    return None
+                return cls(log_file, int(data['size']), str(data['head']), data['type_names'].tolist(),
+                           data['offsets'], data['types'], data['steps'], data['step_values'], data['step_offsets'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def extend(self, results: Iterable[Dict[str, Any]], size: int):
+        """Append worker results (in file order) covering the bytes up to size"""
+        offsets, types, steps = [self.offsets], [self.types], [self.steps]
+        step_values, step_offsets = [self.step_values], [self.step_offsets]
+        codes = {name: i for i, name in enumerate(self.type_names)}
+        step = self.last_step
+        for result in results:
+            chunk_steps = np.asarray(result['steps'], dtype=np.int64)
+            marks = result['step_marks']
+            if marks:
+                # Events before the range's first marker belong to the previous range's last step
+                chunk_steps[chunk_steps == -1] = step
+            else:
+                chunk_steps[:] = step
+            for name in result['types']:
+                if name not in codes:
+                    codes[name] = len(self.type_names)
+                    self.type_names.append(name)
+            offsets.append(np.asarray(result['offsets'], dtype=np.int64))
+            types.append(np.array([codes[n] for n in result['types']], dtype=np.uint16))
+            steps.append(chunk_steps)
+            if marks:
+                values, marks_at = zip(*marks)
+                step_values.append(np.asarray(values, dtype=np.int64))
+                step_offsets.append(np.asarray(marks_at, dtype=np.int64))
+                step = marks[-1][0]
+        self.offsets = np.concatenate(offsets)
+        self.types = np.concatenate(types)
+        self.steps = np.concatenate(steps)
+        self.step_values = np.concatenate(step_values)
+        self.step_offsets = np.concatenate(step_offsets)
+        self.size = size
+
+    def event_offsets(self, event_types: Optional[Iterable[str]] = None,
+                      steps: Optional[Tuple[Optional[int], Optional[int]]] = None) -> np.ndarray:
+        """Offsets of indexed events of the given types within an inclusive step range"""
+        mask = np.ones(len(self.offsets), dtype=bool)
+        if event_types is not None:
+            codes = [i for i, name in enumerate(self.type_names) if name in set(event_types)]
+            mask &= np.isin(self.types, codes)
+        if steps is not None:
+            first, last = steps
+            if first is not None:
+                mask &= self.steps >= first
+            if last is not None:
+                mask &= self.steps <= last
+        return self.offsets[mask]
+
+    def step_span(self, steps: Tuple[Optional[int], Optional[int]]) -> Tuple[int, int]:
+        """
+        Byte range [start, end) holding the lines of an inclusive step range
+
+        From the first step marker at or after the first step up to the next
+        marker beyond the last step (step numbers restart when a new session
+        appends to the same file, so markers are not assumed to be sorted).
+        """
+        first, last = steps
+        start = 0
+        if first is not None:
+            at = np.flatnonzero(self.step_values >= first)
+            start = int(self.step_offsets[at[0]]) if len(at) else self.size
+        end = self.size
+        if last is not None:
+            after = np.flatnonzero((self.step_values > last) & (self.step_offsets > start))
+            end = int(self.step_offsets[after[0]]) if len(after) else self.size
+        return start, end
+
+
+class ParallelLogParser:
+    """
+    Multi-process log parser that maintains a LogIndex next to each file
+
+    Files larger than chunk_bytes are split into newline-aligned byte ranges
+    parsed by worker processes; rotated backups are handled as separate,
+    immutable files whose indexes are only built once.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_bytes: int = CHUNK_BYTES):
+        self.workers = workers
+        self.chunk_bytes = chunk_bytes
+        self.parser = PokemonLogParser()
+        self.stats = Counter()
+
+    def _run(self, path: Path, start: int, end: int, collect: bool) -> List[Dict[str, Any]]:
+        ranges = _byte_ranges(path, start, end, self.chunk_bytes)
+        if len(ranges) == 1 or (self.workers or os.cpu_count() or 1) == 1:
+            return [_parse_byte_range(str(path), a, b, collect) for a, b in ranges]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(_parse_byte_range, [str(path)] * len(ranges), *zip(*ranges),
+                                 [collect] * len(ranges)))
+
+    def index(self, log_file: Path, rebuild: bool = False) -> LogIndex:
+        """
+        The file's index, reusing or extending the sidecar when it is still valid
+
+        An index is reused if the file has the same head digest and size,
+        and extended from its last offset if the file only grew.
+        """
+        log_file = Path(log_file)
+        size = log_file.stat().st_size
+        head = _head_digest(log_file)
+        index = None if rebuild else LogIndex.load(log_file)
+        if index is not None and index.head == head and index.size <= size:
+            if index.size == size:
+                return index
+            index.extend(self._run(log_file, index.size, size, collect=False), size)
+        else:
+            index = LogIndex(log_file, head=head)
+            index.extend(self._run(log_file, 0, size, collect=False), size)
+        index.save()
+        return index
+
+    def parse_files(self, log_files: Iterable[Path]) -> List[LogEvent]:
+        """Parse every line of the files (in order) and rewrite their indexes"""
+        events = []
+        for log_file in log_files:
+            log_file = Path(log_file)
+            size = log_file.stat().st_size
+            results = self._run(log_file, 0, size, collect=True)
+            line_base = 0
+            for result in results:
+                for event in result['events']:
+                    event.data['line_number'] += line_base
+                    events.append(event)
+                line_base += result['lines']
+                self.stats.update(result['stats'])
+            index = LogIndex(log_file, head=_head_digest(log_file))
+            index.extend(results, size)
+            index.save()
+        self.parser.stats = defaultdict(int, self.stats)
+        return events
+
+    def query(self, log_files: Iterable[Path], event_types: Optional[Iterable[str]] = None,
+              steps: Optional[Tuple[Optional[int], Optional[int]]] = None) -> List[LogEvent]:
+        """
+        Events of the given types and step range, read by seeking to indexed offsets
+
+        Unindexed types (STANDARD, UNKNOWN) and type-less step queries read
+        the byte span of the step range instead of the whole file.
+        """
+        event_types = set(event_types) if event_types else None
+        events = []
+        for log_file in log_files:
+            index = self.index(log_file)
+            with open(log_file, 'rb') as f:
+                if event_types is not None and not (event_types & UNINDEXED_TYPES):
+                    for offset in index.event_offsets(event_types, steps).tolist():
+                        f.seek(offset)
+                        event = self.parser.parse_line(f.readline().decode('utf-8', errors='replace'))
+                        if event is not None:
+                            event.data['byte_offset'] = offset
+                            event.data['source_file'] = str(log_file)
+                            events.append(event)
+                    continue
+                start, end = index.step_span(steps) if steps is not None else (0, index.size)
+                f.seek(start)
+                offset = start
+                while offset < end:
+                    raw = f.readline()
+                    if not raw:
+                        break
+                    event = self.parser.parse_line(raw.decode('utf-8', errors='replace'))
+                    if event is not None and (event_types is None or event.event_type in event_types):
+                        event.data['byte_offset'] = offset
+                        event.data['source_file'] = str(log_file)
+                        events.append(event)
+                    offset += len(raw)
+        return events
+
+
+def _parse_steps(text: Optional[str]) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """'100:500', '100:' or ':500' -> inclusive (first, last)"""
+    if not text:
+        return None
+    first, _, last = text.partition(':')
+    return (int(first) if first else None, int(last) if last else None)
+
 def main():
     parser = argparse.ArgumentParser(description='Parse Pokemon game logs for analysis')
     parser.add_argument('logfile', nargs='?', help='Log file to parse (default: stdin)')
@@ -530,27 +967,31 @@ def main():
     parser.add_argument('--logs-dir', default='/puffertank/grok_plays_pokemon/logs', 
                        help='Directory containing log files')
     parser.add_argument('--output', help='Output file (default: stdout)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for large files (default: CPU count)')
+    parser.add_argument('--type', nargs='+', help='Only these event types (uses the offset index)')
+    parser.add_argument('--steps', help='Only this inclusive step range FIRST:LAST (uses the offset index)')
+    parser.add_argument('--rebuild-index', action='store_true', help='Ignore existing .idx.npz sidecars')
     
     args = parser.parse_args()
     
-    log_parser = PokemonLogParser()
+    parallel_parser = ParallelLogParser(workers=args.workers)
+    log_parser = parallel_parser.parser
     
+    log_files = None
     if args.analyze:
-        # Analyze all log files in directory
+        # Analyze all log files in directory (each live file after its rotated backups)
         logs_dir = Path(args.logs_dir)
         if not logs_dir.exists():
             print(f"Logs directory {logs_dir} does not exist", file=sys.stderr)
             return 1
         
-        all_events = []
-        for log_file in logs_dir.glob('*.log'):
-            print(f"Parsing {log_file}...", file=sys.stderr)
-            events = log_parser.parse_file(log_file)
-            all_events.extend(events)
-        
-        # Sort by timestamp
-        all_events.sort(key=lambda e: e.timestamp)
-        events = all_events
+        backup_re = re.compile(r'_\d{8}_\d{6}(?:_\d+)?\.log$')
+        all_files = sorted(logs_dir.glob('*.log'))
+        log_files = []
+        for log_file in all_files:
+            if not backup_re.search(log_file.name):
+                log_files.extend(log_file_series(log_file))
+        log_files.extend(f for f in all_files if f not in log_files)
         
     elif args.logfile:
         # Parse specific file
@@ -558,7 +999,21 @@ def main():
         if not log_file.exists():
             print(f"Log file {log_file} does not exist", file=sys.stderr)
             return 1
-        events = log_parser.parse_file(log_file)
+        log_files = log_file_series(log_file)
+    
+    if log_files is not None:
+        if args.rebuild_index:
+            for log_file in log_files:
+                parallel_parser.index(log_file, rebuild=True)
+        if args.type or args.steps:
+            events = parallel_parser.query(log_files, args.type, _parse_steps(args.steps))
+        else:
+            for log_file in log_files:
+                print(f"Parsing {log_file}...", file=sys.stderr)
+            events = parallel_parser.parse_files(log_files)
+        if args.analyze:
+            # Sort by timestamp
+            events.sort(key=lambda e: e.timestamp)
     else:
         # Parse from stdin
         events = []
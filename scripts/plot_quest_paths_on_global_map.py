@@ -19,7 +19,6 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import sys
 from pathlib import Path
@@ -42,6 +41,8 @@ except Exception as exc:  # pragma: no cover
     print("Cannot import global_map module; ensure you run inside project root.", file=sys.stderr)
     raise
 
+from environment.environment_helpers.path_trace import load_map_coords
+
 PAD_ROW = gm.MAP_ROW_OFFSET  # 20
 PAD_COL = gm.MAP_COL_OFFSET
 
@@ -69,13 +70,11 @@ def load_coords_for_quest(quest_dir: Path, quest_id: int) -> List[Tuple[int, int
     qid_str = f"{quest_id:03}"
     json_path = quest_dir / qid_str / f"{qid_str}_coords.json"
 
-    if not json_path.exists():
+    data = load_map_coords(json_path)  # JSON, or .npz trace chunks next to it
+    if not data:
         print(f"Coords file not found for quest {qid_str}: {json_path}", file=sys.stderr)
         return []
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
     coords: List[Tuple[int, int]] = []
     for step_list in data.values():
         if not isinstance(step_list, list):
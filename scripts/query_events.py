@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""query_events.py
+
+Filter and aggregate a run's typed event log (``<run_id>_events.bin``, see
+environment/environment_helpers/event_log.py) without regex parsing.
+
+Filters (step range, quest, event type) are applied to record headers, so
+payloads of non-matching events are never decoded.
+
+Example
+-------
+    python -m scripts.query_events RUN_DIR                         # counts per event type
+    python -m scripts.query_events RUN_DIR --type trigger_evaluated --quest 12 --count-by trigger_id result
+    python -m scripts.query_events RUN_DIR --type nav_snap --steps 1000:5000 --list 20
+    python -m scripts.query_events RUN_DIR --type position --csv positions.csv
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from environment.environment_helpers.event_log import EVENT_SCHEMAS, EVENTS_SUFFIX, load_events
+
+
+def find_event_log(path: Path) -> Path:
+    """The event file itself, or the one inside a run directory"""
+    if path.is_dir():
+        matches = sorted(path.glob(f"*{EVENTS_SUFFIX}"))
+        if not matches:
+            raise FileNotFoundError(f"No *{EVENTS_SUFFIX} file in {path}")
+        return matches[0]
+    return path
+
+
+def parse_steps(text: Optional[str]) -> Optional[Tuple[Optional[int], Optional[int]]]:
+    """'100:500', '100:' or ':500' -> inclusive (first, last)"""
+    if not text:
+        return None
+    first, _, last = text.partition(":")
+    return (int(first) if first else None, int(last) if last else None)
+
+
+def count_by(tables: Dict[str, Dict[str, np.ndarray]], fields: List[str]) -> Counter:
+    """Count events by a tuple of column values ('type' is the event type)"""
+    counts: Counter = Counter()
+    for kind, table in tables.items():
+        n = len(table["step"])
+        columns = [np.full(n, kind, dtype=object) if f == "type" else table.get(f) for f in fields]
+        if any(c is None for c in columns):
+            continue  # event type lacks one of the fields
+        counts.update(zip(*(c.tolist() for c in columns)))
+    return counts
+
+
+def iter_rows(tables: Dict[str, Dict[str, np.ndarray]]):
+    """(step, type, columns dict) rows of all tables merged in step order"""
+    rows = []
+    for kind, table in tables.items():
+        names = list(table)
+        for i in range(len(table["step"])):
+            rows.append((int(table["step"][i]), float(table["time"][i]), kind,
+                         {name: table[name][i].item() if hasattr(table[name][i], "item") else table[name][i]
+                          for name in names}))
+    rows.sort(key=lambda r: (r[0], r[1]))
+    for step, _, kind, values in rows:
+        yield step, kind, values
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Query a typed event log")
+    parser.add_argument("path", type=Path, help="Event log file or run directory")
+    parser.add_argument("--type", nargs="+", choices=sorted(EVENT_SCHEMAS), help="Event types to keep")
+    parser.add_argument("--steps", help="Inclusive step range FIRST:LAST (either side optional)")
+    parser.add_argument("--quest", type=int, help="Quest id active when the event was recorded")
+    parser.add_argument("--count-by", nargs="+", metavar="FIELD",
+                        help="Count events by these fields ('type', 'quest', 'map_id', 'trigger_id', ...)")
+    parser.add_argument("--list", type=int, metavar="N", help="Print the first N matching events")
+    parser.add_argument("--csv", type=Path, help="Write matching events of a single --type to CSV")
+    args = parser.parse_args(argv)
+
+    tables = load_events(find_event_log(args.path), kinds=args.type, steps=parse_steps(args.steps),
+                         quest=args.quest)
+
+    if args.csv:
+        if not args.type or len(args.type) != 1:
+            parser.error("--csv needs exactly one --type")
+        table = tables.get(args.type[0], {})
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(list(table))
+            writer.writerows(zip(*(c.tolist() for c in table.values())))
+        print(f"Wrote {len(table.get('step', []))} events to {args.csv}")
+        return
+
+    if args.list is not None:
+        for i, (step, kind, values) in enumerate(iter_rows(tables)):
+            if i >= args.list:
+                break
+            fields = " ".join(f"{k}={v}" for k, v in values.items() if k not in ("step", "time"))
+            print(f"{step:>9} {kind:<18} {fields}")
+        return
+
+    counts = count_by(tables, args.count_by or ["type"])
+    width = max((len(" ".join(map(str, key))) for key in counts), default=0)
+    for key, n in sorted(counts.items(), key=lambda kv: (-kv[1], str(kv[0]))):
+        print(f"{' '.join(map(str, key)):<{width}}  {n}")
+    if not counts:
+        print("No matching events", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Quest UI Module - Modern redesign with improved layout and styling
 import tkinter as tk
 from tkinter import ttk
 import queue
+import time
 from typing import List, Dict, Any
 from environment.environment_helpers.quest_manager import describe_trigger
 from ui.map_plotting_utils import draw_first_n_quest_paths
@@ -315,46 +316,84 @@ def create_debug_labels(parent, bg, fg, success, warning, error):
     
     return labels
 
+# Target redraw rate of the Tk UI and the most status messages taken per frame
+UI_FRAME_MS = 33
+MAX_UPDATES_PER_FRAME = 2000
+
+# Channels that redraw canvases; applied after labels/quest state, in this order,
+# so e.g. a facing or quest change in the same frame is already visible to the map
+RENDER_CHANNELS = ('__location__', '__warp_minimap__', '__emulator_screen__', '__collision_overlay_screen__')
+
+def _coalesce_key(item_id, status_data):
+    """Updates with the same key supersede each other within a frame"""
+    if isinstance(item_id, str) and item_id.startswith(('__trigger_debug__', '__quest_status_detailed__')):
+        # One channel for many tree rows: keep the latest per row
+        return (item_id, status_data.get('id') if isinstance(status_data, dict) else None)
+    return item_id
+
+def coalesce_status_updates(status_queue, max_items=MAX_UPDATES_PER_FRAME):
+    """
+    Drain up to max_items messages and keep only the latest value per channel.
+
+    Returns:
+        list: (item_id, status_data) to apply, state updates first (in
+        order of their latest arrival), then RENDER_CHANNELS in that order
+    """
+    latest = {}
+    for _ in range(max_items):
+        try:
+            item_id, status_data = status_queue.get_nowait()
+        except queue.Empty:
+            break
+        key = _coalesce_key(item_id, status_data)
+        latest.pop(key, None)
+        latest[key] = (item_id, status_data)
+
+    renders = {key: latest.pop(key) for key in RENDER_CHANNELS if key in latest}
+    return list(latest.values()) + [renders[key] for key in RENDER_CHANNELS if key in renders]
+
 def setup_polling(root, status_queue, emulator_canvas, collision_canvas, map_canvas, 
                  warp_minimap_canvas, warp_debug_text, tree, env_labels):
-    """Set up the polling mechanism"""
+    """Set up the polling mechanism (one coalesced batch of updates per UI frame)"""
+    
+    def apply_update(item_id, status_data):
+        # Handle different update types
+        if item_id == '__warp_minimap__':
+            draw_warp_minimap(warp_minimap_canvas, warp_debug_text, status_data)
+        
+        elif item_id == '__location__':
+            handle_location_update(status_data, env_labels, map_canvas)
+        
+        elif item_id == '__emulator_screen__':
+            update_screen_canvas(emulator_canvas, status_data, 'emulator_photo_ref')
+        
+        elif item_id == '__collision_overlay_screen__':
+            update_screen_canvas(collision_canvas, status_data, 'collision_photo_ref')
+        
+        elif item_id == '__current_quest__':
+            handle_quest_update(status_data, env_labels, map_canvas, tree)
+        
+        elif item_id.startswith('__trigger_debug__') or item_id.startswith('__quest_status_detailed__'):
+            update_tree_item(tree, status_data)
+        
+        # Update other labels
+        else:
+            update_label_from_id(item_id, status_data, env_labels, tree)
     
     def poll():
+        started = time.perf_counter()
         try:
-            while True:
+            for item_id, status_data in coalesce_status_updates(status_queue):
                 try:
-                    item_id, status_data = status_queue.get_nowait()
-                    
-                    # Handle different update types
-                    if item_id == '__warp_minimap__':
-                        draw_warp_minimap(warp_minimap_canvas, warp_debug_text, status_data)
-                    
-                    elif item_id == '__location__':
-                        handle_location_update(status_data, env_labels, map_canvas)
-                    
-                    elif item_id == '__emulator_screen__':
-                        update_screen_canvas(emulator_canvas, status_data, 'emulator_photo_ref')
-                    
-                    elif item_id == '__collision_overlay_screen__':
-                        update_screen_canvas(collision_canvas, status_data, 'collision_photo_ref')
-                    
-                    elif item_id == '__current_quest__':
-                        handle_quest_update(status_data, env_labels, map_canvas, tree)
-                    
-                    elif item_id.startswith('__trigger_debug__') or item_id.startswith('__quest_status_detailed__'):
-                        update_tree_item(tree, status_data)
-                    
-                    # Update other labels
-                    else:
-                        update_label_from_id(item_id, status_data, env_labels, tree)
-                    
-                except queue.Empty:
-                    break
-                    
+                    apply_update(item_id, status_data)
+                except Exception as e:
+                    print(f"UI Error applying {item_id}: {e}")
         except Exception as e:
             print(f"UI Error in poll: {e}")
         
-        root.after(10, poll)
+        # Keep a steady frame rate; yield to Tk at least 1 ms even after a slow frame
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        root.after(max(1, UI_FRAME_MS - elapsed_ms), poll)
     
     root.after(100, poll)
 
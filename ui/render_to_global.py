@@ -9,11 +9,18 @@ import json
 import colorsys
 import os
 import time
+from collections import OrderedDict
+import numpy as np
 try:
     from PIL import Image, ImageTk, ImageDraw
 except ImportError:
     import Image, ImageTk, ImageDraw
 
+from environment.environment_helpers.status_publisher import FrameRef
+from environment.environment_helpers.frame_channel import get_channel
+from environment.environment_helpers.map_tile_pyramid import get_kanto_pyramid
+from environment.environment_helpers.quest_catalog import normalize_quest_id
+
 # Global variable to store map data
 MAP_DATA = {}
 MAP_DATA_INT_KEYS = {}
@@ -21,6 +28,17 @@ MAP_DATA_INT_KEYS = {}
 # Constants for coordinate conversion
 PAD = 20  # Padding used in environment coordinate system
 TILE_SIZE = 16
+MAP_TILE_TAG = "map_tiles"
+QUEST_DOT_TAG = "quest_coordinates"
+QUEST_DOT_CURRENT_TAG = "quest_coordinates_current"
+
+# (is current quest, is traversed) -> (x/y shift, radius, fill, outline, outline width)
+QUEST_DOT_STYLES = {
+    (False, False): (40, 3, "#569cd6", "", 1),
+    (False, True): (40, 4, "#4ec9b0", "", 1),
+    (True, False): (0, 5, "#dcdcaa", "#b8a654", 2),
+    (True, True): (0, 6, "#4ec9b0", "#3ba776", 2),
+}
 
 def load_map_data():
     """Load map data from JSON file"""
@@ -91,11 +109,13 @@ def initialize_map_canvas(canvas):
     canvas.quest_paths_drawn = False
     canvas.cached_sprite_photos = {}
     canvas.sprite_image_id = None
-    canvas.cached_map_photo = None
+    canvas.map_pyramid = None
+    canvas.map_viewport = None
+    canvas.map_tiles_drawn = False
     canvas.last_map_offset = (0, 0)
-    canvas.map_image_id = None
     canvas.quest_coords = {}
     canvas.quest_colors = {}
+    canvas.quest_dot_layer = None
 
 def load_resources(map_canvas):
     """Load image resources"""
@@ -103,9 +123,12 @@ def load_resources(map_canvas):
         base_dir = Path(__file__).resolve().parent.parent
         env_data_dir = base_dir / "environment" / "data" / "environment_data"
         
-        # Load map
+        # Load map (header only; pixels are decoded once into tiles off the Tk thread)
         full_map_img = Image.open(env_data_dir / "full_kanto_map.png")
         map_canvas.full_map_img = full_map_img
+        map_canvas.map_pyramid = get_kanto_pyramid()
+        map_canvas.map_pyramid.build_in_background()
+        map_canvas.map_viewport = TileViewport(map_canvas, map_canvas.map_pyramid)
         
         # Load sprite frames
         spritesheet_img = Image.open(env_data_dir / "pokemon_red_player_spritesheet.png")
@@ -180,6 +203,80 @@ def load_quest_coordinates(map_canvas):
                 print(f"Render: Error loading quest coordinates from {file_path}: {e}")
                 continue
 
+class TileViewport:
+    """
+    Shows the visible part of a TilePyramid on a Tk canvas.
+
+    One canvas image item per visible tile.  Panning moves the existing items
+    with a single canvas.move() and only creates/deletes items for tiles that
+    enter or leave the view, instead of recreating one full-map PhotoImage.
+    """
+
+    def __init__(self, canvas, pyramid, zoom=None, tag=MAP_TILE_TAG, max_photos=64):
+        """
+        Args:
+            canvas: Tk canvas to draw on
+            pyramid: TilePyramid supplying the tiles
+            zoom: Zoom level to show (defaults to full resolution)
+            tag: Canvas tag shared by all tile items
+            max_photos: Off-screen tile PhotoImages kept for panning back
+        """
+        self.canvas = canvas
+        self.pyramid = pyramid
+        self.zoom = pyramid.max_zoom if zoom is None else zoom
+        self.tag = tag
+        self.max_photos = max_photos
+        self._items = {}            # (x, y) -> canvas item id
+        self._photos = OrderedDict()  # (x, y) -> ImageTk.PhotoImage
+        self._offset = None
+
+    def render(self, dx, dy, view_w, view_h):
+        """
+        Place the map so its top-left corner is at canvas (dx, dy).
+
+        Returns:
+            bool: False while the pyramid is still being built
+        """
+        if not self.pyramid.ready.is_set():
+            return False
+        ts = self.pyramid.tile_size
+
+        if self._offset is not None and self._offset != (dx, dy) and self._items:
+            self.canvas.move(self.tag, dx - self._offset[0], dy - self._offset[1])
+        self._offset = (dx, dy)
+
+        wanted = set(self.pyramid.tiles_in_view(self.zoom, -dx, -dy, view_w, view_h))
+        for key in [k for k in self._items if k not in wanted]:
+            self.canvas.delete(self._items.pop(key))
+        for key in wanted:
+            if key in self._items:
+                continue
+            photo = self._photo(key)
+            if photo is not None:
+                self._items[key] = self.canvas.create_image(
+                    dx + key[0] * ts, dy + key[1] * ts, image=photo, anchor='nw', tags=self.tag
+                )
+        self.canvas.tag_lower(self.tag)
+        return True
+
+    def _photo(self, key):
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            return photo
+        img = self.pyramid.tile_image(self.zoom, key[0], key[1], timeout=0)
+        if img is None:
+            return None
+        photo = ImageTk.PhotoImage(img)
+        self._photos[key] = photo
+        # Evict least recently used tiles that are not on the canvas
+        for old in list(self._photos):
+            if len(self._photos) <= self.max_photos + len(self._items):
+                break
+            if old not in self._items and old != key:
+                del self._photos[old]
+        return photo
+
 def draw_map_optimized(map_canvas, local_x, local_y, map_id, map_name, facing, env_labels):
     """Optimized map drawing with correct coordinate handling
     
@@ -209,35 +306,22 @@ def draw_map_optimized(map_canvas, local_x, local_y, map_id, map_name, facing, e
         dy = center_y - pixel_y - TILE_SIZE // 2
         
         # Update map position
-        if map_canvas.cached_map_photo is None:
-            map_canvas.cached_map_photo = ImageTk.PhotoImage(map_canvas.full_map_img)
-        
-        current_offset = (dx, dy)
-        if map_canvas.last_map_offset != current_offset or map_canvas.map_image_id is None:
-            if map_canvas.map_image_id:
-                map_canvas.delete(map_canvas.map_image_id)
-            
-            # Draw map image with padding offset
-            # Map image already includes padding, so offset directly by dx,dy
-            map_offset_x = dx
-            map_offset_y = dy
-            
-            map_canvas.map_image_id = map_canvas.create_image(
-                map_offset_x, map_offset_y, 
-                image=map_canvas.cached_map_photo, 
-                anchor='nw'
-            )
+        current_offset = (dx, dy, canvas_w, canvas_h)
+        if map_canvas.last_map_offset != current_offset or not map_canvas.map_tiles_drawn:
+            # Map image already includes padding, so offset the tiles directly by dx,dy
+            if map_canvas.map_viewport is not None:
+                map_canvas.map_tiles_drawn = map_canvas.map_viewport.render(dx, dy, canvas_w, canvas_h)
             map_canvas.last_map_offset = current_offset
-            
-            # Draw quest coordinates
-            draw_quest_coordinates(map_canvas, dx, dy, canvas_w, canvas_h)
-        
-        # Update sprite at center
-        update_sprite(map_canvas, facing, center_x, center_y)
         
         # Update traversal (quest coords are stored without padding)
         update_coordinate_traversal(map_canvas, global_x - PAD, global_y - PAD, env_labels)
         
+        # Move/restyle quest coordinates (only changed dots touch the canvas)
+        draw_quest_coordinates(map_canvas, dx, dy, canvas_w, canvas_h)
+        
+        # Update sprite at center
+        update_sprite(map_canvas, facing, center_x, center_y)
+        
         return True
         
     except Exception as e:
@@ -246,87 +330,125 @@ def draw_map_optimized(map_canvas, local_x, local_y, map_id, map_name, facing, e
         traceback.print_exc()
         return False
 
+class QuestDotLayer:
+    """
+    Persistent canvas ovals for the quest coordinates.
+
+    Dots are culled to the view with numpy.  Panning moves the existing
+    ovals with one canvas.move(); only dots entering or leaving the view are
+    created or deleted, and dots whose style changes (traversed, current
+    quest) are reconfigured in place.
+    """
+
+    def __init__(self, canvas, coordinates, margin=10):
+        """
+        Args:
+            canvas: Tk canvas to draw on
+            coordinates: (gy, gx, quest_id) tuples, global coords without padding
+            margin: Pixels outside the view in which dots are still drawn
+        """
+        self.canvas = canvas
+        self.margin = margin
+        self.source = coordinates
+        coords = np.asarray(coordinates, dtype=np.int64).reshape(-1, 3)
+        self.gy, self.gx, self.quest_ids = coords[:, 0], coords[:, 1], coords[:, 2]
+        self.px = (self.gx + PAD) * TILE_SIZE + TILE_SIZE // 2
+        self.py = (self.gy + PAD) * TILE_SIZE + TILE_SIZE // 2
+        self.traversed = np.zeros(len(coords), dtype=bool)
+        self._items = {}  # coordinate index -> (canvas item id, style key)
+        self._offset = None
+        self._current_quest = None
+        self._restyle = False
+
+    def __len__(self):
+        return len(self.quest_ids)
+
+    def mark_traversed(self, player_gy, player_gx, distance):
+        """
+        Mark coordinates within Manhattan distance of the player as traversed.
+
+        Returns:
+            np.ndarray: Indices that became traversed
+        """
+        near = (np.abs(self.gy - player_gy) + np.abs(self.gx - player_gx)) <= distance
+        newly = np.flatnonzero(near & ~self.traversed)
+        if newly.size:
+            self.traversed[newly] = True
+            self._restyle = True
+        return newly
+
+    def quest_progress(self, quest_id):
+        """(traversed, total) coordinates of one quest"""
+        mask = self.quest_ids == normalize_quest_id(quest_id)
+        return int(np.count_nonzero(self.traversed & mask)), int(np.count_nonzero(mask))
+
+    def render(self, dx, dy, view_w, view_h, current_quest):
+        """Show the dots for a map placed at canvas offset (dx, dy)"""
+        if self._offset is not None and self._offset != (dx, dy) and self._items:
+            self.canvas.move(QUEST_DOT_TAG, dx - self._offset[0], dy - self._offset[1])
+        self._offset = (dx, dy)
+        current_quest = normalize_quest_id(current_quest)
+        if current_quest != self._current_quest:
+            self._current_quest = current_quest
+            self._restyle = True
+
+        x, y = self.px + dx, self.py + dy
+        m = self.margin
+        visible = np.flatnonzero((x >= -m) & (x <= view_w + m) & (y >= -m) & (y <= view_h + m))
+        visible_set = set(visible.tolist())
+        for index in [i for i in self._items if i not in visible_set]:
+            self.canvas.delete(self._items.pop(index)[0])
+
+        restyle, self._restyle = self._restyle, False
+        raise_current = False
+        for index in visible.tolist():
+            entry = self._items.get(index)
+            if entry is not None and not restyle:
+                continue
+            style = (current_quest is not None and int(self.quest_ids[index]) == current_quest,
+                     bool(self.traversed[index]))
+            if entry is not None and entry[1] == style:
+                continue
+            shift, r, fill, outline, width = QUEST_DOT_STYLES[style]
+            cx, cy = int(x[index]) + shift, int(y[index]) + shift
+            tags = (QUEST_DOT_TAG, QUEST_DOT_CURRENT_TAG) if style[0] else (QUEST_DOT_TAG,)
+            if entry is None:
+                item = self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r,
+                                               fill=fill, outline=outline, width=width, tags=tags)
+            else:
+                item = entry[0]
+                self.canvas.coords(item, cx - r, cy - r, cx + r, cy + r)
+                self.canvas.itemconfigure(item, fill=fill, outline=outline, width=width, tags=tags)
+            self._items[index] = (item, style)
+            raise_current = raise_current or style[0]
+        if raise_current:
+            # Current quest's dots above the others
+            self.canvas.tag_raise(QUEST_DOT_CURRENT_TAG, QUEST_DOT_TAG)
+
+    def clear(self):
+        self.canvas.delete(QUEST_DOT_TAG)
+        self._items.clear()
+        self._offset = None
+
+
+def _quest_dot_layer(map_canvas):
+    """The canvas's QuestDotLayer, rebuilt if the quest coordinates were (re)loaded"""
+    layer = map_canvas.quest_dot_layer
+    coordinates = map_canvas.all_quest_coordinates
+    if layer is None or layer.source is not coordinates or len(layer) != len(coordinates):
+        if layer is not None:
+            layer.clear()
+        layer = QuestDotLayer(map_canvas, coordinates)
+        map_canvas.quest_dot_layer = layer
+    return layer
+
 def draw_quest_coordinates(map_canvas, dx, dy, canvas_w, canvas_h):
     """Draw quest coordinates on map
     
     Quest coordinates are stored as (y, x) tuples WITHOUT padding.
     We need to add padding to match the global coordinate system.
     """
-    map_canvas.delete("quest_coordinates")
-    
-    current_quest = map_canvas.current_quest_id
-    
-    # Draw all quest coordinates
-    for coord_gy, coord_gx, quest_id in map_canvas.all_quest_coordinates:
-        # Skip if this is current quest (drawn separately on top)
-        draw_on_top = current_quest is not None and quest_id == current_quest
-        
-        if not draw_on_top:
-            # Add padding to match global coordinate system
-            pixel_x = (coord_gx + PAD) * TILE_SIZE + TILE_SIZE // 2
-            pixel_y = (coord_gy + PAD) * TILE_SIZE + TILE_SIZE // 2
-            
-            # Apply canvas offset
-            coord_x = pixel_x + dx
-            coord_y = pixel_y + dy
-            
-            # Skip if outside canvas
-            if not (-10 <= coord_x <= canvas_w + 10 and -10 <= coord_y <= canvas_h + 10):
-                continue
-            
-            coord_pos = (coord_gy, coord_gx)
-            is_traversed = coord_pos in map_canvas.traversed_coordinates
-            
-            if is_traversed:
-                color = "#4ec9b0"
-                size = 4
-            else:
-                color = "#569cd6"
-                size = 3
-            
-            map_canvas.create_oval(
-                coord_x + 40 - size, coord_y + 40 - size, 
-                coord_x + 40 + size, coord_y + 40 + size,
-                fill=color, outline="", 
-                tags="quest_coordinates"
-            )
-    
-    # Draw current quest coordinates on top
-    if current_quest is not None:
-        for coord_gy, coord_gx, quest_id in map_canvas.all_quest_coordinates:
-            if quest_id != current_quest:
-                continue
-            
-            # Add padding to match global coordinate system
-            pixel_x = (coord_gx + PAD) * TILE_SIZE + TILE_SIZE // 2
-            pixel_y = (coord_gy + PAD) * TILE_SIZE + TILE_SIZE // 2
-            
-            # Apply canvas offset
-            coord_x = pixel_x + dx
-            coord_y = pixel_y + dy
-            
-            # Skip if outside canvas
-            if not (-10 <= coord_x <= canvas_w + 10 and -10 <= coord_y <= canvas_h + 10):
-                continue
-            
-            coord_pos = (coord_gy, coord_gx)
-            is_traversed = coord_pos in map_canvas.traversed_coordinates
-            
-            if is_traversed:
-                color = "#4ec9b0"
-                outline = "#3ba776"
-                size = 6
-            else:
-                color = "#dcdcaa"
-                outline = "#b8a654"
-                size = 5
-            
-            map_canvas.create_oval(
-                coord_x - size, coord_y - size, 
-                coord_x + size, coord_y + size,
-                fill=color, outline=outline, width=2, 
-                tags="quest_coordinates"
-            )
+    _quest_dot_layer(map_canvas).render(dx, dy, canvas_w, canvas_h, map_canvas.current_quest_id)
 
 def update_sprite(map_canvas, facing, center_x, center_y):
     """Update player sprite on map"""
@@ -348,18 +470,19 @@ def update_sprite(map_canvas, facing, center_x, center_y):
         sprite_y = center_y - 8
         
         if map_canvas.sprite_image_id:
-            map_canvas.delete(map_canvas.sprite_image_id)
-        
-        map_canvas.sprite_image_id = map_canvas.create_image(
-            sprite_x, sprite_y, 
-            image=sprite_photo, 
-            anchor='nw'
-        )
+            # Reuse the sprite item; only move it / swap its image
+            map_canvas.coords(map_canvas.sprite_image_id, sprite_x, sprite_y)
+            map_canvas.itemconfigure(map_canvas.sprite_image_id, image=sprite_photo)
+        else:
+            map_canvas.sprite_image_id = map_canvas.create_image(
+                sprite_x, sprite_y, 
+                image=sprite_photo, 
+                anchor='nw'
+            )
         
         # Layer ordering
-        if hasattr(map_canvas, 'map_image_id') and map_canvas.map_image_id:
-            map_canvas.tag_lower(map_canvas.map_image_id)
-        map_canvas.tag_raise("quest_coordinates")
+        map_canvas.tag_lower(MAP_TILE_TAG)
+        map_canvas.tag_raise(QUEST_DOT_TAG)
         map_canvas.tag_raise(map_canvas.sprite_image_id)
 
 def update_coordinate_traversal(map_canvas, player_gx, player_gy, env_labels):
@@ -368,35 +491,36 @@ def update_coordinate_traversal(map_canvas, player_gx, player_gy, env_labels):
     player_gx and player_gy are global coordinates WITHOUT padding,
     matching the quest coordinate system.
     """
-    player_pos = (player_gy, player_gx)
-    
-    # Check each quest coordinate
-    for coord_gy, coord_gx, quest_id in map_canvas.all_quest_coordinates:
-        coord_pos = (coord_gy, coord_gx)
-        distance = abs(player_pos[0] - coord_pos[0]) + abs(player_pos[1] - coord_pos[1])
-        
-        if distance <= map_canvas.coordinate_traversal_distance:
-            map_canvas.traversed_coordinates.add(coord_pos)
+    layer = _quest_dot_layer(map_canvas)
+    newly = layer.mark_traversed(player_gy, player_gx, map_canvas.coordinate_traversal_distance)
+    for index in newly.tolist():
+        map_canvas.traversed_coordinates.add((int(layer.gy[index]), int(layer.gx[index])))
     
     # Update stats
-    total = len(map_canvas.all_quest_coordinates)
+    total = len(layer)
     traversed = len(map_canvas.traversed_coordinates)
     
     if total > 0:
-        env_labels['total_coordinates'].config(text=f"Total Coordinates: {total}")
-        env_labels['traversed_count'].config(text=f"Traversed: {traversed} ({traversed/total*100:.1f}%)")
+        _set_label_text(env_labels['total_coordinates'], f"Total Coordinates: {total}")
+        _set_label_text(env_labels['traversed_count'], f"Traversed: {traversed} ({traversed/total*100:.1f}%)")
         
         current_quest = map_canvas.current_quest_id
         if current_quest is not None:
-            quest_coords = [(gy, gx) for gy, gx, qid in map_canvas.all_quest_coordinates if qid == current_quest]
-            quest_traversed = [c for c in quest_coords if c in map_canvas.traversed_coordinates]
+            quest_traversed, quest_total = layer.quest_progress(current_quest)
             
-            if quest_coords:
-                percentage = len(quest_traversed) / len(quest_coords) * 100
-                env_labels['current_quest_stats'].config(
-                    text=f"Quest {current_quest}: {len(quest_traversed)}/{len(quest_coords)} ({percentage:.1f}%)"
+            if quest_total:
+                percentage = quest_traversed / quest_total * 100
+                _set_label_text(
+                    env_labels['current_quest_stats'],
+                    f"Quest {current_quest}: {quest_traversed}/{quest_total} ({percentage:.1f}%)"
                 )
 
+def _set_label_text(label, text):
+    """Configure a label only when its text actually changes"""
+    if getattr(label, '_last_text', None) != text:
+        label.config(text=text)
+        label._last_text = text
+
 def draw_warp_minimap(canvas, debug_text, warp_data):
     """Draw warp minimap with modern styling"""
     try:
@@ -475,8 +599,23 @@ def format_debug_info(debug_info, warp_obs_data):
 def update_screen_canvas(canvas, status_data, photo_attr):
     """Update emulator or collision screen canvas"""
     try:
-        pixel_data, width, height, mode = status_data
-        img = Image.frombytes(mode, (width, height), pixel_data)
+        if isinstance(status_data, FrameRef):
+            channel = get_channel(status_data.shm_name)
+            if channel is None:
+                return
+            # Several refs can queue up between polls; draw each frame once
+            seq_attr = f"{photo_attr}_seq"
+            if channel.seq == getattr(canvas, seq_attr, None):
+                return
+            seq, frame = channel.read()
+            if frame is None:
+                return
+            setattr(canvas, seq_attr, seq)
+            img = Image.fromarray(frame)
+            width, height = img.width, img.height
+        else:
+            pixel_data, width, height, mode = status_data
+            img = Image.frombytes(mode, (width, height), pixel_data)
         
         canvas_w = canvas.winfo_width() or int(canvas.cget('width'))
         canvas_h = canvas.winfo_height() or int(canvas.cget('height'))
@@ -484,11 +623,18 @@ def update_screen_canvas(canvas, status_data, photo_attr):
         if width != canvas_w or height != canvas_h:
             img = img.resize((canvas_w, canvas_h), Image.Resampling.NEAREST)
         
-        photo = ImageTk.PhotoImage(img)
-        setattr(canvas, photo_attr, photo)
-        
-        canvas.delete("all")
-        canvas.create_image(0, 0, image=photo, anchor='nw')
+        photo = getattr(canvas, photo_attr, None)
+        item_attr = f"{photo_attr}_item"
+        if photo is not None and getattr(canvas, item_attr, None) and (photo.width(), photo.height()) == img.size:
+            # Same size: paste into the PhotoImage already on the canvas
+            photo.paste(img)
+        else:
+            photo = ImageTk.PhotoImage(img)
+            setattr(canvas, photo_attr, photo)
+            if getattr(canvas, item_attr, None):
+                canvas.delete(getattr(canvas, item_attr))
+            setattr(canvas, item_attr, canvas.create_image(0, 0, image=photo, anchor='nw'))
+            canvas.tag_lower(getattr(canvas, item_attr))
         
     except Exception as e:
         print(f"Render: Error updating screen canvas: {e}")
@@ -8,12 +8,13 @@ on top of the existing tkinter UI when quests start and complete.
 import tkinter as tk
 from tkinter import PhotoImage
 from PIL import Image, ImageDraw, ImageFont, ImageTk
-import json
 import threading
 import time
 from pathlib import Path
 from typing import Dict, Optional, List, Tuple, Any
 
+from environment.environment_helpers.quest_catalog import QuestCatalog, get_quest_catalog
+
 class SpeechBubbleRenderer:
     """Renders comic-style speech bubbles with quest text"""
     
@@ -238,24 +239,14 @@ class SpeechBubbleManager:
         self.last_quest_id = None
         
         # Load quest data
-        if quest_data_file is None:
-            quest_data_file = Path(__file__).parent.parent / "environment" / "environment_helpers" / "required_completions.json"
-        
         self.load_quest_data(quest_data_file)
     
-    def load_quest_data(self, quest_file: Path):
-        """Load quest data from JSON file"""
+    def load_quest_data(self, quest_file: Optional[Path] = None):
+        """Load quest data from the shared quest catalog, or from a JSON file"""
         try:
-            if quest_file.exists():
-                with open(quest_file, 'r') as f:
-                    quests = json.load(f)
-                    for quest in quests:
-                        quest_id = quest.get('quest_id')
-                        if quest_id:
-                            self.quest_data[quest_id] = quest
-                print(f"Loaded {len(self.quest_data)} quests for speech bubbles")
-            else:
-                print(f"Quest data file not found: {quest_file}")
+            catalog = get_quest_catalog() if quest_file is None else QuestCatalog(Path(quest_file))
+            self.quest_data.update(catalog.by_padded_id)
+            print(f"Loaded {len(self.quest_data)} quests for speech bubbles")
         except Exception as e:
             print(f"Error loading quest data: {e}")
     
@@ -12,6 +12,8 @@ from .logging_config import (
     setup_logging,
     close_logging,
     LineCountRotatingFileHandler,
+    BufferedFileHandler,
+    QueueLogWriter,
     StructuredFormatter,
     LoggerWriter
 )
@@ -22,6 +24,8 @@ __all__ = [
     'setup_logging',
     'close_logging',
     'LineCountRotatingFileHandler',
+    'BufferedFileHandler',
+    'QueueLogWriter',
     'StructuredFormatter',
     'LoggerWriter'
 ] 
\ No newline at end of file
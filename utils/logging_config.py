@@ -7,6 +7,8 @@ and structured logging capabilities specifically designed for Pokemon game analy
 
 Features:
 - Line-based file rotation (20k lines per file)
+- Background writer thread: logging calls only enqueue records, files stay
+  open and are flushed in batches
 - Multiple specialized log streams (game, quest, navigation, environment, performance, errors, debug)
 - Structured JSON logging for debug data
 - Automatic terminal redirection
@@ -27,58 +29,121 @@ Usage:
     logger.log_error("PATHFOLLOW", "Navigation error occurred", {"position": [100, 200]})
 """
 
+import atexit
 import logging
 import logging.handlers
 import json
+import queue
 import sys
 import os
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional, Union
 import threading
 from io import StringIO
 
-class LineCountRotatingFileHandler(logging.Handler):
+class BufferedFileHandler(logging.Handler):
+    """
+    File handler that keeps its file open and flushes in batches.
+
+    Records are written to a buffered stream; the buffer is flushed once
+    flush_bytes have accumulated or flush_interval seconds have passed since
+    the last flush (checked on each record and by QueueLogWriter when idle),
+    and on close().
+    """
+
+    def __init__(self, filename: Union[str, Path], mode: str = 'a',
+                 flush_bytes: int = 64 * 1024, flush_interval: float = 1.0):
+        super().__init__()
+        self.filename = Path(filename)
+        self.mode = mode
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self._stream = None
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+        # Ensure directory exists
+        self.filename.parent.mkdir(parents=True, exist_ok=True)
+        self._open(mode)
+
+    def _open(self, mode: str):
+        self._stream = open(self.filename, mode, encoding='utf-8', buffering=self.flush_bytes + 8192)
+
+    def _write(self, text: str):
+        self._stream.write(text)
+        self._pending += len(text)
+
+    def emit(self, record):
+        """Format and buffer a record; flush if the batch is full or old"""
+        try:
+            self._write(self.format(record) + '\n')
+            if self._pending >= self.flush_bytes or time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            if self._stream is not None and not self._stream.closed:
+                self._stream.flush()
+            self._pending = 0
+            self._last_flush = time.monotonic()
+
+    def close(self):
+        with self.lock:
+            try:
+                if self._stream is not None and not self._stream.closed:
+                    self._stream.flush()
+                    self._stream.close()
+            finally:
+                self._stream = None
+                super().close()
+
+
+class LineCountRotatingFileHandler(BufferedFileHandler):
     """
     Custom handler that rotates log files based on line count rather than file size.
     Creates new files when line limit is reached with timestamped naming.
+
+    The file stays open between records (see BufferedFileHandler); it is only
+    closed and reopened when rotating.
     """
     
-    def __init__(self, filename: Union[str, Path], max_lines: int = 10000, backup_count: int = 10):
-        super().__init__()
-        self.filename = Path(filename)
+    def __init__(self, filename: Union[str, Path], max_lines: int = 10000, backup_count: int = 10,
+                 flush_bytes: int = 64 * 1024, flush_interval: float = 1.0):
         self.max_lines = max_lines
         self.backup_count = backup_count
         self.current_lines = 0
-        self._lock = threading.Lock()
-        
-        # Ensure directory exists
-        self.filename.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Initialize current file
-        self._init_current_file()
-    
-    def _init_current_file(self):
-        """Initialize or reset the current log file"""
-        if self.filename.exists():
+        filename = Path(filename)
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        existed = filename.exists()
+        if existed:
             # Count existing lines
-            with open(self.filename, 'r', encoding='utf-8', errors='ignore') as f:
-                self.current_lines = sum(1 for _ in f)
-        else:
-            self.current_lines = 0
-            # Create empty file
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                f.write(f"# Log started at {datetime.now().isoformat()}\n")
-                self.current_lines = 1
+            with open(filename, 'rb') as f:
+                self.current_lines = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+        super().__init__(filename, mode='a', flush_bytes=flush_bytes, flush_interval=flush_interval)
+        if not existed:
+            self._write(f"# Log started at {datetime.now().isoformat()}\n")
+            self.flush()
+
+    def _write(self, text: str):
+        super()._write(text)
+        self.current_lines += text.count('\n')
     
     def _rotate_file(self):
         """Rotate the current log file with timestamp"""
-        if not self.filename.exists():
-            return
+        self._stream.close()
+        self._pending = 0
             
-        # Create timestamped backup
+        # Create timestamped backup (suffixed if several rotations fall in one second)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         backup_name = self.filename.with_name(f"{self.filename.stem}_{timestamp}.log")
+        counter = 1
+        while backup_name.exists():
+            backup_name = self.filename.with_name(f"{self.filename.stem}_{timestamp}_{counter}.log")
+            counter += 1
         
         try:
             # Move current file to backup
@@ -86,21 +151,16 @@ class LineCountRotatingFileHandler(logging.Handler):
             
             # Clean up old backups if needed
             self._cleanup_old_backups()
-            
-            # Reset line counter
-            self.current_lines = 0
-            
-            # Create new file
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                f.write(f"# Log rotated at {datetime.now().isoformat()}\n")
-                self.current_lines = 1
-                
+            header = f"# Log rotated at {datetime.now().isoformat()}\n"
         except Exception as e:
             # Fallback - just recreate the file
             print(f"Warning: Failed to rotate log file {self.filename}: {e}")
-            with open(self.filename, 'w', encoding='utf-8') as f:
-                f.write(f"# Log recreated at {datetime.now().isoformat()} (rotation failed)\n")
-                self.current_lines = 1
+            header = f"# Log recreated at {datetime.now().isoformat()} (rotation failed)\n"
+
+        # Reset line counter and start the new file
+        self.current_lines = 0
+        self._open('w')
+        self._write(header)
     
     def _cleanup_old_backups(self):
         """Remove old backup files beyond the backup count"""
@@ -117,22 +177,122 @@ class LineCountRotatingFileHandler(logging.Handler):
     
     def emit(self, record):
         """Emit a log record, rotating file if necessary"""
-        with self._lock:
-            # Check if rotation is needed
-            if self.current_lines >= self.max_lines:
+        # Check if rotation is needed
+        if self.current_lines >= self.max_lines:
+            try:
                 self._rotate_file()
-            
+            except Exception as e:
+                print(f"Error rotating log file {self.filename}: {e}")
+                return
+        super().emit(record)
+
+
+_STOP = object()
+
+
+class _RoutedQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that tags each record with the file handler that should write it"""
+
+    def __init__(self, writer: 'QueueLogWriter', target: logging.Handler):
+        super().__init__(writer.queue)
+        self.writer = writer
+        self.target = target
+        self.setLevel(target.level)
+
+    def prepare(self, record):
+        # Formatting is left to the writer thread; only bake in %-args so later
+        # mutation of the arguments cannot change the message
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        self.writer.enqueue(self.target, record)
+
+
+class QueueLogWriter:
+    """
+    Background log writer (QueueHandler/QueueListener style).
+
+    Loggers get a QueueHandler that only puts the record on a bounded queue
+    (never blocking: records are dropped and counted when it is full); one
+    daemon thread formats and writes them with the real file handlers and
+    flushes every handler when the queue has been idle for flush_interval.
+    """
+
+    def __init__(self, maxsize: int = 100_000, flush_interval: float = 1.0):
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self.flush_interval = flush_interval
+        self.handlers = []
+        self.dropped = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def handler_for(self, target: logging.Handler) -> logging.Handler:
+        """Queueing front for target (which is then only used by the writer thread)"""
+        self.handlers.append(target)
+        return _RoutedQueueHandler(self, target)
+
+    def enqueue(self, target: logging.Handler, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait((target, record))
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="QueueLogWriter", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far is written and flushed"""
+        if self._thread is None:
+            self._flush_handlers()
+            return True
+        done = threading.Event()
+        self.queue.put((None, done), timeout=timeout)
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """Write out the queue, flush and stop the thread (file handlers stay open)"""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        atexit.unregister(self.stop)
+        try:
+            self.queue.put((_STOP, None), timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        if self.dropped:
+            print(f"Warning: {self.dropped} log records were dropped (log queue full)")
+
+    def _flush_handlers(self):
+        for handler in self.handlers:
             try:
-                # Format and write the record
-                msg = self.format(record)
-                with open(self.filename, 'a', encoding='utf-8') as f:
-                    f.write(msg + '\n')
-                    f.flush()
-                
-                self.current_lines += 1
-                
+                handler.flush()
+            except Exception as e:
+                print(f"Error flushing log handler {handler}: {e}")
+
+    def _run(self):
+        while True:
+            try:
+                target, record = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush_handlers()
+                continue
+            if target is _STOP:
+                break
+            if target is None:  # flush() marker
+                self._flush_handlers()
+                record.set()
+                continue
+            try:
+                target.handle(record)
             except Exception as e:
-                print(f"Error writing to log file {self.filename}: {e}")
+                print(f"Error writing log record: {e}")
+        self._flush_handlers()
 
 class StructuredFormatter(logging.Formatter):
     """
@@ -196,10 +356,14 @@ class PokemonLogger:
     Specialized logger for Pokemon game system with multiple log streams
     """
     
-    def __init__(self, logs_dir: Path, max_lines: int = 10000, overwrite_logs: bool = True):
+    def __init__(self, logs_dir: Path, max_lines: int = 10000, overwrite_logs: bool = True,
+                 background: bool = True):
         self.logs_dir = Path(logs_dir)
         self.max_lines = max_lines
         self.overwrite_logs = overwrite_logs
+        # File handlers are driven by a background writer thread unless background=False
+        self._writer: Optional[QueueLogWriter] = QueueLogWriter() if background else None
+        self._file_handlers = []
         
         # Ensure logs directory exists
         self.logs_dir.mkdir(parents=True, exist_ok=True)
@@ -211,6 +375,8 @@ class PokemonLogger:
         
         # Initialize all loggers
         self._setup_loggers()
+        if self._writer is not None:
+            self._writer.start()
         
         # Store original stdout/stderr for restoration
         self._original_stdout = sys.stdout
@@ -255,11 +421,7 @@ class PokemonLogger:
         
         if self.overwrite_logs:
             # Simple file handler that overwrites on each run
-            # Clear the file first
-            if file_path.exists():
-                file_path.unlink()
-            
-            handler = logging.FileHandler(file_path, mode='w', encoding='utf-8')
+            handler = BufferedFileHandler(file_path, mode='w')
         else:
             # Use rotating handler
             handler = LineCountRotatingFileHandler(file_path, max_lines=self.max_lines)
@@ -267,12 +429,35 @@ class PokemonLogger:
         # Set formatter
         formatter = StructuredFormatter(structured=structured)
         handler.setFormatter(formatter)
+        self._file_handlers.append(handler)
         
+        if self._writer is not None:
+            handler = self._writer.handler_for(handler)
         logger.addHandler(handler)
         logger.propagate = False  # Prevent duplicate logs
         
         return logger
     
+    def flush(self):
+        """Write out queued records and flush all log files"""
+        if self._writer is not None:
+            self._writer.flush()
+        else:
+            for handler in self._file_handlers:
+                handler.flush()
+
+    def close(self):
+        """Stop the writer thread and close all log files"""
+        if self._writer is not None:
+            self._writer.stop()
+        for handler in self._file_handlers:
+            handler.close()
+        for logger in (self.game_logger, self.quest_logger, self.nav_logger, self.env_logger,
+                       self.perf_logger, self.error_logger, self.debug_logger):
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+        self._file_handlers = []
+    
     def update_map_tracking(self, current_map_id: int):
         """Update map tracking for logging context"""
         global _current_map_id, _previous_map_ids
@@ -437,7 +622,8 @@ class PokemonLogger:
 # Global logger instance
 _pokemon_logger: Optional[PokemonLogger] = None
 
-def setup_logging(logs_dir: str = "logs", max_lines: int = 10000, redirect_stdout: bool = False, overwrite_logs: bool = True) -> PokemonLogger:
+def setup_logging(logs_dir: str = "logs", max_lines: int = 10000, redirect_stdout: bool = False, overwrite_logs: bool = True,
+                  background: bool = True) -> PokemonLogger:
     """
     Setup the Pokemon logging system
     
@@ -446,6 +632,7 @@ def setup_logging(logs_dir: str = "logs", max_lines: int = 10000, redirect_stdou
         max_lines: Maximum lines per log file before rotation (ignored if overwrite_logs=True)
         redirect_stdout: Whether to redirect stdout/stderr to loggers
         overwrite_logs: Whether to overwrite log files on each run (True) or use rotation (False)
+        background: Write log files from a background thread (logging calls only enqueue)
     
     Returns:
         PokemonLogger instance
@@ -470,7 +657,11 @@ def setup_logging(logs_dir: str = "logs", max_lines: int = 10000, redirect_stdou
         else:
             logs_path = current_dir / logs_dir
     
-    _pokemon_logger = PokemonLogger(logs_path, max_lines, overwrite_logs)
+    if _pokemon_logger is not None:
+        # Re-initialization: stop the previous writer thread and release its files
+        _pokemon_logger.restore_stdout_stderr()
+        _pokemon_logger.close()
+    _pokemon_logger = PokemonLogger(logs_path, max_lines, overwrite_logs, background)
     
     if redirect_stdout:
         _pokemon_logger.redirect_stdout_stderr()
@@ -499,6 +690,7 @@ def close_logging():
     global _pokemon_logger
     if _pokemon_logger:
         _pokemon_logger.restore_stdout_stderr()
+        _pokemon_logger.close()
         _pokemon_logger = None
 
 # Context manager for temporary logging
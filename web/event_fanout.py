@@ -0,0 +1,262 @@
+# event_fanout.py
+"""
+Asyncio Server-Sent Events fan-out (http://host:port/events).
+
+The Flask /events endpoint holds one thread per browser and an unbounded
+Queue per client, and broadcast_update() JSON-encodes under a lock and
+pushes into every queue.  EventFanout runs next to Flask on its own asyncio
+loop thread instead:
+
+- broadcast() serializes each event once, in the caller's thread, and hands
+  the bytes to the loop; the emulator side never waits on a browser.
+- every client has a bounded pending map.  State-like events (location,
+  stats, quest data, ...) are coalesced latest-value-wins per event type;
+  one-off events (speech bubbles, actions, ...) are queued individually.
+- a client whose pending map overflows is resynced: its backlog is dropped
+  and replaced by a single snapshot of the current state.  A client that
+  overflows while it has not completed a write for STALL_TIMEOUT seconds, or
+  whose write does not complete within STALL_TIMEOUT, is disconnected: its
+  transport is aborted, so the socket and its unsent buffer are released.
+
+The page connects here when the server runs and falls back to Flask's
+/events otherwise.
+"""
+
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Iterable, Optional, Tuple
+
+EVENTS_PATH = '/events'
+KEEPALIVE_INTERVAL = 30.0
+STALL_TIMEOUT = 10.0
+
+# Event types where only the newest value matters
+COALESCED_EVENT_TYPES = frozenset({
+    'location', 'stats', 'pokemon_team', 'current_quest', 'quest_data', 'dialog',
+    'nav_status', 'grok_thinking', 'grok_response', 'grok_cost', 'grok_enabled',
+    'grok_prompt', 'llm_usage', 'global_map_player', 'facing_direction',
+    'game_screen', 'collision_overlay',
+})
+
+_RESPONSE_HEADERS = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Connection: keep-alive\r\n"
+    b"X-Accel-Buffering: no\r\n"
+    b"Access-Control-Allow-Origin: *\r\n\r\n"
+)
+
+
+def sse_message(event_type: str, data) -> bytes:
+    """Serialize one event in the format the page's EventSource handler expects."""
+    return f"data: {json.dumps({'type': event_type, 'data': data})}\n\n".encode()
+
+
+class _Client:
+    def __init__(self, max_pending: int, writer: Optional[asyncio.StreamWriter] = None):
+        self.max_pending = max_pending
+        self.writer = writer
+        self.pending: "OrderedDict[object, bytes]" = OrderedDict()
+        self.wake = asyncio.Event()
+        self.resyncing = False
+        self.dropped = False
+        self.last_progress = time.monotonic()
+
+    def offer(self, event_type: str, message: bytes, seq: int) -> bool:
+        """Queue a message. Returns False if the client must be resynced."""
+        key = event_type if event_type in COALESCED_EVENT_TYPES else seq
+        self.pending.pop(key, None)
+        self.pending[key] = message
+        self.wake.set()
+        return len(self.pending) <= self.max_pending
+
+
+class EventFanout:
+    """Bounded, coalescing SSE broadcaster served from an asyncio loop"""
+
+    def __init__(self, snapshot: Callable[[], Iterable[Tuple[str, object]]],
+                 host: str = '0.0.0.0', port: int = 8082, max_pending: int = 256,
+                 stall_timeout: float = STALL_TIMEOUT):
+        """
+        Args:
+            snapshot: Returns (event_type, data) pairs describing the current
+                state; sent to new clients and to clients being resynced
+            host, port: Listen address
+            max_pending: Messages a client may have queued before it is resynced
+            stall_timeout: Seconds without a completed write before a client is dropped
+        """
+        self.snapshot = snapshot
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self.stall_timeout = stall_timeout
+        self.running = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._clients = set()
+        self._seq = itertools.count()
+        self._last_seq: Optional[int] = None
+        # Broadcasts waiting for the loop; one callback drains them all
+        self._inbox = deque()
+        self._inbox_lock = threading.Lock()
+        self._flush_scheduled = False
+        self._snapshot_cache = (None, b'')
+        self.resyncs = 0
+        self.drops = 0
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def start(self) -> threading.Thread:
+        """Start serving on a daemon thread."""
+        thread = threading.Thread(target=self._run, name="event-fanout", daemon=True)
+        thread.start()
+        return thread
+
+    def broadcast(self, event_type: str, data=None, message: Optional[bytes] = None) -> bool:
+        """
+        Send an event to every client (thread-safe, never blocks on clients).
+
+        Args:
+            message: Already serialized event (from sse_message), if the
+                caller has one
+
+        Returns:
+            bool: False if the server is not running
+        """
+        if self._loop is None or not self.running.is_set():
+            return False
+        if not self._clients:
+            return True
+        if message is None:
+            message = sse_message(event_type, data)
+        with self._inbox_lock:
+            self._inbox.append((event_type, message))
+            if self._flush_scheduled:
+                return True
+            self._flush_scheduled = True
+        self._loop.call_soon_threadsafe(self._flush_inbox)
+        return True
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            print(f"Event fan-out: server stopped: {e}")
+        finally:
+            self.running.clear()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        async with server:
+            self.running.set()
+            print(f"📡 Event stream on http://{self.host}:{self.port}{EVENTS_PATH}")
+            await server.serve_forever()
+
+    def _flush_inbox(self):
+        with self._inbox_lock:
+            batch = list(self._inbox)
+            self._inbox.clear()
+            self._flush_scheduled = False
+        for event_type, message in batch:
+            self._dispatch(event_type, message)
+
+    def _dispatch(self, event_type: str, message: bytes):
+        seq = next(self._seq)
+        self._last_seq = seq
+        for client in list(self._clients):
+            if not client.offer(event_type, message, seq):
+                self._overflow(client)
+
+    def _overflow(self, client: _Client):
+        client.pending.clear()
+        if client.resyncing and time.monotonic() - client.last_progress > self.stall_timeout:
+            # Not reading at all: give up on it
+            self._drop(client)
+        else:
+            client.resyncing = True
+            client.pending['__snapshot__'] = self._shared_snapshot()
+            self.resyncs += 1
+            client.wake.set()
+
+    def _drop(self, client: _Client):
+        """Disconnect a client; aborting (not closing) discards its unsent buffer."""
+        if client.dropped:
+            return
+        client.dropped = True
+        client.pending.clear()
+        self._clients.discard(client)
+        self.drops += 1
+        if client.writer is not None:
+            client.writer.transport.abort()
+        client.wake.set()
+
+    def _shared_snapshot(self) -> bytes:
+        """Snapshot message shared by every client resynced since the last event."""
+        if self._last_seq is None or self._snapshot_cache[0] != self._last_seq:
+            self._snapshot_cache = (self._last_seq, self._snapshot_message())
+        return self._snapshot_cache[1]
+
+    def _snapshot_message(self) -> bytes:
+        # The state is owned by the status queue thread; retry if it changed mid-serialization
+        for _ in range(3):
+            try:
+                return b''.join(sse_message(event_type, data) for event_type, data in self.snapshot() if data)
+            except RuntimeError:
+                continue
+            except Exception as e:
+                print(f"Event fan-out: error building snapshot: {e}")
+                break
+        return b''
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), 10)
+            parts = request.split(b"\r\n", 1)[0].split()
+            path = parts[1].decode(errors='replace').split('?')[0] if len(parts) >= 2 else ''
+            if parts[:1] != [b'GET'] or path != EVENTS_PATH:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+
+            client = _Client(self.max_pending, writer)
+            client.pending['__snapshot__'] = self._snapshot_message()
+            client.wake.set()
+            self._clients.add(client)
+            writer.write(_RESPONSE_HEADERS)
+            try:
+                await self._send_loop(client, writer)
+            finally:
+                self._clients.discard(client)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send_loop(self, client: _Client, writer: asyncio.StreamWriter):
+        while not client.dropped:
+            try:
+                await asyncio.wait_for(client.wake.wait(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                client.pending[next(self._seq)] = sse_message('keepalive', time.time())
+            client.wake.clear()
+            if not client.pending:
+                continue
+            sends_snapshot = '__snapshot__' in client.pending
+            batch = b''.join(client.pending.values())
+            client.pending.clear()
+            writer.write(batch)
+            try:
+                await asyncio.wait_for(writer.drain(), self.stall_timeout)
+            except asyncio.TimeoutError:
+                self._drop(client)
+                return
+            client.last_progress = time.monotonic()
+            if sends_snapshot:
+                client.resyncing = False
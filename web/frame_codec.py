@@ -0,0 +1,236 @@
+# frame_codec.py
+"""
+Binary frame codec for the /frames WebSocket stream.
+
+Game Boy frames use a handful of colours and change little between frames,
+so each frame is sent as a palette plus one index byte per pixel, and
+usually as the XOR against the previous frame (mostly zeros), with both
+compressed by a PackBits-style RLE.  Frames with more than 256 colours (e.g.
+the blended collision overlay on a busy screen) fall back to raw RGB bytes
+through the same XOR/RLE path.  The browser decodes into an ImageData and
+lets a <canvas> do the 3x scaling.
+
+Message layout (little-endian):
+
+    u8  version (FRAME_VERSION)
+    u8  channel (CHANNEL_IDS)
+    u8  flags   (FLAG_DELTA: XOR against the previous frame of this channel,
+                 FLAG_INDEXED: palette + 1 byte/pixel, otherwise 3 bytes/pixel)
+    u8  reserved
+    u32 seq
+    u16 width
+    u16 height
+    u16 palette size (0 unless FLAG_INDEXED)
+    u16 reserved
+    palette size * 3 bytes RGB palette
+    RLE body
+
+RLE body: a LEB128 varint control n followed by data.  Even n is a run of
+(n >> 1) + 1 copies of the next byte; odd n is (n >> 1) + 1 literal bytes.
+"""
+
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+FRAME_VERSION = 1
+FLAG_DELTA = 0x01
+FLAG_INDEXED = 0x02
+HEADER = struct.Struct('<BBBBIHHHH')
+
+# status_queue screen key -> channel byte in the frame header
+CHANNEL_IDS = {
+    '__emulator_screen__': 0,
+    '__collision_overlay_screen__': 1,
+}
+
+_MIN_RUN = 3
+
+
+def _varint(n: int, out: bytearray):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def rle_encode(data: np.ndarray) -> bytes:
+    """PackBits-style RLE of a flat uint8 array (see module docstring)."""
+    data = np.ascontiguousarray(data, dtype=np.uint8).ravel()
+    n = data.size
+    out = bytearray()
+    if n == 0:
+        return bytes(out)
+    # Start index and length of every run of equal bytes
+    starts = np.flatnonzero(np.concatenate(([True], data[1:] != data[:-1])))
+    lengths = np.diff(np.append(starts, n))
+    raw = data.tobytes()
+
+    literal_start = None
+    for start, length in zip(starts.tolist(), lengths.tolist()):
+        if length < _MIN_RUN:
+            if literal_start is None:
+                literal_start = start
+            continue
+        if literal_start is not None:
+            _varint(((start - literal_start - 1) << 1) | 1, out)
+            out += raw[literal_start:start]
+            literal_start = None
+        _varint((length - 1) << 1, out)
+        out.append(raw[start])
+    if literal_start is not None:
+        _varint(((n - literal_start - 1) << 1) | 1, out)
+        out += raw[literal_start:]
+    return bytes(out)
+
+
+def rle_decode(body: bytes, size: int) -> np.ndarray:
+    """Inverse of rle_encode() (reference implementation for tests and tools)."""
+    out = np.empty(size, dtype=np.uint8)
+    pos = i = 0
+    while i < len(body):
+        n = shift = 0
+        while True:
+            b = body[i]
+            i += 1
+            n |= (b & 0x7F) << shift
+            shift += 7
+            if b < 0x80:
+                break
+        count = (n >> 1) + 1
+        if n & 1:
+            out[pos:pos + count] = np.frombuffer(body, dtype=np.uint8, count=count, offset=i)
+            i += count
+        else:
+            out[pos:pos + count] = body[i]
+            i += 1
+        pos += count
+    if pos != size:
+        raise ValueError(f"RLE body decoded to {pos} bytes, expected {size}")
+    return out
+
+
+def _index_frame(rgb: np.ndarray) -> Tuple[Optional[np.ndarray], np.ndarray]:
+    """Return (palette (N, 3), index plane) or (None, RGB plane) above 256 colours."""
+    packed = (rgb[:, :, 0].astype(np.uint32) << 16) | (rgb[:, :, 1].astype(np.uint32) << 8) | rgb[:, :, 2]
+    colours, indices = np.unique(packed.ravel(), return_inverse=True)
+    if colours.size > 256:
+        return None, np.ascontiguousarray(rgb).ravel()
+    palette = np.stack([(colours >> 16) & 0xFF, (colours >> 8) & 0xFF, colours & 0xFF], axis=1).astype(np.uint8)
+    return palette, indices.astype(np.uint8)
+
+
+class FrameStreamEncoder:
+    """
+    Encodes each channel's frames once for every connected viewer.
+
+    encode() turns a new frame into a delta message against the previous
+    encoded frame (or a keyframe when palette/size changed).  Viewers that
+    saw that previous frame get the delta; viewers that are new or skipped
+    frames get keyframe(), which is built at most once per frame.
+    """
+
+    def __init__(self):
+        self._state: Dict[int, dict] = {}
+
+    def encode(self, channel: int, seq: int, frame: np.ndarray) -> bytes:
+        """
+        Encode frame `seq` of a channel and make it the channel's current frame.
+
+        Args:
+            channel: Channel byte (see CHANNEL_IDS)
+            seq: Frame sequence number
+            frame: (H, W, 3+) uint8 frame
+
+        Returns:
+            bytes: Message for viewers holding the previous frame
+        """
+        rgb = frame[:, :, :3]
+        height, width = rgb.shape[:2]
+        palette, plane = _index_frame(rgb)
+        prev = self._state.get(channel)
+
+        same_format = (
+            prev is not None and prev['shape'] == (height, width)
+            and ((palette is None and prev['palette'] is None)
+                 or (palette is not None and prev['palette'] is not None
+                     and np.array_equal(palette, prev['palette'])))
+        )
+        state = {'seq': seq, 'prev_seq': prev['seq'] if prev else None, 'shape': (height, width),
+                 'palette': palette, 'plane': plane, 'keyframe': None}
+        if same_format:
+            state['message'] = self._message(channel, seq, width, height, palette,
+                                             np.bitwise_xor(plane, prev['plane']), delta=True)
+        else:
+            state['message'] = state['keyframe'] = self._message(channel, seq, width, height, palette, plane)
+        self._state[channel] = state
+        return state['message']
+
+    def message_for(self, channel: int, last_seq: Optional[int]) -> Optional[Tuple[int, bytes]]:
+        """
+        Return (seq, message) bringing a viewer at last_seq to the current frame.
+
+        Returns:
+            None if the viewer is already current or nothing was encoded yet
+        """
+        state = self._state.get(channel)
+        if state is None or last_seq == state['seq']:
+            return None
+        if last_seq is not None and last_seq == state['prev_seq']:
+            return state['seq'], state['message']
+        return state['seq'], self.keyframe(channel)
+
+    def keyframe(self, channel: int) -> Optional[bytes]:
+        """Self-contained message for the channel's current frame."""
+        state = self._state.get(channel)
+        if state is None:
+            return None
+        if state['keyframe'] is None:
+            height, width = state['shape']
+            state['keyframe'] = self._message(channel, state['seq'], width, height, state['palette'], state['plane'])
+        return state['keyframe']
+
+    def current_seq(self, channel: int) -> Optional[int]:
+        state = self._state.get(channel)
+        return state['seq'] if state else None
+
+    @staticmethod
+    def _message(channel, seq, width, height, palette, plane, delta=False) -> bytes:
+        flags = (FLAG_DELTA if delta else 0) | (FLAG_INDEXED if palette is not None else 0)
+        n_colours = 0 if palette is None else len(palette)
+        parts = [HEADER.pack(FRAME_VERSION, channel, flags, 0, seq & 0xFFFFFFFF, width, height, n_colours, 0)]
+        if palette is not None:
+            parts.append(palette.tobytes())
+        parts.append(rle_encode(plane))
+        return b''.join(parts)
+
+
+def decode_message(message: bytes, previous_plane: Optional[np.ndarray] = None):
+    """
+    Reference decoder for stream messages (the browser carries its own).
+
+    Args:
+        message: One stream message
+        previous_plane: Plane returned for the previous frame of the same
+            channel; required for delta messages
+
+    Returns:
+        (channel, seq, (H, W, 3) RGB frame, plane for decoding the next delta)
+    """
+    version, channel, flags, _, seq, width, height, n_colours, _ = HEADER.unpack_from(message)
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported frame version {version}")
+    offset = HEADER.size
+    palette = None
+    if flags & FLAG_INDEXED:
+        palette = np.frombuffer(message, dtype=np.uint8, count=n_colours * 3, offset=offset).reshape(-1, 3)
+        offset += n_colours * 3
+    size = width * height * (1 if palette is not None else 3)
+    plane = rle_decode(message[offset:], size)
+    if flags & FLAG_DELTA:
+        if previous_plane is None:
+            raise ValueError("Delta frame without a previous frame")
+        plane = np.bitwise_xor(plane, previous_plane)
+    rgb = palette[plane] if palette is not None else plane
+    return channel, seq, rgb.reshape(height, width, 3), plane
@@ -0,0 +1,278 @@
+# quest_map_cache.py
+"""
+In-memory cache of the encoded quest-overlay map served at /global-map.png.
+
+Rendering the overlay means decoding the 6976x7104 Kanto map, drawing every
+quest tile and PNG-encoding the result, which takes seconds.  QuestMapCache
+does that once per (quest set, source files) combination on a background
+thread and hands the request path ready-made PNG bytes plus an ETag.
+
+An entry is keyed by the requested quest ids and fingerprinted by the
+mtime/size of the base map and each quest's coords JSON.  When a request
+sees that the fingerprint moved, a rebuild is scheduled and the previous
+bytes (with their own ETag) keep being served until it finishes, so the
+request path never renders or encodes.
+
+Builds run one at a time on a single worker thread, and only max_keys
+distinct quest sets are ever admitted (by default as many as the cache
+keeps, so admitted sets are never evicted and rebuilt in a loop); requests
+for further sets get None, like a build that has not finished.
+
+QuestTileLayer serves the same quest overlay as transparent XYZ tiles for
+the tiled map view (see environment_helpers.map_tile_pyramid).
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from .quest_map_generator import (
+    BASE_MAP_PATH,
+    COLOUR_PALETTE,
+    TILE_SIZE,
+    coords_path_for_quest,
+    load_coords_for_quest,
+    padded_global_to_tile,
+    render,
+)
+
+DEFAULT_QUEST_IDS = tuple(range(1, 11))
+
+
+@dataclass(frozen=True)
+class CachedQuestMap:
+    """Encoded quest-overlay PNG and the source fingerprint it was built from"""
+    quest_ids: Tuple[int, ...]
+    fingerprint: str
+    etag: str
+    png: bytes
+
+
+def source_fingerprint(quest_dir: Path, quest_ids: Tuple[int, ...]) -> str:
+    """Hash of a quest set and the mtime/size of the base map and its coords files."""
+    h = hashlib.sha1(repr(quest_ids).encode())
+    for path in [BASE_MAP_PATH] + [coords_path_for_quest(quest_dir, q) for q in quest_ids]:
+        try:
+            st = path.stat()
+            h.update(f"{path}:{st.st_mtime_ns}:{st.st_size};".encode())
+        except OSError:
+            h.update(f"{path}:missing;".encode())
+    return h.hexdigest()
+
+
+def _encode_png(quest_dir: Path, quest_ids: Tuple[int, ...], crop: bool) -> bytes:
+    return _png_bytes(render(quest_dir, quest_ids, crop=crop))
+
+
+class QuestMapCache:
+    """Background-built, fingerprint-invalidated cache of quest-overlay PNGs"""
+
+    def __init__(self, quest_dir: Path, crop: bool = False, max_entries: int = 8,
+                 encoder: Optional[Callable[[Tuple[int, ...]], bytes]] = None,
+                 max_keys: Optional[int] = None):
+        """
+        Args:
+            quest_dir: Directory holding NNN/NNN_coords.json quest path files
+            crop: Passed through to quest_map_generator.render()
+            max_entries: Quest sets kept in memory (least recently used dropped)
+            encoder: quest_ids -> PNG bytes (defaults to rendering the map)
+            max_keys: Distinct quest sets that may ever be built (defaults to max_entries)
+        """
+        self.quest_dir = Path(quest_dir)
+        self.max_entries = max_entries
+        self.max_keys = max_entries if max_keys is None else max_keys
+        self._encoder = encoder or (lambda ids: _encode_png(self.quest_dir, ids, crop))
+        self._entries: "OrderedDict[Tuple[int, ...], CachedQuestMap]" = OrderedDict()
+        self._admitted = set()
+        self._building = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.rejected = 0
+
+    def fingerprint(self, quest_ids: Tuple[int, ...]) -> str:
+        """Hash of the quest set and the mtime/size of every source file it reads."""
+        return source_fingerprint(self.quest_dir, quest_ids)
+
+    def get(self, quest_ids: Optional[Iterable[int]] = None) -> Optional[CachedQuestMap]:
+        """
+        Return the cached map for quest_ids without rendering.
+
+        Schedules a background rebuild if there is no entry yet or its source
+        files changed; meanwhile the previous entry (if any) is returned.
+
+        Returns:
+            CachedQuestMap or None if the first build has not finished (or
+            quest_ids is a new set beyond max_keys)
+        """
+        key = self._key(quest_ids)
+        if not self._admit(key):
+            return None
+        fingerprint = self.fingerprint(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None or entry.fingerprint != fingerprint:
+            self._schedule(key)
+        return entry
+
+    def warm(self, quest_ids: Optional[Iterable[int]] = None):
+        """Start building quest_ids in the background (call at server start)."""
+        key = self._key(quest_ids)
+        if self._admit(key):
+            self._schedule(key)
+
+    def build(self, quest_ids: Optional[Iterable[int]] = None) -> CachedQuestMap:
+        """Render and store quest_ids synchronously."""
+        key = self._key(quest_ids)
+        fingerprint = self.fingerprint(key)
+        png = self._encoder(key)
+        entry = CachedQuestMap(key, fingerprint, f'"{hashlib.sha1(png).hexdigest()}"', png)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.builds += 1
+        return entry
+
+    def _admit(self, key: Tuple[int, ...]) -> bool:
+        """Whether key may be built: already admitted, or a free slot under max_keys."""
+        with self._lock:
+            if key in self._admitted:
+                return True
+            if len(self._admitted) >= self.max_keys:
+                self.rejected += 1
+                return False
+            self._admitted.add(key)
+            return True
+
+    def _schedule(self, key: Tuple[int, ...]):
+        with self._lock:
+            if key in self._building:
+                return
+            self._building.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="quest-map")
+            executor = self._executor
+        executor.submit(self._build_in_background, key)
+
+    def _build_in_background(self, key: Tuple[int, ...]):
+        try:
+            self.build(key)
+        except Exception as e:
+            print(f"Error building quest map for quests {list(key)}: {e}")
+        finally:
+            with self._lock:
+                self._building.discard(key)
+
+    @staticmethod
+    def _key(quest_ids: Optional[Iterable[int]]) -> Tuple[int, ...]:
+        if quest_ids is None:
+            return DEFAULT_QUEST_IDS
+        return tuple(sorted({int(q) for q in quest_ids}))
+
+
+class QuestTileLayer:
+    """
+    Transparent quest-path tiles on the same XYZ grid as a TilePyramid.
+
+    The web map stacks these over the base tiles instead of baking the quests
+    into one full-size image.  Tiles are drawn on first request (a few dozen
+    rectangles into a 256px tile) and kept in a small LRU keyed by version(),
+    which changes whenever the quest coords files do.
+    """
+
+    def __init__(self, pyramid, quest_dir: Path, quest_ids: Optional[Iterable[int]] = None,
+                 max_tiles: int = 512):
+        """
+        Args:
+            pyramid: TilePyramid whose geometry the tiles follow
+            quest_dir: Directory holding NNN/NNN_coords.json quest path files
+            quest_ids: Quests to draw (defaults to 1-10)
+            max_tiles: Encoded tiles kept in memory
+        """
+        self.pyramid = pyramid
+        self.quest_dir = Path(quest_dir)
+        self.quest_ids = QuestMapCache._key(quest_ids)
+        self.max_tiles = max_tiles
+        self._version = None
+        self._squares = []  # (x0, y0, colour) of each quest map tile, in base-map pixels
+        self._tiles: "OrderedDict[Tuple[str, int, int, int], bytes]" = OrderedDict()
+        self._empty_png = None
+        self._lock = threading.Lock()
+
+    def version(self) -> str:
+        """Short hash identifying the current quest coords; changes when they do."""
+        version = source_fingerprint(self.quest_dir, self.quest_ids)[:12]
+        with self._lock:
+            if version != self._version:
+                self._squares = self._load_squares()
+                self._tiles.clear()
+                self._version = version
+        return version
+
+    def tile_png(self, z: int, x: int, y: int) -> Optional[bytes]:
+        """Encoded RGBA PNG of quest tile (z, x, y), or None if out of range."""
+        cols, rows = self.pyramid.grid_size(z) if 0 <= z <= self.pyramid.max_zoom else (0, 0)
+        if not (0 <= x < cols and 0 <= y < rows):
+            return None
+        version = self.version()
+        key = (version, z, x, y)
+        with self._lock:
+            png = self._tiles.get(key)
+            if png is not None:
+                self._tiles.move_to_end(key)
+                return png
+        png = self._render(z, x, y)
+        with self._lock:
+            self._tiles[key] = png
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return png
+
+    def _load_squares(self):
+        squares = []
+        for idx in self.quest_ids:
+            colour = COLOUR_PALETTE[idx % len(COLOUR_PALETTE)]
+            for gy, gx in load_coords_for_quest(self.quest_dir, idx):
+                tx, ty = padded_global_to_tile(gy, gx)
+                squares.append((tx * TILE_SIZE, ty * TILE_SIZE, colour))
+        return squares
+
+    def _render(self, z: int, x: int, y: int) -> bytes:
+        ts = self.pyramid.tile_size
+        s = self.pyramid.scale(z)
+        left, top = x * ts * s, y * ts * s
+        right, bottom = left + ts * s, top + ts * s
+
+        tile = None
+        for x0, y0, colour in self._squares:
+            if x0 + TILE_SIZE <= left or x0 >= right or y0 + TILE_SIZE <= top or y0 >= bottom:
+                continue
+            if tile is None:
+                tile = Image.new('RGBA', (ts, ts), (0, 0, 0, 0))
+                draw = ImageDraw.Draw(tile)
+            px, py = (x0 - left) // s, (y0 - top) // s
+            size = max(1, TILE_SIZE // s)
+            draw.rectangle([px, py, px + size - 1, py + size - 1], fill=colour)
+
+        if tile is None:
+            if self._empty_png is None:
+                self._empty_png = _png_bytes(Image.new('RGBA', (ts, ts), (0, 0, 0, 0)))
+            return self._empty_png
+        return _png_bytes(tile)
+
+
+def _png_bytes(img) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format='PNG')
+    return buf.getvalue()
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
 
 import json
 from PIL import Image, ImageDraw, ImageFont
@@ -29,9 +29,16 @@ COLOUR_PALETTE = [
 FRAME_NAMES = []  # unused
 
 
-def load_coords_for_quest(quest_dir: Path, quest_id: int) -> List[Tuple[int, int]]:
+BASE_MAP_PATH = Path(__file__).resolve().parent.parent / 'environment' / 'data' / 'environment_data' / 'full_kanto_map.png'
+
+
+def coords_path_for_quest(quest_dir: Path, quest_id: int) -> Path:
     qid_str = f"{quest_id:03}"
-    json_path = quest_dir / qid_str / f"{qid_str}_coords.json"
+    return quest_dir / qid_str / f"{qid_str}_coords.json"
+
+
+def load_coords_for_quest(quest_dir: Path, quest_id: int) -> List[Tuple[int, int]]:
+    json_path = coords_path_for_quest(quest_dir, quest_id)
     if not json_path.exists():
         return []
     data = json.loads(json_path.read_text())
@@ -47,26 +54,27 @@ def padded_global_to_tile(g_y: int, g_x: int) -> Tuple[int, int]:
     return g_x - PAD_COL, g_y - PAD_ROW
 
 
-def generate(output_path: Path, quest_dir: Path, n: int = 10, crop: bool = True) -> None:
-    """Generate quest-overlay map at output_path.
+def render(quest_dir: Path, quest_ids: Iterable[int], crop: bool = True) -> Image.Image:
+    """Render the quest-overlay map in memory.
 
     Args:
-        output_path: Location to save resulting PNG
         quest_dir: Directory containing individual quest coordinate JSON files
-        n: Number of quests to overlay (1..n)
+        quest_ids: Quests to overlay
         crop: Whether to crop the image around the coloured quest tiles. Set to
               False to always export the full original map dimensions – useful
               for web-UIs that rely on fixed sizing.
+
+    Returns:
+        PIL.Image: RGBA map with quest tiles and legend
     """
     # Load the full Kanto base map from environment data
-    base_img_path = Path(__file__).resolve().parent.parent / 'environment' / 'data' / 'environment_data' / 'full_kanto_map.png'
-    base_img = Image.open(base_img_path).convert('RGBA')
+    base_img = Image.open(BASE_MAP_PATH).convert('RGBA')
     draw = ImageDraw.Draw(base_img)
     min_tx, min_ty = MAP_WIDTH_PX // TILE_SIZE, MAP_HEIGHT_PX // TILE_SIZE
     max_tx = max_ty = 0
     legend_entries = []
 
-    for idx in range(1, n+1):
+    for idx in quest_ids:
         colour = COLOUR_PALETTE[idx % len(COLOUR_PALETTE)]
         padded_coords = load_coords_for_quest(quest_dir, idx)
         for gy, gx in padded_coords:
@@ -85,9 +93,9 @@ def generate(output_path: Path, quest_dir: Path, n: int = 10, crop: bool = True)
         y_top = max((min_ty - pad_tiles) * TILE_SIZE, 0)
         x_right = min((max_tx + pad_tiles + 1) * TILE_SIZE, MAP_WIDTH_PX)
         y_bot = min((max_ty + pad_tiles + 1) * TILE_SIZE, MAP_HEIGHT_PX)
-        cropped = base_img.crop((x_left, y_top, x_right, y_bot))
+        out = base_img.crop((x_left, y_top, x_right, y_bot))
     else:
-        cropped = base_img
+        out = base_img
 
     # Legend
     legend_w, legend_h = 200, 20*len(legend_entries)+10
@@ -98,6 +106,17 @@ def generate(output_path: Path, quest_dir: Path, n: int = 10, crop: bool = True)
         y=5+i*20
         ld.rectangle([5,y,15,y+10],fill=col+(255,))
         ld.text((22,y),label,fill=(255,255,255,255),font=font)
-    out = cropped.copy()
     out.paste(legend,(10,10),legend)
-    out.save(output_path) 
\ No newline at end of file
+    return out
+
+
+def generate(output_path: Path, quest_dir: Path, n: int = 10, crop: bool = True) -> None:
+    """Generate quest-overlay map at output_path.
+
+    Args:
+        output_path: Location to save resulting PNG
+        quest_dir: Directory containing individual quest coordinate JSON files
+        n: Number of quests to overlay (1..n)
+        crop: See render()
+    """
+    render(quest_dir, range(1, n+1), crop=crop).save(output_path)
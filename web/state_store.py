@@ -0,0 +1,138 @@
+# state_store.py
+"""
+Versioned store behind the web server's game_state.
+
+Every write bumps a version number and remembers the path it touched, so a
+client that last saw version N can be brought up to date with a JSON Patch
+(RFC 6902) holding only what changed since N:
+
+    GET /game-state             -> {"epoch", "version", "state": {...}}
+    GET /game-state?since=N     -> {"epoch", "version", "patch": [...]}
+
+Writes must go through __setitem__ / set_in() (values handed out by reads
+are the live objects and must not be mutated in place).  Serialized
+snapshots and patches are cached per version, so any number of dashboards
+polling the same state cost one json.dumps per change.
+"""
+
+import json
+import threading
+import uuid
+from typing import Dict, Optional, Tuple
+
+Path = Tuple[str, ...]
+
+_PATCH_CACHE_SIZE = 32
+
+
+def json_pointer(path: Path) -> str:
+    """JSON Pointer (RFC 6901) for a key path"""
+    return ''.join('/' + str(part).replace('~', '~0').replace('/', '~1') for part in path)
+
+
+class VersionedState:
+    """dict-like game state that can report patches between versions"""
+
+    def __init__(self, initial: Optional[dict] = None):
+        self.epoch = uuid.uuid4().hex[:12]  # changes on restart; versions are per epoch
+        self._lock = threading.RLock()
+        self._state = {}
+        self._version = 0
+        self._changes: Dict[Path, int] = {}  # path -> version of its latest write
+        self._snapshot_cache: Tuple[int, bytes] = (-1, b'')
+        self._patch_cache: Dict[int, bytes] = {}
+        self._patch_cache_version = -1
+        for key, value in (initial or {}).items():
+            self[key] = value
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def __getitem__(self, key):
+        return self._state[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._state
+
+    def get(self, key, default=None):
+        return self._state.get(key, default)
+
+    def __setitem__(self, key, value):
+        self.set_in((key,), value)
+
+    def set_in(self, path: Path, value):
+        """
+        Set a nested value, creating missing intermediate dicts.
+
+        Args:
+            path: Keys from the top level down, e.g. ('stats', 'money')
+            value: JSON-serializable value
+        """
+        with self._lock:
+            parent = self._state
+            changed = path
+            for depth, key in enumerate(path[:-1]):
+                child = parent.get(key)
+                if not isinstance(child, dict):
+                    child = parent[key] = {}
+                    if changed is path:
+                        # Clients cannot have the new container; send it whole
+                        changed = path[:depth + 1]
+                parent = child
+            parent[path[-1]] = value
+
+            self._version += 1
+            # A write to a path supersedes earlier writes below it
+            for old in [p for p in self._changes if len(p) > len(changed) and p[:len(changed)] == changed]:
+                del self._changes[old]
+            self._changes[changed] = self._version
+
+    def snapshot_json(self) -> bytes:
+        """Serialized {"epoch", "version", "state"}, cached per version."""
+        with self._lock:
+            version, payload = self._snapshot_cache
+            if version != self._version:
+                payload = json.dumps({'epoch': self.epoch, 'version': self._version,
+                                      'state': self._state}, default=str).encode()
+                self._snapshot_cache = (self._version, payload)
+            return payload
+
+    def patch_json(self, since: int, epoch: Optional[str] = None) -> bytes:
+        """
+        Serialized changes since a version the client already has.
+
+        Args:
+            since: Version the client last saw
+            epoch: Epoch that version belongs to, if the client knows it
+
+        Returns:
+            bytes: {"epoch", "version", "patch": [...]}, or the full snapshot
+            when the client's version cannot be patched (other epoch, or
+            from the future)
+        """
+        with self._lock:
+            if (epoch is not None and epoch != self.epoch) or since < 0 or since > self._version:
+                return self.snapshot_json()
+            if self._patch_cache_version != self._version:
+                self._patch_cache = {}
+                self._patch_cache_version = self._version
+            payload = self._patch_cache.get(since)
+            if payload is None:
+                payload = json.dumps({'epoch': self.epoch, 'version': self._version,
+                                      'patch': self._patch_ops(since)}, default=str).encode()
+                if len(self._patch_cache) < _PATCH_CACHE_SIZE:
+                    self._patch_cache[since] = payload
+            return payload
+
+    def _patch_ops(self, since: int):
+        ops = []
+        for path, version in sorted(self._changes.items(), key=lambda item: item[1]):
+            if version <= since:
+                continue
+            value = self._state
+            for key in path:
+                value = value[key]
+            # "add" on an existing member replaces it, so it works either way
+            ops.append({'op': 'add', 'path': json_pointer(path), 'value': value})
+        return ops
@@ -0,0 +1,138 @@
+# stream_server.py
+"""
+Binary WebSocket stream of the emulator screens (ws://host:port/frames).
+
+Runs its own asyncio loop on a daemon thread next to the Flask app.  The
+Flask side hands over the FrameRef of every new screen via publish(); the
+loop reads the frame from shared memory and encodes it with
+FrameStreamEncoder only if at least one viewer is connected, so each frame
+is encoded once however many viewers there are.  Every viewer has its own
+sender coroutine that always sends the newest frame: a slow viewer skips
+frames and is resynced with a keyframe instead of queueing them.
+"""
+
+import asyncio
+import threading
+from typing import Optional
+
+from environment.environment_helpers.frame_channel import get_channel
+from environment.environment_helpers.status_publisher import FrameRef
+
+from .frame_codec import CHANNEL_IDS, FrameStreamEncoder
+
+try:
+    import websockets
+    from websockets.exceptions import ConnectionClosed
+except ImportError:  # optional dependency; the web UI falls back to SSE PNGs
+    websockets = None
+
+FRAMES_PATH = '/frames'
+
+
+class _Viewer:
+    def __init__(self, ws):
+        self.ws = ws
+        self.last_seq = {}  # channel -> seq of the frame this viewer has
+        self.wake = asyncio.Event()
+
+
+class FrameStreamServer:
+    """WebSocket server pushing FrameStreamEncoder messages to browsers"""
+
+    def __init__(self, host: str = '0.0.0.0', port: int = 8081):
+        self.host = host
+        self.port = port
+        self.encoder = FrameStreamEncoder()
+        self.running = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._viewers = set()
+        self._latest_refs = {}  # channel -> newest FrameRef (loop thread only)
+
+    @property
+    def viewer_count(self) -> int:
+        return len(self._viewers)
+
+    def start(self) -> Optional[threading.Thread]:
+        """Start serving on a daemon thread. Returns None if websockets is unavailable."""
+        if websockets is None:
+            print("Frame stream: 'websockets' is not installed; screens are sent over SSE")
+            return None
+        thread = threading.Thread(target=self._run, name="frame-stream", daemon=True)
+        thread.start()
+        return thread
+
+    def publish(self, screen_key: str, ref: FrameRef) -> bool:
+        """
+        Announce a new frame (thread-safe).
+
+        Returns:
+            bool: True if the stream server took the frame
+        """
+        channel = CHANNEL_IDS.get(screen_key)
+        if channel is None or self._loop is None or not self.running.is_set():
+            return False
+        self._loop.call_soon_threadsafe(self._on_frame, channel, ref)
+        return True
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            print(f"Frame stream: server stopped: {e}")
+        finally:
+            self.running.clear()
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        async with websockets.serve(self._handle, self.host, self.port, compression=None):
+            self.running.set()
+            print(f"🎞️  Frame stream on ws://{self.host}:{self.port}{FRAMES_PATH}")
+            await asyncio.Future()
+
+    def _on_frame(self, channel: int, ref: FrameRef):
+        self._latest_refs[channel] = ref
+        if not self._viewers:
+            return
+        self._encode_latest(channel)
+        for viewer in self._viewers:
+            viewer.wake.set()
+
+    def _encode_latest(self, channel: int):
+        ref = self._latest_refs.get(channel)
+        if ref is None or ref.seq == self.encoder.current_seq(channel):
+            return
+        frame_channel = get_channel(ref.shm_name)
+        if frame_channel is None:
+            return
+        seq, frame = frame_channel.read()
+        if frame is not None and seq != self.encoder.current_seq(channel):
+            self.encoder.encode(channel, seq, frame)
+
+    async def _handle(self, ws, path: Optional[str] = None):
+        request = getattr(ws, 'request', None)
+        path = request.path if request is not None else (path or getattr(ws, 'path', ''))
+        if path.split('?')[0] != FRAMES_PATH:
+            await ws.close(1008, "unknown path")
+            return
+
+        viewer = _Viewer(ws)
+        self._viewers.add(viewer)
+        # Frames that arrived while nobody was watching were not encoded
+        for channel in list(self._latest_refs):
+            self._encode_latest(channel)
+        viewer.wake.set()
+        try:
+            while True:
+                await viewer.wake.wait()
+                viewer.wake.clear()
+                for channel in list(self._latest_refs):
+                    update = self.encoder.message_for(channel, viewer.last_seq.get(channel))
+                    if update is None:
+                        continue
+                    seq, message = update
+                    await ws.send(message)
+                    viewer.last_seq[channel] = seq
+        except ConnectionClosed:
+            pass
+        finally:
+            self._viewers.discard(viewer)
@@ -9,7 +9,7 @@ import time
 import base64
 import threading
 from pathlib import Path
-from queue import Queue, Empty
+from queue import Queue, Empty, Full
 from datetime import datetime
 from flask import Flask, render_template_string, jsonify, Response, stream_with_context, request, send_from_directory
 from flask_cors import CORS
@@ -17,9 +17,16 @@ from PIL import Image
 import io
 import logging
 from shared import game_started, grok_enabled
+from environment.environment_helpers.status_publisher import FrameRef
+from environment.environment_helpers.frame_channel import get_channel
 from omegaconf import OmegaConf
-from .quest_map_generator import generate as build_quest_map, PAD_ROW, PAD_COL, TILE_SIZE
-from PIL import ImageDraw
+from .quest_map_generator import BASE_MAP_PATH
+from .quest_map_cache import QuestMapCache, QuestTileLayer
+from .stream_server import FrameStreamServer
+from .event_fanout import EventFanout, sse_message
+from .state_store import VersionedState
+from environment.environment_helpers.map_tile_pyramid import get_kanto_pyramid
+from environment.environment_helpers.quest_catalog import get_quest_catalog
 
 # load the exact same config.yaml you merged in play.py
 _CONFIG = OmegaConf.load(Path(__file__).parent.parent / "config.yaml")
@@ -38,8 +45,9 @@ STATIC_DIR = Path(__file__).parent / 'static'
 STATIC_DIR.mkdir(exist_ok=True)
 (STATIC_DIR / 'images').mkdir(exist_ok=True)
 
-# Global game state
-game_state = {
+# Global game state; versioned so /game-state?since=N can answer with a patch.
+# Screens are not part of it: 'screens' only holds their seq and URL.
+game_state = VersionedState({
     'location': {'map_name': 'Unknown', 'map_id': 0, 'x': 0, 'y': 0, 'gx': 0, 'gy': 0},
     'stats': {'money': 0, 'badges': 0, 'pokedex_seen': 0, 'pokedex_caught': 0, 'steps': 0},
     'pokemon_team': [],
@@ -47,62 +55,139 @@ game_state = {
     'quest_data': {'quests': {}, 'triggers': {}},
     'dialog': '',
     'nav_status': 'idle',
-    'game_screen': None,
-    'collision_overlay': None,
+    'screens': {},
     'grok_thinking': '',
     'grok_response': '',
     'grok_cost': {},
     'last_update': time.time()
-}
+})
+
+# Quest-overlay map for /global-map.png, rebuilt in the background when quest paths change
+QUEST_PATHS_DIR = Path(__file__).parent.parent / 'environment' / 'environment_helpers' / 'quest_paths'
+quest_map_cache = QuestMapCache(QUEST_PATHS_DIR)
 
-# SSE client connections
+# XYZ tiles for the tiled global map (/tiles/...): base map plus quest overlay layer
+map_tile_pyramid = get_kanto_pyramid()
+quest_tile_layer = QuestTileLayer(map_tile_pyramid, QUEST_PATHS_DIR)
+TILE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+TILE_BUILD_WAIT = 2.0  # seconds a tile request waits for the pyramid build
+
+# SSE client connections (Flask /events); queues are bounded so a stalled
+# browser is dropped instead of buffering without limit
 sse_clients = []
 sse_lock = threading.Lock()
+SSE_CLIENT_QUEUE_SIZE = 512
 
-# Cache for quest definitions
-quest_definitions = None
-last_quest_id = None
+# Asyncio SSE fan-out (started by start_server); the page prefers it over /events
+event_fanout = None
 
-def load_quest_definitions():
-    """Load quest definitions from JSON file"""
-    global quest_definitions
-    if quest_definitions is None:
-        try:
-            file_path = Path(__file__).parent.parent / 'environment' / 'environment_helpers' / 'required_completions.json'
-            with open(file_path, 'r') as f:
-                quest_definitions = json.load(f)
-                print(f"Loaded {len(quest_definitions)} quest definitions")
-        except Exception as e:
-            print(f"Error loading quest definitions: {e}")
-            quest_definitions = []
-    return quest_definitions
+last_quest_id = None
 
 def get_quest_by_id(quest_id):
-    """Get quest data by ID"""
-    quests = load_quest_definitions()
-    for quest in quests:
-        if str(quest.get('quest_id')) == str(quest_id):
-            return quest
-    return None
+    """Get quest data by ID (3, "3" or "003")"""
+    return get_quest_catalog().get(quest_id)
 
 def broadcast_update(event_type, data):
-    """Send update to all SSE clients"""
-    message = f"data: {json.dumps({'type': event_type, 'data': data})}\n\n"
-    
-    with sse_lock:
-        dead_clients = []
-        for client_queue in sse_clients:
-            try:
-                client_queue.put(message)
-            except:
-                dead_clients.append(client_queue)
-        
-        for client in dead_clients:
-            sse_clients.remove(client)
+    """Send update to all SSE clients, serializing it once"""
+    fanout_listening = event_fanout is not None and event_fanout.client_count > 0
+    if not sse_clients and not fanout_listening:
+        return
+    message = sse_message(event_type, data)
+
+    if fanout_listening:
+        event_fanout.broadcast(event_type, message=message)
+
+    if sse_clients:
+        text = message.decode()
+        with sse_lock:
+            dead_clients = []
+            for client_queue in sse_clients:
+                try:
+                    client_queue.put_nowait(text)
+                except Full:
+                    dead_clients.append(client_queue)
+
+            for client in dead_clients:
+                sse_clients.remove(client)
+
+def _has_listeners():
+    return bool(sse_clients) or (event_fanout is not None and event_fanout.client_count > 0)
+
+def _initial_events(encode_screen=True):
+    """(event_type, data) pairs a newly connected SSE client starts with"""
+    events = [('connected', {'msg': 'Connected to game server', 'server_id': os.getpid()})]
+    keys = ['location', 'stats', 'pokemon_team', 'current_quest', 'quest_data', 'grok_thinking', 'grok_response', 'grok_enabled']
+    events.extend((key, game_state.get(key)) for key in keys)
+    if frame_stream is None or not frame_stream.running.is_set():
+        # Send game screen if available
+        events.append(('game_screen', _encode_screen('game_screen') if encode_screen else _cached_screen_url('game_screen')))
+    return events
+
+# Screen channels: status_queue key -> game_state key
+_SCREEN_STATE_KEYS = {
+    '__emulator_screen__': 'game_screen',
+    '__collision_overlay_screen__': 'collision_overlay',
+}
+
+# Newest FrameRef per screen and [seq, PNG bytes, data URL or None] last
+# encoded from it. Frames stay in shared memory until a client needs them.
+_frame_refs = {}
+_encoded_frames = {}
+_frame_lock = threading.Lock()
+_legacy_screen_seq = 0
+
+# Binary WebSocket screen stream (started by start_server); while it runs,
+# screens are no longer pushed to SSE clients as PNG data URLs
+frame_stream = None
+
+def _png_bytes(img):
+    """Upscale a screen image 3x and encode it as PNG"""
+    img = img.resize((img.width * 3, img.height * 3), Image.NEAREST)
+    buffered = io.BytesIO()
+    img.save(buffered, format='PNG')
+    return buffered.getvalue()
+
+def _screen_png(state_key):
+    """Return (seq, PNG bytes) for a screen's newest frame, encoding at most once per frame"""
+    with _frame_lock:
+        cached = _encoded_frames.get(state_key)
+        ref = _frame_refs.get(state_key)
+        channel = get_channel(ref.shm_name) if ref is not None else None
+        if channel is None:
+            return (cached[0], cached[1]) if cached is not None else None
+        seq, view = channel.front()
+        if cached is not None and cached[0] == seq:
+            return cached[0], cached[1]
+        png = _png_bytes(Image.fromarray(view))
+        if not channel.still_valid(seq):
+            # Writer lapped us mid-encode; keep the previous good frame
+            return (cached[0], cached[1]) if cached is not None else None
+        _encoded_frames[state_key] = [seq, png, None]
+        return seq, png
+
+def _encode_screen(state_key):
+    """Return the PNG data URL for a screen's newest frame"""
+    if _screen_png(state_key) is None:
+        return None
+    return _cached_screen_url(state_key)
+
+def _cached_screen_url(state_key):
+    """Data URL of the last encoded frame of a screen, without encoding a new one"""
+    with _frame_lock:
+        cached = _encoded_frames.get(state_key)
+        if cached is None:
+            return None
+        if cached[2] is None:
+            cached[2] = f"data:image/png;base64,{base64.b64encode(cached[1]).decode('utf-8')}"
+        return cached[2]
+
+def _publish_screen_seq(state_key, seq):
+    """Record in game_state that a screen has a new frame at /screens/<key>.png"""
+    game_state.set_in(('screens', state_key), {'seq': seq, 'url': f"/screens/{state_key}.png?seq={seq}"})
 
 def handle_status_update(item_id, data):
     """Process updates from status_queue"""
-    global game_state, last_quest_id
+    global game_state, last_quest_id, _legacy_screen_seq
     
     # # Debug logging
     # if item_id in ('__emulator_screen__', '__collision_overlay_screen__'):
@@ -222,46 +307,37 @@ def handle_status_update(item_id, data):
         
     elif item_id.startswith('__stats_'):
         stat_name = item_id.replace('__stats_', '').replace('__', '')
-        game_state['stats'][stat_name] = data
+        game_state.set_in(('stats', stat_name), data)
         broadcast_update('stats', game_state['stats'])
         
-    elif item_id == '__emulator_screen__':
+    elif item_id in _SCREEN_STATE_KEYS:
+        state_key = _SCREEN_STATE_KEYS[item_id]
         try:
-            if isinstance(data, tuple) and len(data) == 4:
+            if isinstance(data, FrameRef):
+                with _frame_lock:
+                    _frame_refs[state_key] = data
+                _publish_screen_seq(state_key, data.seq)
+                streamed = frame_stream is not None and frame_stream.publish(item_id, data)
+                # Encode now only if someone is listening; HTTP readers encode on demand
+                if _has_listeners() and not streamed:
+                    data_url = _encode_screen(state_key)
+                    if data_url:
+                        broadcast_update(state_key, data_url)
+            elif isinstance(data, tuple) and len(data) == 4:
                 pixel_data_bytes, img_width, img_height, img_mode = data
                 img = Image.frombytes(img_mode, (img_width, img_height), pixel_data_bytes)
-                img = img.resize((img_width * 3, img_height * 3), Image.NEAREST)
-                
-                buffered = io.BytesIO()
-                img.save(buffered, format='PNG')
-                img_b64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
-                
-                game_state['game_screen'] = f"data:image/png;base64,{img_b64}"
-                broadcast_update('game_screen', game_state['game_screen'])
+                _legacy_screen_seq += 1
+                with _frame_lock:
+                    _frame_refs.pop(state_key, None)
+                    _encoded_frames[state_key] = [_legacy_screen_seq, _png_bytes(img), None]
+                _publish_screen_seq(state_key, _legacy_screen_seq)
+                broadcast_update(state_key, _cached_screen_url(state_key))
         except Exception as e:
-            print(f"Error processing screen data: {e}")
-            
-    elif item_id == '__collision_overlay_screen__':
-        try:
-            if isinstance(data, tuple) and len(data) == 4:
-                pixel_data_bytes, img_width, img_height, img_mode = data
-                img = Image.frombytes(img_mode, (img_width, img_height), pixel_data_bytes)
-                img = img.resize((img_width * 3, img_height * 3), Image.NEAREST)
-                
-                buffered = io.BytesIO()
-                img.save(buffered, format='PNG')
-                img_b64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
-                
-                game_state['collision_overlay'] = f"data:image/png;base64,{img_b64}"
-                broadcast_update('collision_overlay', game_state['collision_overlay'])
-        except Exception as e:
-            print(f"Error processing collision overlay: {e}")
+            print(f"Error processing {state_key} data: {e}")
     
     # Handle trigger updates (quest progress)
     elif isinstance(item_id, str) and ('_' in item_id or item_id.isdigit()):
-        if 'triggers' not in game_state['quest_data']:
-            game_state['quest_data']['triggers'] = {}
-        game_state['quest_data']['triggers'][str(item_id)] = data
+        game_state.set_in(('quest_data', 'triggers', str(item_id)), data)
         broadcast_update('trigger_update', {'id': item_id, 'completed': data})
     
     elif item_id == '__global_map_player__':
@@ -2404,13 +2480,16 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
     </style>
     <script>
         const CONFIG = {{ CONFIG | tojson }};
+        const FRAME_STREAM_PORT = {{ STREAM_PORT | tojson }};
+        const EVENT_STREAM_PORT = {{ EVENTS_PORT | tojson }};
     </script>
 </head>
 
 <body>
     <!-- Full-size global map background, centered on player -->
     <div class="global-map-background">
-        <img id="globalMapBackground" src="/global-map.png" alt="Global Map">
+        <!-- Filled with /tiles/ images around the viewport by updateVisibleMapTiles() -->
+        <div id="globalMapBackground"></div>
     </div>
 
     <!-- TV Container -->
@@ -2875,6 +2954,65 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             });
         }
 
+        // Tiled global map: only the tiles around the viewport are in the DOM
+        gameState.tileMeta = null;
+        gameState.mapTiles = {};
+        gameState.mapView = null;
+
+        async function loadTileMeta() {
+            const res = await fetch('/tiles/meta.json');
+            if (!res.ok) throw new Error(res.statusText);
+            gameState.tileMeta = await res.json();
+            const bg = document.getElementById('globalMapBackground');
+            if (bg) {
+                bg.style.width = `${gameState.tileMeta.width}px`;
+                bg.style.height = `${gameState.tileMeta.height}px`;
+            }
+            if (gameState.mapView) {
+                updateVisibleMapTiles(...gameState.mapView);
+            }
+        }
+
+        function updateVisibleMapTiles(offsetX, offsetY, scale) {
+            gameState.mapView = [offsetX, offsetY, scale];
+            const meta = gameState.tileMeta;
+            const bg = document.getElementById('globalMapBackground');
+            if (!meta || !bg) return;
+
+            const ts = meta.tile_size, z = meta.max_zoom;
+            const left = -offsetX / scale, top = -offsetY / scale;
+            const x0 = Math.max(0, Math.floor(left / ts));
+            const y0 = Math.max(0, Math.floor(top / ts));
+            const x1 = Math.min(meta.columns - 1, Math.floor((left + window.innerWidth / scale) / ts));
+            const y1 = Math.min(meta.rows - 1, Math.floor((top + window.innerHeight / scale) / ts));
+
+            const wanted = new Set();
+            for (let y = y0; y <= y1; y++) {
+                for (let x = x0; x <= x1; x++) {
+                    const key = `${x},${y}`;
+                    wanted.add(key);
+                    if (gameState.mapTiles[key]) continue;
+                    const urls = [
+                        `/tiles/${z}/${x}/${y}.png`,
+                        `/tiles/quests/${z}/${x}/${y}.png?v=${meta.quest_version}`,
+                    ];
+                    gameState.mapTiles[key] = urls.map(url => {
+                        const img = document.createElement('img');
+                        img.src = url;
+                        img.style.cssText = `position:absolute;left:${x * ts}px;top:${y * ts}px;image-rendering:pixelated;`;
+                        bg.appendChild(img);
+                        return img;
+                    });
+                }
+            }
+            for (const key of Object.keys(gameState.mapTiles)) {
+                if (!wanted.has(key)) {
+                    gameState.mapTiles[key].forEach(img => img.remove());
+                    delete gameState.mapTiles[key];
+                }
+            }
+        }
+
         // Update player position and center map
         function updatePlayerPosition(localX, localY, mapId, facing = 'Down') {
             if (!gameState.mapData) return;
@@ -2904,6 +3042,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 const offsetX = centerX - (pixelX * scale);
                 const offsetY = centerY - (pixelY * scale);
                 bgImg.style.transform = `translate(${offsetX}px, ${offsetY}px) scale(${scale})`;
+                updateVisibleMapTiles(offsetX, offsetY, scale);
                 console.log(`Map centered on player: (${globalX}, ${globalY}) -> pixel (${pixelX}, ${pixelY}) -> offset (${offsetX}, ${offsetY})`);
             }
         }
@@ -2959,6 +3098,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             loadPlayerSprites();
             loadMapData();
             loadQuestPaths();
+            loadTileMeta();
         });
 
         // Show speech bubble
@@ -3202,8 +3342,88 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             if (viz.children.length > 10) viz.removeChild(viz.children[0]);
         }
 
+        // Binary frame stream (message layout: see web/frame_codec.py).  Frames
+        // arrive as 160x144 palette-indexed planes or XOR/RLE deltas and are
+        // scaled by the browser via the canvas CSS size.
+        let frameStreamActive = false;
+
+        function decodeStreamFrame(buffer, planes) {
+            const bytes = new Uint8Array(buffer);
+            const view = new DataView(buffer);
+            if (view.getUint8(0) !== 1) return null;
+            const channel = view.getUint8(1), flags = view.getUint8(2);
+            const seq = view.getUint32(4, true);
+            const width = view.getUint16(8, true), height = view.getUint16(10, true);
+            const nColours = view.getUint16(12, true);
+            const indexed = (flags & 2) !== 0;
+            let offset = 16, palette = null;
+            if (indexed) {
+                palette = bytes.subarray(offset, offset + nColours * 3);
+                offset += nColours * 3;
+            }
+            const size = width * height * (indexed ? 1 : 3);
+            const plane = new Uint8Array(size);
+            let pos = 0, i = offset;
+            while (i < bytes.length && pos < size) {
+                let n = 0, shift = 0, b;
+                do { b = bytes[i++]; n |= (b & 0x7f) << shift; shift += 7; } while (b & 0x80);
+                const count = (n >> 1) + 1;
+                if (n & 1) { plane.set(bytes.subarray(i, i + count), pos); i += count; }
+                else { plane.fill(bytes[i++], pos, pos + count); }
+                pos += count;
+            }
+            if (flags & 1) {
+                const prev = planes[channel];
+                if (!prev || prev.length !== size) return null;
+                for (let k = 0; k < size; k++) plane[k] ^= prev[k];
+            }
+            planes[channel] = plane;
+
+            const rgba = new Uint8ClampedArray(width * height * 4);
+            for (let p = 0, q = 0; p < width * height; p++, q += 4) {
+                const c = indexed ? plane[p] * 3 : p * 3;
+                const src = indexed ? palette : plane;
+                rgba[q] = src[c]; rgba[q + 1] = src[c + 1]; rgba[q + 2] = src[c + 2]; rgba[q + 3] = 255;
+            }
+            return { channel, seq, image: new ImageData(rgba, width, height) };
+        }
+
+        function startFrameStream() {
+            if (!FRAME_STREAM_PORT || !window.WebSocket) return;
+            const scheme = location.protocol === 'https:' ? 'wss' : 'ws';
+            const ws = new WebSocket(`${scheme}://${location.hostname}:${FRAME_STREAM_PORT}/frames`);
+            ws.binaryType = 'arraybuffer';
+            const planes = {};
+            let canvas = null;
+            ws.onmessage = e => {
+                const frame = decodeStreamFrame(e.data, planes);
+                if (!frame || frame.channel !== 0) return;
+                const gs = document.getElementById('gameScreen');
+                if (!gs) return;
+                if (!canvas || !gs.contains(canvas)) {
+                    canvas = document.createElement('canvas');
+                    canvas.style.cssText = 'width: 100%; height: 100%; image-rendering: pixelated;';
+                    gs.innerHTML = '';
+                    gs.appendChild(canvas);
+                    gs.style.setProperty('display', 'flex', 'important');
+                    const ph = document.getElementById('gamePlaceholder');
+                    if (ph) ph.style.display = 'none';
+                    frameStreamActive = true;
+                }
+                if (canvas.width !== frame.image.width || canvas.height !== frame.image.height) {
+                    canvas.width = frame.image.width;
+                    canvas.height = frame.image.height;
+                }
+                canvas.getContext('2d').putImageData(frame.image, 0, 0);
+            };
+            ws.onclose = () => setTimeout(startFrameStream, 2000);
+        }
+        startFrameStream();
+
         // SSE connection
-        const eventSource = new EventSource('/events');
+        const eventSource = new EventSource(EVENT_STREAM_PORT
+            ? `${location.protocol}//${location.hostname}:${EVENT_STREAM_PORT}/events`
+            : '/events');
         let firstConnect = true, lastServerId = null, reconnectTimer = null;
         const RECONNECT_FALLBACK_MS = 5000, WATCHDOG_INTERVAL_MS = 45000;
         let lastSseTime = Date.now();
@@ -3351,6 +3571,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                     break;
 
                 case 'game_screen':
+                    if (frameStreamActive) break;  // the WebSocket canvas owns the screen
                     const gs = document.getElementById('gameScreen');
                     const ph = document.getElementById('gamePlaceholder');
                     console.log('GAME SCREEN EVENT RECEIVED!');
@@ -3674,7 +3895,9 @@ def index():
     """Serve the main web UI"""
     # Convert OmegaConf DictConfig to plain dict for JSON serialization
     config_dict = OmegaConf.to_container(_CONFIG, resolve=True)
-    return render_template_string(HTML_TEMPLATE, CONFIG=config_dict)
+    stream_port = frame_stream.port if frame_stream is not None and frame_stream.running.is_set() else None
+    events_port = event_fanout.port if event_fanout is not None and event_fanout.running.is_set() else None
+    return render_template_string(HTML_TEMPLATE, CONFIG=config_dict, STREAM_PORT=stream_port, EVENTS_PORT=events_port)
 
 @app.route('/static/<path:filename>')
 def serve_static(filename):
@@ -3711,41 +3934,29 @@ def serve_static(filename):
 def events():
     """Server-Sent Events endpoint"""
     def generate():
-        client_queue = Queue()
+        client_queue = Queue(maxsize=SSE_CLIENT_QUEUE_SIZE)
         
         with sse_lock:
             sse_clients.append(client_queue)
         
         try:
-            # Send initial connection message with unique server_id (PID)
-            yield (
-                f"data: " + json.dumps({
-                    'type': 'connected',
-                    'data': {
-                        'msg': 'Connected to game server',
-                        'server_id': os.getpid()
-                    }
-                }) + "\n\n"
-            )
-            
-            # Send current game state if available
-            keys = ['location', 'stats', 'pokemon_team', 'current_quest', 'quest_data', 'grok_thinking', 'grok_response', 'grok_enabled']
-            initial_updates = [(key, game_state.get(key)) for key in keys]
-
-            for event_type, data in initial_updates:
+            # Send initial connection message with unique server_id (PID) and
+            # current game state if available
+            for event_type, data in _initial_events():
                 if data:
                     yield f"data: {json.dumps({'type': event_type, 'data': data})}\n\n"
             
-            # Send game screen if available
-            if game_state.get('game_screen'):
-                yield f"data: {json.dumps({'type': 'game_screen', 'data': game_state['game_screen']})}\n\n"
-            
             # Stream updates
             while True:
                 try:
                     message = client_queue.get(timeout=30)
                     yield message
                 except Empty:
+                    with sse_lock:
+                        if client_queue not in sse_clients:
+                            # Dropped by broadcast_update for falling behind;
+                            # the browser reconnects and gets fresh state
+                            return
                     # Send keepalive
                     yield f"data: {json.dumps({'type': 'keepalive', 'data': time.time()})}\n\n"
                     
@@ -3766,8 +3977,34 @@ def events():
 
 @app.route('/game-state')
 def get_game_state():
-    """Get current game state as JSON"""
-    return jsonify(game_state)
+    """
+    Get current game state as JSON, or a JSON Patch against a version the
+    client already has (?since=<version>[&epoch=<epoch>]). Screens are
+    fetched separately from /screens/<name>.png.
+    """
+    since = request.args.get('since')
+    if since is None:
+        payload = game_state.snapshot_json()
+    else:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({'error': 'since must be an integer version'}), 400
+        payload = game_state.patch_json(since, request.args.get('epoch'))
+    return Response(payload, mimetype='application/json', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/screens/<name>.png')
+def get_screen(name):
+    """Newest frame of a screen ('game_screen' or 'collision_overlay') as PNG"""
+    if name not in _SCREEN_STATE_KEYS.values():
+        return jsonify({'error': f'unknown screen {name}'}), 404
+    encoded = _screen_png(name)
+    if encoded is None:
+        return jsonify({'error': 'no frame yet'}), 404
+    seq, png = encoded
+    response = Response(png, mimetype='image/png', headers={'Cache-Control': 'no-cache'})
+    response.set_etag(str(seq))
+    return response.make_conditional(request)
 
 @app.route('/status')
 def status():
@@ -3775,17 +4012,27 @@ def status():
     return jsonify({
         'status': 'running',
         'last_update': game_state.get('last_update', 0),
-        'connected_clients': len(sse_clients),
+        'connected_clients': len(sse_clients) + (event_fanout.client_count if event_fanout is not None else 0),
         'current_quest': game_state.get('current_quest'),
         'location': game_state.get('location', {}).get('map_name', 'Unknown')
     })
 
 @app.route('/required_completions.json')
 def required_completions():
-    """Serve the quest definitions file"""
+    """Serve the quest definitions, pre-serialized and gzipped once"""
     try:
-        quests = load_quest_definitions()
-        return jsonify(quests)
+        catalog = get_quest_catalog()
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = Response(catalog.gzip_payload(), mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+            etag = f"{catalog.etag}-gz"
+        else:
+            response = Response(catalog.json_payload(), mimetype='application/json')
+            etag = catalog.etag
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = 'no-cache'
+        response.set_etag(etag)
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -3889,8 +4136,14 @@ def get_grok_usage():
 def is_started():
     return jsonify(started=game_started.is_set())
 
-def start_server(status_queue, host='0.0.0.0', port=8080):
-    """Start the Flask server with status queue monitoring"""
+def start_server(status_queue, host='0.0.0.0', port=8080, stream_port=None, events_port=None):
+    """Start the Flask server with status queue monitoring
+
+    Args:
+        stream_port: Port of the binary frame WebSocket stream (default port + 1)
+        events_port: Port of the asyncio SSE fan-out (default port + 2)
+    """
+    global frame_stream, event_fanout
     # Start status queue monitor thread
     monitor_thread = threading.Thread(
         target=monitor_status_queue, 
@@ -3899,14 +4152,26 @@ def start_server(status_queue, host='0.0.0.0', port=8080):
     )
     monitor_thread.start()
     
-    # Pre-load quest definitions
-    load_quest_definitions()
+    # Binary screen stream for browsers, next to the Flask app
+    frame_stream = FrameStreamServer(host, stream_port or port + 1)
+    frame_stream.start()
+
+    # Event fan-out for browsers; Flask's /events stays as the fallback
+    event_fanout = EventFanout(lambda: _initial_events(encode_screen=False), host, events_port or port + 2)
+    event_fanout.start()
+
+    # Pre-load quest definitions and their HTTP payloads
+    get_quest_catalog().gzip_payload()
+
+    # Render the default quest-overlay map and the map tiles now rather than on the first request
+    quest_map_cache.warm()
+    map_tile_pyramid.build_in_background()
     
     print(f"🎮 Game server starting on http://{host}:{port}")
     print(f"📊 Status queue monitor started")
     print(f"🗺️  Global map tracking enabled") 
     print(f"💬 Speech bubble system active")
-    print(f"📜 Quest system initialized with {len(quest_definitions or [])} quests")
+    print(f"📜 Quest system initialized with {len(get_quest_catalog())} quests")
     print(f"📁 Static files served from: {STATIC_DIR}")
     
     # Signal that the game has started when the web server is up
@@ -3934,26 +4199,80 @@ def start_server(status_queue, host='0.0.0.0', port=8080):
 
 @app.route('/global-map.png')
 def global_map_png():
-    """Dynamically generate and serve the quest-overlay global map."""
-    out_path = STATIC_DIR / 'images' / 'kanto_map.png'
-    # Generate full-size quest-overlay map (do not crop) so front-end sizing remains stable
-    quest_dir = Path(__file__).parent.parent / 'environment' / 'environment_helpers' / 'quest_paths'
-    build_quest_map(output_path=out_path, quest_dir=quest_dir, n=10, crop=False)
-    # # Optionally overlay current player position as a red rectangle
-    # # Player sprite overlay now handled in javascript code
-    # player = game_state.get('global_map_player')
-    # if player:
-    #     gy, gx = player.get('gy', 0), player.get('gx', 0)
-    #     # Convert padded global to tile coords
-    #     tx = gx - PAD_COL
-    #     ty = gy - PAD_ROW
-    #     # Load image and draw
-    #     img = Image.open(out_path).convert('RGBA')
-    #     draw = ImageDraw.Draw(img)
-    #     x0, y0 = tx * TILE_SIZE, ty * TILE_SIZE
-    #     draw.rectangle([x0, y0, x0 + TILE_SIZE - 1, y0 + TILE_SIZE - 1], outline=(255, 0, 0), width=2)
-    #     img.save(out_path)
-    return send_from_directory(out_path.parent, out_path.name, max_age=0)
+    """Serve the cached quest-overlay global map (full size so front-end sizing remains stable).
+
+    Optional ?quests=1,2,5 selects the overlaid quests (default 1-10); ids must
+    be in the quest catalog.  The map is rendered off the request path by
+    quest_map_cache; until the first build finishes (or when the cache admits
+    no more quest sets) the plain Kanto map is served instead.
+    """
+    quests_arg = request.args.get('quests')
+    try:
+        quest_ids = [int(q) for q in quests_arg.split(',') if q.strip()] if quests_arg else None
+    except ValueError:
+        return "Invalid quests parameter", 400
+    catalog = get_quest_catalog()
+    if quest_ids is not None and any(catalog.get(q) is None for q in quest_ids):
+        return "Unknown quest id in quests parameter", 400
+
+    cached = quest_map_cache.get(quest_ids)
+    if cached is None:
+        return send_from_directory(BASE_MAP_PATH.parent, BASE_MAP_PATH.name, max_age=0)
+
+    # Player sprite overlay is handled in javascript code
+    response = Response(cached.png, mimetype='image/png')
+    response.headers['ETag'] = cached.etag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/tiles/meta.json')
+def tiles_meta():
+    """Tile grid geometry and the current quest layer version for the tiled map."""
+    z = map_tile_pyramid.max_zoom
+    columns, rows = map_tile_pyramid.grid_size(z)
+    response = jsonify({
+        'tile_size': map_tile_pyramid.tile_size,
+        'width': map_tile_pyramid.width,
+        'height': map_tile_pyramid.height,
+        'min_zoom': 0,
+        'max_zoom': z,
+        'columns': columns,
+        'rows': rows,
+        'quest_version': quest_tile_layer.version(),
+    })
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/tiles/<int:z>/<int:x>/<int:y>.png')
+def map_tile(z, x, y):
+    """Serve one base map tile. Tiles never change, so browsers may cache them for good."""
+    png = map_tile_pyramid.tile_png(z, x, y, timeout=TILE_BUILD_WAIT)
+    if png is None:
+        if not map_tile_pyramid.ready.is_set():
+            return "Map tiles are still being built", 503, {'Retry-After': '1'}
+        return "Tile not found", 404
+    response = Response(png, mimetype='image/png')
+    response.headers['Cache-Control'] = TILE_CACHE_CONTROL
+    return response
+
+@app.route('/tiles/quests/<int:z>/<int:x>/<int:y>.png')
+def quest_tile(z, x, y):
+    """Serve one transparent quest overlay tile.
+
+    Requests carrying the current ?v= (see /tiles/meta.json) are cacheable
+    for good; anything else revalidates by ETag.
+    """
+    version = quest_tile_layer.version()
+    png = quest_tile_layer.tile_png(z, x, y)
+    if png is None:
+        return "Tile not found", 404
+    response = Response(png, mimetype='image/png')
+    response.set_etag(f"{version}-{z}-{x}-{y}")
+    if request.args.get('v') == version:
+        response.headers['Cache-Control'] = TILE_CACHE_CONTROL
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 @app.route('/static/images/pokemon_red_player_spritesheet.png')
 def serve_spritesheet():